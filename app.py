@@ -27,14 +27,17 @@ def init_session():
 init_session()
 
 # ================= IMPORTS =================
-from services.database_service import ensure_db_or_fail_gracefully
+from config import CACHE_LECTURES_CONFIG, EMAIL_OUTBOX_CONFIG, SCHEDULER_CONFIG
+from services.cache_notify_service import demarrer_ecoute
+from services.database_service import ensure_db_or_fail_gracefully, release_database_connection
+from services.email_outbox_service import demarrer_workers
+from services.scheduler_service import demarrer_planificateur
 from utils.permissions import est_super_admin
 from utils.role_utils import est_admin
 
-from views.auth_view import afficher_page_connexion
-from views.dashboard_view import afficher_page_dashboard
-from views.commande_view import afficher_page_commande
-from views.liste_view import afficher_page_liste_commandes
+# Les vues sont importées à leur premier affichage : la page de connexion
+# ne charge ni pandas, ni plotly, ni reportlab (démarrage à froid sur Render).
+# Mesure : python -m benchmarks.bench_imports
 
 # ================= SIDEBAR =================
 def render_sidebar():
@@ -62,13 +65,14 @@ def render_sidebar():
 def router():
     page = st.session_state.page
 
-    if page == "dashboard":
-        afficher_page_dashboard()
-    elif page == "commande":
+    if page == "commande":
+        from views.commande_view import afficher_page_commande
         afficher_page_commande()
     elif page == "liste":
+        from views.liste_view import afficher_page_liste_commandes
         afficher_page_liste_commandes()
     else:
+        from views.dashboard_view import afficher_page_dashboard
         afficher_page_dashboard()
 
 # ================= MAIN =================
@@ -76,6 +80,7 @@ def main():
 
     # ---------- LOGIN ----------
     if not st.session_state.authenticated:
+        from views.auth_view import afficher_page_connexion
         afficher_page_connexion()
         return
 
@@ -90,8 +95,20 @@ def main():
         st.error(st.session_state.get("db_last_error") or "Base de données indisponible.")
         return
 
+    # ---------- TÂCHES DE FOND (UNE FOIS PAR PROCESSUS) ----------
+    if SCHEDULER_CONFIG["enabled"]:
+        demarrer_planificateur()
+    if EMAIL_OUTBOX_CONFIG["enabled"]:
+        demarrer_workers()
+    if CACHE_LECTURES_CONFIG["enabled"] and CACHE_LECTURES_CONFIG["notify_enabled"]:
+        demarrer_ecoute()
+
     # ---------- APP ----------
     render_sidebar()
     router()
 
-main()
\ No newline at end of file
+try:
+    main()
+finally:
+    # Rendre au pool la connexion empruntée pendant ce rerun
+    release_database_connection(st.session_state)
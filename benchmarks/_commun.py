@@ -0,0 +1,115 @@
+"""
+Outils communs aux benchmarks : connexion dédiée et schéma PostgreSQL jetable.
+
+Les benchmarks ne touchent jamais aux tables de l'application : ils créent
+un schéma temporaire, le placent en tête du search_path de leur connexion
+(les modèles y trouvent donc leurs tables) et le suppriment à la fin.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List
+
+from config import DATABASE_CONFIG, IS_RENDER
+from models.database import DatabaseConnection
+
+
+def connexion_benchmark() -> DatabaseConnection:
+    """Connexion PostgreSQL dédiée (hors pool) vers la base configurée."""
+    cible = "render_production" if IS_RENDER else "postgresql_local"
+    connexion = DatabaseConnection("postgresql", DATABASE_CONFIG.get(cible, {}))
+    if not connexion.connect():
+        raise SystemExit("Connexion à la base impossible.")
+    return connexion
+
+
+@contextmanager
+def schema_jetable(connexion: DatabaseConnection, nom: str):
+    """Crée le schéma `nom`, le met en tête du search_path, puis le supprime."""
+    conn = connexion.get_connection()
+    cursor = conn.cursor()
+    cursor.execute(f"DROP SCHEMA IF EXISTS {nom} CASCADE")
+    cursor.execute(f"CREATE SCHEMA {nom}")
+    cursor.execute(f"SET search_path TO {nom}, public")
+    conn.commit()
+    cursor.close()
+    try:
+        yield
+    finally:
+        cursor = conn.cursor()
+        conn.rollback()
+        cursor.execute("SET search_path TO public")
+        cursor.execute(f"DROP SCHEMA IF EXISTS {nom} CASCADE")
+        conn.commit()
+        cursor.close()
+
+
+def executer_script(connexion: DatabaseConnection, instructions: List[str], params: Dict = None) -> None:
+    """Exécute des instructions SQL dans une transaction."""
+    conn = connexion.get_connection()
+    cursor = conn.cursor()
+    for instruction in instructions:
+        cursor.execute(instruction, params)
+    conn.commit()
+    cursor.close()
+
+
+class _CurseurInstrumente:
+    """Curseur qui compte les allers-retours et ajoute une latence réseau simulée."""
+
+    def __init__(self, cursor, compteur: Dict, rtt_s: float):
+        self._cursor = cursor
+        self._compteur = compteur
+        self._rtt_s = rtt_s
+
+    def execute(self, query, params=None):
+        self._compteur["requetes"] += 1
+        self._compteur["journal"].append((query, params))
+        if self._rtt_s:
+            time.sleep(self._rtt_s)
+        return self._cursor.execute(query, params)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class _ConnexionInstrumentee:
+    def __init__(self, conn, compteur: Dict, rtt_s: float):
+        self._conn = conn
+        self._compteur = compteur
+        self._rtt_s = rtt_s
+
+    def cursor(self, *args, **kwargs):
+        return _CurseurInstrumente(self._conn.cursor(*args, **kwargs), self._compteur, self._rtt_s)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+@contextmanager
+def instrumenter(connexion: DatabaseConnection, rtt_ms: float = 0.0):
+    """
+    Compte les requêtes envoyées via `connexion` pendant le bloc et simule un
+    aller-retour réseau de `rtt_ms` par requête (base distante, ex. Render).
+
+    Yields:
+        Dict {"requetes": n, "journal": [(requête, paramètres), ...]} mis à jour pendant le bloc
+    """
+    compteur = {"requetes": 0, "journal": []}
+    brute = connexion.connection
+    connexion.connection = _ConnexionInstrumentee(brute, compteur, rtt_ms / 1000.0)
+    try:
+        yield compteur
+    finally:
+        connexion.connection = brute
+
+
+def chronometrer(fonction: Callable, repetitions: int = 5) -> float:
+    """Durée médiane (ms) de `fonction()` sur `repetitions` exécutions."""
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append((time.perf_counter() - debut) * 1000)
+    durees.sort()
+    return durees[len(durees) // 2]
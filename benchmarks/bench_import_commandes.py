@@ -0,0 +1,149 @@
+"""
+Benchmark : débit de l'import en masse des commandes.
+
+Génère un fichier CSV synthétique (clients répétés : ~1 téléphone pour 3
+commandes, 2 % de lignes invalides) et compare, dans un schéma jetable :
+
+- le chemin unitaire de la saisie (CommandeController.creer_ou_recuperer_client
+  + CommandeModel.ajouter_commande : recherche, insertions et commit par ligne) ;
+- services/import_service.importer_commandes, pour plusieurs tailles de lot.
+
+Usage :
+    python -m benchmarks.bench_import_commandes [--lignes 20000] [--unitaire 2000] [--lots 100 1000 5000] [--rtt-ms 2]
+
+--rtt-ms ajoute une latence simulée par requête (base hébergée).
+"""
+
+import argparse
+import csv
+import io
+import random
+import time
+
+from benchmarks._commun import connexion_benchmark, executer_script, instrumenter, schema_jetable
+from controllers.commande_controller import CommandeController
+from models.stats_model import StatsDailyModel
+from services.import_service import importer_commandes, valider_ligne, LigneInvalide
+
+
+TABLES = [
+    "CREATE TABLE salons (salon_id VARCHAR(50) PRIMARY KEY, nom VARCHAR(255))",
+    "CREATE TABLE couturiers (id SERIAL PRIMARY KEY, salon_id VARCHAR(50), nom VARCHAR(100))",
+    """
+    CREATE TABLE clients (
+        id SERIAL PRIMARY KEY, couturier_id INTEGER NOT NULL, salon_id VARCHAR(50),
+        nom VARCHAR(100) NOT NULL, prenom VARCHAR(100) NOT NULL, telephone VARCHAR(20) NOT NULL,
+        email VARCHAR(150), date_creation TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    "CREATE INDEX idx_clients_telephone ON clients(telephone)",
+    "CREATE INDEX idx_clients_couturier ON clients(couturier_id)",
+    """
+    CREATE TABLE commandes (
+        id SERIAL PRIMARY KEY, client_id INTEGER NOT NULL REFERENCES clients(id),
+        couturier_id INTEGER NOT NULL REFERENCES couturiers(id), salon_id VARCHAR(50),
+        categorie VARCHAR(20) NOT NULL, sexe VARCHAR(20) NOT NULL, modele VARCHAR(100) NOT NULL,
+        mesures JSONB NOT NULL, prix_total DECIMAL(10,2) NOT NULL, avance DECIMAL(10,2) NOT NULL DEFAULT 0,
+        reste DECIMAL(10,2) NOT NULL, date_livraison DATE,
+        date_creation TIMESTAMP DEFAULT CURRENT_TIMESTAMP, date_fermeture TIMESTAMP NULL,
+        statut VARCHAR(50) DEFAULT 'En cours', est_ouverte BOOLEAN DEFAULT TRUE,
+        fabric_image_path VARCHAR(500), fabric_blob_id INTEGER, fabric_image_name VARCHAR(255),
+        model_type VARCHAR(20), model_image_path VARCHAR(500), model_blob_id INTEGER,
+        model_image_name VARCHAR(255)
+    )
+    """,
+    "INSERT INTO salons VALUES ('B_0001', 'Salon benchmark')",
+    "INSERT INTO couturiers (salon_id, nom) VALUES ('B_0001', 'Couturier benchmark')",
+]
+
+COLONNES = ['nom', 'prenom', 'telephone', 'modele', 'prix_total', 'avance', 'categorie',
+            'sexe', 'statut', 'date_creation', 'date_livraison']
+
+
+def generer_csv(nb_lignes: int, graine: int = 42) -> bytes:
+    """Fichier CSV de `nb_lignes` commandes (~2 % invalides)."""
+    aleatoire = random.Random(graine)
+    sortie = io.StringIO()
+    ecrivain = csv.writer(sortie, delimiter=';')
+    ecrivain.writerow(COLONNES)
+    nb_clients = max(1, nb_lignes // 3)
+    for i in range(nb_lignes):
+        k = aleatoire.randrange(nb_clients)
+        prix = 10000 + aleatoire.randrange(90) * 1000
+        paye = aleatoire.random() < 0.6
+        ecrivain.writerow([
+            f"Nom{k}", f"Prenom{k}", f"77 {k:07d}",
+            f"Modèle {i % 50}", "abc" if aleatoire.random() < 0.02 else prix,
+            prix if paye else prix // 2, "adulte", aleatoire.choice(("homme", "femme")),
+            "Livré et payé" if paye else "En cours",
+            f"{1 + i % 28:02d}/{1 + i % 12:02d}/2023", "",
+        ])
+    return sortie.getvalue().encode('utf-8')
+
+
+def vider(connexion) -> None:
+    executer_script(connexion, ["TRUNCATE commandes, clients, stats_daily RESTART IDENTITY"])
+
+
+def import_unitaire(connexion, contenu: bytes, nb_lignes: int) -> int:
+    """Chemin de la saisie : une recherche client + insertions + commit par ligne."""
+    controleur = CommandeController(connexion)
+    lecteur = csv.DictReader(io.StringIO(contenu.decode('utf-8')), delimiter=';')
+    nb_commandes = 0
+    for numero, brute in enumerate(lecteur):
+        if numero >= nb_lignes:
+            break
+        try:
+            ligne = valider_ligne(brute)
+        except LigneInvalide:
+            continue
+        client_id = controleur.creer_ou_recuperer_client(
+            1, ligne['nom'], ligne['prenom'], ligne['telephone'], ligne['email'])
+        if controleur.commande_model.ajouter_commande(
+                client_id, 1, ligne['categorie'], ligne['sexe'], ligne['modele'], ligne['mesures'],
+                ligne['prix_total'], ligne['avance'], reste=ligne['reste']):
+            nb_commandes += 1
+    return nb_commandes
+
+
+def mesurer(libelle: str, nb_lignes: int, appel, connexion, rtt_ms: float) -> None:
+    vider(connexion)
+    with instrumenter(connexion, rtt_ms) as compteur:
+        debut = time.perf_counter()
+        nb_commandes = appel()
+        duree = time.perf_counter() - debut
+    print(f"{libelle:<24} | {nb_lignes:>8} | {nb_commandes:>9} | {duree:>8.2f} | "
+          f"{nb_lignes / duree:>10.0f} | {compteur['requetes']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lignes", type=int, default=20_000)
+    parser.add_argument("--unitaire", type=int, default=2_000, help="lignes mesurées sur le chemin unitaire")
+    parser.add_argument("--lots", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--rtt-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    contenu = generer_csv(args.lignes)
+    connexion = connexion_benchmark()
+    try:
+        with schema_jetable(connexion, "bench_import"):
+            executer_script(connexion, TABLES)
+            StatsDailyModel(connexion).creer_tables()
+
+            print(f"{'chemin':<24} | {'lignes':>8} | {'commandes':>9} | {'durée (s)':>8} | "
+                  f"{'lignes/s':>10} | {'requêtes':>9}")
+            nb_unitaire = min(args.unitaire, args.lignes)
+            mesurer("unitaire (saisie)", nb_unitaire,
+                    lambda: import_unitaire(connexion, contenu, nb_unitaire), connexion, args.rtt_ms)
+            for taille_lot in args.lots:
+                mesurer(f"import, lots de {taille_lot}", args.lignes,
+                        lambda: importer_commandes(
+                            connexion, 1, io.BytesIO(contenu), "bench.csv", taille_lot)['commandes'],
+                        connexion, args.rtt_ms)
+    finally:
+        connexion.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark : temps d'import au démarrage (python -X importtime).
+
+Mesure, dans un interpréteur neuf par scénario, le temps d'import du chemin
+de connexion (imports de premier niveau d'app.py + views.auth_view) et de
+chaque page, puis affiche les imports les plus coûteux.
+
+Les bibliothèques lourdes (pandas, plotly, matplotlib, reportlab, PIL,
+qrcode...) ne doivent être chargées qu'à leur première utilisation : si le
+chemin de connexion en importe une que streamlit n'importe pas déjà, le
+script le signale et se termine avec le code 1 (régression).
+
+Usage :
+    python -m benchmarks.bench_imports [--repetitions 3] [--top 10] [--modules views.admin_view ...]
+"""
+
+import argparse
+import ast
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BIBLIOTHEQUES_LOURDES = (
+    "pandas", "plotly", "matplotlib", "reportlab", "PIL", "qrcode", "openpyxl", "pyarrow",
+)
+
+PAGES = {
+    "dashboard": ["views.dashboard_view"],
+    "commande": ["views.commande_view"],
+    "liste": ["views.liste_view"],
+}
+
+
+def imports_app() -> List[str]:
+    """Modules importés au premier niveau d'app.py (hors fonctions)."""
+    with open(os.path.join(RACINE, "app.py"), encoding="utf-8") as fichier:
+        arbre = ast.parse(fichier.read())
+    modules = []
+    for noeud in arbre.body:
+        if isinstance(noeud, ast.Import):
+            modules.extend(alias.name for alias in noeud.names)
+        elif isinstance(noeud, ast.ImportFrom) and noeud.module and not noeud.level:
+            modules.append(noeud.module)
+    return list(dict.fromkeys(modules))
+
+
+def mesurer(modules: List[str]) -> Dict[str, Tuple[int, int, int]]:
+    """
+    Importe `modules` dans un nouvel interpréteur.
+
+    Returns:
+        {module: (self µs, cumulé µs, profondeur)} d'après -X importtime
+    """
+    code = "\n".join(f"import {module}" for module in modules)
+    resultat = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=RACINE, capture_output=True, text=True,
+    )
+    if resultat.returncode != 0:
+        raise SystemExit(f"Import impossible ({', '.join(modules)}) :\n{resultat.stderr.strip().splitlines()[-1]}")
+    mesures = {}
+    for ligne in resultat.stderr.splitlines():
+        if not ligne.startswith("import time:") or "self [us]" in ligne:
+            continue
+        propre, cumule, nom = ligne[len("import time:"):].split("|", 2)
+        profondeur = (len(nom) - len(nom.lstrip())) // 2
+        mesures[nom.strip()] = (int(propre), int(cumule), profondeur)
+    return mesures
+
+
+def total_ms(mesures: Dict[str, Tuple[int, int, int]]) -> float:
+    return sum(propre for propre, _, _ in mesures.values()) / 1000
+
+
+def lourdes(mesures: Dict[str, Tuple[int, int, int]]) -> List[str]:
+    return [b for b in BIBLIOTHEQUES_LOURDES if b in mesures]
+
+
+def meilleure_mesure(modules: List[str], repetitions: int) -> Dict[str, Tuple[int, int, int]]:
+    return min((mesurer(modules) for _ in range(repetitions)), key=total_ms)
+
+
+def afficher(libelle: str, mesures: Dict[str, Tuple[int, int, int]], top: int) -> None:
+    print(f"\n== {libelle} : {total_ms(mesures):.0f} ms, {len(mesures)} modules, "
+          f"bibliothèques lourdes : {', '.join(lourdes(mesures)) or 'aucune'}")
+    premiers = sorted(
+        ((cumule, nom) for nom, (_, cumule, profondeur) in mesures.items() if profondeur == 0),
+        reverse=True,
+    )
+    for cumule, nom in premiers[:top]:
+        print(f"   {cumule / 1000:>9.1f} ms  {nom}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repetitions", type=int, default=3, help="mesures par scénario (la meilleure est gardée)")
+    parser.add_argument("--top", type=int, default=10, help="imports les plus coûteux affichés par scénario")
+    parser.add_argument("--modules", nargs="+", help="mesurer ces modules au lieu des scénarios")
+    args = parser.parse_args()
+
+    if args.modules:
+        afficher(", ".join(args.modules), meilleure_mesure(args.modules, args.repetitions), args.top)
+        return
+
+    reference = meilleure_mesure(["streamlit"], args.repetitions)
+    afficher("streamlit seul (référence)", reference, args.top)
+
+    chemin_connexion = imports_app() + ["views.auth_view"]
+    connexion = meilleure_mesure(chemin_connexion, args.repetitions)
+    afficher("page de connexion", connexion, args.top)
+
+    for page, modules in PAGES.items():
+        afficher(f"page {page}", meilleure_mesure(chemin_connexion + modules, args.repetitions), args.top)
+
+    regressions = [b for b in lourdes(connexion) if b not in reference]
+    if regressions:
+        print(f"\nRÉGRESSION : la page de connexion importe {', '.join(regressions)}.")
+        sys.exit(1)
+    print(f"\nPage de connexion : {total_ms(connexion) - total_ms(reference):.0f} ms au-delà de streamlit.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Benchmark : index partiels des requêtes fréquentes sur les commandes.
+
+Génère un jeu synthétique (1 000 000 de commandes par défaut) dans un schéma
+jetable avec les index de base de database_schema.sql, exécute les requêtes
+réelles des modèles sous EXPLAIN ANALYZE, ajoute INDEX_REQUETES_CHAUDES
+(services/migration_service.py) puis les mesure de nouveau.
+
+Usage :
+    python -m benchmarks.bench_index_commandes [--commandes 1000000] [--seed 0.42]
+
+Les requêtes sont capturées au niveau du curseur pendant l'appel des
+méthodes de CommandeModel : c'est bien le SQL de l'application qui est
+mesuré, paramètres compris.
+"""
+
+import argparse
+import json
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks._commun import connexion_benchmark, executer_script, instrumenter, schema_jetable
+from models.database import CommandeModel
+from services.migration_service import INDEX_REQUETES_CHAUDES
+
+
+# Date de référence fixe : jeu de données et fenêtres reproductibles
+AUJOURD_HUI = date(2025, 6, 1)
+
+TABLES = [
+    "CREATE TABLE salons (salon_id VARCHAR(50) PRIMARY KEY, nom VARCHAR(255))",
+    """
+    CREATE TABLE couturiers (
+        id SERIAL PRIMARY KEY, salon_id VARCHAR(50), role VARCHAR(20),
+        nom VARCHAR(100), prenom VARCHAR(100), email VARCHAR(255), telephone VARCHAR(50)
+    )
+    """,
+    """
+    CREATE TABLE clients (
+        id SERIAL PRIMARY KEY, couturier_id INTEGER, salon_id VARCHAR(50),
+        nom VARCHAR(100), prenom VARCHAR(100), telephone VARCHAR(20)
+    )
+    """,
+    """
+    CREATE TABLE commandes (
+        id SERIAL PRIMARY KEY, client_id INTEGER NOT NULL, couturier_id INTEGER NOT NULL,
+        salon_id VARCHAR(50), modele VARCHAR(100) NOT NULL,
+        prix_total DECIMAL(10,2) NOT NULL, avance DECIMAL(10,2) NOT NULL DEFAULT 0,
+        reste DECIMAL(10,2) NOT NULL, date_livraison DATE,
+        date_creation TIMESTAMP DEFAULT CURRENT_TIMESTAMP, date_fermeture TIMESTAMP NULL,
+        statut VARCHAR(50) DEFAULT 'En cours', est_ouverte BOOLEAN DEFAULT TRUE
+    )
+    """,
+    """
+    CREATE TABLE historique_commandes (
+        id SERIAL PRIMARY KEY, commande_id INTEGER NOT NULL, couturier_id INTEGER NOT NULL,
+        type_action VARCHAR(50) NOT NULL, montant_paye DECIMAL(10,2) DEFAULT 0,
+        reste_apres_paiement DECIMAL(10,2) DEFAULT 0, statut_avant VARCHAR(50),
+        statut_apres VARCHAR(50), commentaire TEXT,
+        statut_validation VARCHAR(50) DEFAULT 'en_attente',
+        date_creation TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+]
+
+# Index existants avant la migration 10 (database_schema.sql)
+INDEX_DE_BASE = [
+    "CREATE INDEX idx_couturiers_salon ON couturiers(salon_id)",
+    "CREATE INDEX idx_clients_couturier ON clients(couturier_id)",
+    "CREATE INDEX idx_commandes_client_id ON commandes(client_id)",
+    "CREATE INDEX idx_commandes_couturier_id ON commandes(couturier_id)",
+    "CREATE INDEX idx_commandes_statut ON commandes(statut)",
+    "CREATE INDEX idx_commandes_date_creation ON commandes(date_creation)",
+    "CREATE INDEX idx_commandes_date_livraison ON commandes(date_livraison)",
+    "CREATE INDEX idx_commandes_couturier_statut ON commandes(couturier_id, statut)",
+    "CREATE INDEX idx_commandes_est_ouverte ON commandes(est_ouverte)",
+    "CREATE INDEX idx_commandes_couturier_date ON commandes(couturier_id, date_creation, id)",
+    "CREATE INDEX idx_historique_commande_id ON historique_commandes(commande_id)",
+    "CREATE INDEX idx_historique_couturier_id ON historique_commandes(couturier_id)",
+    "CREATE INDEX idx_historique_statut_validation ON historique_commandes(statut_validation)",
+    "CREATE INDEX idx_historique_date_creation ON historique_commandes(date_creation)",
+]
+
+# 200 salons × 5 couturiers ; ~10 % de commandes ouvertes, ~15 % avec un
+# reste à payer, ~1 % de demandes en attente de validation
+DONNEES = [
+    "SELECT setseed(%(seed)s)",
+    """
+    INSERT INTO salons (salon_id, nom)
+    SELECT 'B_' || LPAD(i::TEXT, 4, '0'), 'Salon ' || i FROM generate_series(1, 200) AS i
+    """,
+    """
+    INSERT INTO couturiers (salon_id, role, nom, prenom, email, telephone)
+    SELECT s.salon_id, CASE WHEN e = 1 THEN 'admin' ELSE 'employe' END,
+           'Nom' || e, 'Prenom' || e, 'c' || e || '@exemple.test', '770000000'
+    FROM salons s CROSS JOIN generate_series(1, 5) AS e
+    """,
+    """
+    INSERT INTO clients (couturier_id, salon_id, nom, prenom, telephone)
+    SELECT co.id, co.salon_id, 'Client' || k, 'Prenom' || k, '77' || LPAD(k::TEXT, 7, '0')
+    FROM couturiers co CROSS JOIN generate_series(1, 40) AS k
+    """,
+    """
+    INSERT INTO commandes (client_id, couturier_id, salon_id, modele, prix_total, avance, reste,
+                           date_livraison, date_creation, statut, est_ouverte)
+    SELECT t.client_id, co.id, co.salon_id, 'Modèle ' || (t.i %% 50),
+           t.prix, t.prix - t.reste, t.reste,
+           %(aujourd_hui)s::date + ((t.i %% 1100) - 1000),
+           %(aujourd_hui)s::date - (t.i %% 1000) * INTERVAL '1 day' - (t.i %% 86400) * INTERVAL '1 second',
+           CASE WHEN t.ouverte THEN 'En cours' ELSE 'Livré et payé' END,
+           t.ouverte
+    FROM (
+        SELECT i,
+               1 + (i %% 40000) AS client_id,
+               1 + (i %% 1000) AS couturier_id,
+               (10000 + (i %% 90) * 1000)::DECIMAL(10,2) AS prix,
+               CASE WHEN random() < 0.15 THEN 5000 ELSE 0 END::DECIMAL(10,2) AS reste,
+               random() < 0.10 AS ouverte
+        FROM generate_series(1, %(nb_commandes)s) AS i
+    ) t
+    JOIN couturiers co ON co.id = t.couturier_id
+    """,
+    """
+    INSERT INTO historique_commandes (commande_id, couturier_id, type_action, montant_paye,
+                                      statut_validation, date_creation)
+    SELECT c.id, c.couturier_id,
+           CASE WHEN c.id %% 2 = 0 THEN 'paiement' ELSE 'fermeture_demande' END,
+           1000,
+           CASE WHEN random() < 0.2 THEN 'en_attente' ELSE 'validee' END,
+           c.date_creation + INTERVAL '1 day'
+    FROM commandes c
+    WHERE random() < 0.05
+    """,
+    "ANALYZE",
+]
+
+
+def _requetes_chaudes(modele: CommandeModel, salon_id: str) -> List[Tuple[str, Callable]]:
+    """(libellé, appel) des méthodes mesurées, pour le couturier 1 et son salon."""
+    debut_semaine = AUJOURD_HUI
+    fin_semaine = AUJOURD_HUI + timedelta(days=7)
+    return [
+        ("commandes ouvertes (couturier)",
+         lambda: modele.lister_commandes_ouvertes(1)),
+        ("commandes ouvertes (salon)",
+         lambda: modele.lister_commandes_ouvertes(None, tous_les_couturiers=True, salon_id=salon_id)),
+        ("reste à payer",
+         lambda: modele.lister_commandes_avec_reste_a_payer(1, salon_id)),
+        ("demandes à valider (salon)",
+         lambda: modele.lister_demandes_validation(salon_id=salon_id)),
+        ("demandes à valider (toutes)",
+         lambda: modele.lister_demandes_validation()),
+        ("calendrier 7 j (couturier)",
+         lambda: modele.lister_commandes_calendrier(debut_semaine, fin_semaine, couturier_id=1)),
+        ("calendrier 7 j (salon)",
+         lambda: modele.lister_commandes_calendrier(
+             debut_semaine, fin_semaine, tous_les_couturiers=True, salon_id=salon_id)),
+    ]
+
+
+def _index_utilises(noeud: Dict) -> List[str]:
+    index = [noeud['Index Name']] if 'Index Name' in noeud else []
+    for enfant in noeud.get('Plans', []):
+        index.extend(_index_utilises(enfant))
+    return index
+
+
+def expliquer(connexion, modele: CommandeModel, salon_id: str) -> Dict[str, Tuple[float, List[str]]]:
+    """Durée d'exécution (ms, EXPLAIN ANALYZE) et index utilisés par requête."""
+    resultats = {}
+    for libelle, appel in _requetes_chaudes(modele, salon_id):
+        with instrumenter(connexion) as capture:
+            appel()
+        requete, params = capture['journal'][-1]
+        cursor = connexion.get_connection().cursor()
+        cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + requete, params)
+        plan = cursor.fetchone()[0]
+        cursor.close()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        plan = plan[0]
+        resultats[libelle] = (plan['Execution Time'], sorted(set(_index_utilises(plan['Plan']))))
+    return resultats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--commandes", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=float, default=0.42, help="graine de random() (entre -1 et 1)")
+    args = parser.parse_args()
+
+    connexion = connexion_benchmark()
+    try:
+        with schema_jetable(connexion, "bench_index"):
+            print(f"Génération de {args.commandes} commandes...")
+            executer_script(connexion, TABLES + INDEX_DE_BASE)
+            executer_script(connexion, DONNEES, {
+                "nb_commandes": args.commandes, "seed": args.seed, "aujourd_hui": AUJOURD_HUI,
+            })
+            modele = CommandeModel(connexion)
+            cursor = connexion.get_connection().cursor()
+            cursor.execute("SELECT salon_id FROM couturiers WHERE id = 1")
+            salon_id = cursor.fetchone()[0]
+            cursor.close()
+
+            avant = expliquer(connexion, modele, salon_id)
+            executer_script(connexion, INDEX_REQUETES_CHAUDES + ["ANALYZE"])
+            apres = expliquer(connexion, modele, salon_id)
+
+            print(f"{'requête':<30} | {'avant (ms)':>10} | {'après (ms)':>10} | index après")
+            for libelle, (ms_avant, _) in avant.items():
+                ms_apres, index = apres[libelle]
+                print(f"{libelle:<30} | {ms_avant:>10.1f} | {ms_apres:>10.1f} | {', '.join(index) or '-'}")
+    finally:
+        connexion.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark : liste des salons du super admin (SalonModel.lister_tous_salons).
+
+Compare l'ancienne implémentation (1 requête pour les salons, puis 5 par
+salon : employés, clients, commandes, CA, admin) à la requête agrégée
+unique, sur 10, 100 et 1000 salons générés dans un schéma jetable.
+
+Usage :
+    python -m benchmarks.bench_lister_salons [--tailles 10 100 1000] [--rtt-ms 2]
+
+--rtt-ms ajoute une latence simulée par requête : en local l'aller-retour
+est quasi nul, alors qu'il coûte 1 à 5 ms vers une base hébergée.
+"""
+
+import argparse
+
+from benchmarks._commun import chronometrer, connexion_benchmark, executer_script, instrumenter, schema_jetable
+from models.salon_model import SalonModel
+
+
+TABLES = [
+    """
+    CREATE TABLE salons (
+        salon_id VARCHAR(50) PRIMARY KEY, nom VARCHAR(255), quartier VARCHAR(255),
+        responsable VARCHAR(255), telephone VARCHAR(50), email VARCHAR(255),
+        code_admin VARCHAR(50), actif BOOLEAN DEFAULT TRUE,
+        date_creation TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        smtp_host VARCHAR(255), smtp_port INTEGER, smtp_user VARCHAR(255),
+        smtp_from VARCHAR(255), smtp_use_tls BOOLEAN, smtp_use_ssl BOOLEAN
+    )
+    """,
+    """
+    CREATE TABLE couturiers (
+        id SERIAL PRIMARY KEY, salon_id VARCHAR(50), role VARCHAR(20),
+        nom VARCHAR(100), prenom VARCHAR(100)
+    )
+    """,
+    "CREATE TABLE clients (id SERIAL PRIMARY KEY, salon_id VARCHAR(50))",
+    "CREATE TABLE commandes (id SERIAL PRIMARY KEY, salon_id VARCHAR(50), prix_total NUMERIC(10, 2))",
+    "CREATE INDEX idx_couturiers_salon ON couturiers(salon_id)",
+    "CREATE INDEX idx_clients_salon ON clients(salon_id)",
+    "CREATE INDEX idx_commandes_salon ON commandes(salon_id)",
+]
+
+DONNEES = [
+    """
+    INSERT INTO salons (salon_id, nom, quartier, code_admin)
+    SELECT 'B_' || LPAD(i::TEXT, 4, '0'), 'Salon ' || i, 'Quartier', 'B_' || LPAD(i::TEXT, 4, '0')
+    FROM generate_series(1, %(nb_salons)s) AS i
+    """,
+    """
+    INSERT INTO couturiers (salon_id, role, nom, prenom)
+    SELECT s.salon_id, CASE WHEN e = 1 THEN 'admin' ELSE 'employe' END, 'Nom' || e, 'Prenom' || e
+    FROM salons s CROSS JOIN generate_series(1, 4) AS e
+    """,
+    "INSERT INTO clients (salon_id) SELECT s.salon_id FROM salons s CROSS JOIN generate_series(1, 30)",
+    """
+    INSERT INTO commandes (salon_id, prix_total)
+    SELECT s.salon_id, (random() * 50000)::NUMERIC(10, 2)
+    FROM salons s CROSS JOIN generate_series(1, 60)
+    """,
+    "ANALYZE",
+]
+
+
+def lister_salons_n_plus_1(connexion):
+    """Reproduction de l'ancienne boucle (requêtes par salon), pour comparaison."""
+    cursor = connexion.get_connection().cursor()
+    cursor.execute("SELECT salon_id, nom FROM salons ORDER BY salon_id")
+    salons = []
+    for salon_id, nom in cursor.fetchall():
+        cursor.execute("SELECT COUNT(*) FROM couturiers WHERE salon_id = %s AND role = 'employe'", (salon_id,))
+        nb_employes = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(*) FROM clients WHERE salon_id = %s", (salon_id,))
+        nb_clients = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(*) FROM commandes WHERE salon_id = %s", (salon_id,))
+        nb_commandes = cursor.fetchone()[0]
+        cursor.execute("SELECT COALESCE(SUM(prix_total), 0) FROM commandes WHERE salon_id = %s", (salon_id,))
+        ca_total = float(cursor.fetchone()[0])
+        cursor.execute(
+            "SELECT nom, prenom FROM couturiers WHERE salon_id = %s AND role = 'admin' LIMIT 1", (salon_id,)
+        )
+        cursor.fetchone()
+        salons.append((salon_id, nom, nb_employes, nb_clients, nb_commandes, ca_total))
+    cursor.close()
+    return salons
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tailles", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="latence simulée par requête")
+    parser.add_argument("--repetitions", type=int, default=5)
+    args = parser.parse_args()
+
+    connexion = connexion_benchmark()
+    print(f"{'salons':>7} | {'avant (req.)':>12} | {'avant (ms)':>10} | {'après (req.)':>12} | {'après (ms)':>10}")
+    try:
+        for nb_salons in args.tailles:
+            with schema_jetable(connexion, "bench_salons"):
+                executer_script(connexion, TABLES)
+                executer_script(connexion, DONNEES, {"nb_salons": nb_salons})
+                salon_model = SalonModel(connexion)
+
+                with instrumenter(connexion, args.rtt_ms) as avant:
+                    ms_avant = chronometrer(lambda: lister_salons_n_plus_1(connexion), args.repetitions)
+                with instrumenter(connexion, args.rtt_ms) as apres:
+                    ms_apres = chronometrer(salon_model.lister_tous_salons, args.repetitions)
+
+                assert len(salon_model.lister_tous_salons()) == nb_salons
+                print(
+                    f"{nb_salons:>7} | {avant['requetes'] // args.repetitions:>12} | {ms_avant:>10.1f} | "
+                    f"{apres['requetes'] // args.repetitions:>12} | {ms_apres:>10.1f}"
+                )
+    finally:
+        connexion.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -198,6 +198,64 @@ else:
         }
     }
 
+# ============================================================================
+# POOL DE CONNEXIONS (PARTAGÉ PAR PROCESSUS)
+# ============================================================================
+
+# POURQUOI ? Une connexion par onglet ouvert épuise vite la limite de connexions
+#            de PostgreSQL sur Render et chaque connexion paie un handshake TLS.
+# COMMENT ? Toutes les sessions d'un processus empruntent leurs connexions à un
+#           pool borné (DB_POOL_MIN / DB_POOL_MAX) le temps d'une requête.
+# UTILISÉ OÙ ? Dans services/database_service.py (DatabaseConnection en mode pool)
+
+
+def _env_bool(name: str, default: str = 'true') -> bool:
+    return os.getenv(name, default).strip().lower() not in ('0', 'false', 'no', 'off', '')
+
+
+DB_POOL_CONFIG = {
+    'enabled': _env_bool('DB_POOL_ENABLED', 'true'),
+    'min': int(os.getenv('DB_POOL_MIN', '1')),
+    'max': int(os.getenv('DB_POOL_MAX', '10')),
+    # Attente max (secondes) d'une connexion libre quand le pool est plein
+    'acquire_timeout': float(os.getenv('DB_POOL_ACQUIRE_TIMEOUT', '10')),
+    # Une connexion inactive depuis plus longtemps est vérifiée avant d'être prêtée
+    'idle_check_seconds': float(os.getenv('DB_POOL_IDLE_CHECK_SECONDS', '60')),
+}
+
+# Durée (secondes) pendant laquelle une connexion vérifiée est considérée vivante
+# sans nouveau "SELECT 1". Au-delà, une sonde est refaite au prochain contrôle ;
+# entre-temps, une connexion coupée est détectée à la première requête qui échoue.
+DB_LIVENESS_TTL_SECONDS = float(os.getenv('DB_LIVENESS_TTL_SECONDS', '300'))
+
+# ============================================================================
+# CACHE DES LECTURES (PAR SALON)
+# ============================================================================
+
+# POURQUOI ? Chaque rerun Streamlit relançait les mêmes listes et statistiques
+#            alors que les données d'un salon ne changent qu'à ses écritures.
+# COMMENT ? Les résultats sont gardés en mémoire par (salon, requête, paramètres)
+#           avec un numéro de version par salon, incrémenté par chaque écriture
+#           (ajouter_commande, enregistrer_paiement, ajouter_charge...). Chaque
+#           invalidation est diffusée aux autres instances par NOTIFY ; tant
+#           que l'écoute (LISTEN) est active, les entrées vivent ttl_ecoute_seconds,
+#           sinon ttl_seconds borne l'écart avec les écritures des autres instances.
+# UTILISÉ OÙ ? Dans utils/cache_lectures.py (décorateurs des modèles et contrôleurs)
+#              et services/cache_notify_service.py (démarré depuis app.py)
+
+CACHE_LECTURES_CONFIG = {
+    'enabled': _env_bool('CACHE_LECTURES_ENABLED', 'true'),
+    # TTL de repli, quand l'écoute des invalidations est coupée ou indisponible
+    'ttl_seconds': float(os.getenv('CACHE_LECTURES_TTL_SECONDS', '120')),
+    # TTL quand l'écoute des invalidations des autres instances est active
+    'ttl_ecoute_seconds': float(os.getenv('CACHE_LECTURES_TTL_LISTEN_SECONDS', '1800')),
+    'max_entries': int(os.getenv('CACHE_LECTURES_MAX_ENTRIES', '2000')),
+    # Diffuser / écouter les invalidations entre instances (PostgreSQL LISTEN/NOTIFY)
+    'notify_enabled': _env_bool('CACHE_LECTURES_NOTIFY_ENABLED', 'true'),
+    # Attente (secondes) avant de relancer une écoute coupée
+    'notify_retry_seconds': float(os.getenv('CACHE_LECTURES_NOTIFY_RETRY_SECONDS', '30')),
+}
+
 # ============================================================================
 # MODÈLES DE VÊTEMENTS DISPONIBLES
 # ============================================================================
@@ -570,6 +628,53 @@ EMAIL_CONFIG = {
     'use_ssl': False
 }
 
+# ============================================================================
+# TÂCHES PLANIFIÉES (RAPPELS DE LIVRAISON)
+# ============================================================================
+
+# POURQUOI ? Envoyer les rappels J-2 sans attendre qu'un utilisateur ouvre le
+#            calendrier, et une seule fois même avec plusieurs instances.
+# COMMENT ? Un thread par processus (ou `python -m services.scheduler_service`)
+#           prend un verrou consultatif PostgreSQL, rattrape les jours manqués
+#           et trace chaque exécution dans la table job_runs.
+# UTILISÉ OÙ ? Dans services/scheduler_service.py (démarré depuis app.py)
+SCHEDULER_CONFIG = {
+    # Démarrer le thread planificateur dans le processus Streamlit
+    'enabled': _env_bool('SCHEDULER_ENABLED', 'true'),
+    # Intervalle (secondes) entre deux vérifications des tâches dues
+    'interval_seconds': float(os.getenv('SCHEDULER_INTERVAL_SECONDS', '900')),
+    # Nombre de jours passés rattrapés si le planificateur n'a pas tourné
+    'max_catchup_days': int(os.getenv('SCHEDULER_MAX_CATCHUP_DAYS', '2')),
+}
+
+# ============================================================================
+# FILE D'ENVOI DES E-MAILS
+# ============================================================================
+
+# POURQUOI ? Un serveur SMTP lent bloquait l'interface pendant l'envoi
+#            (création de commande, livraison, relance de paiement).
+# COMMENT ? Les vues insèrent l'e-mail dans la table email_outbox et rendent
+#           la main ; un pool de workers la vide avec de nouveaux essais espacés
+#           (backoff exponentiel) et un nombre limité d'envois par salon.
+# UTILISÉ OÙ ? Dans services/email_outbox_service.py (démarré depuis app.py)
+EMAIL_OUTBOX_CONFIG = {
+    # Démarrer les workers dans le processus Streamlit
+    'enabled': _env_bool('EMAIL_OUTBOX_ENABLED', 'true'),
+    # Nombre d'envois simultanés par processus
+    'workers': int(os.getenv('EMAIL_OUTBOX_WORKERS', '4')),
+    # Nombre d'envois simultanés pour un même salon (toutes instances)
+    'per_salon_concurrency': int(os.getenv('EMAIL_OUTBOX_PER_SALON', '2')),
+    # Nombre maximal d'essais avant abandon
+    'max_attempts': int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', '5')),
+    # Délai avant le 2e essai (secondes), doublé à chaque échec, plafonné
+    'backoff_base_seconds': float(os.getenv('EMAIL_OUTBOX_BACKOFF_BASE', '30')),
+    'backoff_max_seconds': float(os.getenv('EMAIL_OUTBOX_BACKOFF_MAX', '3600')),
+    # Attente maximale entre deux scrutations de la file
+    'poll_interval_seconds': float(os.getenv('EMAIL_OUTBOX_POLL_SECONDS', '10')),
+    # Un envoi « en cours » plus vieux que ce délai (worker arrêté) est repris
+    'stale_after_seconds': int(os.getenv('EMAIL_OUTBOX_STALE_SECONDS', '300')),
+}
+
 # ============================================================================
 # RÉPERTOIRE DE STOCKAGE DES PDF
 # ============================================================================
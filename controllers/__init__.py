@@ -4,5 +4,13 @@ Package controllers - Contient tous les contrôleurs
 from .auth_controller import AuthController
 from .commande_controller import CommandeController
 from .fermeture_controller import FermetureController
-from .pdf_controller import PDFController
 __all__ = ['AuthController', 'CommandeController', 'FermetureController', 'PDFController']
+
+
+def __getattr__(name):
+    # PDFController (reportlab, PIL, qrcode) n'est chargé qu'au premier accès :
+    # importer un autre contrôleur ne doit pas payer ces bibliothèques.
+    if name == 'PDFController':
+        from .pdf_controller import PDFController
+        return PDFController
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
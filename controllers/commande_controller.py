@@ -136,6 +136,16 @@ class CommandeController:
             logger.exception("Erreur création commande")
             return False, None, "Erreur lors de la création de la commande"
     
+    def importer_commandes(self, couturier_id: int, fichier, nom_fichier: str,
+                           progression=None) -> Dict:
+        """
+        Import en masse de commandes historiques depuis un fichier CSV/Excel
+        (voir services/import_service pour les colonnes et le bilan retourné)
+        """
+        from services.import_service import importer_commandes
+        return importer_commandes(self.db_connection, couturier_id, fichier, nom_fichier,
+                                  progression=progression)
+    
     def obtenir_details_commande(self, commande_id: int) -> Optional[Dict]:
         """Récupère les détails complets d'une commande"""
         return self.commande_model.obtenir_commande(commande_id)
@@ -144,6 +154,23 @@ class CommandeController:
         """Liste toutes les commandes d'un couturier"""
         return self.commande_model.lister_commandes(couturier_id)
     
+    def rechercher_commandes_couturier(self, couturier_id: int, **filtres) -> Dict:
+        """
+        Page de commandes d'un couturier filtrée en base
+        (voir CommandeModel.rechercher_commandes pour les filtres)
+        """
+        return self.commande_model.rechercher_commandes(couturier_id, **filtres)
+    
+    def rechercher_clients(self, texte: str, salon_id: Optional[str] = None,
+                           couturier_id: Optional[int] = None, limite: int = 10) -> List[Dict]:
+        """Clients dont le nom, prénom, téléphone ou e-mail correspond au texte"""
+        return self.client_model.rechercher_clients(texte, salon_id, couturier_id, limite)
+    
+    def rechercher_commandes_texte(self, texte: str, salon_id: Optional[str] = None,
+                                   couturier_id: Optional[int] = None, limite: int = 10) -> List[Dict]:
+        """Commandes dont le modèle ou le numéro correspond au texte"""
+        return self.commande_model.rechercher_par_texte(texte, salon_id, couturier_id, limite)
+    
     def calculer_reste(self, prix_total: float, avance: float) -> float:
         """Calcule le reste à payer"""
         return max(0, prix_total - avance)
@@ -208,7 +235,7 @@ class CommandeController:
             # Ajouter les filtres
             conditions = []
             if salon_id:
-                conditions.append("co.salon_id = %s")
+                conditions.append("c.salon_id = %s")
                 params.append(salon_id)
             
             if code_couturier:
@@ -263,7 +290,7 @@ class CommandeController:
             # Ajouter les filtres
             conditions = []
             if salon_id:
-                conditions.append("co.salon_id = %s")
+                conditions.append("c.salon_id = %s")
                 params.append(salon_id)
             
             if code_couturier:
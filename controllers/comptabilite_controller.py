@@ -1,13 +1,16 @@
 """Contrôleur pour la comptabilité"""
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from models.database import DatabaseConnection
+from models.stats_model import StatsDailyModel
+from utils.cache_lectures import lecture_en_cache
 
 
 class ComptabiliteController:
     def __init__(self, db_connection: DatabaseConnection):
         self.db = db_connection
     
+    @lecture_en_cache()
     def obtenir_statistiques(
         self,
         couturier_id: Optional[int] = None,
@@ -15,60 +18,38 @@ class ComptabiliteController:
         date_fin: Optional[datetime] = None,
         salon_id: Optional[str] = None,
     ) -> Dict:
-        """Calcule les statistiques financières (par couturier ou par salon)."""
-        try:
-            cursor = self.db.get_connection().cursor()
-            if couturier_id is not None:
-                where_clause = "WHERE couturier_id = %s"
-                params: list = [couturier_id]
-            elif salon_id is not None:
-                where_clause = "WHERE couturier_id IN (SELECT id FROM couturiers WHERE salon_id = %s)"
-                params = [salon_id]
-            else:
-                return {'nb_commandes': 0, 'ca_total': 0, 'avances_total': 0, 'reste_total': 0, 'taux_avance': 0, 'commandes_par_statut': {}, 'top_modeles': []}
+        """
+        Calcule les statistiques financières (par couturier ou par salon).
 
-            if date_debut:
-                where_clause += " AND date_creation >= %s"
-                params.append(date_debut)
-            if date_fin:
-                where_clause += " AND date_creation <= %s"
-                params.append(date_fin)
+        Lues dans les agrégats journaliers stats_daily, tenus à jour par les
+        écritures sur les commandes (voir models/stats_model.py).
+        """
+        return StatsDailyModel(self.db).statistiques(
+            couturier_id=couturier_id,
+            salon_id=salon_id,
+            date_debut=date_debut,
+            date_fin=date_fin,
+        )
+    
+    @lecture_en_cache()
+    def obtenir_statistiques_periodes(
+        self,
+        periodes: Dict[str, Tuple[Optional[datetime], Optional[datetime]]],
+        couturier_id: Optional[int] = None,
+        salon_id: Optional[str] = None,
+    ) -> Dict[str, Dict]:
+        """
+        Statistiques de plusieurs périodes en un seul aller-retour SQL.
 
-            # Stats financières
-            query = f"SELECT COUNT(*), COALESCE(SUM(prix_total), 0), COALESCE(SUM(avance), 0), COALESCE(SUM(reste), 0) FROM commandes {where_clause}"
-            cursor.execute(query, params)
-            result = cursor.fetchone()
-            
-            nb_commandes = result[0]
-            ca_total = float(result[1])
-            avances_total = float(result[2])
-            reste_total = float(result[3])
-            taux_avance = (avances_total / ca_total * 100) if ca_total > 0 else 0
-            
-            # Stats par statut
-            query = f"SELECT statut, COUNT(*) FROM commandes {where_clause} GROUP BY statut"
-            cursor.execute(query, params)
-            commandes_par_statut = {statut: count for statut, count in cursor.fetchall()}
-            
-            # Top modèles
-            query = f"SELECT modele, COUNT(*) FROM commandes {where_clause} GROUP BY modele ORDER BY COUNT(*) DESC LIMIT 10"
-            cursor.execute(query, params)
-            top_modeles = cursor.fetchall()
-            
-            cursor.close()
-            
-            return {
-                'nb_commandes': nb_commandes,
-                'ca_total': ca_total,
-                'avances_total': avances_total,
-                'reste_total': reste_total,
-                'taux_avance': taux_avance,
-                'commandes_par_statut': commandes_par_statut,
-                'top_modeles': top_modeles
-            }
-        except Exception as e:
-            print(f"Erreur stats: {e}")
-            return {'nb_commandes': 0, 'ca_total': 0, 'avances_total': 0, 'reste_total': 0, 'taux_avance': 0, 'commandes_par_statut': {}, 'top_modeles': []}
+        Args:
+            periodes: {nom: (date_debut, date_fin)}, ex. {'total': (None, None)}
+
+        Returns:
+            {nom: statistiques au format de `obtenir_statistiques`}
+        """
+        return StatsDailyModel(self.db).statistiques_fenetres(
+            periodes, couturier_id=couturier_id, salon_id=salon_id
+        )
     
     def obtenir_liste_clients(self, couturier_id: int) -> List:
         """Récupère la liste des clients avec leurs stats"""
@@ -157,7 +138,7 @@ class ComptabiliteController:
                 where = ["couturier_id = %s"]
                 params: list = [couturier_id]
             elif salon_id is not None:
-                where = ["couturier_id IN (SELECT id FROM couturiers WHERE salon_id = %s)"]
+                where = ["salon_id = %s"]
                 params = [salon_id]
             else:
                 return []
@@ -4,7 +4,7 @@ Contrôleur d'envoi d'e-mails (SMTP)
 import os
 import smtplib
 from email.message import EmailMessage
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from pathlib import Path
 import logging
 
@@ -65,6 +65,123 @@ class EmailController:
             return False, f"Configuration email incomplète : {', '.join(missing)}."
         return True, "Configuration email OK."
 
+    def _construire_message(self, to_email: str, subject: str, body: str,
+                            attachments: Optional[List[str]] = None,
+                            contenus: Optional[List[Tuple[str, bytes]]] = None) -> EmailMessage:
+        msg = EmailMessage()
+        msg["Subject"] = subject
+        msg["From"] = self.from_email
+        msg["To"] = to_email
+        msg.set_content(body)
+
+        # Ajouter pièces jointes (fichiers sur disque puis contenus déjà chargés)
+        pieces = list(contenus or [])
+        for file_path in attachments or []:
+            path = Path(file_path)
+            if not path.is_file():
+                continue
+            with open(path, "rb") as f:
+                pieces.append((path.name, f.read()))
+        for nom_fichier, data in pieces:
+            msg.add_attachment(
+                data,
+                maintype="application",
+                subtype="pdf",
+                filename=nom_fichier
+            )
+        return msg
+
+    def _ouvrir_connexion(self) -> smtplib.SMTP:
+        """Ouvre une connexion SMTP authentifiée (à fermer par l'appelant, ou via `with`)."""
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(self.host, self.port)
+        else:
+            server = smtplib.SMTP(self.host, self.port)
+        try:
+            if not self.use_ssl:
+                server.ehlo()
+                if self.use_tls:
+                    server.starttls()
+                    server.ehlo()
+            server.login(self.user, self.password)
+            return server
+        except Exception:
+            server.close()
+            raise
+
+    @staticmethod
+    def _connexion_perdue(server, to_email: str, tentative: int) -> None:
+        """Abandonne une session SMTP coupée ; le message sera retenté sur une nouvelle."""
+        try:
+            server.close()
+        except Exception:
+            pass
+        if tentative:
+            logger.error(f"❌ Connexion SMTP perdue, email non envoyé à {to_email}")
+        return None
+
+    def envoyer_lot(self, messages: List[Tuple[str, str, str]]) -> List[bool]:
+        """
+        Envoie plusieurs e-mails sur une seule connexion SMTP.
+
+        Args:
+            messages: Liste de (destinataire, sujet, corps)
+
+        Returns:
+            Liste de booléens (envoyé ou non), dans l'ordre des messages
+        """
+        resultats = [False] * len(messages)
+        if not messages:
+            return resultats
+        if not self._verifier_configuration():
+            logger.warning("⚠️ Configuration email manquante ou désactivée.")
+            return resultats
+
+        server = None
+        try:
+            for i, (to_email, subject, body) in enumerate(messages):
+                if not to_email:
+                    continue
+                try:
+                    msg = self._construire_message(to_email, subject, body)
+                except Exception as e:
+                    logger.error(f"❌ Email invalide pour {to_email}: {e}")
+                    continue
+                for tentative in range(2):
+                    if server is None:
+                        try:
+                            server = self._ouvrir_connexion()
+                        except (smtplib.SMTPException, OSError) as e:
+                            # Serveur injoignable ou authentification refusée : inutile
+                            # de tenter les messages suivants.
+                            logger.error(f"❌ Connexion SMTP impossible, lot interrompu: {e}")
+                            return resultats
+                    try:
+                        server.send_message(msg)
+                        resultats[i] = True
+                        break
+                    except smtplib.SMTPServerDisconnected:
+                        # Session coupée par le serveur : une reconnexion puis on réessaie
+                        server = self._connexion_perdue(server, to_email, tentative)
+                    except smtplib.SMTPException as e:
+                        # Échec propre à ce message (destinataire refusé, données rejetées...) :
+                        # la session reste utilisable pour les suivants.
+                        logger.error(f"❌ Email non envoyé à {to_email}: {e}")
+                        break
+                    except OSError:
+                        # Socket coupée (reset, timeout) : même traitement qu'une déconnexion
+                        server = self._connexion_perdue(server, to_email, tentative)
+            logger.info(f"✅ {sum(resultats)}/{len(messages)} email(s) envoyé(s) sur une connexion SMTP")
+        except Exception as e:
+            logger.error(f"❌ Erreur envoi email (lot): {e}")
+        finally:
+            if server is not None:
+                try:
+                    server.quit()
+                except Exception:
+                    pass
+        return resultats
+
     def envoyer_email(self, to_email: str, subject: str, body: str,
                       attachments: Optional[List[str]] = None) -> bool:
         """
@@ -78,39 +195,11 @@ class EmailController:
             if not to_email:
                 return False
 
-            msg = EmailMessage()
-            msg["Subject"] = subject
-            msg["From"] = self.from_email
-            msg["To"] = to_email
-            msg.set_content(body)
-
-            # Ajouter pièces jointes
-            for file_path in attachments or []:
-                path = Path(file_path)
-                if not path.is_file():
-                    continue
-                with open(path, "rb") as f:
-                    data = f.read()
-                msg.add_attachment(
-                    data,
-                    maintype="application",
-                    subtype="pdf",
-                    filename=path.name
-                )
+            msg = self._construire_message(to_email, subject, body, attachments)
 
             # Connexion SMTP
-            if self.use_ssl:
-                with smtplib.SMTP_SSL(self.host, self.port) as server:
-                    server.login(self.user, self.password)
-                    server.send_message(msg)
-            else:
-                with smtplib.SMTP(self.host, self.port) as server:
-                    server.ehlo()
-                    if self.use_tls:
-                        server.starttls()
-                        server.ehlo()
-                    server.login(self.user, self.password)
-                    server.send_message(msg)
+            with self._ouvrir_connexion() as server:
+                server.send_message(msg)
 
             logger.info(f"✅ Email envoyé à {to_email}")
             return True
@@ -119,6 +208,20 @@ class EmailController:
             logger.error(f"❌ Erreur envoi email: {e}")
             return False
 
+    def envoyer_message(self, to_email: str, subject: str, body: str,
+                        contenus: Optional[List[Tuple[str, bytes]]] = None) -> None:
+        """
+        Envoie un e-mail et laisse remonter l'exception SMTP (utilisé par la
+        file d'envoi, qui décide entre nouvel essai et échec définitif).
+
+        Args:
+            contenus: Pièces jointes déjà chargées, liste de (nom_fichier, données)
+        """
+        msg = self._construire_message(to_email, subject, body, contenus=contenus)
+        with self._ouvrir_connexion() as server:
+            server.send_message(msg)
+        logger.info(f"✅ Email envoyé à {to_email}")
+
     def envoyer_email_avec_message(self, to_email: str, subject: str, body: str,
                                    attachments: Optional[List[str]] = None) -> tuple[bool, str]:
         """Envoie un e-mail et retourne un message explicite pour l'UI."""
@@ -140,38 +243,11 @@ class EmailController:
     def _envoyer_email_detail(self, to_email: str, subject: str, body: str,
                               attachments: Optional[List[str]] = None) -> tuple[bool, str]:
         """Envoie un e-mail et retourne (succes, erreur) sans masquer l'exception SMTP."""
-        msg = EmailMessage()
-        msg["Subject"] = subject
-        msg["From"] = self.from_email
-        msg["To"] = to_email
-        msg.set_content(body)
-
-        for file_path in attachments or []:
-            path = Path(file_path)
-            if not path.is_file():
-                continue
-            with open(path, "rb") as f:
-                data = f.read()
-            msg.add_attachment(
-                data,
-                maintype="application",
-                subtype="pdf",
-                filename=path.name
-            )
+        msg = self._construire_message(to_email, subject, body, attachments)
 
         try:
-            if self.use_ssl:
-                with smtplib.SMTP_SSL(self.host, self.port) as server:
-                    server.login(self.user, self.password)
-                    server.send_message(msg)
-            else:
-                with smtplib.SMTP(self.host, self.port) as server:
-                    server.ehlo()
-                    if self.use_tls:
-                        server.starttls()
-                        server.ehlo()
-                    server.login(self.user, self.password)
-                    server.send_message(msg)
+            with self._ouvrir_connexion() as server:
+                server.send_message(msg)
             logger.info(f"✅ Email envoyé à {to_email}")
             return True, ""
         except smtplib.SMTPAuthenticationError as e:
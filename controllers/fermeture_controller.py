@@ -60,13 +60,8 @@ class FermetureController:
             statut=statut,
         )
 
-    def demandes_en_attente_map(self) -> Dict[int, Dict]:
-        demandes = self.commande_model.lister_demandes_validation()
-        return {
-            d.get("commande_id"): d
-            for d in demandes
-            if d.get("type_action") == "fermeture_demande"
-        }
+    def demandes_en_attente_map(self, commande_ids: List[int], salon_id: Optional[str] = None) -> Dict[int, Dict]:
+        return self.commande_model.demandes_fermeture_en_attente(commande_ids, salon_id)
 
     def demandes_stats_par_commandes(self, couturier_id: int, commande_ids: List[int]) -> Dict[int, Dict]:
         return self.commande_model.compter_demandes_fermeture_par_commandes(couturier_id, commande_ids)
@@ -22,6 +22,7 @@ from reportlab.lib.utils import ImageReader
 # Imports pour images et QR code
 from PIL import Image as PILImage
 import qrcode
+from models.media_model import lire_media
 from utils.logging_utils import get_logger
 
 # Configuration du chemin de stockage - Utiliser celui de config.py
@@ -442,7 +443,7 @@ class PDFController:
                     images_row.append(Paragraph("Image du tissu\nnon disponible", styles['Normal']))
             else:
                 # Fallback production-safe : utiliser l'image binaire si le chemin n'existe plus.
-                fabric_image_bytes = commande_data.get("fabric_image")
+                fabric_image_bytes = lire_media(commande_data.get("fabric_image"))
                 if fabric_image_bytes:
                     try:
                         fabric_img = Image(io.BytesIO(fabric_image_bytes), width=7*cm, height=7*cm)
@@ -473,7 +474,7 @@ class PDFController:
                     images_row.append(Paragraph("Image du modèle\nnon disponible", styles['Normal']))
             else:
                 # Fallback production-safe : utiliser l'image binaire si le chemin n'existe plus.
-                model_image_bytes = commande_data.get("model_image")
+                model_image_bytes = lire_media(commande_data.get("model_image"))
                 if model_image_bytes:
                     try:
                         model_img = Image(io.BytesIO(model_image_bytes), width=7*cm, height=7*cm)
@@ -2,122 +2,114 @@
 Service de rappels automatiques (J-2 avant livraison).
 Envoie email + SMS sans intervention manuelle.
 """
-import os
-import tempfile
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from collections import defaultdict
+from typing import Optional
 
 from models.database import CommandeModel
 from models.salon_model import SalonModel
 from controllers.email_controller import EmailController
 
-# Fichier pour éviter d'envoyer 2 fois le même jour.
-# Important: on l'écrit hors du dossier du projet pour éviter
-# les redémarrages Streamlit déclenchés par le file watcher.
-RAPPELS_LAST_RUN_FILE = os.path.join(
-    tempfile.gettempdir(), "gestion_couturier", "rappels_last_run.txt"
-)
+# Délai entre le jour d'envoi du rappel et la livraison
+JOURS_AVANT_LIVRAISON = 2
 
 
-def _date_aujourd_hui_str() -> str:
-    return datetime.now().strftime("%Y-%m-%d")
+class RappelsNonEnvoyes(RuntimeError):
+    """Des rappels du jour ont échoué à l'envoi (SMTP) : le jour reste à retenter."""
 
 
-def _deja_execute_aujourd_hui() -> bool:
-    """Vérifie si les rappels ont déjà été envoyés aujourd'hui."""
-    try:
-        if os.path.exists(RAPPELS_LAST_RUN_FILE):
-            with open(RAPPELS_LAST_RUN_FILE, "r") as f:
-                return f.read().strip() == _date_aujourd_hui_str()
-    except Exception:
-        pass
-    return False
-
-
-def _marquer_execute():
-    """Marque que les rappels ont été envoyés aujourd'hui."""
-    try:
-        os.makedirs(os.path.dirname(RAPPELS_LAST_RUN_FILE), exist_ok=True)
-        with open(RAPPELS_LAST_RUN_FILE, "w") as f:
-            f.write(_date_aujourd_hui_str())
-    except Exception:
-        pass
+def executer_rappels_automatiques(db_connection, jour: Optional[date] = None) -> tuple:
+    """
+    Envoie les rappels (email) pour les livraisons à J+2 du jour `jour`.
+    Appelé par le planificateur (services/scheduler_service.py), qui garantit
+    une seule exécution par jour et rattrape les jours manqués.
 
+    Args:
+        db_connection: Connexion à la base
+        jour: Jour de référence (aujourd'hui par défaut)
 
-def executer_rappels_automatiques(db_connection) -> tuple:
-    """
-    Envoie les rappels (email + SMS) pour les livraisons dans 2 jours.
-    Appelé automatiquement au chargement du calendrier.
-    
     Returns:
-        (nb_envoyes, message) ou (0, None) si déjà exécuté / rien à faire
-    """
-    if _deja_execute_aujourd_hui():
-        return 0, None
+        (nb_envoyes, message) ou (0, None) si rien à faire
 
-    aujourd_hui = datetime.now().date()
-    date_rappel = aujourd_hui + timedelta(days=2)
+    Raises:
+        RappelsNonEnvoyes: un envoi SMTP a échoué ; les rappels déjà envoyés
+            étant enregistrés, un nouvel essai ne renvoie que les manquants.
+            Les commandes sans e-mail ou sans config SMTP de salon ne sont
+            pas retentées (échec permanent, signalé dans le message).
+    """
+    jour = jour or datetime.now().date()
+    date_rappel = jour + timedelta(days=JOURS_AVANT_LIVRAISON)
 
     commande_model = CommandeModel(db_connection)
     salon_model = SalonModel(db_connection)
-    commande_model.creer_table_rappels_livraison()
-
-    # Toutes les commandes à rappeler (tous salons, sans filtre)
-    commandes = commande_model.lister_commandes_calendrier(
-        date_debut=date_rappel,
-        date_fin=date_rappel,
-        couturier_id=None,
-        tous_les_couturiers=True,
-        salon_id=None,
-    )
 
-    commandes_a_rappeler = [
-        c for c in commandes
-        if not commande_model.rappel_deja_envoye(c["id"], c["date_livraison"])
-    ]
+    # Une requête : commandes à rappeler sans rappel déjà enregistré (tous salons)
+    commandes_a_rappeler = commande_model.lister_rappels_a_envoyer(date_rappel)
 
     if not commandes_a_rappeler:
-        _marquer_execute()
         return 0, None
 
-    envoyes = 0
-    erreurs = []
+    envoyes, echecs, sans_config = _envoyer_rappels(commande_model, salon_model, commandes_a_rappeler)
 
-    for c in commandes_a_rappeler:
-        date_liv = c.get("date_livraison")
-        date_str = date_liv.strftime("%d/%m/%Y") if hasattr(date_liv, "strftime") else str(date_liv)
-        msg_texte = (
-            f"Rappel: Livraison le {date_str} - {c.get('modele', 'N/A')} - "
-            f"Client: {c.get('client_prenom', '')} {c.get('client_nom', '')}"
-        )
+    msg = f"{envoyes} rappel(s) envoyé(s) automatiquement par email."
+    if sans_config:
+        msg += f" Sans e-mail ou config SMTP du salon (non retentés): {', '.join(sans_config[:5])}"
+    if echecs:
+        raise RappelsNonEnvoyes(f"{msg} Échecs d'envoi (retentés): {', '.join(echecs[:5])}")
+    return envoyes, msg
 
-        salon_id = c.get("couturier_salon_id")
-        ok_envoye = False
-
-        # Email uniquement (gratuit avec SMTP)
-        if salon_id:
-            smtp_config = salon_model.obtenir_config_email_salon(salon_id)
-            if smtp_config:
-                email_ctrl = EmailController(smtp_config)
-                to_email = c.get("couturier_email")
-                if to_email and email_ctrl.envoyer_email(
-                    to_email,
-                    f"Rappel: Livraison le {date_str}",
-                    f"Bonjour {c.get('couturier_prenom', '')} {c.get('couturier_nom', '')},\n\n{msg_texte}\n\nCordialement.",
-                ):
-                    ok_envoye = True
-
-        if ok_envoye:
-            commande_model.enregistrer_rappel_envoye(c["id"], c["couturier_id"], date_liv)
-            envoyes += 1
-        else:
-            erreurs.append(f"#{c['id']}")
 
-    _marquer_execute()
+def _message_rappel(c: dict) -> tuple:
+    """(destinataire, sujet, corps) du rappel d'une commande."""
+    date_liv = c.get("date_livraison")
+    date_str = date_liv.strftime("%d/%m/%Y") if hasattr(date_liv, "strftime") else str(date_liv)
+    msg_texte = (
+        f"Rappel: Livraison le {date_str} - {c.get('modele', 'N/A')} - "
+        f"Client: {c.get('client_prenom', '')} {c.get('client_nom', '')}"
+    )
+    return (
+        c.get("couturier_email"),
+        f"Rappel: Livraison le {date_str}",
+        f"Bonjour {c.get('couturier_prenom', '')} {c.get('couturier_nom', '')},\n\n{msg_texte}\n\nCordialement.",
+    )
+
 
-    if envoyes > 0:
-        msg = f"{envoyes} rappel(s) envoyé(s) automatiquement par email."
-        if erreurs:
-            msg += f" Non envoyés: {', '.join(erreurs[:5])}"
-        return envoyes, msg
-    return 0, f"Aucun rappel envoyé. Vérifiez la config email du salon (SMTP). Erreurs: {', '.join(erreurs[:5])}"
+def _envoyer_rappels(commande_model, salon_model, commandes_a_rappeler: list) -> tuple:
+    """
+    Envoie les rappels par salon : config SMTP chargée une fois pour tous les
+    salons, une session SMTP par salon, puis un seul INSERT pour tous les
+    rappels envoyés.
+
+    Returns:
+        (nb_envoyes, commandes en échec d'envoi, commandes sans e-mail ou
+        sans config SMTP du salon)
+    """
+    par_salon = defaultdict(list)
+    echecs = []
+    sans_config = []
+    for c in commandes_a_rappeler:
+        salon_id = c.get("couturier_salon_id")
+        if salon_id and c.get("couturier_email"):
+            par_salon[salon_id].append(c)
+        else:
+            sans_config.append(f"#{c['id']}")
+
+    configs = salon_model.obtenir_configs_email_salons(list(par_salon))
+
+    rappels_envoyes = []
+    for salon_id, commandes in par_salon.items():
+        smtp_config = configs.get(salon_id)
+        if not smtp_config:
+            sans_config.extend(f"#{c['id']}" for c in commandes)
+            continue
+        resultats = EmailController(smtp_config).envoyer_lot(
+            [_message_rappel(c) for c in commandes]
+        )
+        for c, ok_envoye in zip(commandes, resultats):
+            if ok_envoye:
+                rappels_envoyes.append((c["id"], c["couturier_id"], c.get("date_livraison")))
+            else:
+                echecs.append(f"#{c['id']}")
+
+    commande_model.enregistrer_rappels_envoyes(rappels_envoyes)
+    return len(rappels_envoyes), echecs, sans_config
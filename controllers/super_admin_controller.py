@@ -3,6 +3,8 @@ Contrôleur pour le Super Administrateur (Vue 360° multi-salons)
 """
 from typing import Optional, Dict, List
 from models.database import DatabaseConnection
+from models.stats_model import StatsDailyModel
+from utils.cache_lectures import lecture_en_cache
 from datetime import datetime, timedelta
 
 
@@ -12,6 +14,7 @@ class SuperAdminController:
     def __init__(self, db_connection: DatabaseConnection):
         self.db = db_connection
 
+    @lecture_en_cache(couturier=None)
     def obtenir_statistiques_globales(
         self,
         date_debut: Optional[datetime] = None,
@@ -48,25 +51,13 @@ class SuperAdminController:
                 cursor.execute("SELECT COUNT(*) FROM clients")
                 nb_clients_total = cursor.fetchone()[0]
 
-                # Nombre total de commandes
-                cursor.execute("SELECT COUNT(*) FROM commandes")
-                nb_commandes_total = cursor.fetchone()[0]
-
-                # Chiffre d'affaires total
-                cursor.execute("SELECT COALESCE(SUM(prix_total), 0) FROM commandes")
-                ca_total = float(cursor.fetchone()[0])
-
-                # Total des avances
-                cursor.execute("SELECT COALESCE(SUM(avance), 0) FROM commandes")
-                avances_total = float(cursor.fetchone()[0])
-
-                # Total des restes
-                cursor.execute("SELECT COALESCE(SUM(reste), 0) FROM commandes")
-                reste_total = float(cursor.fetchone()[0])
-
-                # Total des charges
-                cursor.execute("SELECT COALESCE(SUM(montant), 0) FROM charges")
-                charges_total = float(cursor.fetchone()[0])
+                # Totaux commandes & charges (agrégats journaliers stats_daily)
+                totaux = StatsDailyModel(self.db).totaux()
+                nb_commandes_total = totaux['nb_commandes']
+                ca_total = totaux['ca_total']
+                avances_total = totaux['avances']
+                reste_total = totaux['reste']
+                charges_total = totaux['charges']
 
                 cursor.close()
             else:
@@ -113,6 +104,7 @@ class SuperAdminController:
             print(f"Erreur statistiques globales: {e}")
             return {}
     
+    @lecture_en_cache(couturier=None)
     def obtenir_statistiques_par_salon(
         self,
         date_debut: Optional[datetime] = None,
@@ -178,72 +170,13 @@ class SuperAdminController:
                     'taux_encaissement': 0.0,
                 }
 
-            # Préparer les filtres de période pour commandes & charges
-            cmd_where = []
-            ch_where = []
-            cmd_params: List = []
-            ch_params: List = []
-
-            if date_debut:
-                cmd_where.append("date_creation >= %s")
-                ch_where.append("date_charge >= %s")
-                cmd_params.append(date_debut)
-                ch_params.append(date_debut)
-            if date_fin:
-                cmd_where.append("date_creation <= %s")
-                ch_where.append("date_charge <= %s")
-                cmd_params.append(date_fin)
-                ch_params.append(date_fin)
-
-            # 2) Agrégats commandes par salon (filtrés par période si fournie)
-            where_cmd_clause = ""
-            if cmd_where:
-                where_cmd_clause = "WHERE " + " AND ".join(cmd_where)
-
-            query_cmd = f"""
-                SELECT 
-                    salon_id,
-                    COUNT(DISTINCT id) as nb_commandes,
-                    COALESCE(SUM(prix_total), 0) as ca_total,
-                    COALESCE(SUM(avance), 0) as avances,
-                    COALESCE(SUM(reste), 0) as reste
-                FROM commandes
-                {where_cmd_clause}
-                GROUP BY salon_id
-            """
-            cursor.execute(query_cmd, tuple(cmd_params))
-            rows_cmd = cursor.fetchall()
-
-            for row in rows_cmd:
-                salon_id = row[0]
-                if salon_id in salons_map:
-                    salons_map[salon_id]['nb_commandes'] = row[1] or 0
-                    salons_map[salon_id]['ca_total'] = float(row[2] or 0.0)
-                    salons_map[salon_id]['avances'] = float(row[3] or 0.0)
-                    salons_map[salon_id]['reste'] = float(row[4] or 0.0)
-
-            # 3) Agrégats charges par salon (filtrés par période si fournie)
-            where_ch_clause = ""
-            if ch_where:
-                where_ch_clause = "WHERE " + " AND ".join(ch_where)
-
-            query_ch = f"""
-                SELECT 
-                    salon_id,
-                    COALESCE(SUM(montant), 0) as charges
-                FROM charges
-                {where_ch_clause}
-                GROUP BY salon_id
-            """
-            cursor.execute(query_ch, tuple(ch_params))
-            rows_ch = cursor.fetchall()
+            cursor.close()
 
-            for row in rows_ch:
-                salon_id = row[0]
+            # 2) Agrégats commandes & charges par salon (stats_daily, filtrés par période si fournie)
+            totaux_salons = StatsDailyModel(self.db).par_salon(date_debut, date_fin)
+            for salon_id, totaux in totaux_salons.items():
                 if salon_id in salons_map:
-                    salons_map[salon_id]['charges'] = float(row[1] or 0.0)
-
-            cursor.close()
+                    salons_map[salon_id].update(totaux)
 
             # Finaliser les métriques dérivées (bénéfice, taux d'encaissement)
             salons: List[Dict] = []
@@ -291,6 +224,7 @@ class SuperAdminController:
         
         return salons[:limit]
     
+    @lecture_en_cache(couturier=None)
     def obtenir_evolution_mensuelle(
         self,
         salon_id: Optional[str] = None,
@@ -307,60 +241,11 @@ class SuperAdminController:
             Liste des données mensuelles
         """
         try:
-            cursor = self.db.get_connection().cursor()
-            
             # Générer les dates
             today = datetime.now()
             start_date = today - timedelta(days=mois*30)
-            
-            where_clause = ""
-            params = [start_date]
-            if salon_id:
-                where_clause = "AND salon_id = %s"
-                params.append(salon_id)
-            
-            # Adapter la requête selon le SGBD
-            if self.db.db_type == 'mysql':
-                query = f"""
-                    SELECT 
-                        DATE_FORMAT(date_creation, '%Y-%m') as mois,
-                        COUNT(*) as nb_commandes,
-                        COALESCE(SUM(prix_total), 0) as ca,
-                        COALESCE(SUM(avance), 0) as encaisse,
-                        COALESCE(SUM(reste), 0) as reste
-                    FROM commandes
-                    WHERE date_creation >= %s {where_clause}
-                    GROUP BY DATE_FORMAT(date_creation, '%Y-%m')
-                    ORDER BY mois ASC
-                """
-            else:  # PostgreSQL
-                query = f"""
-                    SELECT 
-                        TO_CHAR(date_creation, 'YYYY-MM') as mois,
-                        COUNT(*) as nb_commandes,
-                        COALESCE(SUM(prix_total), 0) as ca,
-                        COALESCE(SUM(avance), 0) as encaisse,
-                        COALESCE(SUM(reste), 0) as reste
-                    FROM commandes
-                    WHERE date_creation >= %s {where_clause}
-                    GROUP BY TO_CHAR(date_creation, 'YYYY-MM')
-                    ORDER BY mois ASC
-                """
-            
-            cursor.execute(query, params)
-            results = cursor.fetchall()
-            cursor.close()
-            
-            return [
-                {
-                    'mois': row[0],
-                    'nb_commandes': row[1],
-                    'ca': float(row[2]),
-                    'encaisse': float(row[3]),
-                    'reste': float(row[4])
-                }
-                for row in results
-            ]
+
+            return StatsDailyModel(self.db).evolution_mensuelle(start_date, salon_id)
         except Exception as e:
             print(f"Erreur évolution mensuelle: {e}")
             return []
@@ -422,6 +307,7 @@ class SuperAdminController:
             print(f"Erreur liste utilisateurs: {e}")
             return []
     
+    @lecture_en_cache(couturier=None)
     def obtenir_toutes_commandes(
         self,
         salon_id: Optional[str] = None,
@@ -508,26 +394,107 @@ class SuperAdminController:
             print(f"Erreur liste commandes: {e}")
             return []
     
-    def generer_rapport_complet(self, salon_id: Optional[str] = None) -> Dict:
+    def exporter_rapport_complet(
+        self,
+        destination: str,
+        format_export: str = 'csv',
+        salon_id: Optional[str] = None,
+        progression=None,
+    ) -> Dict[str, int]:
         """
-        Génère un rapport complet (export JSON/CSV)
-        
+        Exporte le rapport complet (statistiques, salons, utilisateurs, toutes
+        les commandes, évolution mensuelle) dans un fichier, table par table.
+
+        Les utilisateurs et les commandes sont lus en flux par
+        services.export_service (COPY sous PostgreSQL), sans limite de lignes.
+
         Args:
+            destination: Chemin du fichier à écrire
+            format_export: 'csv' (ZIP), 'xlsx' ou 'parquet' (ZIP)
             salon_id: ID du salon (None = rapport global)
-            
+            progression: Appelée avec (message, fraction entre 0 et 1)
+
         Returns:
-            Dict avec toutes les données du rapport
+            Nombre de lignes exportées par table
         """
-        rapport = {
-            'date_generation': datetime.now().isoformat(),
-            'salon_id': salon_id,
-            'type': 'global' if not salon_id else 'salon_specifique',
-            'statistiques': self.obtenir_statistiques_globales() if not salon_id else None,
-            'salons': self.obtenir_statistiques_par_salon(),
-            'utilisateurs': self.obtenir_tous_utilisateurs(salon_id),
-            'commandes': self.obtenir_toutes_commandes(salon_id, limit=1000),
-            'evolution_mensuelle': self.obtenir_evolution_mensuelle(salon_id)
-        }
-        
-        return rapport
+        from services.export_service import exporter_tables
+
+        salons = self.obtenir_statistiques_par_salon()
+        if salon_id:
+            salons = [s for s in salons if s['salon_id'] == salon_id]
+
+        tables: List[Dict] = []
+        if not salon_id:
+            statistiques = self.obtenir_statistiques_globales()
+            tables.append({
+                'nom': 'statistiques',
+                'colonnes': ['indicateur', 'valeur'],
+                'numeriques': ['valeur'],
+                'lignes': [{'indicateur': k, 'valeur': v} for k, v in statistiques.items()],
+            })
+        tables.append({
+            'nom': 'salons',
+            'colonnes': [
+                'salon_id', 'nom_salon', 'quartier', 'responsable', 'telephone', 'email',
+                'actif', 'date_creation', 'nb_employes', 'nb_clients', 'nb_commandes',
+                'ca_total', 'avances', 'reste', 'charges', 'benefice', 'taux_encaissement',
+            ],
+            'numeriques': [
+                'nb_employes', 'nb_clients', 'nb_commandes', 'ca_total', 'avances',
+                'reste', 'charges', 'benefice', 'taux_encaissement',
+            ],
+            'lignes': salons,
+        })
+
+        filtre_utilisateurs = "WHERE role != 'SUPER_ADMIN'" + (" AND salon_id = %s" if salon_id else "")
+        tables.append({
+            'nom': 'utilisateurs',
+            'colonnes': [
+                'id', 'code_couturier', 'nom', 'prenom', 'role', 'salon_id',
+                'email', 'telephone', 'actif', 'date_creation',
+            ],
+            'numeriques': ['id'],
+            'requete': f"""
+                SELECT id, code_couturier, nom, prenom, role, salon_id,
+                       email, telephone, actif, date_creation
+                FROM couturiers
+                {filtre_utilisateurs}
+                ORDER BY salon_id, role, id
+            """,
+            'params': (salon_id,) if salon_id else (),
+        })
+
+        filtre_commandes = "WHERE cmd.salon_id = %s" if salon_id else ""
+        tables.append({
+            'nom': 'commandes',
+            'colonnes': [
+                'id', 'date_creation', 'salon_id', 'client_nom', 'client_prenom', 'client_telephone',
+                'couturier_code', 'couturier_nom', 'categorie', 'sexe', 'modele',
+                'prix_total', 'avance', 'reste', 'statut', 'date_livraison', 'date_fermeture',
+            ],
+            'numeriques': ['id', 'prix_total', 'avance', 'reste'],
+            'requete': f"""
+                SELECT cmd.id, cmd.date_creation, cmd.salon_id,
+                       cl.nom, cl.prenom, cl.telephone,
+                       co.code_couturier, co.nom,
+                       cmd.categorie, cmd.sexe, cmd.modele,
+                       cmd.prix_total, cmd.avance, cmd.reste, cmd.statut,
+                       cmd.date_livraison, cmd.date_fermeture
+                FROM commandes cmd
+                JOIN clients cl ON cmd.client_id = cl.id
+                JOIN couturiers co ON cmd.couturier_id = co.id
+                {filtre_commandes}
+                ORDER BY cmd.id
+            """,
+            'params': (salon_id,) if salon_id else (),
+        })
+
+        tables.append({
+            'nom': 'evolution_mensuelle',
+            'colonnes': ['mois', 'nb_commandes', 'ca', 'encaisse', 'reste'],
+            'numeriques': ['nb_commandes', 'ca', 'encaisse', 'reste'],
+            'lignes': self.obtenir_evolution_mensuelle(salon_id),
+        })
+
+        return exporter_tables(self.db, destination, tables, format_export, progression)
 
@@ -58,10 +58,16 @@ CREATE INDEX IF NOT EXISTS idx_couturiers_salon ON couturiers(salon_id);
 CREATE INDEX IF NOT EXISTS idx_couturiers_role ON couturiers(role);
 
 -- FK vers salons (optionnelle car super_admin peut être NULL)
-ALTER TABLE couturiers
-    ADD CONSTRAINT IF NOT EXISTS fk_couturiers_salon
-    FOREIGN KEY (salon_id) REFERENCES salons(salon_id)
-    ON DELETE SET NULL ON UPDATE CASCADE;
+-- (PostgreSQL n'accepte pas ADD CONSTRAINT IF NOT EXISTS : test sur pg_constraint)
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'fk_couturiers_salon') THEN
+        ALTER TABLE couturiers
+            ADD CONSTRAINT fk_couturiers_salon
+            FOREIGN KEY (salon_id) REFERENCES salons(salon_id)
+            ON DELETE SET NULL ON UPDATE CASCADE;
+    END IF;
+END $$;
 
 -- --------------------------------------------------------------------------
 -- TABLE : clients
@@ -84,6 +90,26 @@ CREATE INDEX IF NOT EXISTS idx_clients_salon ON clients(salon_id);
 CREATE INDEX IF NOT EXISTS idx_clients_telephone ON clients(telephone);
 CREATE INDEX IF NOT EXISTS idx_clients_nom_prenom ON clients(nom, prenom);
 
+-- --------------------------------------------------------------------------
+-- TABLE : media_blobs (images, PDF, justificatifs ; adressés par SHA-256)
+-- --------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS media_blobs (
+    id          SERIAL PRIMARY KEY,
+    sha256      CHAR(64) NOT NULL UNIQUE,
+    mime_type   VARCHAR(100) NULL,
+    size_bytes  BIGINT NOT NULL,
+    data        BYTEA NOT NULL,
+    created_at  TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Déclinaisons réduites des photos (160/480/1280 px, WebP ou JPEG)
+CREATE TABLE IF NOT EXISTS media_renditions (
+    source_blob_id  INTEGER NOT NULL REFERENCES media_blobs(id) ON DELETE CASCADE,
+    width           INTEGER NOT NULL,
+    blob_id         INTEGER NOT NULL REFERENCES media_blobs(id) ON DELETE CASCADE,
+    PRIMARY KEY (source_blob_id, width)
+);
+
 -- --------------------------------------------------------------------------
 -- TABLE : commandes
 -- --------------------------------------------------------------------------
@@ -123,6 +149,12 @@ CREATE TABLE IF NOT EXISTS commandes (
     pdf_path           VARCHAR(500),
     pdf_name           VARCHAR(255),
 
+    -- Contenus binaires dans media_blobs (les colonnes BYTEA ci-dessus sont
+    -- historiques et vidées par la migration)
+    fabric_blob_id     INTEGER NULL REFERENCES media_blobs(id) ON DELETE SET NULL,
+    model_blob_id      INTEGER NULL REFERENCES media_blobs(id) ON DELETE SET NULL,
+    pdf_blob_id        INTEGER NULL REFERENCES media_blobs(id) ON DELETE SET NULL,
+
     FOREIGN KEY (client_id) REFERENCES clients(id) ON DELETE CASCADE ON UPDATE CASCADE,
     FOREIGN KEY (couturier_id) REFERENCES couturiers(id) ON DELETE CASCADE ON UPDATE CASCADE,
     FOREIGN KEY (salon_id) REFERENCES salons(salon_id) ON DELETE SET NULL ON UPDATE CASCADE
@@ -135,10 +167,27 @@ CREATE INDEX IF NOT EXISTS idx_commandes_statut ON commandes(statut);
 CREATE INDEX IF NOT EXISTS idx_commandes_date_creation ON commandes(date_creation);
 CREATE INDEX IF NOT EXISTS idx_commandes_date_livraison ON commandes(date_livraison);
 CREATE INDEX IF NOT EXISTS idx_commandes_couturier_statut ON commandes(couturier_id, statut);
+CREATE INDEX IF NOT EXISTS idx_commandes_couturier_date ON commandes(couturier_id, date_creation, id);
+-- Index partiels des requêtes fréquentes (voir INDEX_REQUETES_CHAUDES, services/migration_service.py)
+CREATE INDEX IF NOT EXISTS idx_commandes_ouvertes_couturier ON commandes(couturier_id, date_creation) WHERE est_ouverte = TRUE;
+CREATE INDEX IF NOT EXISTS idx_commandes_reste_couturier ON commandes(couturier_id, date_creation) WHERE avance > 0 AND reste > 0;
+CREATE INDEX IF NOT EXISTS idx_commandes_livraison_couturier ON commandes(couturier_id, date_livraison) WHERE est_ouverte = TRUE AND date_livraison IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_commandes_livraison_ouvertes ON commandes(date_livraison) WHERE est_ouverte = TRUE AND date_livraison IS NOT NULL;
 CREATE INDEX IF NOT EXISTS idx_commandes_est_ouverte ON commandes(est_ouverte);
 CREATE INDEX IF NOT EXISTS idx_commandes_date_fermeture ON commandes(date_fermeture);
 CREATE INDEX IF NOT EXISTS idx_commandes_mesures ON commandes USING GIN (mesures);
 
+-- --------------------------------------------------------------------------
+-- Recherche textuelle (pg_trgm) : clients et modèles de commande
+-- L'expression doit rester identique à expr_recherche_client (models/database.py)
+-- --------------------------------------------------------------------------
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_clients_recherche_trgm ON clients USING GIN (
+    (LOWER(COALESCE(nom, '') || ' ' || COALESCE(prenom, '') || ' ' || COALESCE(telephone, '') || ' ' || COALESCE(email, ''))) gin_trgm_ops
+);
+CREATE INDEX IF NOT EXISTS idx_commandes_modele_trgm ON commandes USING GIN (LOWER(modele) gin_trgm_ops);
+
 -- --------------------------------------------------------------------------
 -- TABLE : historique_commandes
 -- --------------------------------------------------------------------------
@@ -167,6 +216,8 @@ CREATE INDEX IF NOT EXISTS idx_historique_couturier_id ON historique_commandes(c
 CREATE INDEX IF NOT EXISTS idx_historique_statut_validation ON historique_commandes(statut_validation);
 CREATE INDEX IF NOT EXISTS idx_historique_date_creation ON historique_commandes(date_creation);
 CREATE INDEX IF NOT EXISTS idx_historique_type_action ON historique_commandes(type_action);
+CREATE INDEX IF NOT EXISTS idx_historique_en_attente ON historique_commandes(date_creation) WHERE statut_validation = 'en_attente';
+CREATE INDEX IF NOT EXISTS idx_historique_fermeture_en_attente ON historique_commandes(commande_id) WHERE statut_validation = 'en_attente' AND type_action = 'fermeture_demande';
 
 -- --------------------------------------------------------------------------
 -- TABLE : charges
@@ -198,6 +249,12 @@ CREATE INDEX IF NOT EXISTS idx_charges_date ON charges(date_charge);
 CREATE INDEX IF NOT EXISTS idx_charges_commande ON charges(commande_id);
 CREATE INDEX IF NOT EXISTS idx_charges_employe ON charges(employe_id);
 
+-- Compteur de références de paiement des charges (une ligne par salon)
+CREATE TABLE IF NOT EXISTS charge_references (
+    salon_id            VARCHAR(50) NOT NULL PRIMARY KEY,
+    derniere_reference  INTEGER NOT NULL DEFAULT 0
+);
+
 -- --------------------------------------------------------------------------
 -- TABLE : charge_documents (fichiers liés aux charges)
 -- --------------------------------------------------------------------------
@@ -207,6 +264,7 @@ CREATE TABLE IF NOT EXISTS charge_documents (
     salon_id     VARCHAR(50) NULL,
     file_path    VARCHAR(500) NOT NULL,
     file_data    BYTEA,
+    blob_id      INTEGER NULL REFERENCES media_blobs(id) ON DELETE SET NULL,
     file_name    VARCHAR(255) NOT NULL,
     file_size    BIGINT,
     mime_type    VARCHAR(100),
@@ -256,13 +314,79 @@ CREATE TABLE IF NOT EXISTS rappels_livraison (
 CREATE INDEX IF NOT EXISTS idx_rappels_commande ON rappels_livraison(commande_id);
 CREATE INDEX IF NOT EXISTS idx_rappels_date_livraison ON rappels_livraison(date_livraison);
 
+-- --------------------------------------------------------------------------
+-- TABLE : job_runs (exécutions des tâches planifiées, une ligne par jour traité)
+-- --------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS job_runs (
+    id              SERIAL PRIMARY KEY,
+    job_name        VARCHAR(100) NOT NULL,
+    run_date        DATE NOT NULL,
+    status          VARCHAR(20) NOT NULL DEFAULT 'running',
+    started_at      TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at     TIMESTAMP NULL,
+    items_processed INTEGER NOT NULL DEFAULT 0,
+    message         TEXT NULL,
+    UNIQUE (job_name, run_date)
+);
+
+-- --------------------------------------------------------------------------
+-- TABLE : email_outbox (e-mails en attente d'envoi par les workers)
+-- --------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id              SERIAL PRIMARY KEY,
+    salon_id        VARCHAR(50) NULL,
+    to_email        VARCHAR(255) NOT NULL,
+    subject         VARCHAR(500) NOT NULL,
+    body            TEXT NOT NULL,
+    attachments     TEXT NULL,
+    status          VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    max_attempts    INTEGER NOT NULL DEFAULT 5,
+    next_attempt_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_at       TIMESTAMP NULL,
+    last_error      TEXT NULL,
+    created_at      TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    sent_at         TIMESTAMP NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox(next_attempt_at) WHERE status IN ('pending', 'sending');
+CREATE INDEX IF NOT EXISTS idx_email_outbox_salon ON email_outbox(salon_id, status);
+
+-- --------------------------------------------------------------------------
+-- TABLE : stats_daily (agrégats journaliers des commandes et charges)
+-- --------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS stats_daily (
+    salon_id        VARCHAR(50) NOT NULL DEFAULT '',
+    couturier_id    INTEGER NOT NULL,
+    day             DATE NOT NULL,
+    modele          VARCHAR(100) NOT NULL DEFAULT '',
+    nb_commandes    INTEGER NOT NULL DEFAULT 0,
+    ca_total        DECIMAL(14,2) NOT NULL DEFAULT 0,
+    avances_total   DECIMAL(14,2) NOT NULL DEFAULT 0,
+    reste_total     DECIMAL(14,2) NOT NULL DEFAULT 0,
+    nb_en_cours     INTEGER NOT NULL DEFAULT 0,
+    nb_termine      INTEGER NOT NULL DEFAULT 0,
+    nb_livre        INTEGER NOT NULL DEFAULT 0,
+    nb_livre_paye   INTEGER NOT NULL DEFAULT 0,
+    charges_total   DECIMAL(14,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (salon_id, couturier_id, day, modele)
+);
+
+CREATE INDEX IF NOT EXISTS idx_stats_daily_couturier ON stats_daily(couturier_id, day);
+CREATE INDEX IF NOT EXISTS idx_stats_daily_day ON stats_daily(day);
+
 -- --------------------------------------------------------------------------
 -- FK retour sur salons.admin_id (créée après couturiers)
 -- --------------------------------------------------------------------------
-ALTER TABLE salons
-    ADD CONSTRAINT IF NOT EXISTS fk_salons_admin_id
-    FOREIGN KEY (admin_id) REFERENCES couturiers(id)
-    ON DELETE SET NULL ON UPDATE CASCADE;
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'fk_salons_admin_id') THEN
+        ALTER TABLE salons
+            ADD CONSTRAINT fk_salons_admin_id
+            FOREIGN KEY (admin_id) REFERENCES couturiers(id)
+            ON DELETE SET NULL ON UPDATE CASCADE;
+    END IF;
+END $$;
 
 -- --------------------------------------------------------------------------
 -- Fonction utilitaire : générer le prochain salon_id
@@ -283,6 +407,25 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- --------------------------------------------------------------------------
+-- Trigger : commandes.salon_id = salon du couturier (filtres par salon sans jointure)
+-- --------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION commandes_salon_id()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.salon_id IS NULL
+       OR (TG_OP = 'UPDATE' AND NEW.couturier_id IS DISTINCT FROM OLD.couturier_id) THEN
+        SELECT salon_id INTO NEW.salon_id FROM couturiers WHERE id = NEW.couturier_id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_commandes_salon_id ON commandes;
+CREATE TRIGGER trg_commandes_salon_id
+    BEFORE INSERT OR UPDATE OF couturier_id, salon_id ON commandes
+    FOR EACH ROW EXECUTE FUNCTION commandes_salon_id();
+
 -- --------------------------------------------------------------------------
 -- Vérifications / infos
 -- --------------------------------------------------------------------------
@@ -290,6 +433,6 @@ SELECT table_name FROM information_schema.tables WHERE table_schema = 'public' A
 
 DO $$
 BEGIN
-    RAISE NOTICE '✅ Schéma db_couturier créé. Tables : salons, couturiers, clients, commandes, historique_commandes, charges, charge_documents, app_logo, rappels_livraison';
+    RAISE NOTICE '✅ Schéma db_couturier créé. Tables : salons, couturiers, clients, media_blobs, commandes, historique_commandes, charges, charge_documents, app_logo, rappels_livraison, job_runs, email_outbox, stats_daily, charge_references';
 END $$;
 
@@ -3,5 +3,10 @@ Package models - Contient tous les modèles de données
 """
 from .database import DatabaseConnection, CouturierModel, ClientModel, CommandeModel
 from .salon_model import SalonModel
+from .media_model import MediaBlobModel, MediaHandle
+from .job_model import JobRunModel
+from .email_outbox_model import EmailOutboxModel
+from .stats_model import StatsDailyModel
 
-__all__ = ['DatabaseConnection', 'CouturierModel', 'ClientModel', 'CommandeModel', 'SalonModel']
+__all__ = ['DatabaseConnection', 'CouturierModel', 'ClientModel', 'CommandeModel', 'SalonModel',
+           'MediaBlobModel', 'MediaHandle', 'JobRunModel', 'EmailOutboxModel', 'StatsDailyModel']
@@ -0,0 +1,219 @@
+"""
+Pool de connexions PostgreSQL partagé par processus.
+
+Toutes les sessions Streamlit d'un même processus empruntent leurs connexions
+à un pool borné (min/max) au lieu d'ouvrir chacune une connexion dédiée :
+le handshake TLS n'est payé qu'à la création d'une connexion du pool, et le
+nombre total de connexions côté serveur reste plafonné à `maxconn`.
+"""
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+try:
+    from psycopg2 import pool as pg_pool  # type: ignore
+    from psycopg2 import extensions as pg_extensions  # type: ignore
+except Exception:
+    pg_pool = None  # type: ignore
+    pg_extensions = None  # type: ignore
+
+from utils.logging_utils import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class PoolExhaustedError(Exception):
+    """Aucune connexion libérée dans le délai d'attente imparti."""
+
+
+class ConnectionPool:
+    """
+    Pool thread-safe de connexions psycopg2 avec contrôle de santé au checkout.
+
+    - `acquire()` bloque au plus `acquire_timeout` secondes si le pool est plein.
+    - Une connexion fermée, dans un état inconnu ou inactive depuis plus de
+      `idle_check_seconds` est vérifiée (SELECT 1) avant d'être prêtée ;
+      en cas d'échec elle est jetée et remplacée.
+    - `release()` annule toute transaction restée ouverte avant de rendre
+      la connexion au pool.
+    """
+
+    def __init__(self, conn_params: Dict, minconn: int = 1, maxconn: int = 10,
+                 acquire_timeout: float = 10.0, idle_check_seconds: float = 60.0):
+        if pg_pool is None:
+            raise RuntimeError("psycopg2 non installé")
+        minconn = max(0, int(minconn))
+        maxconn = max(1, int(maxconn), minconn)
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.acquire_timeout = float(acquire_timeout)
+        self.idle_check_seconds = float(idle_check_seconds)
+        self._pool = pg_pool.ThreadedConnectionPool(minconn, maxconn, **conn_params)
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._last_release: Dict[int, float] = {}
+        self._stats = {
+            'acquired': 0,
+            'released': 0,
+            'discarded': 0,
+            'health_checks': 0,
+            'waits': 0,
+            'reconnects': 0,
+        }
+
+    @property
+    def closed(self) -> bool:
+        return bool(self._pool.closed)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def _is_healthy(self, conn) -> bool:
+        if conn.closed:
+            return False
+        status = conn.get_transaction_status()
+        if status == pg_extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if status != pg_extensions.TRANSACTION_STATUS_IDLE:
+            conn.rollback()
+
+        idle_since = self._last_release.get(id(conn))
+        if idle_since is None or (time.monotonic() - idle_since) < self.idle_check_seconds:
+            return True
+
+        self._count('health_checks')
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def acquire(self):
+        """Emprunte une connexion saine au pool."""
+        if not self._slots.acquire(blocking=False):
+            self._count('waits')
+            if not self._slots.acquire(timeout=self.acquire_timeout):
+                raise PoolExhaustedError(
+                    f"Pool DB saturé ({self.maxconn} connexions) après {self.acquire_timeout:.0f}s d'attente"
+                )
+
+        try:
+            for _ in range(self.maxconn + 1):
+                conn = self._pool.getconn()
+                try:
+                    healthy = self._is_healthy(conn)
+                except Exception:
+                    healthy = False
+                if healthy:
+                    self._count('acquired')
+                    return conn
+                logger.warning("Connexion DB du pool invalide, remplacement.")
+                self._discard(conn)
+            raise PoolExhaustedError("Impossible d'obtenir une connexion DB saine depuis le pool")
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _discard(self, conn) -> None:
+        self._count('discarded')
+        self._last_release.pop(id(conn), None)
+        try:
+            self._pool.putconn(conn, close=True)
+        except Exception:
+            pass
+
+    def release(self, conn, discard: bool = False) -> None:
+        """Rend une connexion au pool (en annulant toute transaction en cours)."""
+        try:
+            if not discard and not conn.closed:
+                try:
+                    if conn.get_transaction_status() != pg_extensions.TRANSACTION_STATUS_IDLE:
+                        conn.rollback()
+                except Exception:
+                    discard = True
+            if discard or conn.closed:
+                self._discard(conn)
+            else:
+                self._last_release[id(conn)] = time.monotonic()
+                self._pool.putconn(conn)
+            self._count('released')
+        finally:
+            self._slots.release()
+
+    def signaler_reconnexion(self) -> None:
+        """Compte une connexion coupée détectée par une requête puis remplacée."""
+        self._count('reconnects')
+        logger.info("Connexion DB coupée remplacée (reconnexions: %s).", self._stats['reconnects'])
+
+    def close(self) -> None:
+        """Ferme toutes les connexions du pool."""
+        try:
+            self._pool.closeall()
+        except Exception:
+            pass
+
+    def stats(self) -> Dict:
+        """Compteurs d'utilisation du pool (pour diagnostic)."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['minconn'] = self.minconn
+        stats['maxconn'] = self.maxconn
+        stats['in_use'] = len(getattr(self._pool, '_used', {}) or {})
+        stats['idle'] = len(getattr(self._pool, '_pool', []) or [])
+        return stats
+
+
+_POOLS: Dict[Tuple, ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _pool_key(conn_params: Dict) -> Tuple:
+    return tuple(sorted((k, str(v)) for k, v in conn_params.items()))
+
+
+def get_shared_pool(conn_params: Dict, minconn: int = 1, maxconn: int = 10,
+                    acquire_timeout: float = 10.0,
+                    idle_check_seconds: float = 60.0) -> ConnectionPool:
+    """
+    Retourne le pool du processus pour ces paramètres de connexion
+    (créé au premier appel, puis réutilisé par toutes les sessions).
+    """
+    key = _pool_key(conn_params)
+    with _POOLS_LOCK:
+        existing = _POOLS.get(key)
+        if existing is not None and not existing.closed:
+            return existing
+        pool = ConnectionPool(
+            conn_params,
+            minconn=minconn,
+            maxconn=maxconn,
+            acquire_timeout=acquire_timeout,
+            idle_check_seconds=idle_check_seconds,
+        )
+        _POOLS[key] = pool
+        logger.info("Pool DB créé (min=%s, max=%s).", pool.minconn, pool.maxconn)
+        return pool
+
+
+def fermer_pools() -> None:
+    """Ferme tous les pools du processus (arrêt propre / tests)."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
+
+
+def obtenir_pool_existant() -> Optional[ConnectionPool]:
+    """Retourne le premier pool actif du processus (diagnostic)."""
+    with _POOLS_LOCK:
+        for pool in _POOLS.values():
+            if not pool.closed:
+                return pool
+    return None
@@ -1,8 +1,12 @@
 """
 Modèle de gestion de la base de données (Model dans MVC)
 """
+import json
+import re
 from typing import Optional, Dict, List, Tuple
-from datetime import datetime
+from datetime import datetime, timedelta
+from contextlib import contextmanager
+import threading
 
 # Support multi-SGBD: PostgreSQL (legacy) et MySQL (XAMPP)
 try:
@@ -15,10 +19,16 @@ except Exception:
 try:
     import psycopg2  # type: ignore
     from psycopg2 import Error as PGError  # type: ignore
+    from psycopg2.extras import execute_values  # type: ignore
 except Exception:
     psycopg2 = None  # type: ignore
     PGError = Exception  # type: ignore
 
+from models.connection_pool import ConnectionPool, get_shared_pool
+from models.media_model import MediaBlobModel
+from models.stats_model import StatsDailyModel
+from utils.cache_lectures import ecriture_invalide, lecture_en_cache
+
 """#-----------------------------------------
 -- Ajouter TOUTES les colonnes nécessaires en une fois
 ALTER TABLE commandes
@@ -32,20 +42,247 @@ ADD COLUMN IF NOT EXISTS model_image_name VARCHAR(255) AFTER model_image;
 #--------------------------------------------
 """
 
+_READ_ONLY_PREFIXES = ('SELECT', 'SHOW', 'EXPLAIN')
+
+# Recherche textuelle : en dessous, le motif est trop court pour les trigrammes
+LONGUEUR_MIN_RECHERCHE = 2
+
+
+def expr_recherche_client(alias: str = '', db_type: str = 'postgresql') -> str:
+    """
+    Texte cherchable d'un client (nom, prénom, téléphone, e-mail), en minuscules.
+
+    Sous PostgreSQL, doit rester identique à l'expression de l'index GIN
+    pg_trgm idx_clients_recherche_trgm pour qu'il soit utilisé. Sous MySQL,
+    `||` est un OU logique : la concaténation passe par CONCAT_WS.
+    """
+    a = f"{alias}." if alias else ''
+    if db_type == 'mysql':
+        return (
+            f"LOWER(CONCAT_WS(' ', COALESCE({a}nom, ''), COALESCE({a}prenom, ''), "
+            f"COALESCE({a}telephone, ''), COALESCE({a}email, '')))"
+        )
+    return (
+        f"LOWER(COALESCE({a}nom, '') || ' ' || COALESCE({a}prenom, '') || ' ' || "
+        f"COALESCE({a}telephone, '') || ' ' || COALESCE({a}email, ''))"
+    )
+
+
+def chiffres_telephone(telephone) -> str:
+    """Chiffres d'un numéro ("77 123 45 67", "+221771234567" -> chiffres seuls)."""
+    return re.sub(r'\D', '', str(telephone or ''))
+
+
+def expr_chiffres_telephone(colonne: str, db_type: str) -> str:
+    """Expression SQL équivalente à `chiffres_telephone` sur une colonne."""
+    if db_type == 'mysql':
+        return f"REGEXP_REPLACE({colonne}, '[^0-9]', '')"
+    return f"regexp_replace({colonne}, '\\D', '', 'g')"
+
+
+def motif_like(texte: str) -> str:
+    """Motif LIKE « contient » en minuscules, caractères spéciaux échappés."""
+    motif = texte.strip().lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{motif}%"
+
+
+# Requête qui modifie des données (y compris dans un WITH ou un SELECT ... FOR UPDATE)
+_MOTS_ECRITURE = re.compile(r'\b(INSERT|UPDATE|DELETE|MERGE)\b')
+
+# SELECT à effet de bord : la transaction doit être commitée pour qu'il prenne
+# effet (notification, séquence, verrou de transaction)
+_FONCTIONS_A_EFFET = re.compile(
+    r'\b(PG_NOTIFY|NEXTVAL|SETVAL|PG_(TRY_)?ADVISORY_XACT_LOCK(_SHARED)?)\s*\('
+)
+
+# Fonctions liées à la session SQL : via la façade du pool, la connexion peut
+# être rendue puis prêtée à un autre thread avec le verrou encore tenu
+_FONCTIONS_DE_SESSION = re.compile(r'\bPG_(TRY_)?ADVISORY_(UN)?LOCK(_SHARED|_ALL)?\s*\(')
+
+
+def _est_lecture_seule(query) -> bool:
+    """
+    Vrai si la requête ne peut pas laisser d'écriture en attente de commit.
+
+    SELECT / SHOW / EXPLAIN, et WITH sans INSERT / UPDATE / DELETE, sont des
+    lectures ; un SELECT appelant pg_notify, nextval, setval ou un verrou
+    consultatif de transaction est traité comme une écriture.
+    """
+    text = str(query or '').lstrip().upper()
+    if text.startswith('WITH'):
+        return not _MOTS_ECRITURE.search(text) and not _FONCTIONS_A_EFFET.search(text)
+    return text.startswith(_READ_ONLY_PREFIXES) and 'FOR UPDATE' not in text \
+        and not _FONCTIONS_A_EFFET.search(text)
+
+
+class _PooledCursor:
+    """
+    Curseur emprunté au pool : sa fermeture rend la connexion au pool
+    dès qu'aucun autre curseur ni écriture non commitée ne la retient.
+    """
+
+    def __init__(self, owner: 'DatabaseConnection', cursor, raw_conn):
+        self._owner = owner
+        self._cursor = cursor
+        self._raw_conn = raw_conn
+        self._closed = False
+
+    def _rattacher(self):
+        """Recrée le curseur natif si la connexion du thread a été remplacée."""
+        courante = self._owner._etat_thread().conn
+        if courante is not None and courante is not self._raw_conn and self._raw_conn.closed:
+            self._raw_conn = courante
+            self._cursor = courante.cursor()
+
+    def _executer(self, method: str, query, params):
+        self._rattacher()
+        premiere_requete = self._owner._etat_thread().executed == 0
+        try:
+            result = getattr(self._cursor, method)(query, params)
+        except Exception:
+            # Vérification paresseuse : la connexion n'est testée qu'ici, quand une
+            # vraie requête échoue. Si le serveur l'a coupée et que rien n'a encore
+            # été exécuté sur cet emprunt, on la remplace et on rejoue la requête.
+            if not (self._raw_conn.closed and premiere_requete):
+                self._owner._annuler_apres_erreur()
+                raise
+            self._raw_conn = self._owner._reconnecter(self._raw_conn)
+            self._cursor = self._raw_conn.cursor()
+            try:
+                result = getattr(self._cursor, method)(query, params)
+            except Exception:
+                self._owner._annuler_apres_erreur()
+                raise
+        self._owner._etat_thread().executed += 1
+        return result
+
+    def execute(self, query, params=None):
+        if _FONCTIONS_DE_SESSION.search(str(query or '').upper()):
+            raise RuntimeError(
+                "Verrou consultatif de session via le pool : utiliser db.lease()"
+            )
+        if not _est_lecture_seule(query):
+            self._owner._marquer_ecriture()
+        return self._executer('execute', query, params)
+
+    def executemany(self, query, params_seq):
+        self._owner._marquer_ecriture()
+        return self._executer('executemany', query, params_seq)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._cursor.close()
+        finally:
+            self._owner._curseur_ferme(self._raw_conn)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class _PooledConnection:
+    """
+    Façade retournée par `get_connection()` en mode pool.
+
+    Les modèles continuent d'écrire `conn.cursor()` / `conn.commit()` : la
+    connexion réelle n'est empruntée qu'au premier curseur et rendue au pool
+    après le commit (ou la fermeture du dernier curseur en lecture seule).
+    """
+
+    def __init__(self, owner: 'DatabaseConnection'):
+        self._owner = owner
+
+    @property
+    def closed(self) -> int:
+        return 0 if self._owner.is_connected() else 1
+
+    def cursor(self, *args, **kwargs):
+        raw = self._owner._connexion_du_thread()
+        self._owner._local.open_cursors += 1
+        try:
+            return _PooledCursor(self._owner, raw.cursor(*args, **kwargs), raw)
+        except Exception:
+            self._owner._local.open_cursors -= 1
+            raise
+
+    def commit(self):
+        self._owner._terminer_transaction(commit=True)
+
+    def rollback(self):
+        self._owner._terminer_transaction(commit=False)
+
+    def close(self):
+        self._owner.release()
+
+    def __getattr__(self, name):
+        return getattr(self._owner._connexion_du_thread(), name)
+
+
 class DatabaseConnection:
     """Classe pour gérer la connexion à la base de données"""
     
-    def __init__(self, db_type: str, config: Dict):
+    def __init__(self, db_type: str, config: Dict, pool_config: Optional[Dict] = None):
         """
         Initialise la connexion
         
         Args:
             db_type: Type de base de données ('postgresql')
             config: Configuration de connexion
+            pool_config: Paramètres du pool partagé (min, max, acquire_timeout,
+                idle_check_seconds). Si fourni et activé, les connexions sont
+                empruntées à un pool commun au processus (PostgreSQL uniquement).
         """
         self.db_type = db_type
         self.config = config
         self.connection = None
+        self.pool_config = pool_config or {}
+        self.pooled = bool(pool_config) and bool(self.pool_config.get('enabled', True)) \
+            and db_type == 'postgresql'
+        self.pool: Optional[ConnectionPool] = None
+        self._local = threading.local()
+        self._pg_trgm: Optional[bool] = None
+
+    def _connect_timeout(self) -> int:
+        timeout_value = self.config.get('connect_timeout', self.config.get('timeout', 8))
+        try:
+            connect_timeout = int(timeout_value)
+        except (TypeError, ValueError):
+            connect_timeout = 8
+        if connect_timeout <= 0:
+            connect_timeout = 8
+        return connect_timeout
+
+    def _postgresql_params(self) -> Dict:
+        conn_params = {
+            'host': self.config['host'],
+            'port': int(self.config.get('port', 5432)),
+            'database': self.config['database'],
+            'user': self.config['user'],
+            'password': self.config['password'],
+            'connect_timeout': self._connect_timeout(),
+        }
+        # SSL requis pour Render PostgreSQL
+        if self.config.get('sslmode'):
+            conn_params['sslmode'] = self.config['sslmode']
+        return conn_params
         
     def connect(self) -> bool:
         """
@@ -56,30 +293,23 @@ class DatabaseConnection:
         """
         try:
             # Evite les blocages "connexion infinie" si la DB est indisponible.
-            timeout_value = self.config.get('connect_timeout', self.config.get('timeout', 8))
-            try:
-                connect_timeout = int(timeout_value)
-            except (TypeError, ValueError):
-                connect_timeout = 8
-            if connect_timeout <= 0:
-                connect_timeout = 8
+            connect_timeout = self._connect_timeout()
 
             if self.db_type == 'postgresql':
                 if psycopg2 is None:
                     print("psycopg2 non installé")
                     return False
-                conn_params = {
-                    'host': self.config['host'],
-                    'port': int(self.config.get('port', 5432)),
-                    'database': self.config['database'],
-                    'user': self.config['user'],
-                    'password': self.config['password'],
-                    'connect_timeout': connect_timeout,
-                }
-                # SSL requis pour Render PostgreSQL
-                if self.config.get('sslmode'):
-                    conn_params['sslmode'] = self.config['sslmode']
-                self.connection = psycopg2.connect(**conn_params)
+                if self.pooled:
+                    self.pool = get_shared_pool(
+                        self._postgresql_params(),
+                        minconn=int(self.pool_config.get('min', 1)),
+                        maxconn=int(self.pool_config.get('max', 10)),
+                        acquire_timeout=float(self.pool_config.get('acquire_timeout', 10)),
+                        idle_check_seconds=float(self.pool_config.get('idle_check_seconds', 60)),
+                    )
+                    self.connection = _PooledConnection(self)
+                    return True
+                self.connection = psycopg2.connect(**self._postgresql_params())
                 return True
             elif self.db_type == 'mysql':
                 if mysql is None:
@@ -102,17 +332,39 @@ class DatabaseConnection:
             return False
     
     def disconnect(self):
-        """Ferme la connexion"""
+        """
+        Ferme la connexion.
+
+        En mode pool, seule la connexion empruntée par le thread courant est
+        rendue : le pool reste ouvert pour les autres sessions du processus.
+        """
+        if self.pooled:
+            self.release()
+            return
         if self.connection:
             self.connection.close()
             self.connection = None
     
     def get_connection(self):
-        """Retourne l'objet de connexion"""
+        """
+        Retourne l'objet de connexion.
+
+        Hors pool, une connexion PostgreSQL marquée fermée (coupée par le
+        serveur, ce que psycopg2 constate à la première requête en échec) est
+        rouverte ici avant d'être rendue. Le test lit seulement l'attribut
+        `closed`, sans aller-retour serveur.
+        """
+        if not self.pooled and self.connection is not None and self.db_type == 'postgresql' \
+                and getattr(self.connection, 'closed', 0):
+            print("Connexion PostgreSQL fermée : reconnexion")
+            self.connection = None
+            self.connect()
         return self.connection
     
     def is_connected(self) -> bool:
         """Vérifie si la connexion est active"""
+        if self.pooled:
+            return self.pool is not None and not self.pool.closed
         if self.connection is None:
             return False
         # mysql-connector n'a pas l'attribut 'closed' comme psycopg2
@@ -123,6 +375,132 @@ class DatabaseConnection:
         except Exception:
             return False
 
+    def trigrammes_disponibles(self) -> bool:
+        """
+        Vrai si l'extension pg_trgm est installée (recherche approchée `<%`,
+        word_similarity). Vérifié une fois par connexion ; sans l'extension
+        (base gérée sans le droit CREATE EXTENSION), la recherche se limite
+        à LIKE.
+        """
+        if self.db_type != 'postgresql':
+            return False
+        if self._pg_trgm is None:
+            try:
+                cursor = self.get_connection().cursor()
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                self._pg_trgm = cursor.fetchone() is not None
+                cursor.close()
+            except (MySQLError, PGError, Exception) as e:
+                print(f"Erreur vérification pg_trgm: {e}")
+                return False
+        return self._pg_trgm
+
+    # ------------------------------------------------------------------
+    # Mode pool : emprunt/restitution par thread (une requête Streamlit)
+    # ------------------------------------------------------------------
+
+    def _etat_thread(self):
+        local = self._local
+        if not hasattr(local, 'conn'):
+            local.conn = None
+            local.open_cursors = 0
+            local.dirty = False
+            local.executed = 0
+        return local
+
+    def _connexion_du_thread(self):
+        local = self._etat_thread()
+        if local.conn is None:
+            if self.pool is None:
+                raise RuntimeError("Pool DB non initialisé (connect() non appelé)")
+            local.conn = self.pool.acquire()
+            local.open_cursors = 0
+            local.dirty = False
+            local.executed = 0
+        return local.conn
+
+    def _reconnecter(self, conn_morte):
+        """Jette une connexion coupée par le serveur et en emprunte une neuve."""
+        local = self._etat_thread()
+        if local.conn is conn_morte:
+            local.conn = None
+        self.pool.release(conn_morte, discard=True)
+        self.pool.signaler_reconnexion()
+        local.conn = self.pool.acquire()
+        local.executed = 0
+        return local.conn
+
+    def _marquer_ecriture(self):
+        self._etat_thread().dirty = True
+
+    def _annuler_apres_erreur(self):
+        local = self._etat_thread()
+        if local.conn is not None:
+            try:
+                local.conn.rollback()
+            except Exception:
+                pass
+        local.dirty = False
+
+    def _curseur_ferme(self, raw_conn):
+        local = self._etat_thread()
+        if local.conn is not raw_conn:
+            # Curseur d'un emprunt déjà restitué (fin de requête) : rien à faire.
+            return
+        local.open_cursors = max(0, local.open_cursors - 1)
+        if local.open_cursors == 0 and not local.dirty:
+            self.release()
+
+    def _terminer_transaction(self, commit: bool):
+        local = self._etat_thread()
+        if local.conn is None:
+            return
+        if commit:
+            local.conn.commit()
+        else:
+            local.conn.rollback()
+        local.dirty = False
+        if local.open_cursors == 0:
+            self.release()
+
+    def release(self):
+        """Rend au pool la connexion empruntée par le thread courant (si elle existe)."""
+        if not self.pooled:
+            return
+        local = self._etat_thread()
+        conn = local.conn
+        local.conn = None
+        local.open_cursors = 0
+        local.dirty = False
+        local.executed = 0
+        if conn is not None and self.pool is not None:
+            self.pool.release(conn)
+
+    @contextmanager
+    def lease(self):
+        """
+        Emprunte une connexion brute pour la durée du bloc `with`.
+
+        Utile pour les opérations qui ont besoin de l'objet psycopg2 natif
+        (COPY, curseurs nommés...). Hors mode pool, retourne la connexion dédiée.
+        """
+        if not self.pooled:
+            yield self.connection
+            return
+        local = self._etat_thread()
+        deja_emprunte = local.conn is not None
+        conn = self._connexion_du_thread()
+        # Épingle l'emprunt : les curseurs des modèles utilisés dans le bloc
+        # ne doivent pas rendre la connexion au pool en se fermant.
+        local.open_cursors += 1
+        try:
+            yield conn
+        finally:
+            if local.conn is conn:
+                local.open_cursors = max(0, local.open_cursors - 1)
+            if not deja_emprunte:
+                self.release()
+
 
 class CouturierModel:
     """Modèle pour la gestion des couturiers"""
@@ -318,6 +696,7 @@ class CouturierModel:
             print(f"Erreur liste couturiers: {e}")
             return []
     
+    @ecriture_invalide(salon='salon_id')
     def creer_utilisateur(self, code_couturier: str, password: str, nom: str, prenom: str,
                           role: str = 'employe', email: Optional[str] = None,
                           telephone: Optional[str] = None, salon_id: Optional[str] = None) -> Optional[int]:
@@ -376,6 +755,7 @@ class CouturierModel:
             print(f"Erreur création utilisateur: {e}")
             return None
 
+    @ecriture_invalide(couturier='user_id')
     def mettre_a_jour_statut_actif(self, user_id: int, actif: bool) -> bool:
         """
         Active ou désactive un utilisateur.
@@ -400,6 +780,7 @@ class CouturierModel:
             print(f"Erreur mise à jour statut actif utilisateur {user_id}: {e}")
             return False
     
+    @ecriture_invalide(couturier='couturier_id')
     def reinitialiser_mot_de_passe(self, couturier_id: int, nouveau_password: str) -> bool:
         """
         Réinitialise le mot de passe d'un utilisateur
@@ -422,6 +803,7 @@ class CouturierModel:
             print(f"Erreur réinitialisation mot de passe: {e}")
             return False
     
+    @ecriture_invalide(couturier='couturier_id')
     def modifier_role(self, couturier_id: int, nouveau_role: str) -> bool:
         """
         Modifie le rôle d'un utilisateur
@@ -448,6 +830,7 @@ class CouturierModel:
             print(f"Erreur modification rôle: {e}")
             return False
     
+    @ecriture_invalide(couturier='couturier_id')
     def supprimer_utilisateur(self, couturier_id: int) -> bool:
         """
         Supprime un utilisateur (avec vérification de sécurité)
@@ -459,14 +842,21 @@ class CouturierModel:
             True si succès, False sinon
         """
         try:
-            cursor = self.db.get_connection().cursor()
+            connection = self.db.get_connection()
+            cursor = connection.cursor()
+            # Les commandes et charges supprimées en cascade sortent des agrégats
+            StatsDailyModel(self.db).retirer_couturier(cursor, couturier_id)
             query = "DELETE FROM couturiers WHERE id = %s"
             cursor.execute(query, (couturier_id,))
-            self.db.get_connection().commit()
+            connection.commit()
             cursor.close()
             return True
         except (MySQLError, PGError, Exception) as e:
             print(f"Erreur suppression utilisateur: {e}")
+            try:
+                self.db.get_connection().rollback()
+            except Exception:
+                pass
             return False
 
 
@@ -573,6 +963,7 @@ class ClientModel:
             print(f"Erreur création tables: {e}")
             return False
     
+    @ecriture_invalide(couturier='couturier_id')
     def ajouter_client(self, couturier_id: int, nom: str, prenom: str, 
                        telephone: str, email: Optional[str] = None) -> Optional[int]:
         """
@@ -631,6 +1022,77 @@ class ClientModel:
             print(f"Erreur recherche client: {e}")
             return None
 
+    def rechercher_clients(self, texte: str, salon_id: Optional[str] = None,
+                           couturier_id: Optional[int] = None, limite: int = 20) -> List[Dict]:
+        """
+        Recherche de clients par nom, prénom, téléphone ou e-mail (saisie au fil de l'eau).
+
+        Sous PostgreSQL avec pg_trgm, s'appuie sur l'index trigramme
+        idx_clients_recherche_trgm : sous-chaîne (LIKE) ou proximité de mot
+        (<%, tolère les fautes de frappe), classés par word_similarity.
+        Sans l'extension (et sous MySQL), sous-chaîne seulement.
+
+        Args:
+            texte: Texte saisi (au moins LONGUEUR_MIN_RECHERCHE caractères)
+            salon_id: Limiter aux clients des couturiers du salon
+            couturier_id: Limiter aux clients d'un couturier
+            limite: Nombre maximum de résultats
+
+        Returns:
+            Liste de clients, les plus pertinents d'abord
+        """
+        texte = (texte or '').strip()
+        if len(texte) < LONGUEUR_MIN_RECHERCHE or (salon_id is None and couturier_id is None):
+            return []
+        expr = expr_recherche_client('c', self.db.db_type)
+        if couturier_id is not None:
+            portee = "c.couturier_id = %s"
+            params_portee: List = [couturier_id]
+        else:
+            portee = "c.couturier_id IN (SELECT id FROM couturiers WHERE salon_id = %s)"
+            params_portee = [salon_id]
+        try:
+            trigrammes = self.db.trigrammes_disponibles()
+            cursor = self.db.get_connection().cursor()
+            if not trigrammes:
+                cursor.execute(
+                    f"""
+                    SELECT c.id, c.nom, c.prenom, c.telephone, c.email, c.couturier_id
+                    FROM clients c
+                    WHERE {portee} AND {expr} LIKE %s
+                    ORDER BY c.nom, c.prenom
+                    LIMIT %s
+                    """,
+                    (*params_portee, motif_like(texte), limite)
+                )
+            else:
+                cursor.execute(
+                    f"""
+                    SELECT c.id, c.nom, c.prenom, c.telephone, c.email, c.couturier_id
+                    FROM clients c
+                    WHERE {portee} AND ({expr} LIKE %s OR %s <%% {expr})
+                    ORDER BY word_similarity(%s, {expr}) DESC, c.nom, c.prenom
+                    LIMIT %s
+                    """,
+                    (*params_portee, motif_like(texte), texte.lower(), texte.lower(), limite)
+                )
+            rows = cursor.fetchall()
+            cursor.close()
+            return [
+                {
+                    'id': row[0],
+                    'nom': row[1],
+                    'prenom': row[2],
+                    'telephone': row[3],
+                    'email': row[4],
+                    'couturier_id': row[5],
+                }
+                for row in rows
+            ]
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur recherche clients: {e}")
+            return []
+
     def compter_clients_par_salon(self, salon_id: str) -> int:
         """Retourne le nombre total de clients uniques d'un salon."""
         try:
@@ -658,6 +1120,7 @@ class CommandeModel:
 
 
 
+    @ecriture_invalide(couturier='couturier_id')
     def ajouter_commande(self, client_id: int, couturier_id: int, 
                          categorie: str, sexe: str, modele: str,
                          mesures: Dict, prix_total: float, avance: float,
@@ -686,9 +1149,9 @@ class CommandeModel:
             fabric_image_path (str, optional): Chemin de l'image du tissu
             model_type (str, optional): Type ou chemin du modèle
             model_image_path (str, optional): Chemin de l'image du modèle de vêtement
-            fabric_image (bytes, optional): Image du tissu en binaire
+            fabric_image (bytes, optional): Image du tissu en binaire (rangée dans media_blobs)
             fabric_image_name (str, optional): Nom du fichier de l'image du tissu
-            model_image (bytes, optional): Image du modèle en binaire
+            model_image (bytes, optional): Image du modèle en binaire (rangée dans media_blobs)
             model_image_name (str, optional): Nom du fichier de l'image du modèle
 
         Returns:
@@ -708,21 +1171,32 @@ class CommandeModel:
             
             statut = "En cours"
 
+            # Images rangées dans media_blobs, dans la même transaction
+            media_model = MediaBlobModel(self.db)
+            # (avec leurs déclinaisons 160/480/1280 px pour l'affichage)
+            fabric_blob_id = media_model.enregistrer_image(
+                fabric_image, nom_fichier=fabric_image_name, cursor=cursor
+            ) if fabric_image else None
+            model_blob_id = media_model.enregistrer_image(
+                model_image, nom_fichier=model_image_name, cursor=cursor
+            ) if model_image else None
+
             # Requête SQL adaptée à ta table actuelle
             if self.db.db_type == 'mysql':
                 query = (
                     "INSERT INTO commandes "
-                    "(client_id, couturier_id, categorie, sexe, modele, mesures, "
-                    " prix_total, avance, reste, date_livraison, fabric_image_path, fabric_image, fabric_image_name, "
-                    " model_type, model_image_path, model_image, model_image_name, statut) "
-                    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+                    "(client_id, couturier_id, salon_id, categorie, sexe, modele, mesures, "
+                    " prix_total, avance, reste, date_livraison, fabric_image_path, fabric_blob_id, fabric_image_name, "
+                    " model_type, model_image_path, model_blob_id, model_image_name, statut) "
+                    "VALUES (%s, %s, (SELECT salon_id FROM couturiers WHERE id = %s), "
+                    "%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
                 )
 
                 cursor.execute(query, (
-                    client_id, couturier_id, categorie, sexe, modele,
+                    client_id, couturier_id, couturier_id, categorie, sexe, modele,
                     json.dumps(mesures), prix_total, avance, reste, 
-                    date_livraison, fabric_image_path, fabric_image, fabric_image_name,
-                    model_type, model_image_path, model_image, model_image_name, statut
+                    date_livraison, fabric_image_path, fabric_blob_id, fabric_image_name,
+                    model_type, model_image_path, model_blob_id, model_image_name, statut
                 ))
 
                 commande_id = cursor.lastrowid
@@ -731,22 +1205,29 @@ class CommandeModel:
                 # Version PostgreSQL (si jamais tu l'utilises aussi)
                 query = """
                     INSERT INTO commandes 
-                    (client_id, couturier_id, categorie, sexe, modele, mesures,
-                     prix_total, avance, reste, date_livraison, fabric_image_path, fabric_image, fabric_image_name,
-                     model_type, model_image_path, model_image, model_image_name, statut)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    (client_id, couturier_id, salon_id, categorie, sexe, modele, mesures,
+                     prix_total, avance, reste, date_livraison, fabric_image_path, fabric_blob_id, fabric_image_name,
+                     model_type, model_image_path, model_blob_id, model_image_name, statut)
+                    VALUES (%s, %s, (SELECT salon_id FROM couturiers WHERE id = %s),
+                            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                     RETURNING id
                 """
 
                 cursor.execute(query, (
-                    client_id, couturier_id, categorie, sexe, modele,
+                    client_id, couturier_id, couturier_id, categorie, sexe, modele,
                     json.dumps(mesures), prix_total, avance, reste,
-                    date_livraison, fabric_image_path, fabric_image, fabric_image_name,
-                    model_type, model_image_path, model_image, model_image_name, statut
+                    date_livraison, fabric_image_path, fabric_blob_id, fabric_image_name,
+                    model_type, model_image_path, model_blob_id, model_image_name, statut
                 ))
 
                 commande_id = cursor.fetchone()[0]
 
+            # Agrégats journaliers (stats_daily), dans la même transaction
+            stats_model = StatsDailyModel(self.db)
+            stats_model.appliquer_variation_commande(
+                cursor, None, stats_model.etat_commande(cursor, commande_id)
+            )
+
             connection.commit()
             cursor.close()
             return commande_id
@@ -764,7 +1245,12 @@ class CommandeModel:
 
 
     def obtenir_commande(self, commande_id: int) -> Optional[Dict]:
-        """Récupère les détails d'une commande"""
+        """
+        Récupère les détails d'une commande.
+
+        `fabric_image`, `model_image` et `pdf_data` sont des MediaHandle
+        (ou None) : les octets ne sont lus qu'à l'appel de `.read()`.
+        """
         try:
             cursor = self.db.get_connection().cursor()
             # Utiliser des colonnes explicites au lieu de c.* pour éviter les problèmes d'ordre
@@ -774,17 +1260,23 @@ class CommandeModel:
                     c.categorie, c.sexe, c.modele, c.mesures,
                     c.prix_total, c.avance, c.reste,
                     c.date_livraison, c.statut,
-                    c.fabric_image_path, c.fabric_image, c.fabric_image_name,
-                    c.model_type, c.model_image_path, c.model_image, c.model_image_name,
+                    c.fabric_image_path, c.fabric_blob_id, c.fabric_image_name,
+                    c.model_type, c.model_image_path, c.model_blob_id, c.model_image_name,
                     c.date_creation,
-                    c.pdf_data, c.pdf_name, c.pdf_path,
+                    c.pdf_blob_id, c.pdf_name, c.pdf_path,
                     cl.nom as client_nom, cl.prenom as client_prenom, 
                     cl.telephone as client_telephone, cl.email as client_email,
                     co.nom as couturier_nom, co.prenom as couturier_prenom, 
-                    co.code_couturier as couturier_code
+                    co.code_couturier as couturier_code,
+                    fb.mime_type, fb.size_bytes,
+                    mb.mime_type, mb.size_bytes,
+                    pb.mime_type, pb.size_bytes
                 FROM commandes c
                 JOIN clients cl ON c.client_id = cl.id
                 JOIN couturiers co ON c.couturier_id = co.id
+                LEFT JOIN media_blobs fb ON fb.id = c.fabric_blob_id
+                LEFT JOIN media_blobs mb ON mb.id = c.model_blob_id
+                LEFT JOIN media_blobs pb ON pb.id = c.pdf_blob_id
                 WHERE c.id = %s
             """
             cursor.execute(query, (commande_id,))
@@ -792,8 +1284,7 @@ class CommandeModel:
             cursor.close()
             
             if result:
-                # Compter le nombre de colonnes pour gérer la compatibilité
-                num_cols = len(result)
+                media_model = MediaBlobModel(self.db)
                 data = {
                     'id': result[0],
                     'client_id': result[1],
@@ -808,40 +1299,25 @@ class CommandeModel:
                     'date_livraison': result[10],
                     'statut': result[11],
                     'fabric_image_path': result[12],
-                    'fabric_image': result[13],
+                    'fabric_image': media_model.handle(result[13], result[30], result[31], result[14]),
                     'fabric_image_name': result[14],
                     'model_type': result[15],
                     'model_image_path': result[16],
-                    'model_image': result[17],
+                    'model_image': media_model.handle(result[17], result[32], result[33], result[18]),
                     'model_image_name': result[18],
                     'date_creation': result[19],
+                    'pdf_data': media_model.handle(result[20], result[34], result[35], result[21]),
+                    'pdf_name': result[21],
+                    'pdf_path': result[22],
+                    'client_nom': result[23],
+                    'client_prenom': result[24],
+                    'client_telephone': result[25],
+                    'client_email': result[26],
+                    'couturier_nom': result[27],
+                    'couturier_prenom': result[28],
+                    'couturier_code': result[29],
                 }
-                
-                # Ajouter les données PDF si disponibles (colonnes 20-22)
-                if num_cols > 22:
-                    data['pdf_data'] = result[20]
-                    data['pdf_name'] = result[21]
-                    data['pdf_path'] = result[22]
-                    # Données client et couturier (colonnes 23-29)
-                    data['client_nom'] = result[23]
-                    data['client_prenom'] = result[24]
-                    data['client_telephone'] = result[25]
-                    data['client_email'] = result[26]
-                    data['couturier_nom'] = result[27]
-                    data['couturier_prenom'] = result[28]
-                    data['couturier_code'] = result[29]
-                else:
-                    # Ancien format sans PDF (colonnes 20-26)
-                    data['pdf_data'] = None
-                    data['pdf_name'] = None
-                    data['pdf_path'] = None
-                    data['client_nom'] = result[20] if num_cols > 20 else None
-                    data['client_prenom'] = result[21] if num_cols > 21 else None
-                    data['client_telephone'] = result[22] if num_cols > 22 else None
-                    data['client_email'] = result[23] if num_cols > 23 else None
-                    data['couturier_nom'] = result[24] if num_cols > 24 else None
-                    data['couturier_prenom'] = result[25] if num_cols > 25 else None
-                    data['couturier_code'] = result[26] if num_cols > 26 else None
+                media_model.charger_renditions([data['fabric_image'], data['model_image']])
                 # Normaliser le champ mesures: parser JSON si MySQL retourne une string
                 try:
                     import json as _json
@@ -855,6 +1331,7 @@ class CommandeModel:
             print(f"Erreur récupération commande: {e}")
             return None
     
+    @lecture_en_cache()
     def lister_commandes(self, couturier_id: Optional[int] = None, 
                          tous_les_couturiers: bool = False,
                          salon_id: Optional[str] = None) -> List[Dict]:
@@ -892,7 +1369,7 @@ class CommandeModel:
                     FROM commandes c
                     JOIN clients cl ON c.client_id = cl.id
                     LEFT JOIN couturiers co ON c.couturier_id = co.id
-                    WHERE co.salon_id = %s
+                    WHERE c.salon_id = %s
                     ORDER BY c.date_creation DESC
                 """
                 cursor.execute(query, (salon_id,))
@@ -907,7 +1384,7 @@ class CommandeModel:
                         FROM commandes c
                         JOIN clients cl ON c.client_id = cl.id
                         LEFT JOIN couturiers co ON c.couturier_id = co.id
-                        WHERE co.salon_id = %s AND c.couturier_id = %s
+                        WHERE c.salon_id = %s AND c.couturier_id = %s
                         ORDER BY c.date_creation DESC
                     """
                     cursor.execute(query, (salon_id, couturier_id))
@@ -920,7 +1397,7 @@ class CommandeModel:
                         FROM commandes c
                         JOIN clients cl ON c.client_id = cl.id
                         LEFT JOIN couturiers co ON c.couturier_id = co.id
-                        WHERE co.salon_id = %s
+                        WHERE c.salon_id = %s
                         ORDER BY c.date_creation DESC
                     """
                     cursor.execute(query, (salon_id,))
@@ -981,6 +1458,365 @@ class CommandeModel:
             print(f"Erreur liste commandes: {e}")
             return []
     
+    def _clients_par_telephone(self, cursor, salon_id: Optional[str], couturier_id: int,
+                               telephones: List[str]) -> Dict[str, int]:
+        """
+        Chiffres du téléphone -> id du client existant (dans le salon, sinon
+        chez le couturier).
+
+        La comparaison se fait sur les seuls chiffres des deux côtés : la
+        saisie enregistre les numéros tels que tapés ("77 123 45 67").
+        """
+        if not telephones:
+            return {}
+        placeholders = ", ".join(["%s"] * len(telephones))
+        chiffres = expr_chiffres_telephone('cl.telephone', self.db.db_type)
+        if salon_id:
+            cursor.execute(
+                f"""
+                SELECT {chiffres}, MIN(cl.id)
+                FROM clients cl
+                LEFT JOIN couturiers co ON co.id = cl.couturier_id
+                WHERE {chiffres} IN ({placeholders})
+                  AND COALESCE(cl.salon_id, co.salon_id) = %s
+                GROUP BY {chiffres}
+                """,
+                (*telephones, salon_id)
+            )
+        else:
+            cursor.execute(
+                f"""
+                SELECT {chiffres}, MIN(cl.id) FROM clients cl
+                WHERE {chiffres} IN ({placeholders}) AND cl.couturier_id = %s
+                GROUP BY {chiffres}
+                """,
+                (*telephones, couturier_id)
+            )
+        return {row[0]: row[1] for row in cursor.fetchall()}
+
+    @ecriture_invalide(couturier='couturier_id')
+    def importer_lot(self, couturier_id: int, lignes: List[Dict]) -> Optional[Dict]:
+        """
+        Insère un lot de commandes déjà validées (services/import_service)
+        en une seule transaction.
+
+        Les clients sont dédoublonnés par téléphone dans le salon du
+        couturier : un client existant est réutilisé, les nouveaux sont
+        insérés en une requête multi-lignes (execute_values sous PostgreSQL,
+        executemany sous MySQL), puis les commandes de même, et stats_daily
+        reçoit une variation par clé.
+
+        Args:
+            couturier_id: Couturier auquel les commandes sont rattachées
+            lignes: Dicts nom, prenom, telephone, email, categorie, sexe, modele,
+                mesures, prix_total, avance, reste, statut, date_creation, date_livraison
+
+        Returns:
+            {'commandes': n, 'clients_crees': n} ou None si le lot a échoué (rien n'est écrit)
+        """
+        connection = self.db.get_connection()
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT salon_id FROM couturiers WHERE id = %s", (couturier_id,))
+            row = cursor.fetchone()
+            salon_id = row[0] if row else None
+
+            telephones = sorted({chiffres_telephone(ligne['telephone']) for ligne in lignes})
+            clients = self._clients_par_telephone(cursor, salon_id, couturier_id, telephones)
+            nouveaux: Dict[str, Tuple] = {}
+            for ligne in lignes:
+                cle = chiffres_telephone(ligne['telephone'])
+                if cle not in clients and cle not in nouveaux:
+                    nouveaux[cle] = (
+                        couturier_id, salon_id, ligne['nom'], ligne['prenom'],
+                        ligne['telephone'], ligne['email'],
+                    )
+            if nouveaux:
+                requete_clients = "INSERT INTO clients (couturier_id, salon_id, nom, prenom, telephone, email) VALUES "
+                if self.db.db_type == 'mysql':
+                    cursor.executemany(requete_clients + "(%s, %s, %s, %s, %s, %s)", list(nouveaux.values()))
+                else:
+                    execute_values(cursor, requete_clients + "%s", list(nouveaux.values()), page_size=len(nouveaux))
+                clients.update(self._clients_par_telephone(cursor, salon_id, couturier_id, list(nouveaux)))
+
+            valeurs = []
+            etats = []
+            for ligne in lignes:
+                est_ouverte = ligne['statut'] != 'Livré et payé'
+                valeurs.append((
+                    clients[chiffres_telephone(ligne['telephone'])], couturier_id, salon_id,
+                    ligne['categorie'], ligne['sexe'], ligne['modele'], json.dumps(ligne['mesures']),
+                    ligne['prix_total'], ligne['avance'], ligne['reste'],
+                    ligne['date_livraison'], ligne['date_creation'], ligne['statut'], est_ouverte,
+                    None if est_ouverte else (ligne['date_livraison'] or ligne['date_creation']),
+                ))
+                etats.append({
+                    'salon_id': salon_id or '',
+                    'couturier_id': couturier_id,
+                    'day': ligne['date_creation'].date(),
+                    'modele': ligne['modele'][:100],
+                    'prix_total': ligne['prix_total'],
+                    'avance': ligne['avance'],
+                    'reste': ligne['reste'],
+                    'statut': ligne['statut'],
+                })
+            requete_commandes = (
+                "INSERT INTO commandes (client_id, couturier_id, salon_id, categorie, sexe, modele, mesures, "
+                "prix_total, avance, reste, date_livraison, date_creation, statut, est_ouverte, date_fermeture) "
+                "VALUES "
+            )
+            if self.db.db_type == 'mysql':
+                cursor.executemany(requete_commandes + "(" + ", ".join(["%s"] * 15) + ")", valeurs)
+            else:
+                execute_values(cursor, requete_commandes + "%s", valeurs, page_size=len(valeurs))
+
+            StatsDailyModel(self.db).appliquer_creations(cursor, etats)
+            connection.commit()
+            return {'commandes': len(valeurs), 'clients_crees': len(nouveaux)}
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur import d'un lot de commandes: {e}")
+            try:
+                connection.rollback()
+            except Exception:
+                pass
+            return None
+        finally:
+            cursor.close()
+
+    @ecriture_invalide()
+    def renseigner_salon_id(self) -> Optional[int]:
+        """
+        Renseigne commandes.salon_id (salon du couturier) là où il manque.
+
+        Les filtres par salon lisent directement cette colonne (index
+        idx_commandes_salon) au lieu de joindre couturiers.
+
+        Returns:
+            Nombre de commandes mises à jour ou None si erreur
+        """
+        try:
+            connection = self.db.get_connection()
+            cursor = connection.cursor()
+            if self.db.db_type == 'mysql':
+                try:
+                    cursor.execute("ALTER TABLE commandes ADD COLUMN salon_id VARCHAR(50) NULL")
+                    cursor.execute("CREATE INDEX idx_commandes_salon ON commandes (salon_id)")
+                except (MySQLError, PGError, Exception):
+                    pass  # colonne déjà présente
+                cursor.execute(
+                    """
+                    UPDATE commandes c
+                    JOIN couturiers co ON co.id = c.couturier_id
+                    SET c.salon_id = co.salon_id
+                    WHERE c.salon_id IS NULL AND co.salon_id IS NOT NULL
+                    """
+                )
+            else:
+                cursor.execute("ALTER TABLE commandes ADD COLUMN IF NOT EXISTS salon_id VARCHAR(50) NULL")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_commandes_salon ON commandes (salon_id)")
+                cursor.execute(
+                    """
+                    UPDATE commandes c
+                    SET salon_id = co.salon_id
+                    FROM couturiers co
+                    WHERE co.id = c.couturier_id
+                      AND c.salon_id IS NULL AND co.salon_id IS NOT NULL
+                    """
+                )
+            nb_commandes = cursor.rowcount
+            connection.commit()
+            cursor.close()
+            return nb_commandes
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur renseignement commandes.salon_id: {e}")
+            try:
+                self.db.get_connection().rollback()
+            except Exception:
+                pass
+            return None
+    
+    def rechercher_par_texte(self, texte: str, salon_id: Optional[str] = None,
+                             couturier_id: Optional[int] = None, limite: int = 20) -> List[Dict]:
+        """
+        Recherche de commandes par modèle ou numéro (saisie au fil de l'eau).
+
+        Un numéro exact passe en tête ; les modèles sont trouvés par l'index
+        trigramme idx_commandes_modele_trgm et classés par word_similarity
+        (sous-chaîne LIKE seulement sans pg_trgm).
+
+        Returns:
+            Liste de commandes, les plus pertinentes d'abord
+        """
+        texte = (texte or '').strip()
+        if len(texte) < LONGUEUR_MIN_RECHERCHE and not texte.lstrip('#').isdigit():
+            return []
+        if salon_id is None and couturier_id is None:
+            return []
+        numero = texte.lstrip('#')
+        numero = int(numero) if numero.isdigit() else None
+        if couturier_id is not None:
+            portee = "c.couturier_id = %s"
+            params_portee: List = [couturier_id]
+        else:
+            portee = "c.salon_id = %s"
+            params_portee = [salon_id]
+        colonnes = """
+            c.id, c.modele, c.prix_total, c.statut, c.date_creation, cl.nom, cl.prenom
+        """
+        try:
+            trigrammes = self.db.trigrammes_disponibles()
+            cursor = self.db.get_connection().cursor()
+            if not trigrammes:
+                cursor.execute(
+                    f"""
+                    SELECT {colonnes}
+                    FROM commandes c
+                    JOIN clients cl ON c.client_id = cl.id
+                    WHERE {portee} AND (c.id = %s OR LOWER(c.modele) LIKE %s)
+                    ORDER BY (c.id = %s) IS TRUE DESC, c.date_creation DESC
+                    LIMIT %s
+                    """,
+                    (*params_portee, numero, motif_like(texte), numero, limite)
+                )
+            else:
+                cursor.execute(
+                    f"""
+                    SELECT {colonnes}
+                    FROM commandes c
+                    JOIN clients cl ON c.client_id = cl.id
+                    WHERE {portee}
+                      AND (c.id = %s OR LOWER(c.modele) LIKE %s OR %s <%% LOWER(c.modele))
+                    ORDER BY (c.id = %s) IS TRUE DESC,
+                             word_similarity(%s, LOWER(c.modele)) DESC,
+                             c.date_creation DESC
+                    LIMIT %s
+                    """,
+                    (*params_portee, numero, motif_like(texte), texte.lower(),
+                     numero, texte.lower(), limite)
+                )
+            rows = cursor.fetchall()
+            cursor.close()
+            return [
+                {
+                    'id': row[0],
+                    'modele': row[1],
+                    'prix_total': float(row[2]),
+                    'statut': row[3],
+                    'date_creation': row[4],
+                    'client_nom': row[5],
+                    'client_prenom': row[6],
+                }
+                for row in rows
+            ]
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur recherche commandes: {e}")
+            return []
+    
+    @lecture_en_cache()
+    def rechercher_commandes(self, couturier_id: int, statut: Optional[str] = None,
+                             recherche: Optional[str] = None, date_debut=None, date_fin=None,
+                             tri: str = 'recentes', taille_page: int = 50,
+                             apres: Optional[Tuple] = None) -> Dict:
+        """
+        Page de commandes d'un couturier, filtrée et triée en SQL.
+
+        La pagination se fait par clé (date_creation, id) : la page suivante
+        part du dernier couple renvoyé au lieu d'un OFFSET, son coût ne dépend
+        donc pas de la profondeur.
+
+        Args:
+            couturier_id: ID du couturier
+            statut: Statut exact (None = tous)
+            recherche: Texte cherché dans le client (nom, prénom, téléphone,
+                e-mail), le modèle ou le numéro de commande
+            date_debut: Première date de création incluse (date)
+            date_fin: Dernière date de création incluse (date)
+            tri: 'recentes' (plus récentes d'abord) ou 'anciennes'
+            taille_page: Nombre de commandes par page
+            apres: Curseur (date_creation, id) renvoyé par la page précédente
+
+        Returns:
+            Dict {'commandes': [...], 'total': nb de commandes filtrées,
+                  'curseur_suivant': (date_creation, id) ou None si dernière page}
+        """
+        vide = {'commandes': [], 'total': 0, 'curseur_suivant': None}
+        where = ["c.couturier_id = %s"]
+        params: List = [couturier_id]
+        if statut:
+            where.append("c.statut = %s")
+            params.append(statut)
+        if recherche and recherche.strip():
+            motif = motif_like(recherche)
+            numero = recherche.strip().lstrip('#')
+            where.append(f"({expr_recherche_client('cl', self.db.db_type)} LIKE %s OR LOWER(c.modele) LIKE %s OR c.id = %s)")
+            params.extend([motif, motif, int(numero) if numero.isdigit() else None])
+        if date_debut:
+            where.append("c.date_creation >= %s")
+            params.append(datetime.combine(date_debut, datetime.min.time()))
+        if date_fin:
+            where.append("c.date_creation < %s")
+            params.append(datetime.combine(date_fin + timedelta(days=1), datetime.min.time()))
+
+        sens, comparaison = ('ASC', '>') if tri == 'anciennes' else ('DESC', '<')
+        where_page = list(where)
+        params_page = list(params)
+        if apres:
+            where_page.append(f"(c.date_creation, c.id) {comparaison} (%s, %s)")
+            params_page.extend(apres)
+
+        try:
+            cursor = self.db.get_connection().cursor()
+            cursor.execute(
+                f"""
+                SELECT COUNT(*)
+                FROM commandes c
+                JOIN clients cl ON c.client_id = cl.id
+                WHERE {" AND ".join(where)}
+                """,
+                tuple(params)
+            )
+            total = int(cursor.fetchone()[0])
+            cursor.execute(
+                f"""
+                SELECT c.id, c.modele, c.prix_total, c.statut, c.date_creation,
+                       cl.nom, cl.prenom
+                FROM commandes c
+                JOIN clients cl ON c.client_id = cl.id
+                WHERE {" AND ".join(where_page)}
+                ORDER BY c.date_creation {sens}, c.id {sens}
+                LIMIT %s
+                """,
+                tuple(params_page) + (taille_page + 1,)
+            )
+            rows = cursor.fetchall()
+            cursor.close()
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur recherche commandes: {e}")
+            return vide
+
+        # Une ligne de plus que la page : indique s'il reste des commandes
+        curseur_suivant = None
+        if len(rows) > taille_page:
+            rows = rows[:taille_page]
+            curseur_suivant = (rows[-1][4], rows[-1][0])
+        return {
+            'commandes': [
+                {
+                    'id': row[0],
+                    'modele': row[1],
+                    'prix_total': float(row[2]),
+                    'statut': row[3],
+                    'date_creation': row[4],
+                    'client_nom': row[5],
+                    'client_prenom': row[6],
+                }
+                for row in rows
+            ],
+            'total': total,
+            'curseur_suivant': curseur_suivant,
+        }
+    
+    @ecriture_invalide(couturier='couturier_id')
     def enregistrer_paiement(self, commande_id: int, couturier_id: int, 
                             montant_paye: float, commentaire: Optional[str] = None) -> Optional[int]:
         """
@@ -1012,12 +1848,18 @@ class CommandeModel:
             nouvelle_avance = float(commande.get('avance', 0)) + montant_paye
             statut_apres = 'Terminé' if reste_apres <= 0 else statut_avant
             
+            stats_model = StatsDailyModel(self.db)
+            etat_avant = stats_model.etat_commande(cursor, commande_id, verrouiller=True)
+
             update_query = """
                 UPDATE commandes 
                 SET avance = %s, reste = %s, statut = %s, date_dernier_paiement = NOW()
                 WHERE id = %s
             """
             cursor.execute(update_query, (nouvelle_avance, reste_apres, statut_apres, commande_id))
+            stats_model.appliquer_variation_commande(
+                cursor, etat_avant, stats_model.etat_commande(cursor, commande_id)
+            )
             
             # Créer l'entrée dans l'historique
             hist_query = """
@@ -1045,6 +1887,7 @@ class CommandeModel:
             print(f"Erreur enregistrement paiement: {e}")
             return None
     
+    @ecriture_invalide(commande='commande_id')
     def sauvegarder_pdf_upload(self, commande_id: int, pdf_bytes: bytes, 
                               pdf_filename: str, pdf_path: str) -> bool:
         """
@@ -1063,12 +1906,15 @@ class CommandeModel:
             connection = self.db.get_connection()
             cursor = connection.cursor()
             
+            pdf_blob_id = MediaBlobModel(self.db).enregistrer(
+                pdf_bytes, mime_type='application/pdf', cursor=cursor
+            )
             query = """
                 UPDATE commandes 
-                SET pdf_data = %s, pdf_name = %s, pdf_path = %s
+                SET pdf_blob_id = %s, pdf_name = %s, pdf_path = %s
                 WHERE id = %s
             """
-            cursor.execute(query, (pdf_bytes, pdf_filename, pdf_path, commande_id))
+            cursor.execute(query, (pdf_blob_id, pdf_filename, pdf_path, commande_id))
             connection.commit()
             cursor.close()
             return True
@@ -1076,6 +1922,7 @@ class CommandeModel:
             print(f"Erreur sauvegarde PDF upload: {e}")
             return False
 
+    @ecriture_invalide(commande='commande_id')
     def modifier_prix_commande(self, commande_id: int, prix_total: float, 
                                avance: float, reste: Optional[float] = None) -> bool:
         """
@@ -1101,6 +1948,9 @@ class CommandeModel:
                 # S'assurer que le reste est cohérent
                 reste = max(0.0, float(reste))
             
+            stats_model = StatsDailyModel(self.db)
+            etat_avant = stats_model.etat_commande(cursor, commande_id, verrouiller=True)
+
             # Mettre à jour la commande
             update_query = """
                 UPDATE commandes 
@@ -1108,6 +1958,9 @@ class CommandeModel:
                 WHERE id = %s
             """
             cursor.execute(update_query, (prix_total, avance, reste, commande_id))
+            stats_model.appliquer_variation_commande(
+                cursor, etat_avant, stats_model.etat_commande(cursor, commande_id)
+            )
             
             connection.commit()
             cursor.close()
@@ -1117,6 +1970,7 @@ class CommandeModel:
             print(f"Erreur modification prix commande: {e}")
             return False
     
+    @ecriture_invalide(couturier='couturier_id')
     def demander_fermeture(self, commande_id: int, couturier_id: int, 
                           commentaire: Optional[str] = None) -> Optional[int]:
         """
@@ -1204,6 +2058,7 @@ class CommandeModel:
                 pass
             return None
     
+    @ecriture_invalide(couturier='admin_id')
     def valider_fermeture(self, historique_id: int, admin_id: int, 
                          valide: bool, commentaire_admin: Optional[str] = None) -> bool:
         """
@@ -1255,6 +2110,10 @@ class CommandeModel:
             ))
             
             # Si validé, mettre à jour la commande selon le type d'action
+            stats_model = StatsDailyModel(self.db)
+            etat_avant = None
+            if valide and type_action in ('paiement', 'fermeture_demande'):
+                etat_avant = stats_model.etat_commande(cursor, commande_id, verrouiller=True)
             if valide:
                 if type_action == 'paiement':
                     # Mettre à jour les montants de la commande
@@ -1289,6 +2148,11 @@ class CommandeModel:
                 # Si rejeté, on peut éventuellement restaurer l'état précédent
                 # Pour l'instant, on laisse la commande dans son état actuel
                 pass
+
+            if etat_avant:
+                stats_model.appliquer_variation_commande(
+                    cursor, etat_avant, stats_model.etat_commande(cursor, commande_id)
+                )
             
             connection.commit()
             cursor.close()
@@ -1298,6 +2162,7 @@ class CommandeModel:
             print(f"Erreur validation: {e}")
             return False
     
+    @lecture_en_cache()
     def lister_commandes_ouvertes(
         self,
         couturier_id: Optional[int] = None,
@@ -1323,7 +2188,7 @@ class CommandeModel:
                 """
                 params: list = []
                 if salon_id:
-                    base_query += " AND co.salon_id = %s"
+                    base_query += " AND c.salon_id = %s"
                     params.append(salon_id)
                 base_query += " ORDER BY c.date_creation DESC"
                 cursor.execute(base_query, tuple(params))
@@ -1379,6 +2244,7 @@ class CommandeModel:
             print(f"Erreur liste commandes ouvertes: {e}")
             return []
     
+    @lecture_en_cache()
     def lister_commandes_fermees(
         self,
         couturier_id: Optional[int] = None,
@@ -1403,7 +2269,7 @@ class CommandeModel:
                 """
                 params: list = []
                 if salon_id:
-                    query += " AND co.salon_id = %s"
+                    query += " AND c.salon_id = %s"
                     params.append(salon_id)
                 query += " ORDER BY c.date_fermeture DESC"
                 cursor.execute(query, tuple(params))
@@ -1419,7 +2285,7 @@ class CommandeModel:
                 """
                 params = [couturier_id]
                 if salon_id:
-                    query += " AND co.salon_id = %s"
+                    query += " AND c.salon_id = %s"
                     params.append(salon_id)
                 query += " ORDER BY c.date_fermeture DESC"
                 cursor.execute(query, tuple(params))
@@ -1465,6 +2331,7 @@ class CommandeModel:
             print(f"Erreur liste commandes fermées: {e}")
             return []
 
+    @lecture_en_cache()
     def lister_commandes_avec_reste_a_payer(
         self,
         couturier_id: int,
@@ -1481,27 +2348,22 @@ class CommandeModel:
                        cl.nom, cl.prenom
                 FROM commandes c
                 JOIN clients cl ON c.client_id = cl.id
-                JOIN couturiers co ON c.couturier_id = co.id
                 WHERE c.couturier_id = %s
-                  AND co.salon_id = %s
+                  AND c.salon_id = %s
                   AND c.statut != 'Fermé'
                   AND c.avance > 0
                   AND c.reste > 0
             """
             params: list = [couturier_id, salon_id]
 
+            # Bornes sur la colonne brute (pas de DATE()/::date) : les index
+            # sur (couturier_id, date_creation) restent utilisables
             if date_debut:
-                if self.db.db_type == "mysql":
-                    query += " AND DATE(c.date_creation) >= %s"
-                else:
-                    query += " AND c.date_creation::date >= %s"
-                params.append(date_debut)
+                query += " AND c.date_creation >= %s"
+                params.append(datetime.combine(date_debut, datetime.min.time()))
             if date_fin:
-                if self.db.db_type == "mysql":
-                    query += " AND DATE(c.date_creation) <= %s"
-                else:
-                    query += " AND c.date_creation::date <= %s"
-                params.append(date_fin)
+                query += " AND c.date_creation < %s"
+                params.append(datetime.combine(date_fin + timedelta(days=1), datetime.min.time()))
 
             query += " ORDER BY c.date_creation DESC"
             cursor.execute(query, tuple(params))
@@ -1527,15 +2389,21 @@ class CommandeModel:
             print(f"Erreur liste commandes avec reste à payer: {e}")
             return []
 
+    @ecriture_invalide(commande='commande_id')
     def marquer_commande_terminee(self, commande_id: int) -> bool:
         """Passe une commande au statut Terminé."""
         try:
             connection = self.db.get_connection()
             cursor = connection.cursor()
+            stats_model = StatsDailyModel(self.db)
+            etat_avant = stats_model.etat_commande(cursor, commande_id, verrouiller=True)
             cursor.execute(
                 "UPDATE commandes SET statut = 'Terminé' WHERE id = %s",
                 (commande_id,),
             )
+            stats_model.appliquer_variation_commande(
+                cursor, etat_avant, stats_model.etat_commande(cursor, commande_id)
+            )
             connection.commit()
             cursor.close()
             return True
@@ -1543,15 +2411,21 @@ class CommandeModel:
             print(f"Erreur mise à jour statut Terminé: {e}")
             return False
 
+    @ecriture_invalide(commande='commande_id')
     def marquer_commande_livree_payee(self, commande_id: int) -> bool:
         """Passe une commande au statut Livré et payé."""
         try:
             connection = self.db.get_connection()
             cursor = connection.cursor()
+            stats_model = StatsDailyModel(self.db)
+            etat_avant = stats_model.etat_commande(cursor, commande_id, verrouiller=True)
             cursor.execute(
                 "UPDATE commandes SET statut = 'Livré et payé', date_fermeture = NOW() WHERE id = %s",
                 (commande_id,),
             )
+            stats_model.appliquer_variation_commande(
+                cursor, etat_avant, stats_model.etat_commande(cursor, commande_id)
+            )
             connection.commit()
             cursor.close()
             return True
@@ -1559,6 +2433,7 @@ class CommandeModel:
             print(f"Erreur mise à jour statut Livré et payé: {e}")
             return False
 
+    @lecture_en_cache()
     def lister_commandes_terminees(
         self,
         salon_id: str,
@@ -1582,7 +2457,7 @@ class CommandeModel:
                 FROM commandes c
                 JOIN clients cl ON c.client_id = cl.id
                 LEFT JOIN couturiers co ON c.couturier_id = co.id
-                WHERE co.salon_id = %s
+                WHERE c.salon_id = %s
                   AND c.statut = %s
             """
             params: list = [salon_id, statut]
@@ -1594,18 +2469,14 @@ class CommandeModel:
                 query += " AND c.couturier_id = %s"
                 params.append(couturier_id)
 
+            # Bornes sur la colonne brute (pas de DATE()/::date) : les index
+            # sur (couturier_id, date_creation) restent utilisables
             if date_debut:
-                if self.db.db_type == "mysql":
-                    query += " AND DATE(c.date_creation) >= %s"
-                else:
-                    query += " AND c.date_creation::date >= %s"
-                params.append(date_debut)
+                query += " AND c.date_creation >= %s"
+                params.append(datetime.combine(date_debut, datetime.min.time()))
             if date_fin:
-                if self.db.db_type == "mysql":
-                    query += " AND DATE(c.date_creation) <= %s"
-                else:
-                    query += " AND c.date_creation::date <= %s"
-                params.append(date_fin)
+                query += " AND c.date_creation < %s"
+                params.append(datetime.combine(date_fin + timedelta(days=1), datetime.min.time()))
 
             query += " ORDER BY c.date_creation DESC"
             cursor.execute(query, tuple(params))
@@ -1638,6 +2509,7 @@ class CommandeModel:
             print(f"Erreur liste commandes terminées: {e}")
             return []
 
+    @lecture_en_cache()
     def compter_demandes_fermeture_par_commandes(
         self,
         couturier_id: int,
@@ -1706,6 +2578,7 @@ class CommandeModel:
             print(f"Erreur comptage demandes fermeture commande: {e}")
             return {"total": 0, "last_status": None}
 
+    @lecture_en_cache()
     def lister_commandes_avec_reste_a_payer(
         self,
         couturier_id: int,
@@ -1724,27 +2597,22 @@ class CommandeModel:
                        cl.nom, cl.prenom
                 FROM commandes c
                 JOIN clients cl ON c.client_id = cl.id
-                JOIN couturiers co ON c.couturier_id = co.id
                 WHERE c.couturier_id = %s
-                  AND co.salon_id = %s
+                  AND c.salon_id = %s
                   AND c.statut != 'Fermé'
                   AND c.avance > 0
                   AND c.reste > 0
             """
             params: list = [couturier_id, salon_id]
 
+            # Bornes sur la colonne brute (pas de DATE()/::date) : les index
+            # sur (couturier_id, date_creation) restent utilisables
             if date_debut:
-                if self.db.db_type == "mysql":
-                    query += " AND DATE(c.date_creation) >= %s"
-                else:
-                    query += " AND c.date_creation::date >= %s"
-                params.append(date_debut)
+                query += " AND c.date_creation >= %s"
+                params.append(datetime.combine(date_debut, datetime.min.time()))
             if date_fin:
-                if self.db.db_type == "mysql":
-                    query += " AND DATE(c.date_creation) <= %s"
-                else:
-                    query += " AND c.date_creation::date <= %s"
-                params.append(date_fin)
+                query += " AND c.date_creation < %s"
+                params.append(datetime.combine(date_fin + timedelta(days=1), datetime.min.time()))
 
             query += " ORDER BY c.date_creation DESC"
             cursor.execute(query, tuple(params))
@@ -1770,15 +2638,21 @@ class CommandeModel:
             print(f"Erreur liste commandes avec reste à payer: {e}")
             return []
 
+    @ecriture_invalide(commande='commande_id')
     def marquer_commande_terminee(self, commande_id: int) -> bool:
         """Passe une commande au statut Terminé."""
         try:
             connection = self.db.get_connection()
             cursor = connection.cursor()
+            stats_model = StatsDailyModel(self.db)
+            etat_avant = stats_model.etat_commande(cursor, commande_id, verrouiller=True)
             cursor.execute(
                 "UPDATE commandes SET statut = 'Terminé' WHERE id = %s",
                 (commande_id,),
             )
+            stats_model.appliquer_variation_commande(
+                cursor, etat_avant, stats_model.etat_commande(cursor, commande_id)
+            )
             connection.commit()
             cursor.close()
             return True
@@ -1786,15 +2660,21 @@ class CommandeModel:
             print(f"Erreur mise à jour statut Terminé: {e}")
             return False
 
+    @ecriture_invalide(commande='commande_id')
     def marquer_commande_livree_payee(self, commande_id: int) -> bool:
         """Passe une commande au statut Livré et payé."""
         try:
             connection = self.db.get_connection()
             cursor = connection.cursor()
+            stats_model = StatsDailyModel(self.db)
+            etat_avant = stats_model.etat_commande(cursor, commande_id, verrouiller=True)
             cursor.execute(
                 "UPDATE commandes SET statut = 'Livré et payé', date_fermeture = NOW() WHERE id = %s",
                 (commande_id,),
             )
+            stats_model.appliquer_variation_commande(
+                cursor, etat_avant, stats_model.etat_commande(cursor, commande_id)
+            )
             connection.commit()
             cursor.close()
             return True
@@ -1802,6 +2682,7 @@ class CommandeModel:
             print(f"Erreur mise à jour statut Livré et payé: {e}")
             return False
 
+    @lecture_en_cache()
     def lister_commandes_terminees(
         self,
         salon_id: str,
@@ -1825,7 +2706,7 @@ class CommandeModel:
                 FROM commandes c
                 JOIN clients cl ON c.client_id = cl.id
                 LEFT JOIN couturiers co ON c.couturier_id = co.id
-                WHERE co.salon_id = %s
+                WHERE c.salon_id = %s
                   AND c.statut = %s
             """
             params: list = [salon_id, statut]
@@ -1837,18 +2718,14 @@ class CommandeModel:
                 query += " AND c.couturier_id = %s"
                 params.append(couturier_id)
 
+            # Bornes sur la colonne brute (pas de DATE()/::date) : les index
+            # sur (couturier_id, date_creation) restent utilisables
             if date_debut:
-                if self.db.db_type == "mysql":
-                    query += " AND DATE(c.date_creation) >= %s"
-                else:
-                    query += " AND c.date_creation::date >= %s"
-                params.append(date_debut)
+                query += " AND c.date_creation >= %s"
+                params.append(datetime.combine(date_debut, datetime.min.time()))
             if date_fin:
-                if self.db.db_type == "mysql":
-                    query += " AND DATE(c.date_creation) <= %s"
-                else:
-                    query += " AND c.date_creation::date <= %s"
-                params.append(date_fin)
+                query += " AND c.date_creation < %s"
+                params.append(datetime.combine(date_fin + timedelta(days=1), datetime.min.time()))
 
             query += " ORDER BY c.date_creation DESC"
             cursor.execute(query, tuple(params))
@@ -1881,6 +2758,7 @@ class CommandeModel:
             print(f"Erreur liste commandes terminées: {e}")
             return []
 
+    @lecture_en_cache()
     def compter_demandes_fermeture_par_commandes(
         self,
         couturier_id: int,
@@ -1949,6 +2827,7 @@ class CommandeModel:
             print(f"Erreur comptage demandes fermeture commande: {e}")
             return {"total": 0, "last_status": None}
     
+    @lecture_en_cache()
     def lister_commandes_calendrier(
         self,
         date_debut,
@@ -1981,7 +2860,7 @@ class CommandeModel:
                 """
                 params = [date_debut, date_fin]
                 if salon_id:
-                    query += " AND co.salon_id = %s"
+                    query += " AND c.salon_id = %s"
                     params.append(salon_id)
                 query += " ORDER BY c.date_livraison ASC, co.nom, co.prenom"
                 cursor.execute(query, tuple(params))
@@ -2006,7 +2885,7 @@ class CommandeModel:
                 if salon_id:
                     query = query.replace(
                         "WHERE c.couturier_id = %s",
-                        "WHERE c.couturier_id = %s AND co.salon_id = %s"
+                        "WHERE c.couturier_id = %s AND c.salon_id = %s"
                     )
                     params.insert(1, salon_id)
                 query += " ORDER BY c.date_livraison ASC"
@@ -2039,6 +2918,7 @@ class CommandeModel:
             print(f"Erreur liste commandes calendrier: {e}")
             return []
 
+    @lecture_en_cache()
     def lister_modeles_realises(
         self,
         couturier_id: Optional[int] = None,
@@ -2056,7 +2936,7 @@ class CommandeModel:
             where_clauses = ["1=1"]
             params = []
             if salon_id:
-                where_clauses.append("co.salon_id = %s")
+                where_clauses.append("c.salon_id = %s")
                 params.append(salon_id)
             if couturier_id and not tous_les_couturiers:
                 where_clauses.append("c.couturier_id = %s")
@@ -2072,7 +2952,6 @@ class CommandeModel:
                 SELECT c.modele, c.categorie, c.sexe,
                        COUNT(*) as nb_commandes, COALESCE(SUM(c.prix_total), 0) as ca_total
                 FROM commandes c
-                LEFT JOIN couturiers co ON c.couturier_id = co.id
                 WHERE {where_sql}
                 GROUP BY c.modele, c.categorie, c.sexe
                 ORDER BY nb_commandes DESC, ca_total DESC
@@ -2094,7 +2973,7 @@ class CommandeModel:
             print(f"Erreur liste modèles réalisés: {e}")
             return []
 
-    def lister_commandes_avec_images(
+    def lister_photos_galerie(
         self,
         couturier_id: Optional[int] = None,
         tous_les_couturiers: bool = False,
@@ -2103,15 +2982,18 @@ class CommandeModel:
         date_fin=None,
     ) -> List[Dict]:
         """
-        Liste les commandes ayant au moins une image (fabric ou model).
-        Retourne id, modele, client_nom, client_prenom, fabric_image, model_image, etc.
+        Liste les photos (tissu / modèle) des commandes pour la galerie.
+
+        Une entrée par photo : commande_id, type, label et `image` (MediaHandle
+        avec ses déclinaisons). Aucun octet n'est lu ici : la vue ne charge
+        que la photo affichée (et la suivante).
         """
         try:
             cursor = self.db.get_connection().cursor()
-            where_clauses = ["(c.fabric_image IS NOT NULL OR c.model_image IS NOT NULL)"]
+            where_clauses = ["(c.fabric_blob_id IS NOT NULL OR c.model_blob_id IS NOT NULL)"]
             params = []
             if salon_id:
-                where_clauses.append("co.salon_id = %s")
+                where_clauses.append("c.salon_id = %s")
                 params.append(salon_id)
             if couturier_id and not tous_les_couturiers:
                 where_clauses.append("c.couturier_id = %s")
@@ -2124,41 +3006,34 @@ class CommandeModel:
                 params.append(date_fin)
             where_sql = " AND ".join(where_clauses)
             query = f"""
-                SELECT c.id, c.modele, c.categorie, c.sexe, c.prix_total, c.date_creation,
-                       cl.nom, cl.prenom,
-                       c.fabric_image, c.fabric_image_name,
-                       c.model_image, c.model_image_name,
-                       co.nom as couturier_nom, co.prenom as couturier_prenom
+                SELECT c.id, c.modele, cl.nom, cl.prenom,
+                       c.fabric_blob_id, c.model_blob_id
                 FROM commandes c
                 JOIN clients cl ON c.client_id = cl.id
-                LEFT JOIN couturiers co ON c.couturier_id = co.id
                 WHERE {where_sql}
                 ORDER BY c.date_creation DESC
             """
             cursor.execute(query, tuple(params))
             results = cursor.fetchall()
             cursor.close()
-            return [
-                {
-                    "id": row[0],
-                    "modele": row[1],
-                    "categorie": row[2],
-                    "sexe": row[3],
-                    "prix_total": float(row[4]),
-                    "date_creation": row[5],
-                    "client_nom": row[6],
-                    "client_prenom": row[7],
-                    "fabric_image": row[8],
-                    "fabric_image_name": row[9],
-                    "model_image": row[10],
-                    "model_image_name": row[11],
-                    "couturier_nom": row[12],
-                    "couturier_prenom": row[13],
-                }
-                for row in results
-            ]
+
+            media_model = MediaBlobModel(self.db)
+            photos = []
+            for commande_id, modele, client_nom, client_prenom, fabric_blob_id, model_blob_id in results:
+                client = f"{client_prenom or ''} {client_nom or ''}".strip()
+                label_base = f"#{commande_id} {modele or 'N/A'} - {client}"
+                for blob_id, type_photo in ((fabric_blob_id, "Tissu"), (model_blob_id, "Modèle")):
+                    if blob_id:
+                        photos.append({
+                            "commande_id": commande_id,
+                            "type": type_photo,
+                            "label": f"{label_base} — {type_photo}",
+                            "image": media_model.handle(blob_id),
+                        })
+            media_model.charger_renditions(p["image"] for p in photos)
+            return photos
         except (MySQLError, PGError, Exception) as e:
-            print(f"Erreur liste commandes avec images: {e}")
+            print(f"Erreur liste photos galerie: {e}")
             return []
 
     def creer_table_rappels_livraison(self) -> bool:
@@ -2210,6 +3085,7 @@ class CommandeModel:
         except Exception:
             return False
 
+    @ecriture_invalide(commande='commande_id')
     def enregistrer_rappel_envoye(self, commande_id: int, couturier_id: int, date_livraison) -> bool:
         """Enregistre qu'un rappel a été envoyé au couturier pour cette commande."""
         try:
@@ -2228,6 +3104,164 @@ class CommandeModel:
             print(f"Erreur enregistrement rappel: {e}")
             return False
 
+    def lister_rappels_a_envoyer(self, date_livraison) -> List[Dict]:
+        """
+        Commandes ouvertes livrables à `date_livraison` dont le rappel n'a pas
+        encore été envoyé (anti-jointure sur rappels_livraison, une requête).
+        Même format que lister_commandes_calendrier.
+        """
+        try:
+            cursor = self.db.get_connection().cursor()
+            cursor.execute(
+                """
+                SELECT c.id, c.modele, c.prix_total, c.avance, c.reste, c.statut,
+                       c.date_creation, c.date_livraison,
+                       cl.nom, cl.prenom, cl.telephone,
+                       c.couturier_id, co.nom as couturier_nom, co.prenom as couturier_prenom,
+                       co.email as couturier_email, co.telephone as couturier_telephone,
+                       co.salon_id as couturier_salon_id
+                FROM commandes c
+                JOIN clients cl ON c.client_id = cl.id
+                LEFT JOIN couturiers co ON c.couturier_id = co.id
+                WHERE c.est_ouverte = TRUE
+                  AND c.date_livraison = %s
+                  AND NOT EXISTS (
+                      SELECT 1 FROM rappels_livraison r
+                      WHERE r.commande_id = c.id AND r.date_livraison = c.date_livraison
+                  )
+                ORDER BY co.salon_id, c.couturier_id, c.id
+                """,
+                (date_livraison,)
+            )
+            results = cursor.fetchall()
+            cursor.close()
+            return [
+                {
+                    'id': row[0],
+                    'modele': row[1],
+                    'prix_total': float(row[2]),
+                    'avance': float(row[3]),
+                    'reste': float(row[4]),
+                    'statut': row[5],
+                    'date_creation': row[6],
+                    'date_livraison': row[7],
+                    'client_nom': row[8],
+                    'client_prenom': row[9],
+                    'client_telephone': row[10],
+                    'couturier_id': row[11],
+                    'couturier_nom': row[12],
+                    'couturier_prenom': row[13],
+                    'couturier_email': row[14],
+                    'couturier_telephone': row[15],
+                    'couturier_salon_id': row[16],
+                }
+                for row in results
+            ]
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur liste rappels à envoyer: {e}")
+            return []
+
+    @ecriture_invalide()
+    def enregistrer_rappels_envoyes(self, rappels: List[Tuple[int, int, object]]) -> bool:
+        """
+        Enregistre en une seule requête les rappels envoyés.
+
+        Args:
+            rappels: Liste de (commande_id, couturier_id, date_livraison)
+        """
+        if not rappels:
+            return True
+        try:
+            cursor = self.db.get_connection().cursor()
+            valeurs = ", ".join(["(%s, %s, %s)"] * len(rappels))
+            params = tuple(v for rappel in rappels for v in rappel)
+            if self.db.db_type == 'mysql':
+                query = (
+                    "INSERT IGNORE INTO rappels_livraison (commande_id, couturier_id, date_livraison) "
+                    f"VALUES {valeurs}"
+                )
+            else:
+                query = (
+                    "INSERT INTO rappels_livraison (commande_id, couturier_id, date_livraison) "
+                    f"VALUES {valeurs} ON CONFLICT (commande_id, date_livraison) DO NOTHING"
+                )
+            cursor.execute(query, params)
+            self.db.get_connection().commit()
+            cursor.close()
+            return True
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur enregistrement rappels: {e}")
+            return False
+
+    @lecture_en_cache()
+    def demandes_fermeture_en_attente(
+        self,
+        commande_ids: Optional[List[int]] = None,
+        salon_id: Optional[str] = None,
+    ) -> Dict[int, Dict]:
+        """
+        Demandes de fermeture en attente, indexées par commande, limitées aux
+        commandes données et/ou à un salon (index partiel
+        idx_historique_fermeture_en_attente). Sans aucun des deux filtres,
+        retourne un dict vide plutôt que de parcourir tous les salons.
+
+        Returns:
+            {commande_id: demande} (la plus ancienne demande en attente par commande)
+        """
+        if commande_ids is not None and not commande_ids:
+            return {}
+        if not commande_ids and not salon_id:
+            return {}
+        try:
+            cursor = self.db.get_connection().cursor()
+            jointure = ""
+            where_clauses = [
+                "h.statut_validation = 'en_attente'",
+                "h.type_action = 'fermeture_demande'",
+            ]
+            params: list = []
+            if commande_ids:
+                where_clauses.append(f"h.commande_id IN ({', '.join(['%s'] * len(commande_ids))})")
+                params.extend(commande_ids)
+            if salon_id:
+                jointure = "JOIN commandes c ON c.id = h.commande_id"
+                where_clauses.append("c.salon_id = %s")
+                params.append(salon_id)
+            cursor.execute(
+                f"""
+                SELECT h.id, h.commande_id, h.couturier_id, h.type_action,
+                       h.montant_paye, h.reste_apres_paiement, h.commentaire,
+                       h.date_creation, h.statut_avant, h.statut_apres
+                FROM historique_commandes h
+                {jointure}
+                WHERE {' AND '.join(where_clauses)}
+                ORDER BY h.date_creation DESC
+                """,
+                tuple(params)
+            )
+            results = cursor.fetchall()
+            cursor.close()
+
+            demandes: Dict[int, Dict] = {}
+            for row in results:
+                demandes[row[1]] = {
+                    'id': row[0],
+                    'commande_id': row[1],
+                    'couturier_id': row[2],
+                    'type_action': row[3],
+                    'montant_paye': float(row[4]) if row[4] else 0.0,
+                    'reste_apres_paiement': float(row[5]) if row[5] else 0.0,
+                    'commentaire': row[6],
+                    'date_creation': row[7],
+                    'statut_avant': row[8],
+                    'statut_apres': row[9],
+                }
+            return demandes
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur demandes de fermeture en attente: {e}")
+            return {}
+
+    @lecture_en_cache()
     def lister_demandes_validation(
         self,
         salon_id: Optional[str] = None,
@@ -2236,7 +3270,7 @@ class CommandeModel:
     ) -> List[Dict]:
         """
         Liste toutes les demandes en attente de validation (paiements et fermetures).
-        Optionnellement filtrées par salon (via le couturier) et par période.
+        Optionnellement filtrées par salon (commandes.salon_id) et par période.
         """
         try:
             cursor = self.db.get_connection().cursor()
@@ -2245,7 +3279,7 @@ class CommandeModel:
             params: list = []
 
             if salon_id:
-                where_clauses.append("co.salon_id = %s")
+                where_clauses.append("c.salon_id = %s")
                 params.append(salon_id)
 
             if date_debut:
@@ -2392,6 +3426,7 @@ class ChargesModel:
             print(f"Erreur création tables charges: {e}")
             return False
 
+    @ecriture_invalide(couturier='couturier_id')
     def ajouter_charge(self, couturier_id: int, type_charge: str, categorie: str,
                        montant: float, date_charge: str, description: Optional[str] = None,
                        commande_id: Optional[int] = None, employe_id: Optional[int] = None,
@@ -2436,6 +3471,9 @@ class ChargesModel:
                 cursor.execute(query, (couturier_id, type_charge, categorie, description, montant, 
                                        date_charge, commande_id, employe_id, fichier_justificatif, reference))
                 charge_id = cursor.fetchone()[0]
+
+            # Agrégats journaliers (stats_daily), dans la même transaction
+            StatsDailyModel(self.db).appliquer_variation_charge(cursor, couturier_id, date_charge, montant)
             
             self.db.get_connection().commit()
             cursor.close()
@@ -2444,6 +3482,175 @@ class ChargesModel:
             print(f"Erreur ajout charge: {e}")
             return None
 
+    # ------------------------------------------------------------------
+    # Références de paiement : compteur par salon (charge_references)
+    # ------------------------------------------------------------------
+
+    def creer_table_references(self) -> bool:
+        """Crée la table des compteurs de références (une ligne par salon)"""
+        try:
+            cursor = self.db.get_connection().cursor()
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS charge_references (
+                    salon_id VARCHAR(50) NOT NULL PRIMARY KEY,
+                    derniere_reference INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            self.db.get_connection().commit()
+            cursor.close()
+            return True
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur création table charge_references: {e}")
+            return False
+
+    @staticmethod
+    def _cle_salon(cursor, couturier_id: int, salon_id: Optional[str]) -> str:
+        """Salon du compteur : celui fourni, sinon celui du couturier ('' si aucun)."""
+        if salon_id:
+            return salon_id
+        cursor.execute("SELECT salon_id FROM couturiers WHERE id = %s", (couturier_id,))
+        row = cursor.fetchone()
+        return (row[0] if row else None) or ''
+
+    def _relever_compteur(self, cursor, salon_id: str, reference: int) -> None:
+        """Porte le compteur du salon à `reference` s'il est plus bas."""
+        if self.db.db_type == 'mysql':
+            suffixe = "ON DUPLICATE KEY UPDATE derniere_reference = GREATEST(derniere_reference, VALUES(derniere_reference))"
+        else:
+            suffixe = (
+                "ON CONFLICT (salon_id) DO UPDATE SET derniere_reference = "
+                "GREATEST(charge_references.derniere_reference, EXCLUDED.derniere_reference)"
+            )
+        cursor.execute(
+            f"INSERT INTO charge_references (salon_id, derniere_reference) VALUES (%s, %s) {suffixe}",
+            (salon_id, reference)
+        )
+
+    def prochaine_reference(self, couturier_id: int, salon_id: Optional[str] = None) -> int:
+        """
+        Référence proposée dans les formulaires de charge (compteur du salon + 1).
+
+        Simple lecture : la référence n'est réservée qu'à l'enregistrement
+        (`allouer_reference`).
+        """
+        try:
+            cursor = self.db.get_connection().cursor()
+            cle = self._cle_salon(cursor, couturier_id, salon_id)
+            cursor.execute("SELECT derniere_reference FROM charge_references WHERE salon_id = %s", (cle,))
+            row = cursor.fetchone()
+            cursor.close()
+            return (row[0] if row else 0) + 1
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur lecture compteur de références: {e}")
+            return 1
+
+    @ecriture_invalide(couturier='couturier_id', salon='salon_id')
+    def allouer_reference(self, couturier_id: int, salon_id: Optional[str] = None,
+                          reference_saisie: Optional[str] = None) -> Optional[str]:
+        """
+        Réserve la référence d'une nouvelle charge.
+
+        Un seul upsert ... RETURNING sur le compteur du salon : la référence
+        est max(compteur + 1, numéro saisi). Deux saisies simultanées
+        obtiennent donc deux numéros distincts, même si elles partaient de
+        la même proposition. Une référence non numérique est retournée telle quelle.
+
+        Args:
+            reference_saisie: Référence du formulaire (vide = automatique)
+
+        Returns:
+            Référence à enregistrer, ou None si erreur
+        """
+        reference_saisie = (reference_saisie or '').strip()
+        if reference_saisie and not reference_saisie.isdigit():
+            return reference_saisie
+        demandee = min(int(reference_saisie or 0), 2 ** 31 - 1)
+        try:
+            connection = self.db.get_connection()
+            cursor = connection.cursor()
+            cle = self._cle_salon(cursor, couturier_id, salon_id)
+            if self.db.db_type == 'mysql':
+                cursor.execute(
+                    """
+                    INSERT INTO charge_references (salon_id, derniere_reference)
+                    VALUES (%s, LAST_INSERT_ID(GREATEST(%s, 1)))
+                    ON DUPLICATE KEY UPDATE derniere_reference =
+                        LAST_INSERT_ID(GREATEST(derniere_reference + 1, VALUES(derniere_reference)))
+                    """,
+                    (cle, demandee)
+                )
+                cursor.execute("SELECT LAST_INSERT_ID()")
+            else:
+                cursor.execute(
+                    """
+                    INSERT INTO charge_references (salon_id, derniere_reference)
+                    VALUES (%s, GREATEST(%s, 1))
+                    ON CONFLICT (salon_id) DO UPDATE SET derniere_reference =
+                        GREATEST(charge_references.derniere_reference + 1, EXCLUDED.derniere_reference)
+                    RETURNING derniere_reference
+                    """,
+                    (cle, demandee)
+                )
+            reference = cursor.fetchone()[0]
+            connection.commit()
+            cursor.close()
+            return str(reference)
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur allocation référence de charge: {e}")
+            try:
+                self.db.get_connection().rollback()
+            except Exception:
+                pass
+            return None
+
+    def renseigner_references(self) -> Optional[int]:
+        """
+        Initialise les compteurs depuis les charges existantes : plus grande
+        référence numérique par salon, lue dans la colonne reference ou dans
+        la description ("... | Réf: 42").
+
+        Returns:
+            Nombre de salons initialisés ou None si erreur
+        """
+        motif = re.compile(r'Réf:\s*(\d+)', re.IGNORECASE)
+        try:
+            connection = self.db.get_connection()
+            cursor = connection.cursor()
+            cursor.execute(
+                """
+                SELECT COALESCE(co.salon_id, ''), c.reference, c.description
+                FROM charges c
+                LEFT JOIN couturiers co ON co.id = c.couturier_id
+                """
+            )
+            maximums: Dict[str, int] = {}
+            while True:
+                lignes = cursor.fetchmany(5000)
+                if not lignes:
+                    break
+                for salon_id, reference, description in lignes:
+                    numeros = [int(n) for n in motif.findall(description or '')]
+                    if reference and str(reference).strip().isdigit():
+                        numeros.append(int(str(reference).strip()))
+                    numeros = [n for n in numeros if n < 2 ** 31]
+                    if numeros:
+                        maximums[salon_id] = max(maximums.get(salon_id, 0), *numeros)
+            for salon_id, reference in maximums.items():
+                self._relever_compteur(cursor, salon_id, reference)
+            connection.commit()
+            cursor.close()
+            return len(maximums)
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur initialisation des compteurs de références: {e}")
+            try:
+                self.db.get_connection().rollback()
+            except Exception:
+                pass
+            return None
+
+    @ecriture_invalide()
     def ajouter_document(self, charge_id: int, file_name: str, 
                          file_data: bytes,
                          mime_type: Optional[str] = None,
@@ -2451,7 +3658,7 @@ class ChargesModel:
                          description: Optional[str] = None) -> bool:
         """
         Ajoute un document (facture/justificatif) lié à une charge.
-        Le fichier est stocké UNIQUEMENT en base de données (LONGBLOB).
+        Le fichier est stocké UNIQUEMENT en base de données (table media_blobs).
         
         Args:
             charge_id: ID de la charge
@@ -2476,9 +3683,12 @@ class ChargesModel:
             if file_size is None:
                 file_size = len(file_data)
             
+            blob_id = MediaBlobModel(self.db).enregistrer(
+                file_data, mime_type=mime_type, nom_fichier=file_name, cursor=cursor
+            )
             query = (
                 "INSERT INTO charge_documents "
-                "(charge_id, file_name, mime_type, file_size, file_data, description) "
+                "(charge_id, file_name, mime_type, file_size, blob_id, description) "
                 "VALUES (%s, %s, %s, %s, %s, %s)"
             )
             cursor.execute(query, (
@@ -2486,7 +3696,7 @@ class ChargesModel:
                 file_name, 
                 mime_type,
                 file_size,
-                file_data,
+                blob_id,
                 description
             ))
             self.db.get_connection().commit()
@@ -2505,12 +3715,13 @@ class ChargesModel:
             
         Returns:
             Dictionnaire avec les informations du document ou None
+            ('file_data' est un MediaHandle : contenu lu via `.read()`)
         """
         try:
             cursor = self.db.get_connection().cursor()
             query = (
                 "SELECT id, charge_id, file_name, mime_type, file_size, "
-                "file_data, uploaded_at, description "
+                "blob_id, uploaded_at, description "
                 "FROM charge_documents WHERE id = %s"
             )
             cursor.execute(query, (document_id,))
@@ -2524,7 +3735,7 @@ class ChargesModel:
                     'file_name': row[2],
                     'mime_type': row[3],
                     'file_size': row[4],
-                    'file_data': row[5],
+                    'file_data': MediaBlobModel(self.db).handle(row[5], row[3], row[4], row[2]),
                     'uploaded_at': row[6],
                     'description': row[7]
                 }
@@ -2569,6 +3780,7 @@ class ChargesModel:
             print(f"Erreur liste documents charge: {e}")
             return []
 
+    @lecture_en_cache()
     def total_charges(self, couturier_id: Optional[int] = None, 
                       date_debut: Optional[datetime] = None, 
                       date_fin: Optional[datetime] = None,
@@ -2625,6 +3837,7 @@ class ChargesModel:
             print(f"Erreur total charges: {e}")
             return 0.0
 
+    @lecture_en_cache()
     def lister_charges(self, couturier_id: Optional[int] = None, limit: int = 50, 
                        tous_les_couturiers: bool = False,
                        salon_id: Optional[str] = None) -> List[Dict]:
@@ -2799,6 +4012,7 @@ class AppLogoModel:
             print(f"Erreur création table app_logo: {e}")
             return False
     
+    @ecriture_invalide(salon='salon_id')
     def sauvegarder_logo(self, salon_id: str, logo_data: bytes, logo_name: str, 
                         mime_type: str, uploaded_by: Optional[int] = None,
                         description: Optional[str] = None) -> bool:
@@ -0,0 +1,334 @@
+"""
+Modèle de la file d'envoi des e-mails (table email_outbox)
+"""
+import json
+from typing import Optional, Dict, List, Tuple
+
+try:
+    from mysql.connector import Error as MySQLError  # type: ignore
+except Exception:
+    MySQLError = Exception  # type: ignore
+
+try:
+    from psycopg2 import Error as PGError  # type: ignore
+except Exception:
+    PGError = Exception  # type: ignore
+
+
+class EmailOutboxModel:
+    """
+    E-mails à envoyer par les workers (services/email_outbox_service.py).
+
+    Cycle de vie : pending -> sending -> sent, ou retour en pending avec un
+    `next_attempt_at` repoussé après un échec, jusqu'à failed.
+    """
+
+    def __init__(self, db_connection):
+        """
+        Initialise le modèle avec une connexion à la base
+
+        Args:
+            db_connection: Instance de DatabaseConnection
+        """
+        self.db = db_connection
+
+    def _depuis(self, placeholder: str = '%s') -> str:
+        """Expression SQL « maintenant moins N secondes »."""
+        if self.db.db_type == 'mysql':
+            return f"DATE_SUB(CURRENT_TIMESTAMP, INTERVAL {placeholder} SECOND)"
+        return f"(CURRENT_TIMESTAMP - {placeholder} * INTERVAL '1 second')"
+
+    def _dans(self, placeholder: str = '%s') -> str:
+        """Expression SQL « maintenant plus N secondes »."""
+        if self.db.db_type == 'mysql':
+            return f"DATE_ADD(CURRENT_TIMESTAMP, INTERVAL {placeholder} SECOND)"
+        return f"(CURRENT_TIMESTAMP + {placeholder} * INTERVAL '1 second')"
+
+    def creer_tables(self) -> bool:
+        """Crée la table email_outbox si elle n'existe pas"""
+        try:
+            cursor = self.db.get_connection().cursor()
+            if self.db.db_type == 'mysql':
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS email_outbox (
+                        id INT AUTO_INCREMENT PRIMARY KEY,
+                        salon_id VARCHAR(50) NULL,
+                        to_email VARCHAR(255) NOT NULL,
+                        subject VARCHAR(500) NOT NULL,
+                        body TEXT NOT NULL,
+                        attachments TEXT NULL,
+                        status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                        attempts INT NOT NULL DEFAULT 0,
+                        max_attempts INT NOT NULL DEFAULT 5,
+                        next_attempt_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                        locked_at TIMESTAMP NULL,
+                        last_error TEXT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        sent_at TIMESTAMP NULL,
+                        INDEX idx_email_outbox_due (status, next_attempt_at),
+                        INDEX idx_email_outbox_salon (salon_id, status)
+                    )
+                    """
+                )
+            else:
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS email_outbox (
+                        id SERIAL PRIMARY KEY,
+                        salon_id VARCHAR(50) NULL,
+                        to_email VARCHAR(255) NOT NULL,
+                        subject VARCHAR(500) NOT NULL,
+                        body TEXT NOT NULL,
+                        attachments TEXT NULL,
+                        status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        max_attempts INTEGER NOT NULL DEFAULT 5,
+                        next_attempt_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                        locked_at TIMESTAMP NULL,
+                        last_error TEXT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        sent_at TIMESTAMP NULL
+                    )
+                    """
+                )
+                # Index partiel : seules les lignes encore à traiter sont parcourues
+                cursor.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_email_outbox_due
+                    ON email_outbox (next_attempt_at)
+                    WHERE status IN ('pending', 'sending')
+                    """
+                )
+                cursor.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_email_outbox_salon ON email_outbox (salon_id, status)"
+                )
+            self.db.get_connection().commit()
+            cursor.close()
+            return True
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur création table email_outbox: {e}")
+            return False
+
+    def ajouter(self, salon_id: Optional[str], to_email: str, subject: str, body: str,
+                pieces_jointes: Optional[List[Tuple[str, int]]] = None,
+                max_attempts: int = 5) -> Optional[int]:
+        """
+        Met un e-mail en file.
+
+        Args:
+            pieces_jointes: Liste de (nom_fichier, id du blob dans media_blobs)
+
+        Returns:
+            ID de la ligne email_outbox ou None
+        """
+        attachments = json.dumps(
+            [{'filename': nom, 'blob_id': blob_id} for nom, blob_id in pieces_jointes]
+        ) if pieces_jointes else None
+        try:
+            cursor = self.db.get_connection().cursor()
+            params = (salon_id, to_email, subject, body, attachments, max_attempts)
+            if self.db.db_type == 'mysql':
+                cursor.execute(
+                    """
+                    INSERT INTO email_outbox (salon_id, to_email, subject, body, attachments, max_attempts)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    """,
+                    params
+                )
+                outbox_id = cursor.lastrowid
+            else:
+                cursor.execute(
+                    """
+                    INSERT INTO email_outbox (salon_id, to_email, subject, body, attachments, max_attempts)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    RETURNING id
+                    """,
+                    params
+                )
+                outbox_id = cursor.fetchone()[0]
+            self.db.get_connection().commit()
+            cursor.close()
+            return outbox_id
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur mise en file email: {e}")
+            self.db.get_connection().rollback()
+            return None
+
+    def reserver(self, limite: int, par_salon: int, delai_blocage: int) -> List[Dict]:
+        """
+        Réserve jusqu'à `limite` e-mails dus et les passe en `sending`.
+
+        Pas plus de `par_salon` envois simultanés par salon, en comptant ceux
+        déjà en cours (toutes instances). Une ligne `sending` dont le verrou
+        a plus de `delai_blocage` secondes (worker arrêté) est reprise.
+        FOR UPDATE SKIP LOCKED évite que deux workers réservent la même ligne.
+        """
+        if limite <= 0:
+            return []
+        depuis = self._depuis()
+        condition_due = (
+            f"((o.status = 'pending' AND o.next_attempt_at <= CURRENT_TIMESTAMP) "
+            f"OR (o.status = 'sending' AND o.locked_at < {depuis}))"
+        )
+        try:
+            with self.db.lease() as conn:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(
+                        f"""
+                        SELECT c.id FROM (
+                            SELECT o.id, o.next_attempt_at,
+                                   ROW_NUMBER() OVER (
+                                       PARTITION BY o.salon_id ORDER BY o.next_attempt_at, o.id
+                                   ) AS rang,
+                                   COALESCE(e.nb, 0) AS nb_en_cours
+                            FROM email_outbox o
+                            LEFT JOIN (
+                                SELECT salon_id, COUNT(*) AS nb
+                                FROM email_outbox
+                                WHERE status = 'sending' AND locked_at >= {depuis}
+                                GROUP BY salon_id
+                            ) e ON e.salon_id = o.salon_id
+                            WHERE {condition_due}
+                        ) c
+                        WHERE c.rang + c.nb_en_cours <= %s
+                        ORDER BY c.next_attempt_at, c.id
+                        LIMIT %s
+                        """,
+                        (delai_blocage, delai_blocage, par_salon, limite)
+                    )
+                    ids = [row[0] for row in cursor.fetchall()]
+                    if not ids:
+                        conn.commit()
+                        return []
+
+                    placeholders = ", ".join(["%s"] * len(ids))
+                    cursor.execute(
+                        f"""
+                        SELECT o.id FROM email_outbox o
+                        WHERE o.id IN ({placeholders}) AND {condition_due}
+                        FOR UPDATE SKIP LOCKED
+                        """,
+                        (*ids, delai_blocage)
+                    )
+                    ids = [row[0] for row in cursor.fetchall()]
+                    if not ids:
+                        conn.commit()
+                        return []
+
+                    placeholders = ", ".join(["%s"] * len(ids))
+                    cursor.execute(
+                        f"""
+                        UPDATE email_outbox
+                        SET status = 'sending', locked_at = CURRENT_TIMESTAMP, attempts = attempts + 1
+                        WHERE id IN ({placeholders})
+                        """,
+                        tuple(ids)
+                    )
+                    cursor.execute(
+                        f"""
+                        SELECT id, salon_id, to_email, subject, body, attachments, attempts, max_attempts
+                        FROM email_outbox
+                        WHERE id IN ({placeholders})
+                        ORDER BY next_attempt_at, id
+                        """,
+                        tuple(ids)
+                    )
+                    rows = cursor.fetchall()
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    cursor.close()
+            return [
+                {
+                    'id': r[0],
+                    'salon_id': r[1],
+                    'to_email': r[2],
+                    'subject': r[3],
+                    'body': r[4],
+                    'pieces_jointes': [
+                        (p.get('filename'), p.get('blob_id')) for p in json.loads(r[5])
+                    ] if r[5] else [],
+                    'attempts': r[6],
+                    'max_attempts': r[7],
+                }
+                for r in rows
+            ]
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur réservation email_outbox: {e}")
+            return []
+
+    def marquer_envoye(self, outbox_id: int) -> bool:
+        """Marque un e-mail comme envoyé"""
+        try:
+            cursor = self.db.get_connection().cursor()
+            cursor.execute(
+                """
+                UPDATE email_outbox
+                SET status = 'sent', sent_at = CURRENT_TIMESTAMP, locked_at = NULL, last_error = NULL
+                WHERE id = %s
+                """,
+                (outbox_id,)
+            )
+            self.db.get_connection().commit()
+            cursor.close()
+            return True
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur mise à jour email_outbox: {e}")
+            return False
+
+    def marquer_echec(self, outbox_id: int, erreur: str, delai_secondes: Optional[float] = None) -> bool:
+        """
+        Enregistre un échec d'envoi.
+
+        Args:
+            delai_secondes: Délai avant le prochain essai ; None = échec définitif
+        """
+        try:
+            cursor = self.db.get_connection().cursor()
+            if delai_secondes is None:
+                cursor.execute(
+                    """
+                    UPDATE email_outbox
+                    SET status = 'failed', locked_at = NULL, last_error = %s
+                    WHERE id = %s
+                    """,
+                    (erreur[:2000], outbox_id)
+                )
+            else:
+                cursor.execute(
+                    f"""
+                    UPDATE email_outbox
+                    SET status = 'pending', locked_at = NULL, last_error = %s,
+                        next_attempt_at = {self._dans()}
+                    WHERE id = %s
+                    """,
+                    (erreur[:2000], int(delai_secondes), outbox_id)
+                )
+            self.db.get_connection().commit()
+            cursor.close()
+            return True
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur mise à jour email_outbox: {e}")
+            return False
+
+    def compter_par_statut(self, salon_id: Optional[str] = None) -> Dict[str, int]:
+        """Nombre d'e-mails par statut (tous salons si salon_id est None)"""
+        try:
+            cursor = self.db.get_connection().cursor()
+            if salon_id:
+                cursor.execute(
+                    "SELECT status, COUNT(*) FROM email_outbox WHERE salon_id = %s GROUP BY status",
+                    (salon_id,)
+                )
+            else:
+                cursor.execute("SELECT status, COUNT(*) FROM email_outbox GROUP BY status")
+            rows = cursor.fetchall()
+            cursor.close()
+            return {row[0]: int(row[1]) for row in rows}
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur comptage email_outbox: {e}")
+            return {}
@@ -0,0 +1,182 @@
+"""
+Modèle de suivi des tâches planifiées (table job_runs)
+"""
+from datetime import date
+from typing import Optional, Dict, List, Set
+
+try:
+    from mysql.connector import Error as MySQLError  # type: ignore
+except Exception:
+    MySQLError = Exception  # type: ignore
+
+try:
+    from psycopg2 import Error as PGError  # type: ignore
+except Exception:
+    PGError = Exception  # type: ignore
+
+
+class JobRunModel:
+    """Une ligne par (tâche, jour traité) : statut, volume et message de la dernière exécution"""
+
+    def __init__(self, db_connection):
+        """
+        Initialise le modèle avec une connexion à la base
+
+        Args:
+            db_connection: Instance de DatabaseConnection
+        """
+        self.db = db_connection
+
+    def creer_tables(self) -> bool:
+        """Crée la table job_runs si elle n'existe pas"""
+        try:
+            cursor = self.db.get_connection().cursor()
+            if self.db.db_type == 'mysql':
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS job_runs (
+                        id INT AUTO_INCREMENT PRIMARY KEY,
+                        job_name VARCHAR(100) NOT NULL,
+                        run_date DATE NOT NULL,
+                        status VARCHAR(20) NOT NULL DEFAULT 'running',
+                        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        finished_at TIMESTAMP NULL,
+                        items_processed INT NOT NULL DEFAULT 0,
+                        message TEXT NULL,
+                        UNIQUE KEY uk_job_runs_job_date (job_name, run_date)
+                    )
+                    """
+                )
+            else:
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS job_runs (
+                        id SERIAL PRIMARY KEY,
+                        job_name VARCHAR(100) NOT NULL,
+                        run_date DATE NOT NULL,
+                        status VARCHAR(20) NOT NULL DEFAULT 'running',
+                        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        finished_at TIMESTAMP NULL,
+                        items_processed INTEGER NOT NULL DEFAULT 0,
+                        message TEXT NULL,
+                        UNIQUE (job_name, run_date)
+                    )
+                    """
+                )
+            self.db.get_connection().commit()
+            cursor.close()
+            return True
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur création table job_runs: {e}")
+            return False
+
+    def premiere_date(self, job_name: str) -> Optional[date]:
+        """Premier jour enregistré pour une tâche, quel que soit son statut (None si jamais exécutée)"""
+        try:
+            cursor = self.db.get_connection().cursor()
+            cursor.execute("SELECT MIN(run_date) FROM job_runs WHERE job_name = %s", (job_name,))
+            row = cursor.fetchone()
+            cursor.close()
+            return row[0] if row else None
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur lecture job_runs: {e}")
+            return None
+
+    def jours_reussis(self, job_name: str, depuis: date) -> Set[date]:
+        """Jours traités avec succès ('ok') depuis `depuis` inclus"""
+        try:
+            cursor = self.db.get_connection().cursor()
+            cursor.execute(
+                "SELECT run_date FROM job_runs WHERE job_name = %s AND status = 'ok' AND run_date >= %s",
+                (job_name, depuis)
+            )
+            rows = cursor.fetchall()
+            cursor.close()
+            return {row[0] for row in rows}
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur lecture job_runs: {e}")
+            return set()
+
+    def demarrer(self, job_name: str, run_date: date) -> bool:
+        """Marque le jour `run_date` de la tâche comme en cours (crée ou réinitialise la ligne)"""
+        try:
+            cursor = self.db.get_connection().cursor()
+            if self.db.db_type == 'mysql':
+                cursor.execute(
+                    """
+                    INSERT INTO job_runs (job_name, run_date, status)
+                    VALUES (%s, %s, 'running')
+                    ON DUPLICATE KEY UPDATE status = 'running', started_at = CURRENT_TIMESTAMP,
+                        finished_at = NULL, items_processed = 0, message = NULL
+                    """,
+                    (job_name, run_date)
+                )
+            else:
+                cursor.execute(
+                    """
+                    INSERT INTO job_runs (job_name, run_date, status)
+                    VALUES (%s, %s, 'running')
+                    ON CONFLICT (job_name, run_date) DO UPDATE
+                    SET status = 'running', started_at = CURRENT_TIMESTAMP,
+                        finished_at = NULL, items_processed = 0, message = NULL
+                    """,
+                    (job_name, run_date)
+                )
+            self.db.get_connection().commit()
+            cursor.close()
+            return True
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur démarrage job {job_name}: {e}")
+            return False
+
+    def terminer(self, job_name: str, run_date: date, succes: bool,
+                 items_processed: int = 0, message: Optional[str] = None) -> bool:
+        """Enregistre le résultat d'une exécution"""
+        try:
+            cursor = self.db.get_connection().cursor()
+            cursor.execute(
+                """
+                UPDATE job_runs
+                SET status = %s, finished_at = CURRENT_TIMESTAMP,
+                    items_processed = %s, message = %s
+                WHERE job_name = %s AND run_date = %s
+                """,
+                ('ok' if succes else 'error', items_processed, message, job_name, run_date)
+            )
+            self.db.get_connection().commit()
+            cursor.close()
+            return True
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur fin job {job_name}: {e}")
+            return False
+
+    def lister_executions(self, job_name: str, limite: int = 10) -> List[Dict]:
+        """Dernières exécutions d'une tâche (plus récentes d'abord)"""
+        try:
+            cursor = self.db.get_connection().cursor()
+            cursor.execute(
+                """
+                SELECT run_date, status, started_at, finished_at, items_processed, message
+                FROM job_runs
+                WHERE job_name = %s
+                ORDER BY run_date DESC
+                LIMIT %s
+                """,
+                (job_name, limite)
+            )
+            rows = cursor.fetchall()
+            cursor.close()
+            return [
+                {
+                    'run_date': r[0],
+                    'status': r[1],
+                    'started_at': r[2],
+                    'finished_at': r[3],
+                    'items_processed': r[4],
+                    'message': r[5],
+                }
+                for r in rows
+            ]
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur liste job_runs: {e}")
+            return []
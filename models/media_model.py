@@ -0,0 +1,459 @@
+"""
+Modèle de stockage des fichiers binaires (images, PDF, justificatifs).
+
+Les octets sont rangés une seule fois dans `media_blobs`, adressés par leur
+empreinte SHA-256 ; `commandes` et `charge_documents` ne gardent qu'un id.
+Les lectures retournent des `MediaHandle` : métadonnées seulement, les octets
+ne sont chargés qu'à l'appel de `read()`.
+
+Les photos de commande ont en plus des déclinaisons réduites (`media_renditions`,
+générées à l'upload) : les vues demandent la plus petite qui suffit.
+"""
+import hashlib
+import mimetypes
+from typing import Dict, Iterable, List, Optional, Union
+
+try:
+    from mysql.connector import Error as MySQLError  # type: ignore
+except Exception:
+    MySQLError = Exception  # type: ignore
+
+try:
+    from psycopg2 import Error as PGError  # type: ignore
+except Exception:
+    PGError = Exception  # type: ignore
+
+
+# Signatures des formats les plus courants (quand le nom de fichier manque)
+_SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF8', 'image/gif'),
+    (b'%PDF', 'application/pdf'),
+)
+
+# Colonnes binaires historiques -> colonne de référence vers media_blobs
+_COLONNES_COMMANDES = (
+    ('fabric_image', 'fabric_image_name', 'fabric_blob_id'),
+    ('model_image', 'model_image_name', 'model_blob_id'),
+    ('pdf_data', 'pdf_name', 'pdf_blob_id'),
+)
+
+
+def deviner_mime(data: bytes, nom_fichier: Optional[str] = None) -> Optional[str]:
+    """Type MIME d'après le nom du fichier, sinon d'après les premiers octets."""
+    if nom_fichier:
+        mime, _ = mimetypes.guess_type(nom_fichier)
+        if mime:
+            return mime
+    entete = bytes(data[:12])
+    if entete[:4] == b'RIFF' and entete[8:12] == b'WEBP':
+        return 'image/webp'
+    for signature, mime in _SIGNATURES:
+        if entete.startswith(signature):
+            return mime
+    return None
+
+
+class MediaHandle:
+    """
+    Référence légère vers un blob : id, type MIME et taille.
+
+    Les octets ne transitent qu'au premier `read()` (puis sont gardés
+    en mémoire sur le handle).
+    """
+
+    def __init__(self, db_connection, blob_id: int, mime_type: Optional[str] = None,
+                 size: Optional[int] = None, name: Optional[str] = None):
+        self.db = db_connection
+        self.blob_id = blob_id
+        self.mime_type = mime_type
+        self.size = size
+        self.name = name
+        self.renditions: Dict[int, 'MediaHandle'] = {}
+        self._data: Optional[bytes] = None
+
+    def read(self) -> Optional[bytes]:
+        """Charge (une fois) et retourne le contenu binaire."""
+        if self._data is None:
+            self._data = MediaBlobModel(self.db).lire(self.blob_id)
+        return self._data
+
+    def rendition(self, largeur: int) -> 'MediaHandle':
+        """
+        Plus petite déclinaison d'au moins `largeur` px ; à défaut la plus
+        grande disponible, et l'original si l'image n'a pas de déclinaison.
+        """
+        if not self.renditions:
+            return self
+        adaptees = [w for w in self.renditions if w >= largeur]
+        return self.renditions[min(adaptees) if adaptees else max(self.renditions)]
+
+    def __bool__(self) -> bool:
+        return True
+
+    def __repr__(self) -> str:
+        return f"MediaHandle(id={self.blob_id}, mime={self.mime_type!r}, size={self.size})"
+
+
+def lire_media(valeur: Union[MediaHandle, bytes, memoryview, None]) -> Optional[bytes]:
+    """Octets d'un handle, ou la valeur elle-même si ce sont déjà des octets."""
+    if valeur is None:
+        return None
+    if isinstance(valeur, MediaHandle):
+        return valeur.read()
+    return bytes(valeur)
+
+
+def rendition_pour(valeur: Union[MediaHandle, bytes, memoryview, None], largeur: int):
+    """Déclinaison adaptée à `largeur` si `valeur` est un handle, sinon la valeur telle quelle."""
+    if isinstance(valeur, MediaHandle):
+        return valeur.rendition(largeur)
+    return valeur
+
+
+class MediaBlobModel:
+    """Modèle pour la table media_blobs (contenu adressé par SHA-256)"""
+
+    def __init__(self, db_connection):
+        """
+        Initialise le modèle avec une connexion à la base
+
+        Args:
+            db_connection: Instance de DatabaseConnection
+        """
+        self.db = db_connection
+
+    def creer_tables(self) -> bool:
+        """
+        Crée les tables media_blobs / media_renditions et les colonnes de
+        référence (commandes.fabric_blob_id / model_blob_id / pdf_blob_id,
+        charge_documents.blob_id).
+        """
+        try:
+            cursor = self.db.get_connection().cursor()
+            if self.db.db_type == 'mysql':
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS media_blobs (
+                        id INT AUTO_INCREMENT PRIMARY KEY,
+                        sha256 CHAR(64) NOT NULL UNIQUE,
+                        mime_type VARCHAR(100) NULL,
+                        size_bytes BIGINT NOT NULL,
+                        data LONGBLOB NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                    """
+                )
+                # MySQL ne supporte pas IF NOT EXISTS dans ALTER TABLE, on gère l'erreur
+                colonnes = [('commandes', ref) for _, _, ref in _COLONNES_COMMANDES]
+                colonnes.append(('charge_documents', 'blob_id'))
+                for table, colonne in colonnes:
+                    try:
+                        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {colonne} INT NULL")
+                    except (MySQLError, PGError, Exception):
+                        pass
+                try:
+                    cursor.execute("ALTER TABLE charge_documents MODIFY file_data LONGBLOB NULL")
+                except (MySQLError, PGError, Exception):
+                    pass
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS media_renditions (
+                        source_blob_id INT NOT NULL,
+                        width INT NOT NULL,
+                        blob_id INT NOT NULL,
+                        PRIMARY KEY (source_blob_id, width),
+                        FOREIGN KEY (source_blob_id) REFERENCES media_blobs(id) ON DELETE CASCADE,
+                        FOREIGN KEY (blob_id) REFERENCES media_blobs(id) ON DELETE CASCADE
+                    )
+                    """
+                )
+            else:
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS media_blobs (
+                        id SERIAL PRIMARY KEY,
+                        sha256 CHAR(64) NOT NULL UNIQUE,
+                        mime_type VARCHAR(100) NULL,
+                        size_bytes BIGINT NOT NULL,
+                        data BYTEA NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                    """
+                )
+                for _, _, ref in _COLONNES_COMMANDES:
+                    cursor.execute(
+                        f"ALTER TABLE commandes ADD COLUMN IF NOT EXISTS {ref} "
+                        "INTEGER NULL REFERENCES media_blobs(id) ON DELETE SET NULL"
+                    )
+                cursor.execute(
+                    "ALTER TABLE charge_documents ADD COLUMN IF NOT EXISTS blob_id "
+                    "INTEGER NULL REFERENCES media_blobs(id) ON DELETE SET NULL"
+                )
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS media_renditions (
+                        source_blob_id INTEGER NOT NULL REFERENCES media_blobs(id) ON DELETE CASCADE,
+                        width INTEGER NOT NULL,
+                        blob_id INTEGER NOT NULL REFERENCES media_blobs(id) ON DELETE CASCADE,
+                        PRIMARY KEY (source_blob_id, width)
+                    )
+                    """
+                )
+            self.db.get_connection().commit()
+            cursor.close()
+            return True
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur création table media_blobs: {e}")
+            return False
+
+    def enregistrer(self, data: bytes, mime_type: Optional[str] = None,
+                    nom_fichier: Optional[str] = None, cursor=None) -> Optional[int]:
+        """
+        Enregistre un contenu et retourne l'id de son blob.
+
+        Un contenu déjà présent (même SHA-256) n'est pas renvoyé au serveur :
+        l'id existant est réutilisé. Si `cursor` est fourni, l'insertion se
+        fait dans la transaction de l'appelant (pas de commit ici).
+
+        Returns:
+            ID du blob ou None
+        """
+        if not data:
+            return None
+        data = bytes(data)
+        sha256 = hashlib.sha256(data).hexdigest()
+        mime_type = mime_type or deviner_mime(data, nom_fichier)
+        cursor_local = cursor is None
+        try:
+            if cursor_local:
+                cursor = self.db.get_connection().cursor()
+
+            cursor.execute("SELECT id FROM media_blobs WHERE sha256 = %s", (sha256,))
+            row = cursor.fetchone()
+            if row:
+                blob_id = row[0]
+            elif self.db.db_type == 'mysql':
+                cursor.execute(
+                    "INSERT INTO media_blobs (sha256, mime_type, size_bytes, data) "
+                    "VALUES (%s, %s, %s, %s) "
+                    "ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id)",
+                    (sha256, mime_type, len(data), data),
+                )
+                blob_id = cursor.lastrowid
+            else:
+                cursor.execute(
+                    """
+                    INSERT INTO media_blobs (sha256, mime_type, size_bytes, data)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (sha256) DO UPDATE SET sha256 = EXCLUDED.sha256
+                    RETURNING id
+                    """,
+                    (sha256, mime_type, len(data), data),
+                )
+                blob_id = cursor.fetchone()[0]
+
+            if cursor_local:
+                self.db.get_connection().commit()
+                cursor.close()
+            return blob_id
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur enregistrement blob: {e}")
+            if not cursor_local:
+                raise
+            return None
+
+    def enregistrer_image(self, data: bytes, nom_fichier: Optional[str] = None,
+                          cursor=None) -> Optional[int]:
+        """
+        Enregistre une photo et ses déclinaisons (voir
+        utils.image_optimizer.LARGEURS_RENDITIONS).
+
+        Les déclinaisons ne sont calculées que si l'image n'en a pas déjà
+        (même contenu déjà uploadé). Même contrat transactionnel que
+        `enregistrer`.
+
+        Returns:
+            ID du blob original ou None
+        """
+        blob_id = self.enregistrer(data, nom_fichier=nom_fichier, cursor=cursor)
+        if blob_id is None:
+            return None
+        cursor_local = cursor is None
+        try:
+            if cursor_local:
+                cursor = self.db.get_connection().cursor()
+            self._enregistrer_renditions(cursor, blob_id, data)
+            if cursor_local:
+                self.db.get_connection().commit()
+                cursor.close()
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur enregistrement renditions: {e}")
+            if not cursor_local:
+                raise
+        return blob_id
+
+    def _enregistrer_renditions(self, cursor, blob_id: int, data: bytes) -> int:
+        """Calcule et range les déclinaisons manquantes d'un blob image."""
+        from utils.image_optimizer import generer_renditions
+
+        cursor.execute("SELECT 1 FROM media_renditions WHERE source_blob_id = %s LIMIT 1", (blob_id,))
+        if cursor.fetchone():
+            return 0
+        renditions = generer_renditions(bytes(data))
+        for largeur, (contenu, mime) in renditions.items():
+            rendition_id = self.enregistrer(contenu, mime_type=mime, cursor=cursor)
+            cursor.execute(
+                "INSERT INTO media_renditions (source_blob_id, width, blob_id) VALUES (%s, %s, %s)",
+                (blob_id, largeur, rendition_id),
+            )
+        return len(renditions)
+
+    def charger_renditions(self, handles: Iterable[Optional[MediaHandle]]) -> None:
+        """
+        Renseigne `handle.renditions` pour tous les handles en une requête
+        (métadonnées uniquement).
+        """
+        par_id: Dict[int, List[MediaHandle]] = {}
+        for h in handles:
+            if h is not None:
+                par_id.setdefault(h.blob_id, []).append(h)
+        if not par_id:
+            return
+        try:
+            cursor = self.db.get_connection().cursor()
+            placeholders = ", ".join(["%s"] * len(par_id))
+            cursor.execute(
+                f"""
+                SELECT r.source_blob_id, r.width, r.blob_id, m.mime_type, m.size_bytes
+                FROM media_renditions r
+                JOIN media_blobs m ON m.id = r.blob_id
+                WHERE r.source_blob_id IN ({placeholders})
+                """,
+                tuple(par_id),
+            )
+            rows = cursor.fetchall()
+            cursor.close()
+            for source_id, largeur, rendition_id, mime, taille in rows:
+                for h in par_id.get(source_id, []):
+                    h.renditions[largeur] = MediaHandle(self.db, rendition_id, mime_type=mime, size=taille)
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur chargement renditions: {e}")
+
+    def generer_renditions_manquantes(self, taille_lot: int = 20) -> bool:
+        """
+        Génère les déclinaisons des photos de commande existantes qui n'en ont
+        pas (par lots, un commit par lot). Rejouable sans risque.
+        """
+        try:
+            connection = self.db.get_connection()
+            dernier_id = 0
+            total = 0
+            while True:
+                cursor = connection.cursor()
+                cursor.execute(
+                    """
+                    SELECT m.id, m.data
+                    FROM media_blobs m
+                    WHERE m.id > %s
+                      AND m.id IN (
+                          SELECT fabric_blob_id FROM commandes WHERE fabric_blob_id IS NOT NULL
+                          UNION
+                          SELECT model_blob_id FROM commandes WHERE model_blob_id IS NOT NULL
+                      )
+                      AND NOT EXISTS (SELECT 1 FROM media_renditions r WHERE r.source_blob_id = m.id)
+                    ORDER BY m.id
+                    LIMIT %s
+                    """,
+                    (dernier_id, taille_lot),
+                )
+                lignes = cursor.fetchall()
+                if not lignes:
+                    cursor.close()
+                    break
+                for blob_id, data in lignes:
+                    total += 1 if self._enregistrer_renditions(cursor, blob_id, data) else 0
+                    dernier_id = blob_id
+                connection.commit()
+                cursor.close()
+            if total:
+                print(f"media_renditions : déclinaisons générées pour {total} photo(s).")
+            return True
+        except (MySQLError, PGError, Exception) as e:
+            try:
+                self.db.get_connection().rollback()
+            except Exception:
+                pass
+            print(f"Erreur génération des renditions: {e}")
+            return False
+
+    def lire(self, blob_id: int) -> Optional[bytes]:
+        """Retourne le contenu binaire d'un blob"""
+        try:
+            cursor = self.db.get_connection().cursor()
+            cursor.execute("SELECT data FROM media_blobs WHERE id = %s", (blob_id,))
+            row = cursor.fetchone()
+            cursor.close()
+            return bytes(row[0]) if row and row[0] is not None else None
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur lecture blob: {e}")
+            return None
+
+    def handle(self, blob_id: Optional[int], mime_type: Optional[str] = None,
+               size: Optional[int] = None, name: Optional[str] = None) -> Optional[MediaHandle]:
+        """Construit un handle (None si la ligne n'a pas de blob)."""
+        if not blob_id:
+            return None
+        return MediaHandle(self.db, blob_id, mime_type=mime_type, size=size, name=name)
+
+    def migrer_blobs_existants(self, taille_lot: int = 20) -> bool:
+        """
+        Déplace les BLOB encore stockés dans les lignes (commandes.fabric_image,
+        model_image, pdf_data, charge_documents.file_data) vers media_blobs.
+
+        Traitement par lots de `taille_lot` lignes (un commit par lot) pour
+        borner la mémoire ; la colonne historique est vidée une fois l'id posé.
+        Rejouable sans risque : seules les lignes non encore migrées sont lues.
+        """
+        cibles = [
+            ('commandes', colonne, nom, ref) for colonne, nom, ref in _COLONNES_COMMANDES
+        ]
+        cibles.append(('charge_documents', 'file_data', 'file_name', 'blob_id'))
+        try:
+            connection = self.db.get_connection()
+            for table, colonne, nom, ref in cibles:
+                dernier_id = 0
+                total = 0
+                while True:
+                    cursor = connection.cursor()
+                    cursor.execute(
+                        f"SELECT id, {colonne}, {nom} FROM {table} "
+                        f"WHERE {colonne} IS NOT NULL AND {ref} IS NULL AND id > %s "
+                        f"ORDER BY id LIMIT %s",
+                        (dernier_id, taille_lot),
+                    )
+                    lignes = cursor.fetchall()
+                    if not lignes:
+                        cursor.close()
+                        break
+                    for ligne_id, data, nom_fichier in lignes:
+                        blob_id = self.enregistrer(data, nom_fichier=nom_fichier, cursor=cursor)
+                        cursor.execute(
+                            f"UPDATE {table} SET {ref} = %s, {colonne} = NULL WHERE id = %s",
+                            (blob_id, ligne_id),
+                        )
+                        dernier_id = ligne_id
+                    connection.commit()
+                    cursor.close()
+                    total += len(lignes)
+                if total:
+                    print(f"media_blobs : {total} fichier(s) migré(s) depuis {table}.{colonne}")
+            return True
+        except (MySQLError, PGError, Exception) as e:
+            try:
+                self.db.get_connection().rollback()
+            except Exception:
+                pass
+            print(f"Erreur migration des BLOB vers media_blobs: {e}")
+            return False
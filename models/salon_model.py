@@ -3,6 +3,8 @@ Modèle pour la gestion des salons (système multi-tenant)
 """
 from typing import Optional, Dict, List
 
+from utils.cache_lectures import ecriture_invalide
+
 try:
     from mysql.connector import Error as MySQLError  # type: ignore
 except Exception:
@@ -26,6 +28,7 @@ class SalonModel:
         """
         self.db = db_connection
     
+    @ecriture_invalide()
     def creer_salon_avec_admin(
         self,
         nom_salon: str,
@@ -190,6 +193,7 @@ class SalonModel:
                 smtp_use_ssl=smtp_use_ssl,
             )
     
+    @ecriture_invalide()
     def creer_salon_manuel(
         self,
         nom_salon: str,
@@ -319,166 +323,109 @@ class SalonModel:
         """
         Liste tous les salons avec leurs statistiques
         Pour SUPER_ADMIN uniquement
-        
+
+        Une seule requête : les compteurs (employés, clients, commandes, CA)
+        sont agrégés une fois par table puis joints aux salons, au lieu de
+        4 à 5 requêtes par salon.
+
         Returns:
             Liste des salons avec statistiques
         """
         try:
             cursor = self.db.get_connection().cursor()
-            
-            # D'abord, vérifier si la table salons existe et sa structure
-            # Essayer une requête simple d'abord
-            try:
-                simple_query = """
-                    SELECT salon_id,
-                           nom,
-                           quartier,
-                           responsable,
-                           telephone,
-                           email,
-                           code_admin,
-                           actif,
-                           date_creation,
-                           smtp_host,
-                           smtp_port,
-                           smtp_user,
-                           smtp_from,
-                           smtp_use_tls,
-                           smtp_use_ssl
-                    FROM salons
-                    ORDER BY salon_id
+            cursor.execute(
                 """
-                cursor.execute(simple_query)
-                results = cursor.fetchall()
-                
-                if not results:
-                    print("⚠️ Table 'salons' existe mais est vide")
-                    cursor.close()
-                    return []
-                
-                # Si on a des résultats, construire la liste avec les données de base
-                salons = []
-                for row in results:
-                    salon_id = row[0]
-                    
-                    # Récupérer les statistiques pour chaque salon
-                    try:
-                        # Nombre d'employés
-                        cursor.execute(
-                            "SELECT COUNT(*) FROM couturiers WHERE salon_id = %s AND role = 'employe'",
-                            (salon_id,)
-                        )
-                        nb_employes = cursor.fetchone()[0] or 0
-                    except:
-                        nb_employes = 0
-                    
-                    try:
-                        # Nombre de clients
-                        cursor.execute(
-                            "SELECT COUNT(*) FROM clients WHERE salon_id = %s",
-                            (salon_id,)
-                        )
-                        nb_clients = cursor.fetchone()[0] or 0
-                    except:
-                        nb_clients = 0
-                    
-                    try:
-                        # Nombre de commandes
-                        cursor.execute(
-                            "SELECT COUNT(*) FROM commandes WHERE salon_id = %s",
-                            (salon_id,)
-                        )
-                        nb_commandes = cursor.fetchone()[0] or 0
-                    except:
-                        nb_commandes = 0
-                    
-                    # Calculer le CA total
-                    try:
-                        cursor.execute(
-                            "SELECT COALESCE(SUM(prix_total), 0) FROM commandes WHERE salon_id = %s",
-                            (salon_id,)
-                        )
-                        ca_total = float(cursor.fetchone()[0] or 0)
-                    except:
-                        ca_total = 0.0
-                    
-                    # Récupérer l'admin du salon
-                    try:
-                        cursor.execute(
-                            "SELECT nom, prenom FROM couturiers WHERE salon_id = %s AND role = 'admin' LIMIT 1",
-                            (salon_id,)
-                        )
-                        admin_row = cursor.fetchone()
-                        admin_nom = admin_row[0] if admin_row else None
-                        admin_prenom = admin_row[1] if admin_row and len(admin_row) > 1 else None
-                    except:
-                        admin_nom = None
-                        admin_prenom = None
-                    
-                    salons.append({
-                        'salon_id': salon_id,
-                        'nom_salon': row[1] if len(row) > 1 and row[1] else f"Salon {salon_id}",
-                        'quartier': row[2] if len(row) > 2 and row[2] else '',
-                        'responsable': row[3] if len(row) > 3 and row[3] else '',
-                        'telephone': row[4] if len(row) > 4 and row[4] else '',
-                        'email': row[5] if len(row) > 5 and row[5] else '',
-                        'code_admin': row[6] if len(row) > 6 and row[6] else '',
-                        'actif': row[7] if len(row) > 7 else True,
-                        'date_creation': row[8] if len(row) > 8 else None,
-                        'admin_nom': admin_nom,
-                        'admin_prenom': admin_prenom,
-                        'nb_employes': int(nb_employes),
-                        'nb_clients': int(nb_clients),
-                        'nb_commandes': int(nb_commandes),
-                        'ca_total': ca_total,
-                        # Infos SMTP (pour debug / future UI)
-                        'smtp_host': row[9] if len(row) > 9 else None,
-                        'smtp_port': row[10] if len(row) > 10 else None,
-                        'smtp_user': row[11] if len(row) > 11 else None,
-                        'smtp_from': row[12] if len(row) > 12 else None,
-                        'smtp_use_tls': row[13] if len(row) > 13 else None,
-                        'smtp_use_ssl': row[14] if len(row) > 14 else None,
-                    })
-                
-                cursor.close()
-                return salons
-                
-            except Exception as e_simple:
-                print(f"Erreur requête simple salons: {e_simple}")
-                # Essayer de vérifier si la table existe
-                try:
-                    if self.db.db_type == 'mysql':
-                        cursor.execute("SHOW TABLES LIKE 'salons'")
-                    else:  # PostgreSQL
-                        cursor.execute("""
-                            SELECT table_name 
-                            FROM information_schema.tables 
-                            WHERE table_schema = 'public' AND table_name = 'salons'
-                        """)
-                    table_exists = cursor.fetchone()
-                    cursor.close()
-                    
-                    if not table_exists:
-                        print("❌ La table 'salons' n'existe pas dans la base de données")
-                        return []
-                    else:
-                        print("⚠️ La table 'salons' existe mais la requête a échoué")
-                        return []
-                except Exception as e_check:
-                    print(f"Erreur vérification table: {e_check}")
-                    cursor.close()
-                    return []
-            
+                SELECT s.salon_id,
+                       s.nom,
+                       s.quartier,
+                       s.responsable,
+                       s.telephone,
+                       s.email,
+                       s.code_admin,
+                       s.actif,
+                       s.date_creation,
+                       s.smtp_host,
+                       s.smtp_port,
+                       s.smtp_user,
+                       s.smtp_from,
+                       s.smtp_use_tls,
+                       s.smtp_use_ssl,
+                       adm.nom,
+                       adm.prenom,
+                       COALESCE(emp.nb, 0),
+                       COALESCE(cli.nb, 0),
+                       COALESCE(cmd.nb, 0),
+                       COALESCE(cmd.ca, 0)
+                FROM salons s
+                LEFT JOIN (
+                    SELECT salon_id, COUNT(*) AS nb
+                    FROM couturiers
+                    WHERE role = 'employe'
+                    GROUP BY salon_id
+                ) emp ON emp.salon_id = s.salon_id
+                LEFT JOIN (
+                    SELECT salon_id, COUNT(*) AS nb
+                    FROM clients
+                    GROUP BY salon_id
+                ) cli ON cli.salon_id = s.salon_id
+                LEFT JOIN (
+                    SELECT salon_id, COUNT(*) AS nb, SUM(prix_total) AS ca
+                    FROM commandes
+                    GROUP BY salon_id
+                ) cmd ON cmd.salon_id = s.salon_id
+                LEFT JOIN (
+                    SELECT salon_id, MIN(id) AS admin_id
+                    FROM couturiers
+                    WHERE role = 'admin'
+                    GROUP BY salon_id
+                ) premier_admin ON premier_admin.salon_id = s.salon_id
+                LEFT JOIN couturiers adm ON adm.id = premier_admin.admin_id
+                ORDER BY s.salon_id
+                """
+            )
+            results = cursor.fetchall()
+            cursor.close()
+
+            if not results:
+                print("⚠️ Table 'salons' existe mais est vide")
+                return []
+
+            return [
+                {
+                    'salon_id': row[0],
+                    'nom_salon': row[1] or f"Salon {row[0]}",
+                    'quartier': row[2] or '',
+                    'responsable': row[3] or '',
+                    'telephone': row[4] or '',
+                    'email': row[5] or '',
+                    'code_admin': row[6] or '',
+                    'actif': row[7],
+                    'date_creation': row[8],
+                    'admin_nom': row[15],
+                    'admin_prenom': row[16],
+                    'nb_employes': int(row[17]),
+                    'nb_clients': int(row[18]),
+                    'nb_commandes': int(row[19]),
+                    'ca_total': float(row[20]),
+                    # Infos SMTP (pour debug / future UI)
+                    'smtp_host': row[9],
+                    'smtp_port': row[10],
+                    'smtp_user': row[11],
+                    'smtp_from': row[12],
+                    'smtp_use_tls': row[13],
+                    'smtp_use_ssl': row[14],
+                }
+                for row in results
+            ]
+
         except (MySQLError, PGError, Exception) as e:
             print(f"Erreur liste salons : {e}")
-            import traceback
-            traceback.print_exc()
             try:
                 cursor.close()
-            except:
+            except Exception:
                 pass
             return []
-    
+
     def obtenir_salon_by_code_admin(self, code_admin: str) -> Optional[Dict]:
         """
         Récupère un salon par le code de son admin
@@ -601,6 +548,27 @@ class SalonModel:
             print(f"Erreur récupération salon : {e}")
             return None
 
+    @staticmethod
+    def _config_email(salon: Dict) -> Optional[Dict]:
+        """Dict compatible avec EmailController à partir des colonnes smtp_* d'un salon."""
+        smtp_user = salon.get("smtp_user")
+        smtp_password = salon.get("smtp_password")
+
+        # Si pas d'utilisateur ou mot de passe SMTP, on considère que la config n'est pas prête
+        if not smtp_user or not smtp_password:
+            return None
+
+        return {
+            "enabled": True,
+            "host": salon.get("smtp_host") or "smtp.gmail.com",
+            "port": int(salon.get("smtp_port") or 587),
+            "user": smtp_user,
+            "password": smtp_password,
+            "from_email": salon.get("smtp_from") or smtp_user,
+            "use_tls": salon.get("smtp_use_tls") if salon.get("smtp_use_tls") is not None else True,
+            "use_ssl": salon.get("smtp_use_ssl") if salon.get("smtp_use_ssl") is not None else False,
+        }
+
     def obtenir_config_email_salon(self, salon_id: str) -> Optional[Dict]:
         """
         Récupère la configuration SMTP d'un salon pour l'envoi d'e-mails.
@@ -610,28 +578,54 @@ class SalonModel:
             salon = self.obtenir_salon_by_id(salon_id)
             if not salon:
                 return None
-
-            smtp_user = salon.get("smtp_user")
-            smtp_password = salon.get("smtp_password")
-
-            # Si pas d'utilisateur ou mot de passe SMTP, on considère que la config n'est pas prête
-            if not smtp_user or not smtp_password:
-                return None
-
-            return {
-                "enabled": True,
-                "host": salon.get("smtp_host") or "smtp.gmail.com",
-                "port": int(salon.get("smtp_port") or 587),
-                "user": smtp_user,
-                "password": smtp_password,
-                "from_email": salon.get("smtp_from") or smtp_user,
-                "use_tls": salon.get("smtp_use_tls") if salon.get("smtp_use_tls") is not None else True,
-                "use_ssl": salon.get("smtp_use_ssl") if salon.get("smtp_use_ssl") is not None else False,
-            }
+            return self._config_email(salon)
         except Exception as e:
             print(f"Erreur récupération config email salon: {e}")
             return None
+
+    def obtenir_configs_email_salons(self, salon_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Configurations SMTP de plusieurs salons en une requête.
+
+        Returns:
+            {salon_id: config} pour les salons dont le SMTP est configuré
+        """
+        salon_ids = [s for s in dict.fromkeys(salon_ids) if s]
+        if not salon_ids:
+            return {}
+        try:
+            cursor = self.db.get_connection().cursor()
+            placeholders = ", ".join(["%s"] * len(salon_ids))
+            cursor.execute(
+                f"""
+                SELECT salon_id, smtp_host, smtp_port, smtp_user, smtp_password,
+                       smtp_from, smtp_use_tls, smtp_use_ssl
+                FROM salons
+                WHERE salon_id IN ({placeholders})
+                """,
+                tuple(salon_ids),
+            )
+            rows = cursor.fetchall()
+            cursor.close()
+            configs = {}
+            for row in rows:
+                config = self._config_email({
+                    "smtp_host": row[1],
+                    "smtp_port": row[2],
+                    "smtp_user": row[3],
+                    "smtp_password": row[4],
+                    "smtp_from": row[5],
+                    "smtp_use_tls": row[6],
+                    "smtp_use_ssl": row[7],
+                })
+                if config:
+                    configs[row[0]] = config
+            return configs
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur récupération configs email salons: {e}")
+            return {}
     
+    @ecriture_invalide(salon='salon_id')
     def modifier_salon(self, salon_id: str, nom: str = None, quartier: str = None,
                        responsable: str = None, telephone: str = None,
                        email: str = None, actif: bool = None,
@@ -0,0 +1,523 @@
+"""
+Modèle des agrégats journaliers (table stats_daily)
+
+Une ligne par (salon, couturier, jour de création, modèle) : nombre de
+commandes, montants et répartition par statut, plus les charges du jour
+(rangées sous le modèle ''). Les écritures sur les commandes et les charges
+appliquent leur variation dans la même transaction ; les tableaux de bord
+lisent ces lignes au lieu de re-parcourir `commandes` et `charges`.
+"""
+from datetime import date, datetime
+from typing import Optional, Dict, List, Tuple, Union
+
+from utils.cache_lectures import ecriture_invalide
+
+try:
+    from mysql.connector import Error as MySQLError  # type: ignore
+except Exception:
+    MySQLError = Exception  # type: ignore
+
+try:
+    from psycopg2 import Error as PGError  # type: ignore
+except Exception:
+    PGError = Exception  # type: ignore
+
+
+# Statuts de commande suivis -> colonne de comptage
+COLONNES_STATUT = {
+    'En cours': 'nb_en_cours',
+    'Terminé': 'nb_termine',
+    'Livré': 'nb_livre',
+    'Livré et payé': 'nb_livre_paye',
+}
+
+# Colonnes de mesures, dans l'ordre des vecteurs de variation
+MESURES = (
+    'nb_commandes', 'ca_total', 'avances_total', 'reste_total',
+    'nb_en_cours', 'nb_termine', 'nb_livre', 'nb_livre_paye', 'charges_total',
+)
+
+STATS_VIDES = {
+    'nb_commandes': 0, 'ca_total': 0, 'avances_total': 0, 'reste_total': 0,
+    'taux_avance': 0, 'commandes_par_statut': {}, 'top_modeles': [],
+}
+
+Jour = Union[date, datetime, None]
+
+
+def _jour(valeur: Jour) -> Optional[date]:
+    """Date (sans heure) d'une borne ou d'un horodatage."""
+    if isinstance(valeur, datetime):
+        return valeur.date()
+    return valeur
+
+
+class StatsDailyModel:
+    """Modèle pour la table stats_daily"""
+
+    def __init__(self, db_connection):
+        """
+        Initialise le modèle avec une connexion à la base
+
+        Args:
+            db_connection: Instance de DatabaseConnection
+        """
+        self.db = db_connection
+
+    def creer_tables(self) -> bool:
+        """Crée la table stats_daily si elle n'existe pas"""
+        colonnes_mesures = """
+                        nb_commandes INTEGER NOT NULL DEFAULT 0,
+                        ca_total DECIMAL(14,2) NOT NULL DEFAULT 0,
+                        avances_total DECIMAL(14,2) NOT NULL DEFAULT 0,
+                        reste_total DECIMAL(14,2) NOT NULL DEFAULT 0,
+                        nb_en_cours INTEGER NOT NULL DEFAULT 0,
+                        nb_termine INTEGER NOT NULL DEFAULT 0,
+                        nb_livre INTEGER NOT NULL DEFAULT 0,
+                        nb_livre_paye INTEGER NOT NULL DEFAULT 0,
+                        charges_total DECIMAL(14,2) NOT NULL DEFAULT 0,
+        """
+        try:
+            cursor = self.db.get_connection().cursor()
+            cursor.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS stats_daily (
+                    salon_id VARCHAR(50) NOT NULL DEFAULT '',
+                    couturier_id INTEGER NOT NULL,
+                    day DATE NOT NULL,
+                    modele VARCHAR(100) NOT NULL DEFAULT '',
+                    {colonnes_mesures}
+                    PRIMARY KEY (salon_id, couturier_id, day, modele)
+                )
+                """
+            )
+            if self.db.db_type == 'mysql':
+                try:
+                    cursor.execute("CREATE INDEX idx_stats_daily_couturier ON stats_daily (couturier_id, day)")
+                    cursor.execute("CREATE INDEX idx_stats_daily_day ON stats_daily (day)")
+                except (MySQLError, PGError, Exception):
+                    pass
+            else:
+                cursor.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_stats_daily_couturier ON stats_daily (couturier_id, day)"
+                )
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_stats_daily_day ON stats_daily (day)")
+            self.db.get_connection().commit()
+            cursor.close()
+            return True
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur création table stats_daily: {e}")
+            return False
+
+    # ------------------------------------------------------------------
+    # Mise à jour incrémentale (dans la transaction de l'appelant)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def etat_commande(cursor, commande_id: int, verrouiller: bool = False) -> Optional[Dict]:
+        """
+        Valeurs d'une commande qui contribuent aux agrégats.
+
+        Args:
+            verrouiller: FOR UPDATE, à utiliser avant une modification pour
+                que la variation calculée reste exacte en cas d'écritures concurrentes
+        """
+        cursor.execute(
+            f"""
+            SELECT c.salon_id, c.couturier_id, c.date_creation, c.modele,
+                   c.prix_total, c.avance, c.reste, c.statut
+            FROM commandes c
+            WHERE c.id = %s
+            {'FOR UPDATE' if verrouiller else ''}
+            """,
+            (commande_id,)
+        )
+        row = cursor.fetchone()
+        if not row or row[2] is None:
+            return None
+        return {
+            'salon_id': row[0] or '',
+            'couturier_id': row[1],
+            'day': _jour(row[2]),
+            'modele': (row[3] or '')[:100],
+            'prix_total': float(row[4] or 0),
+            'avance': float(row[5] or 0),
+            'reste': float(row[6] or 0),
+            'statut': row[7],
+        }
+
+    @staticmethod
+    def _contribution(etat: Dict) -> List[float]:
+        vecteur = [1, etat['prix_total'], etat['avance'], etat['reste'], 0, 0, 0, 0, 0.0]
+        colonne = COLONNES_STATUT.get(etat['statut'])
+        if colonne:
+            vecteur[MESURES.index(colonne)] = 1
+        return vecteur
+
+    def appliquer_variation_commande(self, cursor, avant: Optional[Dict], apres: Optional[Dict]) -> None:
+        """
+        Retire la contribution de `avant` et ajoute celle de `apres`
+        (états retournés par `etat_commande`, None pour une création).
+        """
+        variations: Dict[Tuple, List[float]] = {}
+        for etat, signe in ((avant, -1), (apres, 1)):
+            if not etat:
+                continue
+            cle = (etat['salon_id'], etat['couturier_id'], etat['day'], etat['modele'])
+            cumul = variations.setdefault(cle, [0] * len(MESURES))
+            for i, valeur in enumerate(self._contribution(etat)):
+                cumul[i] += signe * valeur
+        for cle, vecteur in variations.items():
+            if any(vecteur):
+                self._ajouter(cursor, cle, vecteur)
+
+    def appliquer_creations(self, cursor, etats: List[Dict]) -> None:
+        """
+        Ajoute un lot de commandes créées (import en masse) : les
+        contributions sont cumulées par clé avant l'upsert.
+        """
+        cumuls: Dict[Tuple, List[float]] = {}
+        for etat in etats:
+            cle = (etat['salon_id'], etat['couturier_id'], etat['day'], etat['modele'])
+            cumul = cumuls.setdefault(cle, [0] * len(MESURES))
+            for i, valeur in enumerate(self._contribution(etat)):
+                cumul[i] += valeur
+        for cle, vecteur in cumuls.items():
+            self._ajouter(cursor, cle, vecteur)
+
+    def appliquer_variation_charge(self, cursor, couturier_id: int, date_charge, montant: float) -> None:
+        """Ajoute une charge aux agrégats du jour (modèle '')."""
+        cursor.execute("SELECT salon_id FROM couturiers WHERE id = %s", (couturier_id,))
+        row = cursor.fetchone()
+        salon_id = (row[0] if row else None) or ''
+        if isinstance(date_charge, str):
+            date_charge = datetime.strptime(date_charge[:10], '%Y-%m-%d').date()
+        vecteur = [0] * len(MESURES)
+        vecteur[MESURES.index('charges_total')] = float(montant or 0)
+        self._ajouter(cursor, (salon_id, couturier_id, _jour(date_charge), ''), vecteur)
+
+    def retirer_couturier(self, cursor, couturier_id: int) -> None:
+        """
+        Retire des agrégats tout ce que la suppression d'un couturier
+        emporte en cascade : ses lignes (ses commandes et ses charges) et
+        les commandes d'autres couturiers passées pour ses clients.
+        À appeler avant le DELETE, dans la même transaction.
+        """
+        cursor.execute(
+            """
+            SELECT c.id FROM commandes c
+            JOIN clients cl ON cl.id = c.client_id
+            WHERE cl.couturier_id = %s AND c.couturier_id <> %s
+            """,
+            (couturier_id, couturier_id)
+        )
+        for (commande_id,) in cursor.fetchall():
+            self.appliquer_variation_commande(
+                cursor, self.etat_commande(cursor, commande_id, verrouiller=True), None
+            )
+        cursor.execute("DELETE FROM stats_daily WHERE couturier_id = %s", (couturier_id,))
+
+    def _ajouter(self, cursor, cle: Tuple, vecteur: List[float]) -> None:
+        colonnes = ", ".join(MESURES)
+        placeholders = ", ".join(["%s"] * (4 + len(MESURES)))
+        if self.db.db_type == 'mysql':
+            increments = ", ".join(f"{m} = {m} + VALUES({m})" for m in MESURES)
+            suffixe = f"ON DUPLICATE KEY UPDATE {increments}"
+        else:
+            increments = ", ".join(f"{m} = stats_daily.{m} + EXCLUDED.{m}" for m in MESURES)
+            suffixe = f"ON CONFLICT (salon_id, couturier_id, day, modele) DO UPDATE SET {increments}"
+        cursor.execute(
+            f"""
+            INSERT INTO stats_daily (salon_id, couturier_id, day, modele, {colonnes})
+            VALUES ({placeholders})
+            {suffixe}
+            """,
+            (*cle, *vecteur)
+        )
+
+    # ------------------------------------------------------------------
+    # Reconstruction complète
+    # ------------------------------------------------------------------
+
+    @ecriture_invalide(salon='salon_id')
+    def reconstruire(self, salon_id: Optional[str] = None) -> Optional[int]:
+        """
+        Recalcule stats_daily depuis commandes et charges (tous les salons,
+        ou un seul), en une transaction.
+
+        Returns:
+            Nombre de lignes produites ou None si erreur
+        """
+        cas_statut = ", ".join(
+            f"CASE WHEN c.statut = '{statut}' THEN 1 ELSE 0 END AS s{i}"
+            for i, statut in enumerate(COLONNES_STATUT, start=1)
+        )
+        params = (salon_id, salon_id) if salon_id else ()
+        try:
+            connection = self.db.get_connection()
+            cursor = connection.cursor()
+            if salon_id:
+                cursor.execute("DELETE FROM stats_daily WHERE salon_id = %s", (salon_id,))
+            else:
+                cursor.execute("DELETE FROM stats_daily")
+            cursor.execute(
+                f"""
+                INSERT INTO stats_daily (salon_id, couturier_id, day, modele, {", ".join(MESURES)})
+                SELECT salon_id, couturier_id, day, modele,
+                       SUM(nb), SUM(ca), SUM(av), SUM(re),
+                       SUM(s1), SUM(s2), SUM(s3), SUM(s4), SUM(ch)
+                FROM (
+                    SELECT COALESCE(c.salon_id, '') AS salon_id, c.couturier_id,
+                           CAST(c.date_creation AS DATE) AS day,
+                           SUBSTRING(COALESCE(c.modele, ''), 1, 100) AS modele,
+                           1 AS nb, COALESCE(c.prix_total, 0) AS ca,
+                           COALESCE(c.avance, 0) AS av, COALESCE(c.reste, 0) AS re,
+                           {cas_statut},
+                           0 AS ch
+                    FROM commandes c
+                    WHERE c.date_creation IS NOT NULL{' AND c.salon_id = %s' if salon_id else ''}
+                    UNION ALL
+                    SELECT COALESCE(co.salon_id, ''), ch.couturier_id, ch.date_charge, '',
+                           0, 0, 0, 0, 0, 0, 0, 0, COALESCE(ch.montant, 0)
+                    FROM charges ch
+                    LEFT JOIN couturiers co ON co.id = ch.couturier_id
+                    {'WHERE co.salon_id = %s' if salon_id else ''}
+                ) faits
+                GROUP BY salon_id, couturier_id, day, modele
+                """,
+                params
+            )
+            nb_lignes = cursor.rowcount
+            connection.commit()
+            cursor.close()
+            return nb_lignes
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur reconstruction stats_daily: {e}")
+            try:
+                self.db.get_connection().rollback()
+            except Exception:
+                pass
+            return None
+
+    # ------------------------------------------------------------------
+    # Lectures (tableaux de bord)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _filtres(couturier_id: Optional[int], salon_id: Optional[str],
+                 date_debut: Jour, date_fin: Jour) -> Tuple[List[str], List]:
+        where: List[str] = []
+        params: List = []
+        if couturier_id is not None:
+            where.append("couturier_id = %s")
+            params.append(couturier_id)
+        elif salon_id is not None:
+            where.append("salon_id = %s")
+            params.append(salon_id)
+        if date_debut:
+            where.append("day >= %s")
+            params.append(_jour(date_debut))
+        if date_fin:
+            where.append("day <= %s")
+            params.append(_jour(date_fin))
+        return where, params
+
+    def statistiques(self, couturier_id: Optional[int] = None, salon_id: Optional[str] = None,
+                     date_debut: Jour = None, date_fin: Jour = None) -> Dict:
+        """
+        Statistiques financières d'un couturier ou d'un salon
+        (même format que ComptabiliteController.obtenir_statistiques).
+        """
+        return self.statistiques_fenetres(
+            {'periode': (date_debut, date_fin)}, couturier_id=couturier_id, salon_id=salon_id
+        )['periode']
+
+    def statistiques_fenetres(self, fenetres: Dict[str, Tuple[Jour, Jour]],
+                              couturier_id: Optional[int] = None,
+                              salon_id: Optional[str] = None) -> Dict[str, Dict]:
+        """
+        Statistiques de plusieurs périodes en une seule requête.
+
+        Les fenêtres sont jointes aux lignes de stats_daily qu'elles couvrent,
+        puis regroupées par GROUPING SETS : (fenêtre) donne les totaux et la
+        répartition par statut, (fenêtre, modèle) le classement des modèles.
+
+        Args:
+            fenetres: {nom: (date_debut, date_fin)}, bornes None = non bornée
+
+        Returns:
+            {nom: statistiques au format de `statistiques`}
+        """
+        resultats = {nom: self._stats_vides() for nom in fenetres}
+        if not fenetres or (couturier_id is None and salon_id is None):
+            return resultats
+        where, params = self._filtres(couturier_id, salon_id, None, None)
+
+        # Table dérivée des fenêtres : une ligne (nom, debut, fin) par période
+        selects = []
+        params_fenetres: List = []
+        for nom, (date_debut, date_fin) in fenetres.items():
+            selects.append("SELECT %s AS nom, CAST(%s AS DATE) AS debut, CAST(%s AS DATE) AS fin")
+            params_fenetres.extend([nom, _jour(date_debut), _jour(date_fin)])
+
+        if self.db.db_type == 'mysql':
+            # MySQL n'a pas GROUPING SETS : ROLLUP produit les mêmes groupes plus
+            # un total général, ignoré ci-dessous
+            group_by = "GROUP BY f.nom, s.modele WITH ROLLUP"
+        else:
+            group_by = "GROUP BY GROUPING SETS ((f.nom), (f.nom, s.modele))"
+
+        mesures_statut = ", ".join(f"SUM(s.{c})" for c in COLONNES_STATUT.values())
+        try:
+            cursor = self.db.get_connection().cursor()
+            cursor.execute(
+                f"""
+                SELECT f.nom, s.modele, GROUPING(s.modele),
+                       SUM(s.nb_commandes), SUM(s.ca_total),
+                       SUM(s.avances_total), SUM(s.reste_total),
+                       {mesures_statut}
+                FROM stats_daily s
+                JOIN ({" UNION ALL ".join(selects)}) f
+                  ON (f.debut IS NULL OR s.day >= f.debut)
+                 AND (f.fin IS NULL OR s.day <= f.fin)
+                WHERE {" AND ".join(where)}
+                {group_by}
+                HAVING GROUPING(s.modele) = 1 OR SUM(s.nb_commandes) > 0
+                """,
+                tuple(params_fenetres) + tuple(params)
+            )
+            rows = cursor.fetchall()
+            cursor.close()
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur stats_daily: {e}")
+            return resultats
+
+        modeles: Dict[str, List[Tuple[str, int]]] = {nom: [] for nom in fenetres}
+        for row in rows:
+            nom = row[0]
+            if nom not in resultats:
+                continue  # total général du ROLLUP MySQL
+            if not row[2]:
+                modeles[nom].append((row[1], int(row[3])))
+                continue
+            ca_total = float(row[4] or 0)
+            avances_total = float(row[5] or 0)
+            resultats[nom].update({
+                'nb_commandes': int(row[3] or 0),
+                'ca_total': ca_total,
+                'avances_total': avances_total,
+                'reste_total': float(row[6] or 0),
+                'taux_avance': (avances_total / ca_total * 100) if ca_total > 0 else 0,
+                'commandes_par_statut': {
+                    statut: int(nb) for statut, nb in zip(COLONNES_STATUT, row[7:]) if nb
+                },
+            })
+        for nom, liste in modeles.items():
+            liste.sort(key=lambda modele: modele[1], reverse=True)
+            resultats[nom]['top_modeles'] = liste[:10]
+        return resultats
+
+    @staticmethod
+    def _stats_vides() -> Dict:
+        return dict(STATS_VIDES, commandes_par_statut={}, top_modeles=[])
+
+    def totaux(self, date_debut: Jour = None, date_fin: Jour = None) -> Dict[str, float]:
+        """Totaux tous salons : commandes, CA, avances, restes, charges."""
+        where, params = self._filtres(None, None, date_debut, date_fin)
+        where_clause = ("WHERE " + " AND ".join(where)) if where else ""
+        try:
+            cursor = self.db.get_connection().cursor()
+            cursor.execute(
+                f"""
+                SELECT COALESCE(SUM(nb_commandes), 0), COALESCE(SUM(ca_total), 0),
+                       COALESCE(SUM(avances_total), 0), COALESCE(SUM(reste_total), 0),
+                       COALESCE(SUM(charges_total), 0)
+                FROM stats_daily
+                {where_clause}
+                """,
+                tuple(params)
+            )
+            row = cursor.fetchone()
+            cursor.close()
+            return {
+                'nb_commandes': int(row[0]),
+                'ca_total': float(row[1]),
+                'avances': float(row[2]),
+                'reste': float(row[3]),
+                'charges': float(row[4]),
+            }
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur totaux stats_daily: {e}")
+            return {'nb_commandes': 0, 'ca_total': 0.0, 'avances': 0.0, 'reste': 0.0, 'charges': 0.0}
+
+    def par_salon(self, date_debut: Jour = None, date_fin: Jour = None) -> Dict[str, Dict]:
+        """Totaux par salon : {salon_id: {nb_commandes, ca_total, avances, reste, charges}}."""
+        where, params = self._filtres(None, None, date_debut, date_fin)
+        where_clause = ("WHERE " + " AND ".join(where)) if where else ""
+        try:
+            cursor = self.db.get_connection().cursor()
+            cursor.execute(
+                f"""
+                SELECT salon_id, SUM(nb_commandes), SUM(ca_total),
+                       SUM(avances_total), SUM(reste_total), SUM(charges_total)
+                FROM stats_daily
+                {where_clause}
+                GROUP BY salon_id
+                """,
+                tuple(params)
+            )
+            rows = cursor.fetchall()
+            cursor.close()
+            return {
+                row[0]: {
+                    'nb_commandes': int(row[1] or 0),
+                    'ca_total': float(row[2] or 0),
+                    'avances': float(row[3] or 0),
+                    'reste': float(row[4] or 0),
+                    'charges': float(row[5] or 0),
+                }
+                for row in rows
+            }
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur stats_daily par salon: {e}")
+            return {}
+
+    def evolution_mensuelle(self, depuis: Jour, salon_id: Optional[str] = None) -> List[Dict]:
+        """Commandes, CA, encaissé et reste par mois (format 'YYYY-MM')."""
+        if self.db.db_type == 'mysql':
+            mois = "DATE_FORMAT(day, '%%Y-%%m')"
+        else:
+            mois = "TO_CHAR(day, 'YYYY-MM')"
+        where = ["day >= %s", "nb_commandes > 0"]
+        params: List = [_jour(depuis)]
+        if salon_id:
+            where.append("salon_id = %s")
+            params.append(salon_id)
+        try:
+            cursor = self.db.get_connection().cursor()
+            cursor.execute(
+                f"""
+                SELECT {mois} AS mois, SUM(nb_commandes), SUM(ca_total),
+                       SUM(avances_total), SUM(reste_total)
+                FROM stats_daily
+                WHERE {" AND ".join(where)}
+                GROUP BY {mois}
+                ORDER BY mois ASC
+                """,
+                tuple(params)
+            )
+            rows = cursor.fetchall()
+            cursor.close()
+            return [
+                {
+                    'mois': row[0],
+                    'nb_commandes': int(row[1] or 0),
+                    'ca': float(row[2] or 0),
+                    'encaisse': float(row[3] or 0),
+                    'reste': float(row[4] or 0),
+                }
+                for row in rows
+            ]
+        except (MySQLError, PGError, Exception) as e:
+            print(f"Erreur évolution mensuelle stats_daily: {e}")
+            return []
@@ -0,0 +1,141 @@
+"""
+Invalidation du cache des lectures entre instances (PostgreSQL LISTEN/NOTIFY).
+
+Chaque invalidation locale (utils/cache_lectures.invalider, déclenchée par
+les écritures des modèles) est diffusée par `pg_notify` sur le canal
+CANAL_INVALIDATION. Un thread démon par processus garde une connexion
+dédiée en LISTEN et applique les invalidations reçues des autres instances.
+
+Tant que l'écoute est active, le cache applique son TTL long
+(CACHE_LECTURES_CONFIG['ttl_ecoute_seconds']) ; si elle tombe, il revient
+au TTL court et toute la base est invalidée à la reconnexion (les
+notifications émises pendant la coupure sont perdues).
+"""
+
+import json
+import os
+import select
+import threading
+import time
+import uuid
+from typing import Optional
+
+from config import CACHE_LECTURES_CONFIG
+from models.database import DatabaseConnection
+from services.database_service import open_dedicated_connection
+from utils.cache_lectures import abonner, definir_ecoute, invalider
+from utils.logging_utils import get_logger
+
+
+logger = get_logger(__name__)
+
+CANAL_INVALIDATION = "cache_lectures"
+
+# Identifie ce processus : ses propres notifications sont ignorées à la réception
+_ORIGINE = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+# Sans notification pendant ce délai, la connexion d'écoute est sondée (SELECT 1)
+_DELAI_SONDE_SECONDES = 60.0
+
+_thread: Optional[threading.Thread] = None
+_thread_lock = threading.Lock()
+_arret = threading.Event()
+
+
+def _notifier(db_connection: DatabaseConnection, salon_id: Optional[str]) -> None:
+    """Abonné de cache_lectures : diffuse une invalidation locale aux autres instances."""
+    if db_connection.db_type != "postgresql":
+        return
+    message = json.dumps({"origine": _ORIGINE, "salon": salon_id})
+    # Connexion brute empruntée et commit explicite : la notification n'est
+    # émise qu'au commit, indépendamment des curseurs de la façade du pool.
+    with db_connection.lease() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT pg_notify(%s, %s)", (CANAL_INVALIDATION, message))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+
+def _recevoir(db_connection: DatabaseConnection, payload: str) -> None:
+    try:
+        message = json.loads(payload)
+    except ValueError:
+        logger.warning("Notification de cache illisible : %r", payload)
+        return
+    if message.get("origine") == _ORIGINE:
+        return
+    invalider(db_connection, message.get("salon"), diffuser=False)
+
+
+def _ecouter() -> None:
+    """Écoute jusqu'à l'arrêt demandé ou à la perte de la connexion."""
+    db_connection = open_dedicated_connection()
+    if db_connection is None:
+        logger.warning("Écoute du cache : base indisponible.")
+        return
+    try:
+        conn = db_connection.get_connection()
+        conn.autocommit = True
+        cursor = conn.cursor()
+        cursor.execute(f"LISTEN {CANAL_INVALIDATION}")
+        # Les écritures des autres instances pendant la coupure n'ont pas été reçues
+        invalider(db_connection, None, diffuser=False)
+        definir_ecoute(db_connection, True)
+        logger.info("Écoute des invalidations du cache active (canal %s).", CANAL_INVALIDATION)
+
+        derniere_activite = time.monotonic()
+        while not _arret.is_set():
+            if select.select([conn], [], [], 5.0) == ([], [], []):
+                if time.monotonic() - derniere_activite >= _DELAI_SONDE_SECONDES:
+                    cursor.execute("SELECT 1")
+                    cursor.fetchone()
+                    derniere_activite = time.monotonic()
+                continue
+            conn.poll()
+            derniere_activite = time.monotonic()
+            while conn.notifies:
+                _recevoir(db_connection, conn.notifies.pop(0).payload)
+    finally:
+        definir_ecoute(db_connection, False)
+        try:
+            db_connection.disconnect()
+        except Exception:
+            pass
+
+
+def _boucle() -> None:
+    while not _arret.is_set():
+        try:
+            _ecouter()
+        except Exception:
+            logger.exception("Écoute des invalidations du cache interrompue")
+        _arret.wait(CACHE_LECTURES_CONFIG["notify_retry_seconds"])
+
+
+def demarrer_ecoute() -> bool:
+    """
+    Branche la diffusion des invalidations et démarre le thread d'écoute,
+    une seule fois par processus.
+
+    Returns:
+        True si le thread a été démarré par cet appel
+    """
+    global _thread
+    abonner(_notifier)
+    with _thread_lock:
+        if _thread is not None and _thread.is_alive():
+            return False
+        _arret.clear()
+        _thread = threading.Thread(target=_boucle, name="cache-listen", daemon=True)
+        _thread.start()
+        return True
+
+
+def arreter_ecoute() -> None:
+    """Demande l'arrêt du thread d'écoute (au plus quelques secondes)."""
+    _arret.set()
@@ -2,27 +2,81 @@
 Services de connexion et bootstrap base de donnees.
 """
 
-from typing import MutableMapping, Any, Tuple
+import threading
+import time
+from typing import Dict, MutableMapping, Any, Optional, Tuple
 
-from config import DATABASE_CONFIG, IS_RENDER
-from controllers.auth_controller import AuthController
-from controllers.commande_controller import CommandeController
-from models.database import DatabaseConnection, ChargesModel
+from config import DATABASE_CONFIG, DB_LIVENESS_TTL_SECONDS, DB_POOL_CONFIG, IS_RENDER
+from models.database import DatabaseConnection
+from services.migration_service import assurer_schema_a_jour
 from utils.logging_utils import get_logger
 
 
 logger = get_logger(__name__)
 
+# Connexion poolée partagée par toutes les sessions du processus.
+_shared_connection: Optional[DatabaseConnection] = None
+_shared_lock = threading.Lock()
+
+# Compteurs de vivacité (processus) : combien de sondes SELECT 1 sont réellement
+# envoyées, combien sont évitées grâce au TTL, et combien de reconnexions ont lieu.
+_liveness_stats = {
+    "probes": 0,
+    "probe_failures": 0,
+    "probes_skipped": 0,
+    "reconnects": 0,
+}
+_stats_lock = threading.Lock()
+
+
+def _count(key: str) -> None:
+    with _stats_lock:
+        _liveness_stats[key] += 1
+
+
+def get_liveness_stats(state: Optional[MutableMapping[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Retourne les compteurs de sondes/reconnexions, complétés par ceux du pool
+    (contrôles au checkout, connexions coupées remplacées) si disponible.
+    """
+    with _stats_lock:
+        stats: Dict[str, Any] = dict(_liveness_stats)
+    db_connection = (state or {}).get("db_connection") if state is not None else _shared_connection
+    pool = getattr(db_connection, "pool", None)
+    if pool is not None:
+        stats["pool"] = pool.stats()
+    stats["ttl_seconds"] = DB_LIVENESS_TTL_SECONDS
+    return stats
+
+
+def _mark_alive(state: MutableMapping[str, Any]) -> None:
+    state["db_checked_at"] = time.monotonic()
+
+
+def _is_trusted(state: MutableMapping[str, Any], db_connection: DatabaseConnection) -> bool:
+    """
+    Vrai si la connexion a été vérifiée il y a moins de DB_LIVENESS_TTL_SECONDS.
+    Aucun aller-retour serveur : une connexion coupée entre-temps sera détectée
+    (et remplacée en mode pool) par la première requête réelle qui échoue.
+    """
+    checked_at = state.get("db_checked_at")
+    if checked_at is None or not db_connection.is_connected():
+        return False
+    return (time.monotonic() - checked_at) < DB_LIVENESS_TTL_SECONDS
+
 
 def _probe_connection(db_connection: DatabaseConnection) -> bool:
     """
     Vérifie qu'une connexion active répond réellement côté serveur.
     """
+    _count("probes")
     try:
         if not db_connection or not db_connection.is_connected():
+            _count("probe_failures")
             return False
         conn = db_connection.get_connection()
         if conn is None:
+            _count("probe_failures")
             return False
         cursor = conn.cursor()
         cursor.execute("SELECT 1")
@@ -30,10 +84,23 @@ def _probe_connection(db_connection: DatabaseConnection) -> bool:
         cursor.close()
         return True
     except Exception:
+        _count("probe_failures")
         logger.warning("Probe DB échouée (connexion potentiellement expirée).")
         return False
 
 
+def _check_alive(state: MutableMapping[str, Any], db_connection: DatabaseConnection) -> bool:
+    """Contrôle de vivacité : confiance pendant le TTL, sinon une sonde SELECT 1."""
+    if _is_trusted(state, db_connection):
+        _count("probes_skipped")
+        return True
+    if _probe_connection(db_connection):
+        _mark_alive(state)
+        return True
+    state.pop("db_checked_at", None)
+    return False
+
+
 def _resolve_db_target() -> str:
     return "render_production" if IS_RENDER else "postgresql_local"
 
@@ -51,24 +118,75 @@ def _validate_config(config: dict) -> Tuple[bool, str]:
     return True, ""
 
 
-def _bootstrap_schema(db_connection: DatabaseConnection) -> Tuple[bool, str]:
+def _open_connection(config: dict) -> Optional[DatabaseConnection]:
     """
-    Initialise les tables applicatives sans logique UI.
+    Retourne la connexion poolée du processus (créée une seule fois),
+    ou une connexion dédiée si le pool est désactivé.
     """
-    try:
-        auth_controller = AuthController(db_connection)
-        if not auth_controller.initialiser_tables():
-            return False, "Initialisation table couturiers impossible."
+    global _shared_connection
 
-        commande_controller = CommandeController(db_connection)
-        if not commande_controller.initialiser_tables():
-            return False, "Initialisation tables clients/commandes impossible."
+    if not DB_POOL_CONFIG.get("enabled"):
+        connection = DatabaseConnection("postgresql", config)
+        return connection if connection.connect() else None
 
-        charges_model = ChargesModel(db_connection)
-        if not charges_model.creer_tables():
-            return False, "Initialisation tables charges impossible."
+    with _shared_lock:
+        if _shared_connection is not None and _shared_connection.is_connected():
+            return _shared_connection
+        connection = DatabaseConnection("postgresql", config, pool_config=DB_POOL_CONFIG)
+        if not connection.connect():
+            return None
+        _shared_connection = connection
+        return connection
 
-        return True, ""
+
+def open_background_connection() -> Optional[DatabaseConnection]:
+    """
+    Connexion pour les traitements hors session (planificateur, workers) :
+    la connexion poolée du processus, ou une connexion dédiée à fermer par
+    l'appelant si le pool est désactivé.
+    """
+    config = _resolve_db_config()
+    valid, _ = _validate_config(config)
+    if not valid:
+        return None
+    return _open_connection(config)
+
+
+def open_dedicated_connection() -> Optional[DatabaseConnection]:
+    """
+    Connexion hors pool, à fermer par l'appelant : pour l'état lié à la
+    session SQL qui doit survivre aux emprunts (ex. LISTEN).
+    """
+    config = _resolve_db_config()
+    valid, _ = _validate_config(config)
+    if not valid:
+        return None
+    connection = DatabaseConnection("postgresql", config)
+    return connection if connection.connect() else None
+
+
+def release_database_connection(state: MutableMapping[str, Any]) -> None:
+    """
+    Rend au pool la connexion empruntée pendant la requête courante.
+    À appeler en fin de rerun Streamlit (no-op hors mode pool).
+    """
+    db_connection = state.get("db_connection")
+    if db_connection is None or not getattr(db_connection, "pooled", False):
+        return
+    try:
+        db_connection.release()
+    except Exception:
+        logger.warning("Restitution de la connexion DB au pool échouée.")
+
+
+def _bootstrap_schema(db_connection: DatabaseConnection) -> Tuple[bool, str]:
+    """
+    Vérifie que le schéma est à la version attendue sans logique UI.
+    Aucun DDL : une base en retard est signalée, les migrations sont lancées
+    au déploiement (voir migration_service).
+    """
+    try:
+        return assurer_schema_a_jour(db_connection)
     except Exception:
         logger.exception("Erreur pendant le bootstrap du schéma DB")
         return False, "Erreur d'initialisation du schéma de base de données."
@@ -96,8 +214,8 @@ def ensure_database_connection(state: MutableMapping[str, Any]) -> Tuple[bool, s
         state["db_available"] = False
         return False, message
 
-    connection = DatabaseConnection("postgresql", config)
-    if not connection.connect():
+    connection = _open_connection(config)
+    if connection is None:
         logger.error("Connexion DB échouée pour la cible '%s'.", _resolve_db_target())
         error_msg = (
             "Connexion a la base impossible. Verifiez les variables d'environnement "
@@ -109,6 +227,7 @@ def ensure_database_connection(state: MutableMapping[str, Any]) -> Tuple[bool, s
 
     state["db_connection"] = connection
     state["db_type"] = _resolve_db_target()
+    _mark_alive(state)
 
     ok, bootstrap_error = _bootstrap_schema(connection)
     state["db_initialized"] = ok
@@ -130,12 +249,13 @@ def ensure_database_connection(state: MutableMapping[str, Any]) -> Tuple[bool, s
 def ensure_db_or_fail_gracefully(state: MutableMapping[str, Any], max_retries: int = 2) -> Tuple[bool, str]:
     """
     Guard central de résilience DB :
-    - probe connexion courante,
+    - connexion courante considérée vivante pendant DB_LIVENESS_TTL_SECONDS,
+      sonde SELECT 1 seulement une fois le TTL expiré,
     - reconnexion légère (max_retries),
     - renvoie un état contrôlé sans exception.
     """
     db_connection = state.get("db_connection")
-    if db_connection and _probe_connection(db_connection):
+    if db_connection and _check_alive(state, db_connection):
         state["db_available"] = True
         state["db_last_error"] = None
         return True, ""
@@ -153,14 +273,19 @@ def ensure_db_or_fail_gracefully(state: MutableMapping[str, Any], max_retries: i
 
         state["db_connection"] = None
         state["db_initialized"] = False
+        state.pop("db_checked_at", None)
 
         ok, message = ensure_database_connection(state)
         if ok:
             refreshed = state.get("db_connection")
-            if refreshed and _probe_connection(refreshed):
+            if refreshed and _check_alive(state, refreshed):
                 state["db_available"] = True
                 state["db_last_error"] = None
-                logger.info("Reconnexion DB réussie (tentative %s).", attempt)
+                _count("reconnects")
+                logger.info(
+                    "Reconnexion DB réussie (tentative %s, reconnexions: %s).",
+                    attempt, _liveness_stats["reconnects"],
+                )
                 return True, ""
             last_error = "Connexion base instable après reconnexion."
             state["db_available"] = False
@@ -0,0 +1,255 @@
+"""
+File d'envoi des e-mails (table email_outbox).
+
+Les vues appellent `mettre_en_file` (une insertion, retour immédiat) au lieu
+d'ouvrir une session SMTP dans le thread Streamlit. Un répartiteur par
+processus réserve les e-mails dus (FOR UPDATE SKIP LOCKED, limite par salon)
+et les confie à un pool de workers ; un échec est retenté avec un délai
+exponentiel jusqu'à `max_attempts`.
+
+Exécution manuelle (ex. worker Render séparé) :
+    python -m services.email_outbox_service
+"""
+
+import random
+import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config import EMAIL_OUTBOX_CONFIG
+from controllers.email_controller import EmailController
+from models.database import DatabaseConnection
+from models.email_outbox_model import EmailOutboxModel
+from models.media_model import MediaBlobModel
+from models.salon_model import SalonModel
+from services.database_service import open_background_connection
+from services.migration_service import assurer_schema_a_jour
+from utils.logging_utils import get_logger
+
+
+logger = get_logger(__name__)
+
+# Erreurs qu'un nouvel essai ne corrigera pas
+_ERREURS_DEFINITIVES = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)
+
+_repartiteur: Optional[threading.Thread] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_demarrage_lock = threading.Lock()
+_reveil = threading.Event()
+_arret = threading.Event()
+_en_cours = 0
+_en_cours_lock = threading.Lock()
+
+
+# ----------------------------------------------------------------------------
+# Mise en file (appelée depuis les vues)
+# ----------------------------------------------------------------------------
+
+def mettre_en_file(db_connection: DatabaseConnection, salon_id: Optional[str], to_email: str,
+                   subject: str, body: str, attachments: Optional[List[str]] = None) -> Optional[int]:
+    """
+    Enregistre un e-mail à envoyer et réveille les workers.
+
+    Les pièces jointes (chemins de fichiers) sont copiées dans media_blobs :
+    l'envoi ne dépend pas du disque de l'instance qui a créé le message.
+
+    Returns:
+        ID de la ligne email_outbox ou None
+    """
+    pieces_jointes: List[Tuple[str, int]] = []
+    media_model = MediaBlobModel(db_connection)
+    for chemin in attachments or []:
+        path = Path(chemin)
+        if not path.is_file():
+            continue
+        blob_id = media_model.enregistrer(path.read_bytes(), 'application/pdf', path.name)
+        if blob_id:
+            pieces_jointes.append((path.name, blob_id))
+
+    outbox_id = EmailOutboxModel(db_connection).ajouter(
+        salon_id, to_email, subject, body, pieces_jointes,
+        max_attempts=EMAIL_OUTBOX_CONFIG['max_attempts'],
+    )
+    if outbox_id:
+        _reveil.set()
+    return outbox_id
+
+
+def mettre_en_file_avec_message(db_connection: DatabaseConnection, email_controller: EmailController,
+                                salon_id: Optional[str], to_email: str, subject: str, body: str,
+                                attachments: Optional[List[str]] = None) -> Tuple[bool, str]:
+    """
+    Équivalent non bloquant de `EmailController.envoyer_email_avec_message` :
+    vérifie la configuration SMTP (sans connexion réseau) puis met en file.
+    """
+    ok_config, msg_config = email_controller.verifier_configuration()
+    if not ok_config:
+        return False, msg_config
+    if not to_email:
+        return False, "Adresse email du client manquante."
+    if mettre_en_file(db_connection, salon_id, to_email, subject, body, attachments):
+        return True, "Email en cours d'envoi."
+    return False, "Email non mis en file d'envoi (erreur base de données)."
+
+
+# ----------------------------------------------------------------------------
+# Workers
+# ----------------------------------------------------------------------------
+
+def delai_backoff(tentatives: int) -> float:
+    """Délai avant le prochain essai : base × 2^(n-1), plafonné, ±20 % d'aléa."""
+    base = EMAIL_OUTBOX_CONFIG['backoff_base_seconds']
+    delai = min(EMAIL_OUTBOX_CONFIG['backoff_max_seconds'], base * (2 ** max(0, tentatives - 1)))
+    return delai * random.uniform(0.8, 1.2)
+
+
+def _fermer(db_connection: DatabaseConnection) -> None:
+    if db_connection.pooled:
+        db_connection.release()
+    else:
+        db_connection.disconnect()
+
+
+def _envoyer(db_connection: DatabaseConnection, message: Dict) -> None:
+    """Envoie un e-mail réservé et enregistre le résultat."""
+    outbox_model = EmailOutboxModel(db_connection)
+    smtp_config = None
+    if message['salon_id']:
+        smtp_config = SalonModel(db_connection).obtenir_config_email_salon(message['salon_id'])
+    email_controller = EmailController(smtp_config=smtp_config)
+
+    ok_config, msg_config = email_controller.verifier_configuration()
+    if not ok_config:
+        outbox_model.marquer_echec(message['id'], msg_config)
+        return
+
+    media_model = MediaBlobModel(db_connection)
+    contenus = []
+    for nom_fichier, blob_id in message['pieces_jointes']:
+        data = media_model.lire(blob_id)
+        if data:
+            contenus.append((nom_fichier, data))
+
+    try:
+        email_controller.envoyer_message(message['to_email'], message['subject'], message['body'], contenus)
+    except _ERREURS_DEFINITIVES as e:
+        logger.error("Email #%s refusé définitivement: %s", message['id'], e)
+        outbox_model.marquer_echec(message['id'], str(e))
+        return
+    except Exception as e:
+        if message['attempts'] >= message['max_attempts']:
+            logger.error("Email #%s abandonné après %s essais: %s", message['id'], message['attempts'], e)
+            outbox_model.marquer_echec(message['id'], str(e))
+        else:
+            delai = delai_backoff(message['attempts'])
+            logger.warning("Email #%s en échec (essai %s), nouvel essai dans %.0fs: %s",
+                           message['id'], message['attempts'], delai, e)
+            outbox_model.marquer_echec(message['id'], str(e), delai)
+        return
+    outbox_model.marquer_envoye(message['id'])
+
+
+def _traiter(message: Dict) -> None:
+    global _en_cours
+    try:
+        db_connection = open_background_connection()
+        if db_connection is None:
+            # La ligne reste en `sending` et sera reprise après stale_after_seconds
+            logger.warning("Email #%s : base indisponible.", message['id'])
+            return
+        try:
+            _envoyer(db_connection, message)
+        finally:
+            _fermer(db_connection)
+    except Exception:
+        logger.exception("Erreur worker email #%s", message['id'])
+    finally:
+        with _en_cours_lock:
+            _en_cours -= 1
+        _reveil.set()
+
+
+def _reserver(libres: int) -> List[Dict]:
+    db_connection = open_background_connection()
+    if db_connection is None:
+        return []
+    try:
+        return EmailOutboxModel(db_connection).reserver(
+            libres,
+            EMAIL_OUTBOX_CONFIG['per_salon_concurrency'],
+            EMAIL_OUTBOX_CONFIG['stale_after_seconds'],
+        )
+    finally:
+        _fermer(db_connection)
+
+
+def _boucle() -> None:
+    """Répartiteur : réserve autant d'e-mails que de workers libres."""
+    global _en_cours
+    workers = EMAIL_OUTBOX_CONFIG['workers']
+    while not _arret.is_set():
+        _reveil.clear()
+        reserves = []
+        try:
+            with _en_cours_lock:
+                libres = workers - _en_cours
+            reserves = _reserver(libres) if libres > 0 else []
+            for message in reserves:
+                with _en_cours_lock:
+                    _en_cours += 1
+                _executor.submit(_traiter, message)
+        except Exception:
+            logger.exception("Erreur du répartiteur de la file email")
+        if not reserves:
+            _reveil.wait(EMAIL_OUTBOX_CONFIG['poll_interval_seconds'])
+
+
+def demarrer_workers() -> bool:
+    """
+    Démarre le répartiteur et le pool de workers une seule fois par processus.
+
+    Returns:
+        True si les workers ont été démarrés par cet appel
+    """
+    global _repartiteur, _executor
+    with _demarrage_lock:
+        if _repartiteur is not None and _repartiteur.is_alive():
+            return False
+        _arret.clear()
+        _executor = ThreadPoolExecutor(
+            max_workers=EMAIL_OUTBOX_CONFIG['workers'], thread_name_prefix="email-outbox"
+        )
+        _repartiteur = threading.Thread(target=_boucle, name="email-outbox-dispatcher", daemon=True)
+        _repartiteur.start()
+        return True
+
+
+def arreter_workers() -> None:
+    """Arrête le répartiteur ; les envois en cours se terminent."""
+    _arret.set()
+    _reveil.set()
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    import time
+
+    connexion = open_background_connection()
+    if connexion is None:
+        raise SystemExit("Connexion à la base impossible.")
+    try:
+        succes, erreur = assurer_schema_a_jour(connexion)
+    finally:
+        _fermer(connexion)
+    if not succes:
+        raise SystemExit(erreur)
+
+    demarrer_workers()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        arreter_workers()
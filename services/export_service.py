@@ -0,0 +1,289 @@
+"""
+Export en flux des rapports (CSV, XLSX, Parquet).
+
+Chaque table du rapport est extraite une par une vers un fichier CSV
+temporaire — `COPY (requête) TO STDOUT` sous PostgreSQL, lecture par lots
+(`fetchmany`) sous MySQL — puis recopiée dans le fichier final :
+
+- csv     : archive ZIP, un fichier CSV par table ;
+- xlsx    : classeur openpyxl en mode write_only, une feuille par table
+            (découpée au-delà de la limite de lignes d'Excel) ;
+- parquet : archive ZIP, un fichier Parquet par table (pyarrow, optionnel).
+
+Aucune table n'est chargée entièrement en mémoire : seules les petites
+tables calculées (statistiques, évolution mensuelle) sont passées en listes.
+
+Exécution manuelle (rapport complet du super admin) :
+    python -m services.export_service --format xlsx [--salon SALON_ID] [--sortie rapport.xlsx]
+"""
+
+import argparse
+import csv
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from typing import Callable, Dict, List, Optional
+
+from models.database import DatabaseConnection
+from utils.logging_utils import get_logger
+
+
+logger = get_logger(__name__)
+
+FORMATS_EXPORT = {
+    'csv': ('.zip', 'application/zip'),
+    'xlsx': ('.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'parquet': ('.zip', 'application/zip'),
+}
+
+# Lignes lues par aller-retour (repli MySQL) et entre deux signaux de progression
+TAILLE_LOT = 5000
+
+# Limite d'Excel (1 048 576 lignes, en-tête compris)
+LIGNES_MAX_FEUILLE = 1_048_575
+
+Progression = Callable[[str, float], None]
+
+
+def _extraire_requete(db_connection: DatabaseConnection, table: Dict, fichier) -> int:
+    """Écrit les lignes de la requête de `table` (CSV sans en-tête) dans `fichier` binaire."""
+    params = tuple(table.get('params', ()))
+    if db_connection.db_type == 'postgresql':
+        from psycopg2.extensions import encodings
+
+        with db_connection.lease() as conn:
+            cursor = conn.cursor()
+            try:
+                requete = cursor.mogrify(table['requete'], params).decode(encodings[conn.encoding])
+                cursor.copy_expert(f"COPY ({requete}) TO STDOUT WITH (FORMAT CSV, ENCODING 'UTF8')", fichier)
+                nb_lignes = cursor.rowcount
+            finally:
+                cursor.close()
+                conn.rollback()
+        return nb_lignes
+
+    texte = io.TextIOWrapper(fichier, encoding='utf-8', newline='', write_through=True)
+    ecrivain = csv.writer(texte)
+    cursor = db_connection.get_connection().cursor()
+    nb_lignes = 0
+    try:
+        cursor.execute(table['requete'], params)
+        while True:
+            lignes = cursor.fetchmany(TAILLE_LOT)
+            if not lignes:
+                break
+            ecrivain.writerows(lignes)
+            nb_lignes += len(lignes)
+    finally:
+        cursor.close()
+        texte.detach()
+    return nb_lignes
+
+
+def _extraire_lignes(table: Dict, fichier) -> int:
+    """Écrit les lignes (liste de dicts) de `table` en CSV sans en-tête dans `fichier` binaire."""
+    texte = io.TextIOWrapper(fichier, encoding='utf-8', newline='', write_through=True)
+    ecrivain = csv.writer(texte)
+    for ligne in table['lignes']:
+        ecrivain.writerow([ligne.get(colonne) for colonne in table['colonnes']])
+    texte.detach()
+    return len(table['lignes'])
+
+
+def _lire_csv(chemin: str):
+    with open(chemin, encoding='utf-8', newline='') as fichier:
+        yield from csv.reader(fichier)
+
+
+def _valeur_cellule(valeur: str, numerique: bool):
+    """Valeur de cellule Excel : nombres pour les colonnes numériques, None pour les vides."""
+    if valeur == '':
+        return None
+    if numerique:
+        try:
+            return float(valeur)
+        except ValueError:
+            return valeur
+    return valeur
+
+
+class _EcrivainCsv:
+    def __init__(self, destination: str):
+        self.archive = zipfile.ZipFile(destination, 'w', compression=zipfile.ZIP_DEFLATED)
+
+    def ajouter(self, table: Dict, chemin_csv: str, signaler: Callable[[int], None]) -> None:
+        with self.archive.open(f"{table['nom']}.csv", 'w', force_zip64=True) as sortie:
+            sortie.write(('\ufeff' + ','.join(table['colonnes']) + '\r\n').encode('utf-8'))
+            with open(chemin_csv, 'rb') as source:
+                shutil.copyfileobj(source, sortie, 1024 * 1024)
+
+    def fermer(self) -> None:
+        self.archive.close()
+
+
+class _EcrivainXlsx:
+    def __init__(self, destination: str):
+        from openpyxl import Workbook
+
+        self.destination = destination
+        self.classeur = Workbook(write_only=True)
+
+    def _feuille(self, table: Dict, numero: int):
+        titre = table['nom'][:28] if numero == 1 else f"{table['nom'][:25]}_{numero}"
+        feuille = self.classeur.create_sheet(titre)
+        feuille.append(table['colonnes'])
+        return feuille
+
+    def ajouter(self, table: Dict, chemin_csv: str, signaler: Callable[[int], None]) -> None:
+        numeriques = [colonne in table.get('numeriques', ()) for colonne in table['colonnes']]
+        numero = 1
+        feuille = self._feuille(table, numero)
+        lignes_feuille = 0
+        for nb_lignes, ligne in enumerate(_lire_csv(chemin_csv), start=1):
+            if lignes_feuille == LIGNES_MAX_FEUILLE:
+                numero += 1
+                feuille = self._feuille(table, numero)
+                lignes_feuille = 0
+            feuille.append([_valeur_cellule(v, n) for v, n in zip(ligne, numeriques)])
+            lignes_feuille += 1
+            if nb_lignes % TAILLE_LOT == 0:
+                signaler(nb_lignes)
+
+    def fermer(self) -> None:
+        self.classeur.save(self.destination)
+
+
+class _EcrivainParquet:
+    def __init__(self, destination: str):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError("L'export Parquet nécessite pyarrow (pip install pyarrow).") from e
+        self.archive = zipfile.ZipFile(destination, 'w', compression=zipfile.ZIP_STORED, allowZip64=True)
+
+    def ajouter(self, table: Dict, chemin_csv: str, signaler: Callable[[int], None]) -> None:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+        import pyarrow.parquet as pq
+
+        numeriques = set(table.get('numeriques', ()))
+        types = {c: (pa.float64() if c in numeriques else pa.string()) for c in table['colonnes']}
+        schema = pa.schema([(c, types[c]) for c in table['colonnes']])
+        lecteur = pa_csv.open_csv(
+            chemin_csv,
+            read_options=pa_csv.ReadOptions(column_names=table['colonnes'], block_size=8 * 1024 * 1024),
+            convert_options=pa_csv.ConvertOptions(column_types=types, strings_can_be_null=True),
+        )
+        descripteur, chemin_parquet = tempfile.mkstemp(suffix='.parquet')
+        os.close(descripteur)
+        try:
+            nb_lignes = 0
+            with pq.ParquetWriter(chemin_parquet, schema) as ecrivain:
+                for lot in lecteur:
+                    ecrivain.write_batch(lot)
+                    nb_lignes += lot.num_rows
+                    signaler(nb_lignes)
+            self.archive.write(chemin_parquet, f"{table['nom']}.parquet")
+        finally:
+            os.remove(chemin_parquet)
+
+    def fermer(self) -> None:
+        self.archive.close()
+
+
+ECRIVAINS = {'csv': _EcrivainCsv, 'xlsx': _EcrivainXlsx, 'parquet': _EcrivainParquet}
+
+
+def exporter_tables(
+    db_connection: DatabaseConnection,
+    destination: str,
+    tables: List[Dict],
+    format_export: str = 'csv',
+    progression: Optional[Progression] = None,
+) -> Dict[str, int]:
+    """
+    Écrit les tables dans `destination`, une par une, en mémoire constante.
+
+    Args:
+        tables: Dicts {'nom', 'colonnes', 'numeriques' (optionnel)} avec soit
+            'requete' (+ 'params') pour les tables volumineuses, soit 'lignes'
+            (liste de dicts) pour les petites tables déjà calculées
+        format_export: 'csv', 'xlsx' ou 'parquet' (voir FORMATS_EXPORT)
+        progression: Appelée avec (message, fraction entre 0 et 1)
+
+    Returns:
+        Nombre de lignes exportées par table
+    """
+    if format_export not in ECRIVAINS:
+        raise ValueError(f"Format d'export inconnu : {format_export}")
+
+    def signaler(message: str, fraction: float) -> None:
+        if progression:
+            progression(message, min(1.0, fraction))
+
+    ecrivain = ECRIVAINS[format_export](destination)
+    resultats: Dict[str, int] = {}
+    try:
+        for index, table in enumerate(tables):
+            debut = index / len(tables)
+            signaler(f"{table['nom']} : extraction...", debut)
+            descripteur, chemin_csv = tempfile.mkstemp(suffix='.csv')
+            try:
+                with os.fdopen(descripteur, 'wb') as fichier:
+                    if 'requete' in table:
+                        nb_lignes = _extraire_requete(db_connection, table, fichier)
+                    else:
+                        nb_lignes = _extraire_lignes(table, fichier)
+                ecrivain.ajouter(
+                    table, chemin_csv,
+                    lambda n, t=table, total=nb_lignes, d=debut: signaler(
+                        f"{t['nom']} : {n:,} / {total:,} lignes".replace(',', ' '),
+                        d + (n / total if total else 1) / len(tables),
+                    ),
+                )
+            finally:
+                os.remove(chemin_csv)
+            resultats[table['nom']] = nb_lignes
+            logger.info("Export %s : table %s, %s lignes", format_export, table['nom'], nb_lignes)
+        ecrivain.fermer()
+    except Exception:
+        try:
+            ecrivain.fermer()
+        except Exception:
+            pass
+        if os.path.exists(destination):
+            os.remove(destination)
+        raise
+    signaler("Export terminé", 1.0)
+    return resultats
+
+
+if __name__ == "__main__":
+    from datetime import datetime
+
+    from config import DATABASE_CONFIG, IS_RENDER
+    from controllers.super_admin_controller import SuperAdminController
+
+    parser = argparse.ArgumentParser(description="Exporte le rapport complet du super admin.")
+    parser.add_argument("--format", choices=sorted(FORMATS_EXPORT), default="csv")
+    parser.add_argument("--salon", default=None, help="ID du salon (défaut : tous les salons)")
+    parser.add_argument("--sortie", default=None, help="Fichier de sortie")
+    args = parser.parse_args()
+
+    sortie = args.sortie or (
+        f"rapport_{args.salon or 'global'}_{datetime.now():%Y%m%d_%H%M%S}{FORMATS_EXPORT[args.format][0]}"
+    )
+    cible = "render_production" if IS_RENDER else "postgresql_local"
+    connexion = DatabaseConnection("postgresql", DATABASE_CONFIG.get(cible, {}))
+    if not connexion.connect():
+        raise SystemExit("Connexion à la base impossible.")
+    try:
+        lignes = SuperAdminController(connexion).exporter_rapport_complet(
+            sortie, args.format, args.salon,
+            progression=lambda message, fraction: print(f"[{fraction:6.1%}] {message}"),
+        )
+    finally:
+        connexion.disconnect()
+    print(f"Rapport écrit dans {sortie} : " + ", ".join(f"{t}={n}" for t, n in lignes.items()))
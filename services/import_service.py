@@ -0,0 +1,377 @@
+"""
+Import en masse de commandes historiques (CSV ou Excel).
+
+Les salons qui passent du papier ou d'un tableur à l'application importent
+leurs commandes en une fois : chaque ligne est validée et normalisée, les
+lignes valides sont chargées par lots (CommandeModel.importer_lot : une
+transaction et une requête multi-lignes par table et par lot), les clients
+étant dédoublonnés par téléphone dans le salon. Les lignes refusées sont
+rassemblées dans un rapport CSV (numéro de ligne, motif, valeurs d'origine).
+
+Colonnes reconnues (en-têtes sans accents ni casse, espaces = "_") :
+    obligatoires : nom, telephone, modele, prix_total, sexe
+    optionnelles : prenom, email, categorie (adulte), avance (0),
+                   statut (En cours), date_creation (maintenant),
+                   date_livraison, mesures (objet JSON)
+
+Exécution manuelle :
+    python -m services.import_service FICHIER --couturier ID [--rejets rejets.csv]
+"""
+
+import argparse
+import csv
+import io
+import json
+import re
+import unicodedata
+from datetime import date, datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from models.database import CommandeModel, DatabaseConnection
+from models.stats_model import COLONNES_STATUT
+from utils.logging_utils import get_logger
+
+
+logger = get_logger(__name__)
+
+# Lignes par transaction
+TAILLE_LOT = 1000
+
+COLONNES_OBLIGATOIRES = ('nom', 'telephone', 'modele', 'prix_total', 'sexe')
+
+# Variantes d'en-têtes courantes -> colonne
+ALIAS_COLONNES = {
+    'tel': 'telephone', 'telephone_client': 'telephone', 'portable': 'telephone',
+    'nom_client': 'nom', 'prenom_client': 'prenom',
+    'prix': 'prix_total', 'montant': 'prix_total', 'total': 'prix_total',
+    'acompte': 'avance', 'date': 'date_creation', 'date_commande': 'date_creation',
+    'livraison': 'date_livraison',
+}
+
+SEXES = {'adulte': ('homme', 'femme'), 'enfant': ('garcon', 'fille')}
+
+FORMATS_DATE = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y %H:%M')
+
+Progression = Callable[[str, float], None]
+
+
+class LigneInvalide(ValueError):
+    """Ligne refusée ; le message est le motif reporté dans le rapport de rejets."""
+
+
+def _cle_colonne(entete) -> str:
+    texte = unicodedata.normalize('NFKD', str(entete or '')).encode('ascii', 'ignore').decode()
+    cle = re.sub(r'[^a-z0-9]+', '_', texte.strip().lower()).strip('_')
+    return ALIAS_COLONNES.get(cle, cle)
+
+
+def _sans_accents(texte: str) -> str:
+    return unicodedata.normalize('NFKD', texte).encode('ascii', 'ignore').decode().lower()
+
+
+# ----------------------------------------------------------------------------
+# Lecture
+# ----------------------------------------------------------------------------
+
+def _lire_csv(fichier) -> Tuple[int, Iterator[Tuple[int, Dict]]]:
+    debut = fichier.read(64 * 1024)
+    try:
+        debut.decode('utf-8')
+        encodage = 'utf-8-sig'
+    except UnicodeDecodeError as e:
+        # Coupure au milieu d'un caractère en fin de bloc : reste de l'UTF-8
+        encodage = 'utf-8-sig' if e.start >= len(debut) - 3 else 'cp1252'
+    fichier.seek(0)
+    total = sum(bloc.count(b'\n') for bloc in iter(lambda: fichier.read(1024 * 1024), b''))
+    fichier.seek(0)
+
+    texte = io.TextIOWrapper(fichier, encoding=encodage, newline='')
+    try:
+        dialecte = csv.Sniffer().sniff(debut.decode(encodage, 'ignore').split('\n', 1)[0], delimiters=',;\t')
+    except csv.Error:
+        dialecte = csv.excel
+    lecteur = csv.reader(texte, dialecte)
+    colonnes = [_cle_colonne(c) for c in next(lecteur, [])]
+
+    def lignes():
+        for numero, valeurs in enumerate(lecteur, start=2):
+            if any(v.strip() for v in valeurs):
+                yield numero, dict(zip(colonnes, valeurs))
+        texte.detach()
+
+    return max(total - 1, 0), lignes()
+
+
+def _lire_xlsx(fichier) -> Tuple[int, Iterator[Tuple[int, Dict]]]:
+    from openpyxl import load_workbook
+
+    classeur = load_workbook(fichier, read_only=True, data_only=True)
+    feuille = classeur.worksheets[0]
+    lignes_feuille = feuille.iter_rows(values_only=True)
+    colonnes = [_cle_colonne(c) for c in next(lignes_feuille, ())]
+
+    def lignes():
+        for numero, valeurs in enumerate(lignes_feuille, start=2):
+            if any(v not in (None, '') for v in valeurs):
+                yield numero, dict(zip(colonnes, valeurs))
+        classeur.close()
+
+    return max((feuille.max_row or 1) - 1, 0), lignes()
+
+
+def lire_fichier(fichier, nom_fichier: str) -> Tuple[int, Iterator[Tuple[int, Dict]]]:
+    """
+    Lit un fichier CSV (séparateur , ; ou tabulation, UTF-8 ou Windows-1252)
+    ou Excel (première feuille) ligne par ligne.
+
+    Args:
+        fichier: Flux binaire positionnable (fichier ouvert, UploadedFile Streamlit)
+        nom_fichier: Nom d'origine, dont l'extension choisit le format
+
+    Returns:
+        (nombre de lignes estimé, itérateur de (numéro de ligne, {colonne: valeur}))
+    """
+    if nom_fichier.lower().endswith(('.xlsx', '.xlsm')):
+        return _lire_xlsx(fichier)
+    return _lire_csv(fichier)
+
+
+# ----------------------------------------------------------------------------
+# Validation
+# ----------------------------------------------------------------------------
+
+def _texte(valeur, colonne: str, longueur_max: int, obligatoire: bool = False) -> Optional[str]:
+    texte = '' if valeur is None else str(valeur).strip()
+    if not texte:
+        if obligatoire:
+            raise LigneInvalide(f"{colonne} manquant")
+        return None
+    if len(texte) > longueur_max:
+        raise LigneInvalide(f"{colonne} trop long ({len(texte)} > {longueur_max} caractères)")
+    return texte
+
+
+def _montant(valeur, colonne: str, obligatoire: bool = False) -> float:
+    if isinstance(valeur, (int, float)):
+        montant = float(valeur)
+    else:
+        texte = re.sub(r'\s|fcfa|f$', '', str(valeur or '').strip().lower()).replace(',', '.')
+        if not texte:
+            if obligatoire:
+                raise LigneInvalide(f"{colonne} manquant")
+            return 0.0
+        try:
+            montant = float(texte)
+        except ValueError:
+            raise LigneInvalide(f"{colonne} invalide : {valeur}")
+    if montant < 0 or montant >= 1e8:
+        raise LigneInvalide(f"{colonne} hors limites : {valeur}")
+    return round(montant, 2)
+
+
+def _date(valeur, colonne: str) -> Optional[datetime]:
+    if valeur in (None, ''):
+        return None
+    if isinstance(valeur, datetime):
+        return valeur
+    if isinstance(valeur, date):
+        return datetime.combine(valeur, datetime.min.time())
+    texte = str(valeur).strip()
+    for format_date in FORMATS_DATE:
+        try:
+            return datetime.strptime(texte, format_date)
+        except ValueError:
+            continue
+    raise LigneInvalide(f"{colonne} invalide : {valeur} (attendu AAAA-MM-JJ ou JJ/MM/AAAA)")
+
+
+def normaliser_telephone(valeur) -> str:
+    """Téléphone sans espaces ni séparateurs ('+' initial conservé)."""
+    if isinstance(valeur, float) and valeur.is_integer():
+        valeur = int(valeur)  # cellule Excel numérique
+    texte = str(valeur or '').strip()
+    chiffres = re.sub(r'\D', '', texte)
+    if not 8 <= len(chiffres) <= 15:
+        raise LigneInvalide(f"telephone invalide : {valeur}")
+    return ('+' if texte.startswith('+') else '') + chiffres
+
+
+def valider_ligne(ligne: Dict) -> Dict:
+    """
+    Valide et normalise une ligne lue par `lire_fichier`.
+
+    Returns:
+        Dict attendu par CommandeModel.importer_lot
+
+    Raises:
+        LigneInvalide: motif du rejet
+    """
+    for colonne in COLONNES_OBLIGATOIRES:
+        if colonne not in ligne:
+            raise LigneInvalide(f"colonne {colonne} absente du fichier")
+
+    categorie = _sans_accents(_texte(ligne.get('categorie'), 'categorie', 20) or 'adulte')
+    if categorie not in SEXES:
+        raise LigneInvalide(f"categorie invalide : {ligne.get('categorie')} (adulte ou enfant)")
+    sexe = _sans_accents(_texte(ligne.get('sexe'), 'sexe', 20, obligatoire=True))
+    if sexe not in SEXES[categorie]:
+        raise LigneInvalide(f"sexe invalide pour {categorie} : {ligne.get('sexe')} ({' ou '.join(SEXES[categorie])})")
+
+    prix_total = _montant(ligne.get('prix_total'), 'prix_total', obligatoire=True)
+    if prix_total <= 0:
+        raise LigneInvalide("prix_total doit être positif")
+    avance = _montant(ligne.get('avance'), 'avance')
+    if avance > prix_total:
+        raise LigneInvalide("avance supérieure au prix_total")
+
+    statut = _texte(ligne.get('statut'), 'statut', 50) or 'En cours'
+    statut = next((s for s in COLONNES_STATUT if _sans_accents(s) == _sans_accents(statut)), None)
+    if statut is None:
+        raise LigneInvalide(f"statut invalide : {ligne.get('statut')} ({', '.join(COLONNES_STATUT)})")
+    if statut == 'Livré et payé' and avance < prix_total:
+        raise LigneInvalide("statut Livré et payé avec un reste à payer")
+
+    mesures = {}
+    if ligne.get('mesures') not in (None, ''):
+        try:
+            mesures = json.loads(str(ligne['mesures']))
+        except ValueError:
+            raise LigneInvalide("mesures : JSON invalide")
+        if not isinstance(mesures, dict):
+            raise LigneInvalide("mesures : objet JSON attendu")
+
+    date_creation = _date(ligne.get('date_creation'), 'date_creation') or datetime.now()
+    date_livraison = _date(ligne.get('date_livraison'), 'date_livraison')
+
+    return {
+        'nom': _texte(ligne.get('nom'), 'nom', 100, obligatoire=True),
+        'prenom': _texte(ligne.get('prenom'), 'prenom', 100) or '',
+        'telephone': normaliser_telephone(ligne.get('telephone')),
+        'email': _texte(ligne.get('email'), 'email', 150),
+        'categorie': categorie,
+        'sexe': sexe,
+        'modele': _texte(ligne.get('modele'), 'modele', 100, obligatoire=True),
+        'mesures': mesures,
+        'prix_total': prix_total,
+        'avance': avance,
+        'reste': round(prix_total - avance, 2),
+        'statut': statut,
+        'date_creation': date_creation,
+        'date_livraison': date_livraison.date() if date_livraison else None,
+    }
+
+
+# ----------------------------------------------------------------------------
+# Import
+# ----------------------------------------------------------------------------
+
+def importer_commandes(
+    db_connection: DatabaseConnection,
+    couturier_id: int,
+    fichier,
+    nom_fichier: str,
+    taille_lot: int = TAILLE_LOT,
+    progression: Optional[Progression] = None,
+) -> Dict:
+    """
+    Importe les commandes d'un fichier CSV/Excel pour un couturier.
+
+    Un lot refusé par la base est rejoué ligne par ligne pour isoler les
+    lignes fautives ; les autres lignes du lot sont importées.
+
+    Args:
+        couturier_id: Couturier auquel les commandes sont rattachées
+        fichier: Flux binaire positionnable
+        nom_fichier: Nom d'origine (extension .csv, .xlsx)
+        progression: Appelée avec (message, fraction entre 0 et 1)
+
+    Returns:
+        {'lignes': n, 'commandes': n, 'clients_crees': n,
+         'rejets': [{'ligne': numéro, 'motif': str, 'valeurs': dict d'origine}]}
+    """
+    commande_model = CommandeModel(db_connection)
+    total, lignes = lire_fichier(fichier, nom_fichier)
+    resultat = {'lignes': 0, 'commandes': 0, 'clients_crees': 0, 'rejets': []}
+    lot: List[Tuple[int, Dict, Dict]] = []
+
+    def charger(lot_courant: List[Tuple[int, Dict, Dict]]) -> None:
+        bilan = commande_model.importer_lot(couturier_id, [valide for _, _, valide in lot_courant])
+        if bilan is None and len(lot_courant) > 1:
+            for element in lot_courant:
+                charger([element])
+            return
+        if bilan is None:
+            numero, brute, _ = lot_courant[0]
+            resultat['rejets'].append({'ligne': numero, 'motif': "refusée par la base de données", 'valeurs': brute})
+            return
+        resultat['commandes'] += bilan['commandes']
+        resultat['clients_crees'] += bilan['clients_crees']
+
+    def signaler() -> None:
+        if progression:
+            progression(
+                f"{resultat['lignes']} lignes lues, {resultat['commandes']} commandes importées, "
+                f"{len(resultat['rejets'])} rejets",
+                min(1.0, resultat['lignes'] / total) if total else 0.0,
+            )
+
+    for numero, brute in lignes:
+        resultat['lignes'] += 1
+        try:
+            lot.append((numero, brute, valider_ligne(brute)))
+        except LigneInvalide as e:
+            resultat['rejets'].append({'ligne': numero, 'motif': str(e), 'valeurs': brute})
+        if len(lot) >= taille_lot:
+            charger(lot)
+            lot = []
+            signaler()
+    if lot:
+        charger(lot)
+    signaler()
+
+    logger.info(
+        "Import %s (couturier %s) : %s lignes, %s commandes, %s clients créés, %s rejets",
+        nom_fichier, couturier_id, resultat['lignes'], resultat['commandes'],
+        resultat['clients_crees'], len(resultat['rejets']),
+    )
+    return resultat
+
+
+def rapport_rejets_csv(rejets: List[Dict]) -> str:
+    """Rapport des lignes refusées : numéro, motif puis les colonnes d'origine."""
+    colonnes: List[str] = []
+    for rejet in rejets:
+        colonnes.extend(c for c in rejet['valeurs'] if c not in colonnes)
+    sortie = io.StringIO()
+    ecrivain = csv.writer(sortie)
+    ecrivain.writerow(['ligne', 'motif'] + colonnes)
+    for rejet in rejets:
+        ecrivain.writerow([rejet['ligne'], rejet['motif']] + [rejet['valeurs'].get(c, '') for c in colonnes])
+    return sortie.getvalue()
+
+
+if __name__ == "__main__":
+    from config import DATABASE_CONFIG, IS_RENDER
+
+    parser = argparse.ArgumentParser(description="Importe des commandes historiques (CSV ou Excel).")
+    parser.add_argument("fichier")
+    parser.add_argument("--couturier", type=int, required=True, help="ID du couturier des commandes")
+    parser.add_argument("--rejets", default=None, help="Fichier CSV du rapport de rejets")
+    parser.add_argument("--lot", type=int, default=TAILLE_LOT, help="Lignes par transaction")
+    args = parser.parse_args()
+
+    cible = "render_production" if IS_RENDER else "postgresql_local"
+    connexion = DatabaseConnection("postgresql", DATABASE_CONFIG.get(cible, {}))
+    if not connexion.connect():
+        raise SystemExit("Connexion à la base impossible.")
+    try:
+        with open(args.fichier, 'rb') as source:
+            bilan = importer_commandes(connexion, args.couturier, source, args.fichier, args.lot)
+    finally:
+        connexion.disconnect()
+    print(f"{bilan['commandes']} commandes importées, {bilan['clients_crees']} clients créés, "
+          f"{len(bilan['rejets'])} lignes rejetées sur {bilan['lignes']}.")
+    if bilan['rejets'] and args.rejets:
+        with open(args.rejets, 'w', encoding='utf-8-sig', newline='') as sortie:
+            sortie.write(rapport_rejets_csv(bilan['rejets']))
+        print(f"Rapport des rejets : {args.rejets}")
@@ -0,0 +1,512 @@
+"""
+Migrations de schéma versionnées.
+
+Le DDL (database_schema.sql + méthodes `creer_tables` des modèles) n'est plus
+rejoué à chaque nouvelle session : chaque migration n'est appliquée qu'une
+fois par base, et la version atteinte est enregistrée dans `schema_version`.
+
+Les migrations (dont certaines réécrivent des tables entières) sont lancées
+par l'étape de déploiement (preDeployCommand de render.yaml), jamais par une
+session : les sessions et les tâches de fond se contentent d'une
+vérification de version mise en cache dans le processus et refusent de
+travailler sur un schéma en retard.
+
+    python -m services.migration_service
+"""
+
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from models.database import (
+    AppLogoModel,
+    ChargesModel,
+    ClientModel,
+    CommandeModel,
+    CouturierModel,
+    DatabaseConnection,
+    expr_recherche_client,
+)
+from models.email_outbox_model import EmailOutboxModel
+from models.job_model import JobRunModel
+from models.media_model import MediaBlobModel
+from models.stats_model import StatsDailyModel
+from utils.logging_utils import get_logger
+
+
+logger = get_logger(__name__)
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "database_schema.sql")
+
+# Clé du verrou consultatif PostgreSQL : un seul processus migre à la fois.
+_MIGRATION_LOCK_KEY = 7_301_001
+
+# Versions déjà vérifiées dans ce processus, par base cible.
+_versions_verifiees: Dict[Tuple, int] = {}
+_cache_lock = threading.Lock()
+
+
+# ----------------------------------------------------------------------------
+# Migrations (ordre croissant, jamais renuméroter une version publiée)
+# Chaque migration doit rester idempotente : si le processus s'arrête entre
+# le DDL et l'enregistrement de la version, elle sera rejouée.
+# ----------------------------------------------------------------------------
+
+def _decouper_sql(script: str) -> List[str]:
+    """
+    Découpe un script SQL en instructions (gère commentaires `--`,
+    chaînes '...' et blocs dollar-quotés `$$ ... $$`).
+    """
+    instructions: List[str] = []
+    courante: List[str] = []
+    i, n = 0, len(script)
+    dans_chaine = False
+    dollar: Optional[str] = None
+
+    while i < n:
+        c = script[i]
+        if dollar:
+            if script.startswith(dollar, i):
+                courante.append(dollar)
+                i += len(dollar)
+                dollar = None
+                continue
+        elif dans_chaine:
+            if c == "'":
+                dans_chaine = False
+        elif c == "'":
+            dans_chaine = True
+        elif script.startswith("--", i):
+            fin = script.find("\n", i)
+            i = n if fin == -1 else fin
+            continue
+        elif c == "$":
+            fin = script.find("$", i + 1)
+            tag = script[i:fin + 1] if fin != -1 else ""
+            if tag and (tag == "$$" or tag[1:-1].isidentifier()):
+                courante.append(tag)
+                i += len(tag)
+                dollar = tag
+                continue
+        elif c == ";":
+            instruction = "".join(courante).strip()
+            if instruction:
+                instructions.append(instruction)
+            courante = []
+            i += 1
+            continue
+        courante.append(c)
+        i += 1
+
+    reste = "".join(courante).strip()
+    if reste:
+        instructions.append(reste)
+    return instructions
+
+
+def _appliquer_schema_sql(db_connection: DatabaseConnection) -> bool:
+    """
+    Applique database_schema.sql (PostgreSQL uniquement).
+
+    Chaque instruction passe sous un SAVEPOINT : sur une base créée par une
+    ancienne version de l'application (colonnes manquantes), une instruction
+    en échec est journalisée et ignorée, les colonnes étant ajoutées par les
+    migrations suivantes.
+    """
+    if db_connection.db_type != "postgresql":
+        return True
+    with open(SCHEMA_FILE, encoding="utf-8") as f:
+        instructions = _decouper_sql(f.read())
+
+    # Connexion native : la façade du pool annulerait toute la transaction
+    # à la première erreur, savepoints compris.
+    with db_connection.lease() as conn:
+        return _executer_instructions(conn, instructions, ignorer_erreurs=True)
+
+
+def _executer_instructions(conn, instructions: List[str], ignorer_erreurs: bool = False) -> bool:
+    """
+    Exécute les instructions dans une transaction.
+
+    Args:
+        ignorer_erreurs: réservé au rejeu de database_schema.sql ; chaque
+            instruction passe sous un SAVEPOINT et une erreur est journalisée
+            puis ignorée. Sinon, la première erreur annule tout et la
+            migration échoue (sa version n'est pas enregistrée).
+
+    Returns:
+        True si toutes les instructions (non ignorées) ont réussi
+    """
+    cursor = conn.cursor()
+    instruction = "COMMIT"
+    try:
+        for instruction in instructions:
+            if not ignorer_erreurs:
+                cursor.execute(instruction)
+                continue
+            cursor.execute("SAVEPOINT migration_instruction")
+            try:
+                cursor.execute(instruction)
+                cursor.execute("RELEASE SAVEPOINT migration_instruction")
+            except Exception as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT migration_instruction")
+                logger.warning("Instruction du schéma ignorée (%s): %s", e, instruction.splitlines()[0])
+        conn.commit()
+        return True
+    except Exception as e:
+        conn.rollback()
+        logger.error("Instruction de migration en échec (%s): %s", e, instruction.splitlines()[0])
+        return False
+    finally:
+        cursor.close()
+
+
+_CREATE_INDEX = "CREATE INDEX IF NOT EXISTS "
+
+
+def _creer_index_concurrents(db_connection: DatabaseConnection, instructions: List[str]) -> bool:
+    """
+    Exécute des `CREATE INDEX IF NOT EXISTS <nom> ...` en CONCURRENTLY, hors
+    transaction : les écritures sur la table continuent pendant la
+    construction. Un index laissé invalide par un essai interrompu est
+    supprimé puis reconstruit.
+
+    Returns:
+        True si tous les index sont créés et valides
+    """
+    if db_connection.db_type != "postgresql":
+        return True
+    with db_connection.lease() as conn:
+        conn.commit()
+        conn.autocommit = True
+        cursor = conn.cursor()
+        instruction = ""
+        try:
+            for instruction in instructions:
+                if not instruction.startswith(_CREATE_INDEX):
+                    raise ValueError("instruction CREATE INDEX IF NOT EXISTS attendue")
+                nom = instruction[len(_CREATE_INDEX):].split()[0]
+                cursor.execute("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)", (nom,))
+                row = cursor.fetchone()
+                if row and row[0]:
+                    logger.warning("Index %s invalide (construction interrompue) : reconstruction.", nom)
+                    cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {nom}")
+                cursor.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS " + instruction[len(_CREATE_INDEX):])
+            return True
+        except Exception as e:
+            logger.error("Index en échec (%s): %s", e, instruction.splitlines()[0] if instruction else "")
+            return False
+        finally:
+            cursor.close()
+            conn.autocommit = False
+
+
+def _creer_tables_modeles(db_connection: DatabaseConnection) -> bool:
+    """DDL des modèles (CREATE TABLE / ALTER TABLE IF NOT EXISTS)."""
+    return all((
+        CouturierModel(db_connection).creer_tables(),
+        ClientModel(db_connection).creer_tables(),
+        ChargesModel(db_connection).creer_tables(),
+        AppLogoModel(db_connection).creer_tables(),
+        CommandeModel(db_connection).creer_table_rappels_livraison(),
+    ))
+
+
+def _deplacer_blobs(db_connection: DatabaseConnection) -> bool:
+    """Table media_blobs + déplacement des BLOB stockés dans les lignes."""
+    media_model = MediaBlobModel(db_connection)
+    return media_model.creer_tables() and media_model.migrer_blobs_existants()
+
+
+def _generer_renditions(db_connection: DatabaseConnection) -> bool:
+    """Table media_renditions + déclinaisons des photos déjà enregistrées."""
+    media_model = MediaBlobModel(db_connection)
+    return media_model.creer_tables() and media_model.generer_renditions_manquantes()
+
+
+def _creer_table_job_runs(db_connection: DatabaseConnection) -> bool:
+    """Suivi des tâches planifiées (remplace le fichier temporaire des rappels)."""
+    return JobRunModel(db_connection).creer_tables()
+
+
+def _creer_table_email_outbox(db_connection: DatabaseConnection) -> bool:
+    """File d'envoi asynchrone des e-mails."""
+    return EmailOutboxModel(db_connection).creer_tables()
+
+
+def _creer_stats_daily(db_connection: DatabaseConnection) -> bool:
+    """Agrégats journaliers des tableaux de bord, calculés depuis l'existant."""
+    stats_model = StatsDailyModel(db_connection)
+    return stats_model.creer_tables() and stats_model.reconstruire() is not None
+
+
+def _creer_index_commandes(db_connection: DatabaseConnection) -> bool:
+    """Index de la liste paginée des commandes (couturier, date_creation, id)."""
+    return _creer_index_concurrents(db_connection, [
+        "CREATE INDEX IF NOT EXISTS idx_commandes_couturier_date ON commandes(couturier_id, date_creation, id)",
+    ])
+
+
+def _creer_index_recherche(db_connection: DatabaseConnection) -> bool:
+    """Extension pg_trgm + index GIN de la recherche clients / commandes."""
+    if db_connection.db_type != "postgresql":
+        return True
+    with db_connection.lease() as conn:
+        if not _executer_instructions(conn, ["CREATE EXTENSION IF NOT EXISTS pg_trgm"]):
+            return False
+    return _creer_index_concurrents(db_connection, [
+        f"CREATE INDEX IF NOT EXISTS idx_clients_recherche_trgm "
+        f"ON clients USING GIN (({expr_recherche_client()}) gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS idx_commandes_modele_trgm ON commandes USING GIN (LOWER(modele) gin_trgm_ops)",
+    ])
+
+
+# Index partiels / composites des requêtes les plus fréquentes
+# (mesurés par benchmarks/bench_index_commandes.py)
+INDEX_REQUETES_CHAUDES = [
+    # lister_commandes_ouvertes
+    "CREATE INDEX IF NOT EXISTS idx_commandes_ouvertes_couturier "
+    "ON commandes(couturier_id, date_creation) WHERE est_ouverte = TRUE",
+    # lister_commandes_avec_reste_a_payer
+    "CREATE INDEX IF NOT EXISTS idx_commandes_reste_couturier "
+    "ON commandes(couturier_id, date_creation) WHERE avance > 0 AND reste > 0",
+    # lister_demandes_validation
+    "CREATE INDEX IF NOT EXISTS idx_historique_en_attente "
+    "ON historique_commandes(date_creation) WHERE statut_validation = 'en_attente'",
+    # lister_commandes_calendrier (un couturier, puis tout un salon)
+    "CREATE INDEX IF NOT EXISTS idx_commandes_livraison_couturier "
+    "ON commandes(couturier_id, date_livraison) WHERE est_ouverte = TRUE AND date_livraison IS NOT NULL",
+    "CREATE INDEX IF NOT EXISTS idx_commandes_livraison_ouvertes "
+    "ON commandes(date_livraison) WHERE est_ouverte = TRUE AND date_livraison IS NOT NULL",
+]
+
+
+def _creer_index_requetes_chaudes(db_connection: DatabaseConnection) -> bool:
+    """Index partiels des listes de commandes ouvertes, à payer, à valider et du calendrier."""
+    return _creer_index_concurrents(db_connection, INDEX_REQUETES_CHAUDES)
+
+
+# Renseigne commandes.salon_id depuis le couturier quand l'écriture ne le
+# fournit pas (ou quand la commande change de couturier)
+TRIGGER_COMMANDES_SALON_ID = [
+    """
+    CREATE OR REPLACE FUNCTION commandes_salon_id() RETURNS TRIGGER AS $$
+    BEGIN
+        IF NEW.salon_id IS NULL
+           OR (TG_OP = 'UPDATE' AND NEW.couturier_id IS DISTINCT FROM OLD.couturier_id) THEN
+            SELECT salon_id INTO NEW.salon_id FROM couturiers WHERE id = NEW.couturier_id;
+        END IF;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS trg_commandes_salon_id ON commandes",
+    "CREATE TRIGGER trg_commandes_salon_id BEFORE INSERT OR UPDATE OF couturier_id, salon_id "
+    "ON commandes FOR EACH ROW EXECUTE FUNCTION commandes_salon_id()",
+]
+
+
+def _renseigner_salon_commandes(db_connection: DatabaseConnection) -> bool:
+    """commandes.salon_id renseigné partout (rattrapage + trigger), agrégats recalculés."""
+    if CommandeModel(db_connection).renseigner_salon_id() is None:
+        return False
+    if db_connection.db_type == "postgresql":
+        with db_connection.lease() as conn:
+            if not _executer_instructions(conn, TRIGGER_COMMANDES_SALON_ID):
+                return False
+    # Les clés salon de stats_daily suivent désormais commandes.salon_id
+    return StatsDailyModel(db_connection).reconstruire() is not None
+
+
+def _creer_compteurs_references(db_connection: DatabaseConnection) -> bool:
+    """Compteurs de références de charges par salon, initialisés depuis l'existant."""
+    charges_model = ChargesModel(db_connection)
+    return charges_model.creer_table_references() and charges_model.renseigner_references() is not None
+
+
+def _creer_index_demandes_fermeture(db_connection: DatabaseConnection) -> bool:
+    """Index partiel des demandes de fermeture en attente, par commande."""
+    return _creer_index_concurrents(db_connection, [
+        "CREATE INDEX IF NOT EXISTS idx_historique_fermeture_en_attente ON historique_commandes(commande_id) "
+        "WHERE statut_validation = 'en_attente' AND type_action = 'fermeture_demande'",
+    ])
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[DatabaseConnection], bool]]] = [
+    (1, "Schéma de base (database_schema.sql)", _appliquer_schema_sql),
+    (2, "Tables des modèles (creer_tables)", _creer_tables_modeles),
+    (3, "BLOB déplacés vers media_blobs", _deplacer_blobs),
+    (4, "Déclinaisons des photos (media_renditions)", _generer_renditions),
+    (5, "Suivi des tâches planifiées (job_runs)", _creer_table_job_runs),
+    (6, "File d'envoi des e-mails (email_outbox)", _creer_table_email_outbox),
+    (7, "Agrégats journaliers (stats_daily)", _creer_stats_daily),
+    (8, "Index de pagination des commandes", _creer_index_commandes),
+    (9, "Recherche textuelle (pg_trgm)", _creer_index_recherche),
+    (10, "Index partiels des requêtes fréquentes", _creer_index_requetes_chaudes),
+    (11, "Salon dénormalisé des commandes (commandes.salon_id)", _renseigner_salon_commandes),
+    (12, "Compteurs de références des charges (charge_references)", _creer_compteurs_references),
+    (13, "Index des demandes de fermeture en attente", _creer_index_demandes_fermeture),
+]
+
+VERSION_CIBLE = MIGRATIONS[-1][0]
+
+
+# ----------------------------------------------------------------------------
+# Table schema_version
+# ----------------------------------------------------------------------------
+
+def _creer_table_version(db_connection: DatabaseConnection) -> None:
+    conn = db_connection.get_connection()
+    cursor = conn.cursor()
+    try:
+        if db_connection.db_type == "mysql":
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INT PRIMARY KEY,
+                    description VARCHAR(255) NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+                """
+            )
+        else:
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    description VARCHAR(255) NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+                """
+            )
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def _lire_version(db_connection: DatabaseConnection) -> Optional[int]:
+    """Version courante de la base, ou None si schema_version n'existe pas encore."""
+    conn = db_connection.get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        row = cursor.fetchone()
+        return int(row[0]) if row else 0
+    except Exception:
+        conn.rollback()
+        return None
+    finally:
+        cursor.close()
+
+
+def _enregistrer_version(db_connection: DatabaseConnection, version: int, description: str) -> None:
+    conn = db_connection.get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+            (version, description),
+        )
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def _cle_cache(db_connection: DatabaseConnection) -> Tuple:
+    config = db_connection.config or {}
+    return (db_connection.db_type, config.get("host"), str(config.get("port")), config.get("database"))
+
+
+def _verrou(db_connection: DatabaseConnection, raw_conn, prendre: bool) -> None:
+    if db_connection.db_type != "postgresql":
+        return
+    cursor = raw_conn.cursor()
+    try:
+        fonction = "pg_advisory_lock" if prendre else "pg_advisory_unlock"
+        cursor.execute(f"SELECT {fonction}(%s)", (_MIGRATION_LOCK_KEY,))
+        cursor.fetchone()
+        raw_conn.commit()
+    finally:
+        cursor.close()
+
+
+# ----------------------------------------------------------------------------
+# API
+# ----------------------------------------------------------------------------
+
+def appliquer_migrations(db_connection: DatabaseConnection) -> Tuple[bool, str]:
+    """
+    Applique les migrations manquantes, dans l'ordre, sous verrou consultatif.
+    Réservé à l'étape de déploiement (`python -m services.migration_service`) :
+    certaines migrations réécrivent toutes les lignes d'une table.
+
+    Returns:
+        (succès, message d'erreur)
+    """
+    with db_connection.lease() as raw_conn:
+        _verrou(db_connection, raw_conn, prendre=True)
+        try:
+            _creer_table_version(db_connection)
+            version = _lire_version(db_connection) or 0
+            for numero, description, migration in MIGRATIONS:
+                if numero <= version:
+                    continue
+                logger.info("Migration %s : %s", numero, description)
+                if not migration(db_connection):
+                    logger.error("Migration %s échouée (%s).", numero, description)
+                    return False, f"Migration de schéma {numero} échouée."
+                _enregistrer_version(db_connection, numero, description)
+                version = numero
+            return True, ""
+        except Exception:
+            logger.exception("Erreur pendant les migrations de schéma")
+            return False, "Erreur de migration du schéma de base de données."
+        finally:
+            try:
+                _verrou(db_connection, raw_conn, prendre=False)
+            except Exception:
+                logger.warning("Libération du verrou de migration échouée.")
+
+
+def assurer_schema_a_jour(db_connection: DatabaseConnection) -> Tuple[bool, str]:
+    """
+    Vérification appelée à l'ouverture d'une session et par les tâches de fond.
+
+    Aucune requête si la version a déjà été vérifiée par ce processus ;
+    sinon une lecture de `schema_version`. Ne migre pas : une base en
+    retard est signalée, les migrations étant une étape du déploiement.
+    """
+    cle = _cle_cache(db_connection)
+    with _cache_lock:
+        if _versions_verifiees.get(cle) == VERSION_CIBLE:
+            return True, ""
+
+    version = _lire_version(db_connection)
+    if version is None or version < VERSION_CIBLE:
+        logger.error(
+            "Schéma de base de données en retard (version %s, attendue %s).", version, VERSION_CIBLE
+        )
+        return False, (
+            "Schéma de base de données non à jour : lancer `python -m services.migration_service` "
+            "(étape de déploiement)."
+        )
+
+    with _cache_lock:
+        _versions_verifiees[cle] = VERSION_CIBLE
+    return True, ""
+
+
+if __name__ == "__main__":
+    from config import DATABASE_CONFIG, IS_RENDER
+
+    cible = "render_production" if IS_RENDER else "postgresql_local"
+    connexion = DatabaseConnection("postgresql", DATABASE_CONFIG.get(cible, {}))
+    if not connexion.connect():
+        raise SystemExit("Connexion à la base impossible.")
+    try:
+        succes, erreur = appliquer_migrations(connexion)
+    finally:
+        connexion.disconnect()
+    if not succes:
+        raise SystemExit(erreur)
+    print(f"Schéma à jour (version {VERSION_CIBLE}).")
@@ -0,0 +1,222 @@
+"""
+Planificateur des tâches quotidiennes (rappels de livraison).
+
+Les rappels ne sont plus déclenchés par l'ouverture du calendrier : un thread
+démon par processus vérifie périodiquement les tâches dues. Un verrou
+consultatif (pg_try_advisory_lock / GET_LOCK) élit une seule instance à la
+fois, et la table job_runs garde la trace de chaque jour traité, ce qui
+permet de rattraper les jours manqués (redémarrage, instance en veille) ou
+en échec : chaque jour de la fenêtre sans exécution 'ok' est retenté.
+
+Exécution manuelle (ex. cron Render) :
+    python -m services.scheduler_service --once
+"""
+
+import threading
+from datetime import date, datetime, timedelta
+from typing import Callable, List, Optional, Set, Tuple
+
+from config import SCHEDULER_CONFIG
+from controllers.rappel_service import RappelsNonEnvoyes, executer_rappels_automatiques
+from models.database import DatabaseConnection
+from models.job_model import JobRunModel
+from services.database_service import open_background_connection
+from services.migration_service import assurer_schema_a_jour
+from utils.logging_utils import get_logger
+
+
+logger = get_logger(__name__)
+
+# Clé du verrou consultatif PostgreSQL (distincte de celle des migrations).
+_SCHEDULER_LOCK_KEY = 7_301_002
+_SCHEDULER_LOCK_NAME = "gestion_couturier_scheduler"
+
+# Tâches quotidiennes : (nom, fonction(db, jour) -> (nb_traites, message)).
+# Une tâche signale un jour à retenter en levant une exception.
+TACHES: List[Tuple[str, Callable[[DatabaseConnection, date], Tuple[int, Optional[str]]]]] = [
+    ("rappels_livraison", lambda db, jour: executer_rappels_automatiques(db, jour=jour)),
+]
+
+_thread: Optional[threading.Thread] = None
+_thread_lock = threading.Lock()
+_arret = threading.Event()
+
+
+def _prendre_verrou(db_connection: DatabaseConnection, raw_conn) -> bool:
+    """Verrou non bloquant : False si une autre instance exécute déjà les tâches."""
+    cursor = raw_conn.cursor()
+    try:
+        if db_connection.db_type == "mysql":
+            cursor.execute("SELECT GET_LOCK(%s, 0)", (_SCHEDULER_LOCK_NAME,))
+        else:
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", (_SCHEDULER_LOCK_KEY,))
+        row = cursor.fetchone()
+        raw_conn.commit()
+        return bool(row and row[0])
+    finally:
+        cursor.close()
+
+
+def _liberer_verrou(db_connection: DatabaseConnection, raw_conn) -> None:
+    cursor = raw_conn.cursor()
+    try:
+        if db_connection.db_type == "mysql":
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (_SCHEDULER_LOCK_NAME,))
+        else:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (_SCHEDULER_LOCK_KEY,))
+        cursor.fetchone()
+        raw_conn.commit()
+    finally:
+        cursor.close()
+
+
+def fenetre_rattrapage(premiere_date: Optional[date], aujourd_hui: date, max_rattrapage: int) -> List[date]:
+    """
+    Jours pouvant encore être traités, du plus ancien au plus récent.
+
+    Première exécution : aujourd'hui seulement. Sinon, les `max_rattrapage`
+    derniers jours (au-delà, les livraisons concernées sont déjà passées),
+    sans remonter avant la première exécution de la tâche.
+    """
+    debut = aujourd_hui - timedelta(days=max(0, max_rattrapage))
+    if premiere_date is None:
+        debut = aujourd_hui
+    else:
+        debut = max(debut, min(premiere_date, aujourd_hui))
+    return [debut + timedelta(days=i) for i in range((aujourd_hui - debut).days + 1)]
+
+
+def jours_a_traiter(premiere_date: Optional[date], jours_reussis: Set[date],
+                    aujourd_hui: date, max_rattrapage: int) -> List[date]:
+    """Jours de la fenêtre de rattrapage sans exécution réussie."""
+    return [
+        jour for jour in fenetre_rattrapage(premiere_date, aujourd_hui, max_rattrapage)
+        if jour not in jours_reussis
+    ]
+
+
+def _executer_tache(job_model: JobRunModel, db_connection: DatabaseConnection, nom: str, tache, aujourd_hui: date) -> int:
+    """
+    Exécute une tâche pour chaque jour dû de la fenêtre. Chaque jour est
+    indépendant : un jour en échec est retenté au cycle suivant sans bloquer
+    les jours suivants.
+    """
+    premiere_date = job_model.premiere_date(nom)
+    max_rattrapage = SCHEDULER_CONFIG["max_catchup_days"]
+    debut = fenetre_rattrapage(premiere_date, aujourd_hui, max_rattrapage)[0]
+    jours = jours_a_traiter(
+        premiere_date, job_model.jours_reussis(nom, debut), aujourd_hui, max_rattrapage
+    )
+    total = 0
+    for jour in jours:
+        job_model.demarrer(nom, jour)
+        try:
+            nb, message = tache(db_connection, jour)
+        except RappelsNonEnvoyes as e:
+            logger.warning("Tâche %s non aboutie pour le %s : %s", nom, jour, e)
+            job_model.terminer(nom, jour, False, message=str(e)[:1000])
+            continue
+        except Exception as e:
+            logger.exception("Tâche %s échouée pour le %s", nom, jour)
+            job_model.terminer(nom, jour, False, message=str(e)[:1000])
+            continue
+        job_model.terminer(nom, jour, True, items_processed=nb, message=message)
+        if message:
+            logger.info("Tâche %s (%s) : %s", nom, jour, message)
+        total += nb
+    return total
+
+
+def executer_taches_dues(db_connection: DatabaseConnection, aujourd_hui: Optional[date] = None) -> Optional[int]:
+    """
+    Exécute les tâches dues si cette instance obtient le verrou.
+
+    Returns:
+        Nombre d'éléments traités, ou None si une autre instance tient le verrou
+    """
+    aujourd_hui = aujourd_hui or datetime.now().date()
+    # Le verrou est lié à la session SQL : la même connexion doit rester
+    # empruntée jusqu'à sa libération.
+    with db_connection.lease() as raw_conn:
+        if not _prendre_verrou(db_connection, raw_conn):
+            logger.info("Tâches planifiées déjà en cours sur une autre instance.")
+            return None
+        try:
+            job_model = JobRunModel(db_connection)
+            return sum(
+                _executer_tache(job_model, db_connection, nom, tache, aujourd_hui)
+                for nom, tache in TACHES
+            )
+        finally:
+            try:
+                _liberer_verrou(db_connection, raw_conn)
+            except Exception:
+                logger.warning("Libération du verrou du planificateur échouée.")
+
+
+def _cycle() -> None:
+    db_connection = open_background_connection()
+    if db_connection is None:
+        logger.warning("Planificateur : base indisponible, cycle ignoré.")
+        return
+    try:
+        ok, message = assurer_schema_a_jour(db_connection)
+        if not ok:
+            logger.warning("Planificateur : %s", message)
+            return
+        executer_taches_dues(db_connection)
+    finally:
+        if db_connection.pooled:
+            db_connection.release()
+        else:
+            db_connection.disconnect()
+
+
+def _boucle() -> None:
+    while not _arret.is_set():
+        try:
+            _cycle()
+        except Exception:
+            logger.exception("Erreur du planificateur")
+        _arret.wait(SCHEDULER_CONFIG["interval_seconds"])
+
+
+def demarrer_planificateur() -> bool:
+    """
+    Démarre le thread planificateur une seule fois par processus.
+
+    Returns:
+        True si le thread a été démarré par cet appel
+    """
+    global _thread
+    with _thread_lock:
+        if _thread is not None and _thread.is_alive():
+            return False
+        _arret.clear()
+        _thread = threading.Thread(target=_boucle, name="scheduler", daemon=True)
+        _thread.start()
+        return True
+
+
+def arreter_planificateur() -> None:
+    """Demande l'arrêt du thread (fin du cycle en cours)."""
+    _arret.set()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Tâches planifiées Gestion Couturier")
+    parser.add_argument("--once", action="store_true", help="exécuter un seul cycle puis quitter")
+    args = parser.parse_args()
+
+    if args.once:
+        _cycle()
+    else:
+        demarrer_planificateur()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            arreter_planificateur()
@@ -0,0 +1,58 @@
+"""
+Reconstruction des agrégats journaliers (table stats_daily).
+
+Les écritures sur les commandes et les charges tiennent stats_daily à jour ;
+une reconstruction n'est utile qu'après une correction manuelle en base
+(UPDATE/DELETE direct, restauration partielle...).
+
+Exécution manuelle :
+    python -m services.stats_service [--salon SALON_ID]
+"""
+
+import argparse
+from typing import Optional
+
+from models.database import DatabaseConnection
+from models.stats_model import StatsDailyModel
+from utils.logging_utils import get_logger
+
+
+logger = get_logger(__name__)
+
+
+def reconstruire_stats(db_connection: DatabaseConnection, salon_id: Optional[str] = None) -> Optional[int]:
+    """
+    Recalcule stats_daily depuis commandes et charges.
+
+    Args:
+        salon_id: Salon à recalculer (None = tous les salons)
+
+    Returns:
+        Nombre de lignes produites ou None si erreur
+    """
+    nb_lignes = StatsDailyModel(db_connection).reconstruire(salon_id)
+    if nb_lignes is None:
+        logger.error("Échec de la reconstruction de stats_daily (salon=%s)", salon_id or "tous")
+    else:
+        logger.info("stats_daily reconstruite (salon=%s) : %s lignes", salon_id or "tous", nb_lignes)
+    return nb_lignes
+
+
+if __name__ == "__main__":
+    from config import DATABASE_CONFIG, IS_RENDER
+
+    parser = argparse.ArgumentParser(description="Reconstruit les agrégats journaliers (stats_daily).")
+    parser.add_argument("--salon", default=None, help="ID du salon à recalculer (défaut : tous)")
+    args = parser.parse_args()
+
+    cible = "render_production" if IS_RENDER else "postgresql_local"
+    connexion = DatabaseConnection("postgresql", DATABASE_CONFIG.get(cible, {}))
+    if not connexion.connect():
+        raise SystemExit("Connexion à la base impossible.")
+    try:
+        resultat = reconstruire_stats(connexion, args.salon)
+    finally:
+        connexion.disconnect()
+    if resultat is None:
+        raise SystemExit("Reconstruction de stats_daily impossible.")
+    print(f"stats_daily reconstruite : {resultat} lignes.")
@@ -0,0 +1,87 @@
+"""
+Diffusion des invalidations du cache (services/cache_notify_service) en mode pool.
+
+Exécution : python -m unittest discover -s tests
+"""
+
+import unittest
+
+from models.database import DatabaseConnection, _PooledConnection
+from services import cache_notify_service
+
+
+class _CurseurFactice:
+    def __init__(self, journal):
+        self.journal = journal
+
+    def execute(self, query, params=None):
+        self.journal.append(("EXECUTE", query))
+
+    def close(self):
+        pass
+
+
+class _ConnexionFactice:
+    """Connexion psycopg2 simulée : journalise execute / commit / rollback."""
+
+    closed = 0
+
+    def __init__(self, journal):
+        self.journal = journal
+        self.en_transaction = False
+
+    def cursor(self, *args, **kwargs):
+        self.en_transaction = True
+        return _CurseurFactice(self.journal)
+
+    def commit(self):
+        self.journal.append(("COMMIT", None))
+        self.en_transaction = False
+
+    def rollback(self):
+        self.journal.append(("ROLLBACK", None))
+        self.en_transaction = False
+
+
+class _PoolFactice:
+    """Comme ConnectionPool.release : annule la transaction ouverte à la restitution."""
+
+    closed = False
+
+    def __init__(self, journal):
+        self.journal = journal
+        self.connexion = _ConnexionFactice(journal)
+
+    def acquire(self):
+        self.journal.append(("ACQUIRE", None))
+        return self.connexion
+
+    def release(self, conn, discard=False):
+        if conn.en_transaction:
+            conn.rollback()
+        self.journal.append(("RELEASE", None))
+
+
+class NotifierEnModePoolTest(unittest.TestCase):
+    def setUp(self):
+        self.journal = []
+        self.db = DatabaseConnection(
+            "postgresql", {"host": "h", "port": 5432, "database": "d"}, pool_config={"enabled": True}
+        )
+        self.db.pool = _PoolFactice(self.journal)
+        self.db.connection = _PooledConnection(self.db)
+
+    def test_pg_notify_commite_avant_restitution(self):
+        cache_notify_service._notifier(self.db, "SALON_1")
+
+        actions = [action for action, _ in self.journal]
+        self.assertIn("COMMIT", actions)
+        self.assertLess(actions.index("EXECUTE"), actions.index("COMMIT"))
+        self.assertLess(actions.index("COMMIT"), actions.index("RELEASE"))
+        self.assertNotIn("ROLLBACK", actions)
+        requete = next(q for action, q in self.journal if action == "EXECUTE")
+        self.assertIn("pg_notify", requete)
+
+
+if __name__ == "__main__":
+    unittest.main()
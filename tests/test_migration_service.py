@@ -0,0 +1,97 @@
+"""
+Vérification du schéma et index concurrents (services/migration_service).
+
+Exécution : python -m unittest discover -s tests
+"""
+
+import unittest
+from unittest import mock
+
+from models.database import DatabaseConnection
+from services import migration_service
+
+
+class _CurseurFactice:
+    def __init__(self, connexion):
+        self.connexion = connexion
+        self.resultat = None
+
+    def execute(self, query, params=None):
+        self.connexion.journal.append((query, self.connexion.autocommit))
+        if "indisvalid" in query:
+            self.resultat = (True,) if params[0] in self.connexion.index_invalides else None
+        elif "schema_version" in query:
+            self.resultat = (self.connexion.version,)
+
+    def fetchone(self):
+        return self.resultat
+
+    def close(self):
+        pass
+
+
+class _ConnexionFactice:
+    closed = 0
+
+    def __init__(self, version=0, index_invalides=()):
+        self.journal = []
+        self.autocommit = False
+        self.version = version
+        self.index_invalides = set(index_invalides)
+
+    def cursor(self, *args, **kwargs):
+        return _CurseurFactice(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def _base(connexion):
+    db = DatabaseConnection("postgresql", {"host": "test", "database": "test", "user": "test", "password": ""})
+    db.connection = connexion
+    return db
+
+
+class AssurerSchemaTest(unittest.TestCase):
+    def setUp(self):
+        migration_service._versions_verifiees.clear()
+
+    def test_base_en_retard_signalee_sans_migrer(self):
+        connexion = _ConnexionFactice(version=migration_service.VERSION_CIBLE - 1)
+        with mock.patch.object(migration_service, "appliquer_migrations") as appliquer:
+            ok, message = migration_service.assurer_schema_a_jour(_base(connexion))
+        self.assertFalse(ok)
+        self.assertIn("non à jour", message)
+        appliquer.assert_not_called()
+
+    def test_version_a_jour_mise_en_cache(self):
+        connexion = _ConnexionFactice(version=migration_service.VERSION_CIBLE)
+        db = _base(connexion)
+        self.assertEqual(migration_service.assurer_schema_a_jour(db), (True, ""))
+        connexion.journal.clear()
+        self.assertEqual(migration_service.assurer_schema_a_jour(db), (True, ""))
+        self.assertEqual(connexion.journal, [])
+
+
+class IndexConcurrentsTest(unittest.TestCase):
+    def test_create_index_concurrently_hors_transaction(self):
+        connexion = _ConnexionFactice(index_invalides={"idx_b"})
+        ok = migration_service._creer_index_concurrents(_base(connexion), [
+            "CREATE INDEX IF NOT EXISTS idx_a ON commandes(statut)",
+            "CREATE INDEX IF NOT EXISTS idx_b ON commandes(modele)",
+        ])
+        self.assertTrue(ok)
+        ddl = [(q, auto) for q, auto in connexion.journal if "indisvalid" not in q]
+        self.assertEqual(ddl, [
+            ("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_a ON commandes(statut)", True),
+            ("DROP INDEX CONCURRENTLY IF EXISTS idx_b", True),
+            ("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_b ON commandes(modele)", True),
+        ])
+        self.assertFalse(connexion.autocommit)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Restitution au pool selon la nature de la requête (models/database, façade du pool).
+
+Exécution : python -m unittest discover -s tests
+"""
+
+import unittest
+
+from models.database import DatabaseConnection, _PooledConnection, _est_lecture_seule
+from tests.test_cache_notify_service import _PoolFactice
+
+
+class LectureSeuleTest(unittest.TestCase):
+    def test_with_en_lecture(self):
+        self.assertTrue(_est_lecture_seule("WITH t AS (SELECT id FROM commandes) SELECT COUNT(*) FROM t"))
+        self.assertTrue(_est_lecture_seule("  with recursive t(n) AS (SELECT 1) SELECT n FROM t"))
+
+    def test_with_modifiant_des_donnees(self):
+        self.assertFalse(_est_lecture_seule("WITH s AS (DELETE FROM stats_daily RETURNING *) SELECT COUNT(*) FROM s"))
+        self.assertFalse(_est_lecture_seule("WITH c AS (SELECT id FROM commandes FOR UPDATE) SELECT * FROM c"))
+
+    def test_select_a_effet_de_bord(self):
+        self.assertFalse(_est_lecture_seule("SELECT pg_notify(%s, %s)"))
+        self.assertFalse(_est_lecture_seule("SELECT nextval('commandes_id_seq')"))
+        self.assertFalse(_est_lecture_seule("SELECT setval('commandes_id_seq', 10)"))
+        self.assertFalse(_est_lecture_seule("SELECT pg_advisory_xact_lock(1)"))
+        self.assertTrue(_est_lecture_seule("SELECT id, updated_at FROM commandes"))
+
+
+class FacadePoolTest(unittest.TestCase):
+    def setUp(self):
+        self.journal = []
+        self.db = DatabaseConnection(
+            "postgresql", {"host": "h", "port": 5432, "database": "d"}, pool_config={"enabled": True}
+        )
+        self.db.pool = _PoolFactice(self.journal)
+        self.db.connection = _PooledConnection(self.db)
+
+    def _actions(self):
+        return [action for action, _ in self.journal]
+
+    def test_with_en_lecture_rend_la_connexion_a_la_fermeture(self):
+        cursor = self.db.get_connection().cursor()
+        cursor.execute("WITH t AS (SELECT 1) SELECT * FROM t")
+        cursor.close()
+        self.assertEqual(self._actions()[-1], "RELEASE")
+
+    def test_select_a_effet_garde_la_connexion_jusqu_au_commit(self):
+        connection = self.db.get_connection()
+        cursor = connection.cursor()
+        cursor.execute("SELECT pg_notify(%s, %s)", ("canal", "{}"))
+        cursor.close()
+        self.assertNotIn("RELEASE", self._actions())
+        connection.commit()
+        self.assertEqual(self._actions()[-2:], ["COMMIT", "RELEASE"])
+        self.assertNotIn("ROLLBACK", self._actions())
+
+    def test_verrou_de_session_refuse_hors_lease(self):
+        cursor = self.db.get_connection().cursor()
+        with self.assertRaises(RuntimeError):
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", (1,))
+        cursor.close()
+        self.assertNotIn("EXECUTE", self._actions())
+
+
+if __name__ == "__main__":
+    unittest.main()
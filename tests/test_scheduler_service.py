@@ -0,0 +1,86 @@
+"""
+Rattrapage des jours du planificateur (services/scheduler_service).
+
+Exécution : python -m unittest discover -s tests
+"""
+
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+
+from controllers.rappel_service import RappelsNonEnvoyes
+from services import scheduler_service
+
+
+AUJOURD_HUI = date(2026, 10, 18)
+
+
+class _JobModelFactice:
+    """JobRunModel en mémoire : {jour: statut}."""
+
+    def __init__(self, statuts):
+        self.statuts = dict(statuts)
+
+    def premiere_date(self, nom):
+        return min(self.statuts) if self.statuts else None
+
+    def jours_reussis(self, nom, depuis):
+        return {jour for jour, statut in self.statuts.items() if statut == "ok" and jour >= depuis}
+
+    def demarrer(self, nom, jour):
+        self.statuts[jour] = "running"
+
+    def terminer(self, nom, jour, succes, items_processed=0, message=None):
+        self.statuts[jour] = "ok" if succes else "error"
+
+
+class ExecuterTacheTest(unittest.TestCase):
+    def setUp(self):
+        patch = mock.patch.dict(scheduler_service.SCHEDULER_CONFIG, {"max_catchup_days": 2})
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_un_jour_en_echec_ne_bloque_pas_les_suivants(self):
+        veille = AUJOURD_HUI - timedelta(days=2)
+        job_model = _JobModelFactice({veille - timedelta(days=1): "ok"})
+        traites = []
+
+        def tache(db, jour):
+            traites.append(jour)
+            if jour == veille:
+                raise RappelsNonEnvoyes("SMTP indisponible")
+            return 1, None
+
+        total = scheduler_service._executer_tache(job_model, None, "rappels", tache, AUJOURD_HUI)
+
+        self.assertEqual(traites, [veille, veille + timedelta(days=1), AUJOURD_HUI])
+        self.assertEqual(total, 2)
+        self.assertEqual(job_model.statuts[veille], "error")
+        self.assertEqual(job_model.statuts[AUJOURD_HUI], "ok")
+
+    def test_seuls_les_jours_sans_succes_sont_retentes(self):
+        hier = AUJOURD_HUI - timedelta(days=1)
+        avant_hier = AUJOURD_HUI - timedelta(days=2)
+        job_model = _JobModelFactice({avant_hier: "error", hier: "ok"})
+        traites = []
+
+        def tache(db, jour):
+            traites.append(jour)
+            return 0, None
+
+        scheduler_service._executer_tache(job_model, None, "rappels", tache, AUJOURD_HUI)
+
+        self.assertEqual(traites, [avant_hier, AUJOURD_HUI])
+
+    def test_jours_hors_fenetre_abandonnes(self):
+        jours = scheduler_service.jours_a_traiter(
+            AUJOURD_HUI - timedelta(days=10), set(), AUJOURD_HUI, 2
+        )
+        self.assertEqual(jours, [AUJOURD_HUI - timedelta(days=2), AUJOURD_HUI - timedelta(days=1), AUJOURD_HUI])
+
+    def test_premiere_execution_aujourd_hui_seulement(self):
+        self.assertEqual(scheduler_service.jours_a_traiter(None, set(), AUJOURD_HUI, 2), [AUJOURD_HUI])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,18 @@
 """
 Styles et thème centralisés - Optimisation pour app_optimise.py
 Extrait de app.py pour séparation des responsabilités et maintenabilité.
+
+Les images de assets/ (fonds de page, sidebar, logo) sont converties une
+fois par processus en WebP redimensionné dans static/cache/, servi par
+Streamlit sous app/static/ (server.enableStaticServing) : le navigateur les
+garde en cache au lieu de recevoir une data URI de plusieurs centaines de Ko
+à chaque rerun. Le HTML/CSS de chaque page est mémorisé.
 """
 import os
 import base64
 import json
+from functools import lru_cache
+from typing import Optional
 
 
 # =====================
@@ -12,17 +20,86 @@ import json
 # =====================
 SIDEBAR_BG_PLAIN = "background: #FAFAFA !important;"
 
+# =====================
+# IMAGES STATIQUES
+# =====================
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ASSETS_DIR = os.path.join(_PROJECT_ROOT, "assets")
+# Dossier static/ à côté d'app.py : servi par Streamlit sous app/static/
+STATIC_CACHE_DIR = os.path.join(_PROJECT_ROOT, "static", "cache")
+STATIC_CACHE_URL = "app/static/cache"
+
+# Plus grand côté (px) des images converties : les fonds sont floutés à l'affichage
+TAILLE_FOND = 1280
+TAILLE_SIDEBAR = 1024
+TAILLE_LOGO = 256
+QUALITE_WEBP = 80
+
+
+def _service_statique_actif() -> bool:
+    try:
+        import streamlit as st
+        return bool(st.get_option("server.enableStaticServing"))
+    except Exception:
+        return False
+
+
+def _convertir_webp(source: str, taille_max: int) -> Optional[str]:
+    """
+    Écrit (si absente ou plus ancienne que la source) la version WebP
+    redimensionnée de `source` dans STATIC_CACHE_DIR et retourne son chemin.
+    """
+    racine = os.path.splitext(os.path.basename(source))[0]
+    cible = os.path.join(STATIC_CACHE_DIR, f"{racine}-{taille_max}.webp")
+    if os.path.exists(cible) and os.path.getmtime(cible) >= os.path.getmtime(source):
+        return cible
+    try:
+        from PIL import Image
+
+        os.makedirs(STATIC_CACHE_DIR, exist_ok=True)
+        with Image.open(source) as image:
+            image.thumbnail((taille_max, taille_max), Image.Resampling.LANCZOS)
+            # Fichier temporaire puis renommage : plusieurs processus peuvent convertir en même temps
+            temporaire = f"{cible}.{os.getpid()}.tmp"
+            image.save(temporaire, format="WEBP", quality=QUALITE_WEBP, method=6)
+        os.replace(temporaire, cible)
+        return cible
+    except Exception as e:
+        print(f"Conversion WebP impossible pour {source}: {e}")
+        return None
+
+
+@lru_cache(maxsize=None)
+def _url_asset(nom_fichier: str, taille_max: int) -> Optional[str]:
+    """
+    URL d'une image de assets/, calculée une fois par processus : fichier
+    statique WebP si possible, sinon data URI (WebP ou fichier d'origine).
+    """
+    source = os.path.join(ASSETS_DIR, nom_fichier)
+    if not os.path.exists(source):
+        return None
+    webp = _convertir_webp(source, taille_max)
+    if webp and _service_statique_actif():
+        # ?v= : une nouvelle version de l'image change l'URL (cache navigateur)
+        return f"{STATIC_CACHE_URL}/{os.path.basename(webp)}?v={int(os.path.getmtime(webp))}"
+    chemin, mime = (webp, "image/webp") if webp else (source, _mime(nom_fichier))
+    with open(chemin, "rb") as f:
+        return f"data:{mime};base64,{base64.b64encode(f.read()).decode('utf-8')}"
+
+
+def _mime(nom_fichier: str) -> str:
+    ext = os.path.splitext(nom_fichier)[1].lower()
+    return "image/jpeg" if ext in (".jpg", ".jpeg") else "image/png"
 
+
+@lru_cache(maxsize=None)
 def _load_sidebar_bg_image() -> str:
-    """Charge l'image nav.png pour la sidebar (page connexion)."""
+    """Image nav.png pour la sidebar (page connexion)."""
     try:
-        project_root = os.path.dirname(os.path.dirname(__file__))
-        nav_path = os.path.join(project_root, "assets", "nav.png")
-        if os.path.exists(nav_path):
-            with open(nav_path, "rb") as f:
-                nav_b64 = base64.b64encode(f.read()).decode("utf-8")
+        url = _url_asset("nav.png", TAILLE_SIDEBAR)
+        if url:
             return f"""
-        background-image: url('data:image/png;base64,{nav_b64}') !important;
+        background-image: url('{url}') !important;
         background-size: cover !important;
         background-position: center !important;
         background-repeat: no-repeat !important;
@@ -77,7 +154,7 @@ def get_main_css() -> str:
         background: linear-gradient(135deg, #B19CD9 0%, #40E0D0 100%) !important;
         color: #FFFFFF !important;
     }
-    
+
     [data-testid="stMetricValue"] { font-size: 2.5rem; font-weight: 700; color: var(--noir); }
     h1, h2, h3, h4, h5, h6 { font-family: 'Poppins', sans-serif; color: var(--noir); }
     a, a:visited, a:hover { color: #B19CD9 !important; }
@@ -110,25 +187,23 @@ def get_page_background_html(page_id: str, page_background_images: dict) -> str:
     image_name = page_background_images.get(page_id)
     if not image_name:
         return ""
-    project_root = os.path.dirname(os.path.dirname(__file__))
-    img_path = os.path.join(project_root, "assets", image_name)
-    if not os.path.exists(img_path):
-        return ""
+    return _page_background_html(image_name)
+
+
+@lru_cache(maxsize=None)
+def _page_background_html(image_name: str) -> str:
+    """HTML/CSS du fond d'une image, construit une fois par processus."""
     try:
-        with open(img_path, "rb") as f:
-            b64 = base64.b64encode(f.read()).decode("utf-8")
-        ext = os.path.splitext(image_name)[1].lower()
-        mime = "image/jpeg" if ext in (".jpg", ".jpeg") else "image/png"
-        data_uri = f"data:{mime};base64,{b64}"
-        data_uri_js = json.dumps(data_uri)
-        data_uri_css = data_uri.replace("'", "\\'")
+        image_url = _url_asset(image_name, TAILLE_FOND)
+        if not image_url:
+            return ""
+        image_url_js = json.dumps(image_url)
+        image_url_css = image_url.replace("'", "\\'")
 
         logo_html = ""
-        logo_path = os.path.join(project_root, "assets", "logoBon.png")
-        if os.path.exists(logo_path):
-            with open(logo_path, "rb") as f_logo:
-                logo_b64 = base64.b64encode(f_logo.read()).decode("utf-8")
-            logo_html = f'<div style="position:fixed;top:1rem;left:1rem;z-index:99999;width:110px;height:auto;background:rgba(255,255,255,0.95);padding:6px;border-radius:8px;box-shadow:0 4px 12px rgba(0,0,0,0.15);"><img src="data:image/png;base64,{logo_b64}" alt="Logo" style="width:100%;height:auto;display:block;"></div>'
+        logo_url = _url_asset("logoBon.png", TAILLE_LOGO)
+        if logo_url:
+            logo_html = f'<div style="position:fixed;top:1rem;left:1rem;z-index:99999;width:110px;height:auto;background:rgba(255,255,255,0.95);padding:6px;border-radius:8px;box-shadow:0 4px 12px rgba(0,0,0,0.15);"><img src="{logo_url}" alt="Logo" style="width:100%;height:auto;display:block;"></div>'
 
         return f"""
     {logo_html}
@@ -136,7 +211,7 @@ def get_page_background_html(page_id: str, page_background_images: dict) -> str:
     body .main, section.main {{ position: relative !important; min-height: 100vh !important; background: #FAFAFA !important; }}
     body .main::before, section.main::before {{
         content: '' !important; position: absolute !important; inset: 0 !important; z-index: -2 !important;
-        background-image: url('{data_uri_css}') !important; background-size: cover !important;
+        background-image: url('{image_url_css}') !important; background-size: cover !important;
         background-position: center !important; filter: blur(14px) !important; opacity: 0.75 !important;
     }}
     body .main::after, section.main::after {{
@@ -147,13 +222,13 @@ def get_page_background_html(page_id: str, page_background_images: dict) -> str:
     </style>
     <script>
     (function() {{
-        var dataUri = {data_uri_js};
+        var imageUrl = {image_url_js};
         function applyBg() {{
             var main = document.querySelector(".main");
             if (main && !main.querySelector('.page-bg-blur')) {{
                 var blur = document.createElement('div');
                 blur.className = 'page-bg-blur';
-                blur.style.cssText = 'position:absolute;inset:0;z-index:-2;background-image:url(' + dataUri + ');background-size:cover;background-position:center;filter:blur(14px);opacity:0.75;';
+                blur.style.cssText = 'position:absolute;inset:0;z-index:-2;background-image:url(' + imageUrl + ');background-size:cover;background-position:center;filter:blur(14px);opacity:0.75;';
                 main.insertBefore(blur, main.firstChild);
                 var veil = document.createElement('div');
                 veil.className = 'page-bg-veil';
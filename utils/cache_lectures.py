@@ -0,0 +1,267 @@
+"""
+Cache des lectures par salon, invalidé par numéro de version.
+
+Les lectures décorées par `lecture_en_cache` sont gardées en mémoire
+(partagée par les sessions du processus) sous la clé
+(base, salon, méthode, paramètres, version du salon). Les écritures
+décorées par `ecriture_invalide` incrémentent la version du salon concerné :
+les entrées correspondantes ne sont plus jamais relues et sortent du LRU.
+
+- Une lecture sans salon identifiable (vue super admin, tous salons) dépend
+  de la version '*', incrémentée par toute écriture.
+- Une écriture dont le salon est introuvable incrémente l'époque de la base,
+  ce qui invalide toutes les entrées.
+- Les invalidations sont diffusées aux abonnés (voir
+  services/cache_notify_service.py : NOTIFY vers les autres instances).
+  Tant que l'écoute de la base est active (`definir_ecoute`), les entrées
+  vivent `ttl_ecoute_seconds` ; sinon le TTL court `ttl_seconds` borne
+  l'écart avec les écritures des autres processus ou faites en SQL.
+
+Les résultats sont copiés à l'entrée et à la sortie du cache : une vue peut
+modifier la liste qu'elle reçoit sans altérer celle des autres sessions.
+"""
+
+import copy
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from config import CACHE_LECTURES_CONFIG
+from utils.logging_utils import get_logger
+
+
+logger = get_logger(__name__)
+
+TOUS_SALONS = '*'
+
+_verrou = threading.RLock()
+_entrees: "OrderedDict[Tuple, Tuple[float, object]]" = OrderedDict()
+_versions: Dict[Tuple, int] = {}
+_salons_couturiers: Dict[Tuple, Tuple[float, Optional[str]]] = {}
+# Bases dont les invalidations des autres instances sont reçues
+_bases_ecoutees: set = set()
+
+# Appelées après chaque invalidation locale avec (base, salon_id ou None)
+_abonnes: list = []
+
+
+def _base(db_connection) -> Tuple:
+    config = getattr(db_connection, 'config', None) or {}
+    return (db_connection.db_type, config.get('host'), str(config.get('port')), config.get('database'))
+
+
+def _figer(valeur) -> Hashable:
+    """Forme hachable d'un paramètre (listes, dicts, ensembles)."""
+    if isinstance(valeur, dict):
+        return tuple(sorted((k, _figer(v)) for k, v in valeur.items()))
+    if isinstance(valeur, (list, tuple)):
+        return tuple(_figer(v) for v in valeur)
+    if isinstance(valeur, (set, frozenset)):
+        return tuple(sorted(_figer(v) for v in valeur))
+    return valeur
+
+
+def _version(base: Tuple, salon: str) -> Tuple[int, int]:
+    return _versions.get((base, None), 0), _versions.get((base, salon), 0)
+
+
+def _ttl(base: Tuple) -> float:
+    if base in _bases_ecoutees:
+        return CACHE_LECTURES_CONFIG['ttl_ecoute_seconds']
+    return CACHE_LECTURES_CONFIG['ttl_seconds']
+
+
+def definir_ecoute(db_connection, active: bool) -> None:
+    """
+    Signale que les invalidations des autres instances sont (ou ne sont plus)
+    reçues pour cette base : choisit le TTL appliqué à ses entrées.
+    """
+    base = _base(db_connection)
+    with _verrou:
+        if active:
+            _bases_ecoutees.add(base)
+        else:
+            _bases_ecoutees.discard(base)
+
+
+def invalider(db_connection, salon_id: Optional[str] = None, diffuser: bool = True) -> None:
+    """
+    Périme les lectures d'un salon (et celles de tous les salons confondus),
+    ou de toute la base si `salon_id` est None.
+
+    Args:
+        diffuser: Prévenir les abonnés (voir `abonner`) ; False pour une
+            invalidation reçue d'un autre processus
+    """
+    base = _base(db_connection)
+    with _verrou:
+        if salon_id:
+            _versions[(base, salon_id)] = _versions.get((base, salon_id), 0) + 1
+            _versions[(base, TOUS_SALONS)] = _versions.get((base, TOUS_SALONS), 0) + 1
+        else:
+            _versions[(base, None)] = _versions.get((base, None), 0) + 1
+            _salons_couturiers.clear()
+    if diffuser:
+        for abonne in list(_abonnes):
+            try:
+                abonne(db_connection, salon_id)
+            except Exception:
+                logger.exception("Échec de la diffusion d'une invalidation du cache")
+
+
+def abonner(fonction: Callable) -> None:
+    """Appelle `fonction(db_connection, salon_id)` après chaque invalidation locale."""
+    if fonction not in _abonnes:
+        _abonnes.append(fonction)
+
+
+def vider() -> None:
+    """Vide tout le cache (tests manuels, benchmarks)."""
+    with _verrou:
+        _entrees.clear()
+        _versions.clear()
+        _salons_couturiers.clear()
+        _bases_ecoutees.clear()
+
+
+def salon_du_couturier(db_connection, couturier_id: Optional[int]) -> Optional[str]:
+    """Salon d'un couturier, mémorisé le temps du TTL."""
+    if not couturier_id:
+        return None
+    cle = (_base(db_connection), couturier_id)
+    maintenant = time.monotonic()
+    with _verrou:
+        memo = _salons_couturiers.get(cle)
+    if memo and memo[0] > maintenant:
+        return memo[1]
+    cursor = db_connection.get_connection().cursor()
+    try:
+        cursor.execute("SELECT salon_id FROM couturiers WHERE id = %s", (couturier_id,))
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+    salon_id = row[0] if row else None
+    with _verrou:
+        _salons_couturiers[cle] = (maintenant + CACHE_LECTURES_CONFIG['ttl_seconds'], salon_id)
+    return salon_id
+
+
+def _salon_de_commande(db_connection, commande_id: Optional[int]) -> Optional[str]:
+    if not commande_id:
+        return None
+    cursor = db_connection.get_connection().cursor()
+    try:
+        cursor.execute("SELECT salon_id FROM commandes WHERE id = %s", (commande_id,))
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+    return row[0] if row else None
+
+
+def _connexion(instance):
+    return getattr(instance, 'db', None) or getattr(instance, 'db_connection')
+
+
+def _arguments(signature: inspect.Signature, args, kwargs) -> Dict:
+    lies = signature.bind(*args, **kwargs)
+    lies.apply_defaults()
+    arguments = dict(lies.arguments)
+    arguments.pop('self', None)
+    return arguments
+
+
+def lecture_en_cache(salon: Optional[str] = 'salon_id', couturier: Optional[str] = 'couturier_id',
+                     tous: Optional[str] = 'tous_les_couturiers'):
+    """
+    Décore une méthode de lecture d'un modèle ou d'un contrôleur.
+
+    Args:
+        salon: Nom du paramètre portant le salon
+        couturier: Nom du paramètre portant le couturier, dont le salon est
+            utilisé quand le paramètre `salon` est absent ou vide
+        tous: Nom du paramètre booléen "tous les couturiers" : vrai sans
+            salon, la lecture porte sur tous les salons
+
+    Les résultats vides ou None ne sont pas mis en cache : les modèles
+    retournent [] / {} / None en cas d'erreur base de données.
+    """
+    def decorateur(methode):
+        signature = inspect.signature(methode)
+        nom = methode.__qualname__
+
+        @functools.wraps(methode)
+        def enveloppe(self, *args, **kwargs):
+            if not CACHE_LECTURES_CONFIG['enabled']:
+                return methode(self, *args, **kwargs)
+            db_connection = _connexion(self)
+            try:
+                arguments = _arguments(signature, (self,) + args, kwargs)
+                salon_id = arguments.get(salon) if salon else None
+                if not salon_id and couturier and not (tous and arguments.get(tous)):
+                    salon_id = salon_du_couturier(db_connection, arguments.get(couturier))
+                base = _base(db_connection)
+                salon_cle = salon_id or TOUS_SALONS
+                with _verrou:
+                    cle = (base, salon_cle, nom, _figer(arguments), _version(base, salon_cle))
+                    entree = _entrees.get(cle)
+                    # L'âge est comparé au TTL courant : il raccourcit dès que l'écoute tombe
+                    if entree and time.monotonic() - entree[0] < _ttl(base):
+                        _entrees.move_to_end(cle)
+                        return copy.deepcopy(entree[1])
+            except Exception:
+                logger.exception("Cache indisponible pour %s", nom)
+                return methode(self, *args, **kwargs)
+
+            resultat = methode(self, *args, **kwargs)
+            if resultat:
+                with _verrou:
+                    _entrees[cle] = (time.monotonic(), copy.deepcopy(resultat))
+                    _entrees.move_to_end(cle)
+                    while len(_entrees) > CACHE_LECTURES_CONFIG['max_entries']:
+                        _entrees.popitem(last=False)
+            return resultat
+
+        return enveloppe
+    return decorateur
+
+
+def ecriture_invalide(couturier: Optional[str] = None, commande: Optional[str] = None,
+                      salon: Optional[str] = None):
+    """
+    Décore une méthode d'écriture : après un appel réussi (résultat ni None
+    ni False, valeurs d'échec des modèles ; 0 ligne traitée compte comme un
+    succès), incrémente la version du salon touché.
+
+    Le salon est pris dans le paramètre `salon`, sinon déduit du paramètre
+    `couturier` ou `commande` ; introuvable, toute la base est invalidée.
+    Il est résolu avant l'écriture : une suppression (utilisateur, commande)
+    ne doit pas empêcher de retrouver son salon.
+    """
+    def decorateur(methode):
+        signature = inspect.signature(methode)
+
+        @functools.wraps(methode)
+        def enveloppe(self, *args, **kwargs):
+            if not CACHE_LECTURES_CONFIG['enabled']:
+                return methode(self, *args, **kwargs)
+            db_connection = _connexion(self)
+            try:
+                arguments = _arguments(signature, (self,) + args, kwargs)
+                salon_id = arguments.get(salon) if salon else None
+                if not salon_id and couturier:
+                    salon_id = salon_du_couturier(db_connection, arguments.get(couturier))
+                if not salon_id and commande:
+                    salon_id = _salon_de_commande(db_connection, arguments.get(commande))
+            except Exception:
+                logger.exception("Salon introuvable pour l'invalidation de %s", methode.__qualname__)
+                salon_id = None
+            resultat = methode(self, *args, **kwargs)
+            if resultat is not None and resultat is not False:
+                invalider(db_connection, salon_id)
+            return resultat
+
+        return enveloppe
+    return decorateur
@@ -3,8 +3,30 @@ Module d'optimisation d'images pour réduire leur taille avant insertion en base
 """
 
 import io
-from PIL import Image
-from typing import Optional, Tuple
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+# PIL n'est importé qu'au premier traitement d'image (temps de démarrage)
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+# Largeurs (px) des déclinaisons générées à l'upload : vignette, mobile, plein écran
+LARGEURS_RENDITIONS = (160, 480, 1280)
+
+
+def _convertir_rgb(image: "Image.Image") -> "Image.Image":
+    """Convertit en RGB (fond blanc pour les images avec transparence)."""
+    from PIL import Image
+
+    if image.mode in ('RGBA', 'LA', 'P'):
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        if image.mode == 'P':
+            image = image.convert('RGBA')
+        background.paste(image, mask=image.split()[-1] if image.mode in ('RGBA', 'LA') else None)
+        return background
+    if image.mode != 'RGB':
+        return image.convert('RGB')
+    return image
 
 
 def optimiser_image(image_bytes: bytes, max_size: Tuple[int, int] = (1920, 1920), 
@@ -22,19 +44,13 @@ def optimiser_image(image_bytes: bytes, max_size: Tuple[int, int] = (1920, 1920)
         Image optimisée en bytes, ou None en cas d'erreur
     """
     try:
+        from PIL import Image
+
         # Ouvrir l'image depuis les bytes
         image = Image.open(io.BytesIO(image_bytes))
         
         # Convertir en RGB si nécessaire (pour JPEG)
-        if image.mode in ('RGBA', 'LA', 'P'):
-            # Créer un fond blanc pour les images avec transparence
-            background = Image.new('RGB', image.size, (255, 255, 255))
-            if image.mode == 'P':
-                image = image.convert('RGBA')
-            background.paste(image, mask=image.split()[-1] if image.mode in ('RGBA', 'LA') else None)
-            image = background
-        elif image.mode != 'RGB':
-            image = image.convert('RGB')
+        image = _convertir_rgb(image)
         
         # Redimensionner si l'image est trop grande
         original_size = image.size
@@ -70,6 +86,54 @@ def optimiser_image(image_bytes: bytes, max_size: Tuple[int, int] = (1920, 1920)
         return image_bytes
 
 
+def generer_renditions(image_bytes: bytes,
+                       largeurs: Tuple[int, ...] = LARGEURS_RENDITIONS,
+                       quality: int = 80) -> Dict[int, Tuple[bytes, str]]:
+    """
+    Génère les déclinaisons d'une image pour l'affichage.
+
+    Chaque largeur est encodée en WebP ; si l'encodeur WebP n'est pas disponible
+    dans Pillow, en JPEG. Les largeurs supérieures à l'original ne sont pas
+    agrandies (la plus petite est toujours produite).
+
+    Args:
+        image_bytes: Image source en bytes
+        largeurs: Largeurs cibles en pixels
+        quality: Qualité d'encodage (1-100)
+
+    Returns:
+        {largeur: (octets, type MIME)}, vide en cas d'erreur
+    """
+    try:
+        from PIL import Image, ImageOps
+
+        source = Image.open(io.BytesIO(image_bytes))
+        # Photos de téléphone : appliquer l'orientation EXIF avant de redimensionner
+        source = _convertir_rgb(ImageOps.exif_transpose(source))
+    except Exception as e:
+        print(f"Erreur lecture image pour renditions: {e}")
+        return {}
+
+    renditions: Dict[int, Tuple[bytes, str]] = {}
+    for largeur in sorted(largeurs):
+        if renditions and largeur > source.width:
+            break
+        image = source.copy()
+        if image.width > largeur:
+            hauteur = max(1, round(image.height * largeur / image.width))
+            image = image.resize((largeur, hauteur), Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        try:
+            image.save(output, format='WEBP', quality=quality, method=4)
+            mime = 'image/webp'
+        except Exception:
+            output = io.BytesIO()
+            image.save(output, format='JPEG', quality=quality, optimize=True, progressive=True)
+            mime = 'image/jpeg'
+        renditions[largeur] = (output.getvalue(), mime)
+    return renditions
+
+
 def obtenir_taille_image(image_bytes: bytes) -> Tuple[int, int]:
     """
     Obtient les dimensions d'une image.
@@ -81,6 +145,8 @@ def obtenir_taille_image(image_bytes: bytes) -> Tuple[int, int]:
         Tuple (largeur, hauteur) en pixels
     """
     try:
+        from PIL import Image
+
         image = Image.open(io.BytesIO(image_bytes))
         return image.size
     except Exception as e:
@@ -0,0 +1,66 @@
+"""
+Onglets rendus à la demande.
+
+`st.tabs` exécute le contenu de tous les onglets à chaque rerun : une page à
+sept onglets lance les requêtes des sept sections. `afficher_onglets` affiche
+un sélecteur du même aspect (radio horizontal stylé par CSS_ONGLETS) et
+n'exécute que la section choisie.
+
+Les résultats des requêtes d'une section restent dans le cache des lectures
+(utils/cache_lectures) jusqu'à la prochaine écriture sur le salon : revenir
+sur un onglet déjà ouvert ne relance pas ses requêtes.
+"""
+
+from typing import Callable, List, Tuple
+
+import streamlit as st
+
+
+# Préfixe du libellé (masqué) des sélecteurs, repris par le CSS des onglets
+PREFIXE_ONGLETS = "Onglets"
+
+# Radio horizontal présenté comme une barre d'onglets
+CSS_ONGLETS = f"""
+<style>
+div[role="radiogroup"][aria-label^="{PREFIXE_ONGLETS}"] {{
+    gap: 0.25rem; border-bottom: 1px solid rgba(49, 51, 63, 0.2); margin-bottom: 1rem;
+}}
+div[role="radiogroup"][aria-label^="{PREFIXE_ONGLETS}"] label {{
+    padding: 0.5rem 1rem; border-radius: 12px 12px 0 0; margin: 0;
+}}
+div[role="radiogroup"][aria-label^="{PREFIXE_ONGLETS}"] label > div:first-child {{ display: none; }}
+div[role="radiogroup"][aria-label^="{PREFIXE_ONGLETS}"] label:has(input:checked) {{
+    background: linear-gradient(135deg, #B19CD9 0%, #40E0D0 100%) !important;
+}}
+div[role="radiogroup"][aria-label^="{PREFIXE_ONGLETS}"] label:has(input:checked) p {{ color: #FFFFFF !important; }}
+</style>
+"""
+
+
+def afficher_onglets(cle: str, sections: List[Tuple[str, Callable[[], None]]]) -> str:
+    """
+    Affiche le sélecteur d'onglets puis la seule section choisie.
+
+    Args:
+        cle: Identifiant de la page ; l'onglet choisi est gardé dans
+            st.session_state[f"onglet_{cle}"]
+        sections: Liste de (libellé, fonction sans argument affichant la section)
+
+    Returns:
+        Libellé de la section affichée
+    """
+    libelles = [libelle for libelle, _ in sections]
+    cle_session = f"onglet_{cle}"
+    if st.session_state.get(cle_session) not in libelles:
+        st.session_state[cle_session] = libelles[0]
+
+    st.markdown(CSS_ONGLETS, unsafe_allow_html=True)
+    choix = st.radio(
+        f"{PREFIXE_ONGLETS} {cle}",
+        libelles,
+        key=cle_session,
+        horizontal=True,
+        label_visibility="collapsed",
+    )
+    dict(sections)[choix]()
+    return choix
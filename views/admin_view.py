@@ -24,6 +24,7 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from models.database import ChargesModel, CommandeModel, CouturierModel, ClientModel, AppLogoModel
 from views.mes_charges_view import _generer_pdf_impots
 from models.salon_model import SalonModel
+from utils.onglets import afficher_onglets
 from utils.role_utils import est_admin, obtenir_salon_id
 from utils.logging_utils import get_logger
 
@@ -112,68 +113,24 @@ def afficher_page_administration():
         st.markdown("---")
     
     # ========================================================================
-    # TABS PRINCIPAUX
+    # ONGLETS PRINCIPAUX (seul l'onglet choisi est exécuté)
     # ========================================================================
     
-    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
-        "📊 Tableau de bord",
-        "🌐 Vue 360°",
-        "💰 Toutes les charges",
-        "📦 Gestion des commandes",
-        "📋 Modèles & Calendrier",
-        "🧮 Calcul d'impôts",
-        "👥 Gestion des utilisateurs",
-    ])
-    
-    # ========================================================================
-    # TAB 1 : TABLEAU DE BORD (figures + tableau)
-    # ========================================================================
-    
-    with tab1:
-        afficher_tableau_de_bord_admin(commande_model, couturier_model, salon_id_admin)
-    
-    # ========================================================================
-    # TAB 2 : VUE 360° DE L'ATELIER
-    # ========================================================================
-    
-    with tab2:
-        afficher_vue_360(couturier_model, charges_model, commande_model, client_model, salon_id_admin)
-    
-    # ========================================================================
-    # TAB 3 : TOUTES LES CHARGES
-    # ========================================================================
-    
-    with tab3:
-        afficher_toutes_charges(charges_model, salon_id_admin)
-    
-    # ========================================================================
-    # TAB 4 : GESTION DES COMMANDES
-    # ========================================================================
-    
-    with tab4:
-        afficher_gestion_commandes_admin(commande_model, couturier_data)
-    
-    # ========================================================================
-    # TAB 5 : CALENDRIER DES LIVRAISONS
-    # ========================================================================
-    
-    with tab5:
+    def afficher_calendrier():
         from views.calendrier_view import afficher_page_calendrier
         afficher_page_calendrier(onglet_admin=True)
     
-    # ========================================================================
-    # TAB 6 : CALCUL D'IMPÔTS
-    # ========================================================================
-    
-    with tab6:
-        afficher_calcul_impots_admin(charges_model, commande_model)
-    
-    # ========================================================================
-    # TAB 7 : GESTION DES UTILISATEURS
-    # ========================================================================
-    
-    with tab7:
-        afficher_gestion_utilisateurs(couturier_model, couturier_data)
+    afficher_onglets("administration", [
+        ("📊 Tableau de bord",
+         lambda: afficher_tableau_de_bord_admin(commande_model, couturier_model, salon_id_admin)),
+        ("🌐 Vue 360°",
+         lambda: afficher_vue_360(couturier_model, charges_model, commande_model, client_model, salon_id_admin)),
+        ("💰 Toutes les charges", lambda: afficher_toutes_charges(charges_model, salon_id_admin)),
+        ("📦 Gestion des commandes", lambda: afficher_gestion_commandes_admin(commande_model, couturier_data)),
+        ("📋 Modèles & Calendrier", afficher_calendrier),
+        ("🧮 Calcul d'impôts", lambda: afficher_calcul_impots_admin(charges_model, commande_model)),
+        ("👥 Gestion des utilisateurs", lambda: afficher_gestion_utilisateurs(couturier_model, couturier_data)),
+    ])
     
     # (Plus d'onglet spécifique de réinitialisation : tout est géré dans "Gestion des utilisateurs")
 
@@ -1961,9 +1918,6 @@ def afficher_gestion_logo(admin_data: Dict):
     # Initialiser le modèle
     logo_model = AppLogoModel(st.session_state.db_connection)
     
-    # Créer la table si elle n'existe pas
-    logo_model.creer_tables()
-    
     # Récupérer le salon_id de l'admin
     salon_id = obtenir_salon_id(admin_data)
     
@@ -2118,10 +2072,11 @@ def afficher_gestion_commandes_admin(commande_model: CommandeModel, admin_data:
     st.markdown("---")
     
     # Sous-onglets
-    sub_tab1, sub_tab2, sub_tab3 = st.tabs([
+    sub_tab1, sub_tab2, sub_tab3, sub_tab4 = st.tabs([
         "🔔 Demandes en attente",
         "📂 Commandes ouvertes",
-        "✅ Commandes fermées"
+        "✅ Commandes fermées",
+        "📥 Import"
     ])
     
     # ========================================================================
@@ -2398,4 +2353,68 @@ def afficher_gestion_commandes_admin(commande_model: CommandeModel, admin_data:
                 df_display['Date Fermeture'] = pd.to_datetime(df_display['Date Fermeture']).dt.strftime('%d/%m/%Y %H:%M')
             
             st.dataframe(df_display, width='stretch', hide_index=True, height=400)
+    
+    # ========================================================================
+    # ONGLET 4 : IMPORT EN MASSE
+    # ========================================================================
+    with sub_tab4:
+        afficher_import_commandes(commande_model, admin_data, tous_couturiers, couturier_id_filtre)
+
 
+def afficher_import_commandes(commande_model: CommandeModel, admin_data: Dict,
+                              tous_couturiers: list, couturier_id_filtre: Optional[int]):
+    """Import de commandes historiques depuis un fichier CSV ou Excel"""
+    from controllers.commande_controller import CommandeController
+    
+    st.markdown("#### 📥 Importer des commandes (CSV / Excel)")
+    st.info(
+        "💡 Une ligne par commande. Colonnes obligatoires : **nom**, **telephone**, **modele**, "
+        "**prix_total**, **sexe**. Optionnelles : prenom, email, categorie, avance, statut, "
+        "date_creation, date_livraison, mesures (JSON). Les clients sont reconnus par leur téléphone."
+    )
+    
+    # Couturier auquel rattacher les commandes (filtre en haut de page, sinon l'admin)
+    couturier_id_import = couturier_id_filtre or admin_data.get('id')
+    couturier_import = next((c for c in tous_couturiers if c['id'] == couturier_id_import), None)
+    if couturier_import:
+        st.caption(f"Commandes rattachées à {couturier_import['prenom']} {couturier_import['nom']} "
+                   f"({couturier_import['code_couturier']}) — changez-le avec le filtre ci-dessus.")
+    
+    fichier = st.file_uploader("Fichier à importer", type=["csv", "xlsx"], key="import_commandes_fichier")
+    
+    if fichier is not None and st.button("🚀 Lancer l'import", type="primary", key="import_commandes_lancer"):
+        barre = st.progress(0.0, text="Lecture du fichier...")
+        try:
+            bilan = CommandeController(commande_model.db).importer_commandes(
+                couturier_id_import, fichier, fichier.name,
+                progression=lambda message, fraction: barre.progress(fraction, text=message),
+            )
+        except Exception as e:
+            logger.exception("Échec de l'import de %s", fichier.name)
+            st.error(f"❌ Fichier illisible : {e}")
+        else:
+            st.session_state.import_commandes_bilan = bilan
+    
+    bilan = st.session_state.get('import_commandes_bilan')
+    if bilan:
+        col_b1, col_b2, col_b3 = st.columns(3)
+        with col_b1:
+            st.metric("📦 Commandes importées", bilan['commandes'])
+        with col_b2:
+            st.metric("👤 Nouveaux clients", bilan['clients_crees'])
+        with col_b3:
+            st.metric("⚠️ Lignes rejetées", len(bilan['rejets']))
+        
+        if bilan['rejets']:
+            from services.import_service import rapport_rejets_csv
+            st.dataframe(
+                pd.DataFrame([{'Ligne': r['ligne'], 'Motif': r['motif']} for r in bilan['rejets'][:200]]),
+                width='stretch', hide_index=True
+            )
+            st.download_button(
+                label="💾 Télécharger le rapport des rejets",
+                data=rapport_rejets_csv(bilan['rejets']).encode('utf-8-sig'),
+                file_name=f"rejets_import_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                mime="text/csv",
+                key="import_commandes_rejets"
+            )
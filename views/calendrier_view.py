@@ -10,12 +10,19 @@ import streamlit as st
 import pandas as pd
 import io
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 
 from models.database import CommandeModel, CouturierModel
 from models.salon_model import SalonModel
+from models.media_model import lire_media, rendition_pour
 from utils.role_utils import est_admin, obtenir_salon_id, obtenir_couturier_id
 
+# Largeur d'affichage de la photo de la galerie (colonne 2/3 en layout wide) :
+# la plus petite déclinaison suffisante est chargée, pas l'original.
+LARGEUR_GALERIE_PX = 900
+# Photos gardées en mémoire de session (affichée, suivante, précédente)
+GALERIE_CACHE_MAX = 3
+
 
 def afficher_page_calendrier(onglet_admin: bool = False):
     """
@@ -37,18 +44,6 @@ def afficher_page_calendrier(onglet_admin: bool = False):
     couturier_id = obtenir_couturier_id(couturier_data)
     est_admin_user = est_admin(couturier_data)
 
-    # Créer la table rappels si nécessaire
-    commande_model.creer_table_rappels_livraison()
-
-    # Rappels automatiques (exécutés 1 fois par jour)
-    from controllers.rappel_service import executer_rappels_automatiques
-    nb_rappels, msg_rappels = executer_rappels_automatiques(st.session_state.db_connection)
-    if msg_rappels:
-        if nb_rappels > 0:
-            st.success(f"✅ {msg_rappels}")
-        else:
-            st.warning(f"⚠️ {msg_rappels}")
-
     # Header (uniquement en page standalone)
     if not onglet_admin:
         st.markdown("""
@@ -132,9 +127,31 @@ def _afficher_modeles_realises(commande_model, couturier_model, couturier_id, sa
     )
 
 
+def _image_galerie(handle, key_prefix: str):
+    """
+    Octets de la déclinaison adaptée à la galerie, via un petit cache de session
+    (photo affichée + voisines) : naviguer ne relit pas la base pour une photo
+    déjà préchargée.
+    """
+    rendition = rendition_pour(handle, LARGEUR_GALERIE_PX)
+    cache_key = f"galerie_cache_{key_prefix}"
+    cache = st.session_state.setdefault(cache_key, OrderedDict())
+    cle = getattr(rendition, 'blob_id', None)
+    if cle in cache:
+        cache.move_to_end(cle)
+        return cache[cle]
+    image = lire_media(rendition)
+    if cle is not None and image is not None:
+        cache[cle] = image
+        while len(cache) > GALERIE_CACHE_MAX:
+            cache.popitem(last=False)
+    return image
+
+
 def _afficher_galerie_photos(commande_model, couturier_id_filtre, salon_id, date_debut, date_fin, key_prefix: str = "modeles"):
     """Galerie photos avec navigation Suivant / En arrière."""
-    commandes_img = commande_model.lister_commandes_avec_images(
+    # Ids, labels et handles seulement : une seule photo est chargée à la fois
+    images_liste = commande_model.lister_photos_galerie(
         couturier_id=couturier_id_filtre,
         tous_les_couturiers=(couturier_id_filtre is None),
         salon_id=salon_id,
@@ -142,22 +159,6 @@ def _afficher_galerie_photos(commande_model, couturier_id_filtre, salon_id, date
         date_fin=date_fin,
     )
 
-    # Construire la liste plate des images (fabric + model)
-    images_liste = []
-    for cmd in commandes_img:
-        client = f"{cmd.get('client_prenom', '')} {cmd.get('client_nom', '')}".strip()
-        label_base = f"#{cmd['id']} {cmd.get('modele', 'N/A')} - {client}"
-        if cmd.get('fabric_image'):
-            images_liste.append({
-                'bytes': cmd['fabric_image'],
-                'label': f"{label_base} — Tissu",
-            })
-        if cmd.get('model_image'):
-            images_liste.append({
-                'bytes': cmd['model_image'],
-                'label': f"{label_base} — Modèle",
-            })
-
     if not images_liste:
         st.info("📷 Aucune photo disponible pour cette période.")
         return
@@ -176,10 +177,11 @@ def _afficher_galerie_photos(commande_model, couturier_id_filtre, salon_id, date
 
         col_img, _ = st.columns([2, 1])
         with col_img:
+            image = _image_galerie(img_data['image'], key_prefix)
             try:
-                st.image(img_data['bytes'], caption=img_data['label'], use_container_width=True)
+                st.image(image, caption=img_data['label'], use_container_width=True)
             except Exception:
-                st.image(io.BytesIO(img_data['bytes']), caption=img_data['label'], use_container_width=True)
+                st.image(io.BytesIO(image), caption=img_data['label'], use_container_width=True)
 
         st.caption(f"Photo {idx + 1} / {nb_photos}")
 
@@ -193,6 +195,10 @@ def _afficher_galerie_photos(commande_model, couturier_id_filtre, salon_id, date
                 st.session_state[key_idx] = (st.session_state[key_idx] + 1) % nb_photos
                 st.rerun()
 
+        # Préchargement de la photo suivante (après affichage de la courante)
+        if nb_photos > 1:
+            _image_galerie(images_liste[(idx + 1) % nb_photos]['image'], key_prefix)
+
 
 def _afficher_calendrier(commande_model, couturier_model, couturier_id, salon_id, est_admin_user):
     """Affiche le calendrier des livraisons avec rappels."""
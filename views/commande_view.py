@@ -5,8 +5,8 @@ import streamlit as st
 import os
 from datetime import datetime, timedelta
 from controllers.commande_controller import CommandeController
-from controllers.pdf_controller import PDFController
 from controllers.email_controller import EmailController
+from services.email_outbox_service import mettre_en_file_avec_message
 from config import MODELES, MESURES
 from utils.image_optimizer import optimiser_image, obtenir_taille_fichier_mb
 from models.salon_model import SalonModel
@@ -23,10 +23,10 @@ def afficher_page_commande():
     # Initialiser les contrôleurs
     db = st.session_state.db_connection
     commande_controller = CommandeController(db)
-    pdf_controller = PDFController(db_connection=db)
 
     # Récupérer la configuration SMTP du salon courant (multi-tenant)
     smtp_config = None
+    salon_id = None
     try:
         if st.session_state.get("couturier_data"):
             salon_id = obtenir_salon_id(st.session_state.couturier_data)
@@ -154,7 +154,38 @@ def afficher_page_commande():
                 st.rerun()
     
     st.markdown("<br>", unsafe_allow_html=True)
-    
+
+    # ========================================================================
+    # CLIENT EXISTANT (recherche pour pré-remplir le formulaire)
+    # ========================================================================
+
+    with st.expander("🔎 Client existant", expanded=False):
+        recherche_client = st.text_input(
+            "Rechercher un client",
+            placeholder="Nom, prénom, téléphone ou email...",
+            key="recherche_client_commande"
+        )
+        clients_trouves = commande_controller.rechercher_clients(recherche_client, salon_id=salon_id) if salon_id else []
+        if clients_trouves:
+            col_client, col_remplir = st.columns([3, 1])
+            with col_client:
+                client_choisi = st.selectbox(
+                    "Clients trouvés",
+                    options=clients_trouves,
+                    format_func=lambda c: f"{c['prenom']} {c['nom']} - {c['telephone']}",
+                    key="select_client_existant"
+                )
+            with col_remplir:
+                st.markdown("<br>", unsafe_allow_html=True)
+                if st.button("✅ Utiliser", use_container_width=True, key="btn_utiliser_client"):
+                    st.session_state.client_nom_form = client_choisi['nom']
+                    st.session_state.client_prenom_form = client_choisi['prenom']
+                    st.session_state.client_telephone_form = client_choisi['telephone']
+                    st.session_state.client_email_form = client_choisi['email'] or ""
+                    st.rerun()
+        elif recherche_client.strip():
+            st.caption("Aucun client trouvé")
+
     # ========================================================================
     # FORMULAIRE PRINCIPAL
     # ========================================================================
@@ -519,7 +550,9 @@ def afficher_page_commande():
                                     if champs_manquants:
                                         raise ValueError(f"Champs manquants dans les données: {', '.join(champs_manquants)}")
                                     
-                                    # Générer le PDF
+                                    # Générer le PDF (reportlab chargé au premier PDF)
+                                    from controllers.pdf_controller import PDFController
+                                    pdf_controller = PDFController(db_connection=db)
                                     pdf_path = pdf_controller.generer_pdf_commande(pdf_data)
                                     
                                     if pdf_path and os.path.exists(pdf_path):
@@ -606,7 +639,7 @@ def afficher_page_commande():
                                     statut_fonctions['email']['message'] = "⚠️ Email non envoyé : PDF introuvable"
                                     st.warning(statut_fonctions['email']['message'])
                                 else:
-                                    with st.spinner("📧 Envoi de l'email au client..."):
+                                    with st.spinner("📧 Mise en file de l'email au client..."):
                                         subject = f"Fiche de commande - {client_prenom} {client_nom}"
                                         body = (
                                             f"Bonjour {client_prenom} {client_nom},\n\n"
@@ -619,7 +652,10 @@ def afficher_page_commande():
                                             "Merci pour votre confiance."
                                         )
                                         
-                                        succes_email, message_email = email_controller.envoyer_email_avec_message(
+                                        succes_email, message_email = mettre_en_file_avec_message(
+                                            db,
+                                            email_controller,
+                                            salon_id,
                                             client_email,
                                             subject,
                                             body,
@@ -723,6 +759,8 @@ def afficher_page_commande():
                 try:
                     if dossier_upload and os.path.exists(dossier_upload):
                         with st.spinner("📤 Copie du PDF..."):
+                            from controllers.pdf_controller import PDFController
+                            pdf_controller = PDFController(db_connection=db)
                             pdf_uploaded = pdf_controller.uploader_pdf_dossier(pdf_path_upload, dossier_upload)
                             if pdf_uploaded:
                                 st.success(f'✅ PDF copié dans: {pdf_uploaded}')
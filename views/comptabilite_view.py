@@ -18,9 +18,8 @@ FONCTIONNALITÉS :
 
 import streamlit as st
 from datetime import datetime, timedelta
-import pandas as pd
-import matplotlib.pyplot as plt
 from controllers.email_controller import EmailController
+from services.email_outbox_service import mettre_en_file_avec_message
 from models.salon_model import SalonModel
 from utils.role_utils import obtenir_salon_id
 from utils.logging_utils import get_logger
@@ -170,6 +169,9 @@ def afficher_page_comptabilite():
         
         st.markdown("### 📈 Modèles et revenus")
         
+        # matplotlib n'est chargé qu'à l'affichage des graphiques (démarrage de l'application)
+        import matplotlib.pyplot as plt
+        
         # Helper pour placer la légende intelligemment
         def _place_legend(ax, wedges, labels, title):
             max_inline = 6
@@ -369,6 +371,7 @@ def afficher_page_comptabilite():
         
         if clients:
             # Créer un DataFrame pour affichage
+            import pandas as pd
             df_clients = pd.DataFrame(clients)
             
             # Renommer les colonnes
@@ -408,6 +411,7 @@ def afficher_page_comptabilite():
         # Configurer l'email pour le salon courant
         db = st.session_state.db_connection
         smtp_config = None
+        salon_id = None
         try:
             if st.session_state.get("couturier_data"):
                 salon_id = obtenir_salon_id(st.session_state.couturier_data)
@@ -463,13 +467,15 @@ def afficher_page_comptabilite():
                             )
                             pdf_path = cmd.get('pdf_path')
                             attachments = [pdf_path] if pdf_path else None
-                            with st.spinner("📧 Envoi du rappel par email..."):
-                                succes, message = email_controller.envoyer_email_avec_message(
-                                    client_email,
-                                    subject,
-                                    body,
-                                    attachments=attachments
-                                )
+                            succes, message = mettre_en_file_avec_message(
+                                db,
+                                email_controller,
+                                salon_id,
+                                client_email,
+                                subject,
+                                body,
+                                attachments=attachments
+                            )
                             if succes:
                                 st.success(f"✅ {message}")
                             else:
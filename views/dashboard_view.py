@@ -17,8 +17,6 @@ FONCTIONNALITÉS :
 
 import streamlit as st
 from datetime import datetime
-import pandas as pd
-import plotly.express as px
 from models.database import ChargesModel, CommandeModel, CouturierModel
 from utils.role_utils import est_admin, obtenir_salon_id
 from utils.logging_utils import get_logger
@@ -153,8 +151,18 @@ def afficher_page_dashboard():
         
         st.markdown("### 📈 Statistiques de la période")
         
-        # Stats de la période sélectionnée
-        stats_periode = compta_controller.obtenir_statistiques(couturier_id, date_debut_dt, date_fin_dt)
+        # Stats de la période, totales et du jour : une seule requête
+        debut_jour = datetime.combine(aujourdhui.date(), datetime.min.time())
+        fin_jour = datetime.combine(aujourdhui.date(), datetime.max.time())
+        stats_par_periode = compta_controller.obtenir_statistiques_periodes(
+            {
+                'periode': (date_debut_dt, date_fin_dt),
+                'total': (None, None),
+                'jour': (debut_jour, fin_jour),
+            },
+            couturier_id=couturier_id,
+        )
+        stats_periode = stats_par_periode['periode']
         charges_periode = charges_model.total_charges(couturier_id, date_debut_dt, date_fin_dt)
         resultat_periode = stats_periode['ca_total'] - charges_periode
         
@@ -236,7 +244,7 @@ def afficher_page_dashboard():
         st.markdown("### 🎯 Statistiques totales (toutes périodes)")
         
         # Stats globales (sans filtre de date)
-        stats_total = compta_controller.obtenir_statistiques(couturier_id)
+        stats_total = stats_par_periode['total']
         charges_total = charges_model.total_charges(couturier_id)
         
         col1, col2, col3, col4 = st.columns(4)
@@ -318,9 +326,7 @@ def afficher_page_dashboard():
             st.success("✅ Tous les paiements sont à jour !")
         
         # Performance du jour
-        debut_jour = datetime.combine(aujourdhui.date(), datetime.min.time())
-        fin_jour = datetime.combine(aujourdhui.date(), datetime.max.time())
-        stats_jour = compta_controller.obtenir_statistiques(couturier_id, debut_jour, fin_jour)
+        stats_jour = stats_par_periode['jour']
         
         if stats_jour['nb_commandes'] > 0:
             st.success(f"🎉 Aujourd'hui : {stats_jour['nb_commandes']} commande(s) pour {stats_jour['ca_total']:,.0f} FCFA")
@@ -347,6 +353,10 @@ def afficher_page_dashboard():
             )
             
             if modeles:
+                # pandas / plotly chargés au premier graphique (démarrage de l'application)
+                import pandas as pd
+                import plotly.express as px
+
                 df_modeles = pd.DataFrame(modeles)
                 df_modeles['CA (FCFA)'] = df_modeles['ca_total'].apply(lambda x: f"{x:,.0f}")
                 total_ca_modeles = df_modeles['ca_total'].sum()
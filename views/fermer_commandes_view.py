@@ -6,6 +6,7 @@ import os
 from models.database import CommandeModel
 from controllers.fermeture_controller import FermetureController
 from controllers.email_controller import EmailController
+from services.email_outbox_service import mettre_en_file_avec_message
 from models.salon_model import SalonModel
 from utils.role_utils import obtenir_couturier_id, obtenir_salon_id, est_admin
 
@@ -46,6 +47,7 @@ def afficher_page_fermer_commandes():
 
     # Configurer l'email pour le salon courant
     smtp_config = None
+    salon_id = None
     try:
         if st.session_state.get("couturier_data"):
             salon_id = obtenir_salon_id(st.session_state.couturier_data)
@@ -285,10 +287,10 @@ def afficher_page_fermer_commandes():
                 statut="Terminé",
             )
 
-            demandes_map = fermeture_controller.demandes_en_attente_map()
+            ids = [cmd["id"] for cmd in commandes_terminees]
+            demandes_map = fermeture_controller.demandes_en_attente_map(ids, salon_id_user)
             historique_counts = {}
             if not is_admin_user and commandes_terminees:
-                ids = [cmd["id"] for cmd in commandes_terminees]
                 historique_counts = fermeture_controller.demandes_stats_par_commandes(couturier_id, ids)
 
             for cmd in commandes_terminees:
@@ -388,12 +390,14 @@ def afficher_page_fermer_commandes():
                                         f"Date de livraison: {date_livraison_txt}\n\n"
                                         "Merci pour votre confiance."
                                     )
-                                    with st.spinner("📧 Envoi de l'email de livraison..."):
-                                        succes, message = email_controller.envoyer_email_avec_message(
-                                            client_email,
-                                            subject,
-                                            body
-                                        )
+                                    succes, message = mettre_en_file_avec_message(
+                                        db,
+                                        email_controller,
+                                        salon_id,
+                                        client_email,
+                                        subject,
+                                        body
+                                    )
                                     if succes:
                                         st.success(f"✅ {message}")
                                     else:
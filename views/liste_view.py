@@ -2,12 +2,27 @@
 Vue de liste des commandes (View dans MVC)
 """
 import streamlit as st
-import pandas as pd
 import os
 import re
 from datetime import datetime
 from controllers.commande_controller import CommandeController
-from controllers.pdf_controller import PDFController
+from controllers.comptabilite_controller import ComptabiliteController
+
+
+# Nombre de commandes par page
+TAILLE_PAGE = 50
+
+# Libellé affiché -> ordre de tri de CommandeModel.rechercher_commandes
+TRIS = {
+    "Plus récentes": 'recentes',
+    "Plus anciennes": 'anciennes',
+}
+
+
+def _reinitialiser_pagination():
+    """Revient à la première page (rechargement des commandes)"""
+    st.session_state.pop('liste_signature_filtres', None)
+    st.session_state.pop('liste_curseurs', None)
 
 
 def _generer_nom_fichier_pdf(details):
@@ -44,7 +59,6 @@ def afficher_page_liste_commandes():
         
         # Initialiser les contrôleurs
         commande_controller = CommandeController(st.session_state.db_connection)
-        pdf_controller = PDFController(db_connection=st.session_state.db_connection)
         
         # Récupérer les informations de l'utilisateur connecté
         from utils.role_utils import obtenir_salon_id
@@ -52,16 +66,17 @@ def afficher_page_liste_commandes():
         salon_id = obtenir_salon_id(couturier_data)
         code_couturier = couturier_data.get('code_couturier') if couturier_data else None
         
-        # Récupérer les commandes (avec cache pour éviter les rechargements)
-        if 'commandes_liste' not in st.session_state:
-            with st.spinner("Chargement des commandes..."):
-                st.session_state.commandes_liste = commande_controller.lister_commandes_couturier(
-                    st.session_state.couturier_data['id']
-                )
+        couturier_id = couturier_data['id']
+        
+        # Statistiques lues dans les agrégats (pas de chargement de toutes les commandes)
+        stats_commandes = ComptabiliteController(st.session_state.db_connection).obtenir_statistiques(couturier_id)
         
-        commandes = st.session_state.commandes_liste
+        # Liste vide : décidé sur le COUNT de la recherche sans filtre, pas sur les agrégats
+        nb_commandes_total = commande_controller.rechercher_commandes_couturier(
+            couturier_id, taille_page=1
+        )['total']
     
-    if not commandes:
+    if not nb_commandes_total:
         with st.container():
             st.info("📭 Aucune commande enregistrée pour le moment")
             st.markdown("---")
@@ -75,9 +90,9 @@ def afficher_page_liste_commandes():
             col1, col2, col3, col4, col5 = st.columns(5)
             
             # Calculs de base
-            total_commandes = len(commandes)
-            total_ca = sum(c['prix_total'] for c in commandes)
-            commandes_en_cours = sum(1 for c in commandes if c['statut'] == 'En cours')
+            total_commandes = stats_commandes['nb_commandes']
+            total_ca = stats_commandes['ca_total']
+            commandes_en_cours = stats_commandes['commandes_par_statut'].get('En cours', 0)
             
             # Calculs optimisés avec requêtes SQL directes
             # Terminé : somme des prix_totaux des commandes totalement payées (reste <= 0)
@@ -131,7 +146,7 @@ def afficher_page_liste_commandes():
         # Filtres avec style amélioré
         with st.container():
             st.markdown("### 🔍 Filtres et Recherche")
-            col1, col2, col3 = st.columns([2, 2, 1])
+            col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
             
             with col1:
                 filtre_statut = st.selectbox(
@@ -143,16 +158,23 @@ def afficher_page_liste_commandes():
             
             with col2:
                 recherche = st.text_input(
-                    "🔎 Rechercher un client",
-                    placeholder="Nom ou prénom du client...",
+                    "🔎 Rechercher",
+                    placeholder="Client, téléphone, modèle ou n° de commande...",
                     key="recherche_client_liste"
                 )
             
             with col3:
+                tri = st.selectbox(
+                    "↕️ Trier par date",
+                    options=list(TRIS.keys()),
+                    index=0,
+                    key="tri_liste"
+                )
+            
+            with col4:
                 st.markdown("<br>", unsafe_allow_html=True)
                 if st.button("🔄 Actualiser", use_container_width=True, key="btn_actualiser_liste"):
-                    if 'commandes_liste' in st.session_state:
-                        del st.session_state.commandes_liste
+                    _reinitialiser_pagination()
                     st.rerun()
             
             # Filtre par période (dates)
@@ -186,123 +208,28 @@ def afficher_page_liste_commandes():
                         del st.session_state.filtre_date_fin_liste
                     st.rerun()
         
-        # Filtrer les commandes
-        commandes_filtrees = commandes
-        
-        # Filtrer par statut
-        if filtre_statut != "Tous":
-            commandes_filtrees = [c for c in commandes_filtrees if c['statut'] == filtre_statut]
+        # Filtres appliqués en base, pagination par clé (date_creation, id)
+        filtres = {
+            'statut': None if filtre_statut == "Tous" else filtre_statut,
+            'recherche': recherche or None,
+            'date_debut': date_debut,
+            'date_fin': date_fin,
+            'tri': TRIS[tri],
+        }
+        signature_filtres = repr(sorted(filtres.items()))
+        if st.session_state.get('liste_signature_filtres') != signature_filtres:
+            st.session_state.liste_signature_filtres = signature_filtres
+            st.session_state.liste_curseurs = [None]
+        curseurs = st.session_state.liste_curseurs
         
-        # Filtrer par recherche client
-        if recherche:
-            recherche_lower = recherche.lower()
-            commandes_filtrees = [
-                c for c in commandes_filtrees 
-                if recherche_lower in c['client_nom'].lower() 
-                or recherche_lower in c['client_prenom'].lower()
-            ]
-        
-        # Filtrer par dates
-        if date_debut or date_fin:
-            commandes_filtrees_temp = []
-            for c in commandes_filtrees:
-                date_creation = c.get('date_creation')
-                
-                # Convertir datetime en date si nécessaire
-                if date_creation is None:
-                    continue
-                
-                date_commande = None
-                
-                # Essayer différentes méthodes de conversion
-                if isinstance(date_creation, datetime):
-                    date_commande = date_creation.date()
-                elif hasattr(date_creation, 'date') and callable(getattr(date_creation, 'date')):
-                    # Si c'est un objet avec une méthode date() (comme datetime)
-                    try:
-                        date_commande = date_creation.date()
-                    except:
-                        pass
-                elif isinstance(date_creation, str):
-                    # Si c'est une chaîne, essayer de la convertir
-                    try:
-                        # Essayer différents formats
-                        if ' ' in date_creation:
-                            date_commande = datetime.strptime(date_creation.split()[0], '%Y-%m-%d').date()
-                        else:
-                            date_commande = datetime.strptime(date_creation, '%Y-%m-%d').date()
-                    except:
-                        try:
-                            date_commande = datetime.strptime(date_creation, '%Y-%m-%d %H:%M:%S').date()
-                        except:
-                            continue
-                elif hasattr(date_creation, 'year') and hasattr(date_creation, 'month') and hasattr(date_creation, 'day'):
-                    # C'est déjà une date
-                    date_commande = date_creation
-                
-                if date_commande is None:
-                    continue
-                
-                # Vérifier si la date est dans la plage
-                try:
-                    if date_debut and date_fin:
-                        # Période complète
-                        if date_debut <= date_commande <= date_fin:
-                            commandes_filtrees_temp.append(c)
-                    elif date_debut:
-                        # Seulement date de début
-                        if date_commande >= date_debut:
-                            commandes_filtrees_temp.append(c)
-                    elif date_fin:
-                        # Seulement date de fin
-                        if date_commande <= date_fin:
-                            commandes_filtrees_temp.append(c)
-                except (TypeError, ValueError):
-                    # Si la comparaison échoue, ignorer cette commande pour le filtre de date
-                    continue
-            
-            commandes_filtrees = commandes_filtrees_temp
-        
-        # Trier les commandes par date de création (du plus récent au plus ancien)
-        def get_date_for_sort(date_creation):
-            """Convertit une date en datetime pour le tri"""
-            if date_creation is None:
-                return datetime.min
-            if isinstance(date_creation, datetime):
-                return date_creation
-            if hasattr(date_creation, 'date') and callable(getattr(date_creation, 'date')):
-                try:
-                    return datetime.combine(date_creation.date(), datetime.min.time())
-                except:
-                    return datetime.min
-            if isinstance(date_creation, str):
-                try:
-                    if ' ' in date_creation:
-                        return datetime.strptime(date_creation.split()[0], '%Y-%m-%d')
-                    else:
-                        return datetime.strptime(date_creation, '%Y-%m-%d')
-                except:
-                    try:
-                        return datetime.strptime(date_creation, '%Y-%m-%d %H:%M:%S')
-                    except:
-                        return datetime.min
-            if hasattr(date_creation, 'year') and hasattr(date_creation, 'month') and hasattr(date_creation, 'day'):
-                # C'est déjà une date
-                try:
-                    return datetime.combine(date_creation, datetime.min.time())
-                except:
-                    return datetime.min
-            return datetime.min
-        
-        try:
-            commandes_filtrees = sorted(
-                commandes_filtrees,
-                key=lambda x: get_date_for_sort(x.get('date_creation')),
-                reverse=True
-            )
-        except (TypeError, ValueError, KeyError):
-            # Si le tri échoue, garder l'ordre original
-            pass
+        page = commande_controller.rechercher_commandes_couturier(
+            couturier_id,
+            taille_page=TAILLE_PAGE,
+            apres=curseurs[-1],
+            **filtres
+        )
+        commandes_filtrees = page['commandes']
+        nb_resultats = page['total']
         
         st.markdown("---")
         
@@ -319,7 +246,7 @@ def afficher_page_liste_commandes():
         
         # Affichage des commandes avec style amélioré
         with st.container():
-            st.markdown(f"### 📋 Liste des commandes ({len(commandes_filtrees)})")
+            st.markdown(f"### 📋 Liste des commandes ({nb_resultats})")
             
             if not commandes_filtrees:
                 st.warning("⚠️ Aucune commande ne correspond aux filtres sélectionnés")
@@ -343,6 +270,8 @@ def afficher_page_liste_commandes():
                         'Date': cmd['date_creation'].strftime('%d/%m/%Y')
                     })
                 
+                import pandas as pd
+
                 df = pd.DataFrame(df_data)
                 
                 # Afficher le tableau avec style
@@ -352,6 +281,20 @@ def afficher_page_liste_commandes():
                     hide_index=True,
                     height=400
                 )
+                
+                # Navigation entre les pages
+                nb_pages = max(1, -(-nb_resultats // TAILLE_PAGE))
+                col_prec, col_page, col_suiv = st.columns([1, 2, 1])
+                with col_prec:
+                    if len(curseurs) > 1 and st.button("◀ Précédente", use_container_width=True, key="btn_page_prec_liste"):
+                        curseurs.pop()
+                        st.rerun()
+                with col_page:
+                    st.caption(f"Page {len(curseurs)} / {nb_pages}")
+                with col_suiv:
+                    if page['curseur_suivant'] and st.button("Suivante ▶", use_container_width=True, key="btn_page_suiv_liste"):
+                        curseurs.append(page['curseur_suivant'])
+                        st.rerun()
         
         st.markdown("---")
         
@@ -452,6 +395,8 @@ def afficher_page_liste_commandes():
                         with col1:
                             if st.button("📄 Générer PDF", use_container_width=True, type="primary", key=f"btn_gen_pdf_{commande_selectionnee}"):
                                 with st.spinner("📄 Génération du PDF en cours..."):
+                                    from controllers.pdf_controller import PDFController
+                                    pdf_controller = PDFController(db_connection=st.session_state.db_connection)
                                     pdf_path = pdf_controller.generer_pdf_commande(details)
                                     
                                     if pdf_path and os.path.exists(pdf_path):
@@ -479,6 +424,5 @@ def afficher_page_liste_commandes():
                         
                         with col2:
                             if st.button("🔄 Actualiser", use_container_width=True, key=f"btn_actualiser_details_{commande_selectionnee}"):
-                                if 'commandes_liste' in st.session_state:
-                                    del st.session_state.commandes_liste
+                                _reinitialiser_pagination()
                                 st.rerun()
@@ -86,67 +86,6 @@ TRANCHES_IMPOTS = [
 # FONCTIONS UTILITAIRES
 # ============================================================================
 
-def calculer_prochaine_reference(charges_model: ChargesModel, couturier_id: int, salon_id: Optional[str] = None) -> int:
-    """
-    Calcule la prochaine référence (N+1) en se basant sur toutes les charges existantes.
-    Extrait les références depuis les descriptions au format "| Réf: {numero}"
-    ou depuis la colonne reference si elle existe.
-    
-    Args:
-        charges_model: Instance du modèle ChargesModel
-        couturier_id: ID du couturier
-        
-    Returns:
-        Prochaine référence (1 si aucune charge n'existe)
-    """
-    try:
-        # Récupérer toutes les charges (pour le calcul de référence, on prend toutes)
-        # Note: Pour le calcul de référence, on prend toutes les charges même si admin
-        charges = charges_model.lister_charges(
-            couturier_id,
-            limit=10000,
-            tous_les_couturiers=False,
-            salon_id=salon_id
-        )
-        
-        if not charges:
-            return 1
-        
-        # Extraire toutes les références depuis les descriptions
-        references = []
-        pattern = r'Réf:\s*(\d+)'
-        
-        for charge in charges:
-            # Vérifier d'abord si la colonne reference existe et est remplie
-            if 'reference' in charge and charge.get('reference'):
-                try:
-                    ref_num = int(charge['reference'])
-                    references.append(ref_num)
-                except (ValueError, TypeError):
-                    pass
-            
-            # Sinon, extraire depuis la description
-            description = charge.get('description', '') or ''
-            matches = re.findall(pattern, description, re.IGNORECASE)
-            for match in matches:
-                try:
-                    ref_num = int(match)
-                    references.append(ref_num)
-                except ValueError:
-                    continue
-        
-        # Si aucune référence trouvée, retourner 1
-        if not references:
-            return 1
-        
-        # Retourner le maximum + 1
-        return max(references) + 1
-        
-    except Exception as e:
-        logger.warning("Erreur calcul prochaine référence: %s", e)
-        return 1
-
-
 def sauvegarder_fichier_charge(uploaded_file, charge_id: int) -> Optional[Dict]:
     """
     Sauvegarde un fichier justificatif pour une charge EN BASE DE DONNÉES.
@@ -2240,7 +2179,7 @@ def _formulaire_salaire(charges_model, couturier_id, salon_id_user: Optional[str
     st.info("Enregistrez le paiement du salaire d'un employé")
     
     # Calculer la prochaine référence (N+1) basée sur toutes les charges
-    ref_suivante = calculer_prochaine_reference(charges_model, couturier_id, salon_id=salon_id_user)
+    ref_suivante = charges_model.prochaine_reference(couturier_id, salon_id=salon_id_user)
     
     with st.form("form_salaire", clear_on_submit=True):
         col1, col2 = st.columns(2)
@@ -2293,7 +2232,7 @@ def _formulaire_salaire(charges_model, couturier_id, salon_id_user: Optional[str
             reference = st.text_input(
                 "Référence de paiement *",
                 value=str(ref_suivante),
-                help="Référence de paiement (générée automatiquement N+1, modifiable)"
+                help="Référence de paiement (N+1 du salon, réservée à l'enregistrement ; modifiable)"
             )
         
         submit = st.form_submit_button("💾 Enregistrer le salaire", type="primary")
@@ -2304,6 +2243,8 @@ def _formulaire_salaire(charges_model, couturier_id, salon_id_user: Optional[str
             elif montant <= 0:
                 st.error("❌ Le montant doit être supérieur à 0")
             else:
+                # Réservation atomique sur le compteur du salon (numéro déjà pris -> suivant libre)
+                reference = charges_model.allouer_reference(couturier_id, salon_id_user, reference) or reference
                 periode_str = periode.strftime('%m/%Y')
                 description = f"Salaire - Période: {periode_str} - Mode: {mode_paiement}"
                 if reference:
@@ -2360,7 +2301,7 @@ def _formulaire_ponctuelle(charges_model, couturier_id, salon_id_user: Optional[
     st.info("Enregistrez une dépense occasionnelle ou ponctuelle")
     
     # Calculer la prochaine référence (N+1) basée sur toutes les charges
-    ref_suivante = calculer_prochaine_reference(charges_model, couturier_id, salon_id=salon_id_user)
+    ref_suivante = charges_model.prochaine_reference(couturier_id, salon_id=salon_id_user)
     
     with st.form("form_ponctuelle", clear_on_submit=True):
         col1, col2 = st.columns(2)
@@ -2413,7 +2354,7 @@ def _formulaire_ponctuelle(charges_model, couturier_id, salon_id_user: Optional[
             reference = st.text_input(
                 "Référence de paiement *",
                 value=str(ref_suivante),
-                help="Référence de paiement (générée automatiquement N+1, modifiable)"
+                help="Référence de paiement (N+1 du salon, réservée à l'enregistrement ; modifiable)"
             )
             
            
@@ -2436,6 +2377,7 @@ def _formulaire_ponctuelle(charges_model, couturier_id, salon_id_user: Optional[
             elif not description or len(description.strip()) < 5:
                 st.error("❌ La description doit comporter au moins 5 caractères")
             else:
+                reference = charges_model.allouer_reference(couturier_id, salon_id_user, reference) or reference
                 desc_complete = description
                 if fournisseur and fournisseur != "Aucun":
                     desc_complete = f"{description} | Fournisseur: {fournisseur}"
@@ -2481,7 +2423,7 @@ def _formulaire_fixe(charges_model, couturier_id, salon_id_user: Optional[str] =
     st.info("Enregistrez une dépense récurrente (loyer, électricité, abonnements...)")
 
     # Calculer la prochaine référence (N+1) basée sur toutes les charges
-    ref_suivante = calculer_prochaine_reference(charges_model, couturier_id, salon_id=salon_id_user)
+    ref_suivante = charges_model.prochaine_reference(couturier_id, salon_id=salon_id_user)
 
     BENEFICIAIRES_FIXES = [
         "Aucun",
@@ -2542,7 +2484,7 @@ def _formulaire_fixe(charges_model, couturier_id, salon_id_user: Optional[str] =
             reference = st.text_input(
                 "Référence de paiement *",
                 value=str(ref_suivante),
-                help="Référence de paiement (générée automatiquement N+1, modifiable)"
+                help="Référence de paiement (N+1 du salon, réservée à l'enregistrement ; modifiable)"
             )
         
         # Upload de fichier justificatif
@@ -2561,6 +2503,7 @@ def _formulaire_fixe(charges_model, couturier_id, salon_id_user: Optional[str] =
             if montant <= 0:
                 st.error("❌ Le montant doit être supérieur à 0")
             else:
+                reference = charges_model.allouer_reference(couturier_id, salon_id_user, reference) or reference
                 # Construire une description structurée
                 periode_str = periode_concernee.strftime('%m/%Y')
                 desc_complete = f"Charge {periodicite.lower()} - Période: {periode_str}"
@@ -2609,7 +2552,7 @@ def _formulaire_commande(charges_model, commande_model, couturier_id, salon_id_u
     st.info("Enregistrez une dépense directement associée à une commande client")
     
     # Calculer la prochaine référence (N+1) basée sur toutes les charges
-    ref_suivante = calculer_prochaine_reference(charges_model, couturier_id, salon_id=salon_id_user)
+    ref_suivante = charges_model.prochaine_reference(couturier_id, salon_id=salon_id_user)
     
     LIEE_AU_COMMANDES = [
         "Aucun",
@@ -2697,7 +2640,7 @@ def _formulaire_commande(charges_model, commande_model, couturier_id, salon_id_u
         reference = st.text_input(
             "Référence de paiement *",
             value=str(ref_suivante),
-            help="Référence de paiement (générée automatiquement N+1, modifiable)"
+            help="Référence de paiement (N+1 du salon, réservée à l'enregistrement ; modifiable)"
         )
         
       
@@ -2722,6 +2665,7 @@ def _formulaire_commande(charges_model, commande_model, couturier_id, salon_id_u
             elif not description or len(description.strip()) < 5:
                 st.error("❌ Veuillez fournir une description d'au moins 5 caractères")
             else:
+                reference = charges_model.allouer_reference(couturier_id, salon_id_user, reference) or reference
                 desc_complete = description
                 if fournisseur and fournisseur != "Aucun":
                     desc_complete += f" | Fournisseur: {fournisseur}"
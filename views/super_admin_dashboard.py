@@ -10,12 +10,15 @@ import streamlit as st
 from models.salon_model import SalonModel
 from models.database import CouturierModel, CommandeModel
 from controllers.super_admin_controller import SuperAdminController
+from services.export_service import FORMATS_EXPORT
+from utils.onglets import afficher_onglets
 from utils.permissions import est_super_admin
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import json
+import os
+import tempfile
 from utils.logging_utils import get_logger
 
 
@@ -47,57 +50,19 @@ def afficher_dashboard_super_admin():
     commande_model = CommandeModel(st.session_state.db_connection)
     
     # ========================================================================
-    # ONGLETS PRINCIPAUX
+    # ONGLETS PRINCIPAUX (seul l'onglet choisi est exécuté)
     # ========================================================================
     
-    tabs = st.tabs([
-        "📊 Vue d'ensemble",
-        "🏢 Gérer les salons",
-        "👥 Gérer les utilisateurs",
-        "📦 Toutes les commandes",
-        "📈 Statistiques avancées",
-        "🔔 Demandes (global)",
-        "📄 Rapports"
+    afficher_onglets("super_admin", [
+        ("📊 Vue d'ensemble", lambda: afficher_vue_ensemble(super_admin_ctrl, salon_model)),
+        ("🏢 Gérer les salons", lambda: afficher_gestion_salons(salon_model)),
+        ("👥 Gérer les utilisateurs",
+         lambda: afficher_gestion_utilisateurs(super_admin_ctrl, salon_model, couturier_model)),
+        ("📦 Toutes les commandes", lambda: afficher_toutes_commandes(super_admin_ctrl, salon_model)),
+        ("📈 Statistiques avancées", lambda: afficher_statistiques_avancees(super_admin_ctrl, salon_model)),
+        ("🔔 Demandes (global)", lambda: afficher_demandes_globales_super_admin(commande_model, salon_model)),
+        ("📄 Rapports", lambda: afficher_rapports(super_admin_ctrl, salon_model)),
     ])
-    
-    # ========================================================================
-    # ONGLET 1 : VUE D'ENSEMBLE
-    # ========================================================================
-    with tabs[0]:
-        afficher_vue_ensemble(super_admin_ctrl, salon_model)
-    
-    # ========================================================================
-    # ONGLET 2 : GÉRER LES SALONS
-    # ========================================================================
-    with tabs[1]:
-        afficher_gestion_salons(salon_model)
-    
-    # ========================================================================
-    # ONGLET 3 : GÉRER LES UTILISATEURS (ADMINS + EMPLOYÉS)
-    # ========================================================================
-    with tabs[2]:
-        afficher_gestion_utilisateurs(super_admin_ctrl, salon_model, couturier_model)
-    
-    # ========================================================================
-    # ONGLET 4 : TOUTES LES COMMANDES
-    # ========================================================================
-    with tabs[3]:
-        afficher_toutes_commandes(super_admin_ctrl, salon_model)
-    
-    # ========================================================================
-    # ONGLET 5 : STATISTIQUES AVANCÉES
-    # ========================================================================
-    with tabs[4]:
-        afficher_statistiques_avancees(super_admin_ctrl, salon_model)
-    
-    # ========================================================================
-    # ONGLET 6 : RAPPORTS
-    # ========================================================================
-    with tabs[5]:
-        afficher_demandes_globales_super_admin(commande_model, salon_model)
-    
-    with tabs[6]:
-        afficher_rapports(super_admin_ctrl, salon_model)
 
 
 # ============================================================================
@@ -1805,76 +1770,49 @@ def afficher_rapports(super_admin_ctrl, salon_model):
     ---
     """)
     
-    col1, col2 = st.columns(2)
+
+    formats = {
+        "📊 Excel (XLSX) – une feuille par table": 'xlsx',
+        "📄 CSV (ZIP) – un fichier par table": 'csv',
+        "🧱 Parquet (ZIP) – pour Python, Power BI, DuckDB": 'parquet',
+    }
+    format_choisi = formats[st.radio("Format", options=list(formats.keys()), key="format_rapport")]
+    st.caption("Toutes les commandes sont exportées, sans limite : le fichier est écrit table par table.")
     
-    with col1:
-        st.markdown("#### 📄 Format JSON")
-        st.markdown("""
-        Le format JSON est idéal pour :
-        - Import dans d'autres applications
-        - Analyse avec des outils de programmation (Python, JavaScript)
-        - Archivage structuré
-        """)
-        
-        if st.button("📥 Générer rapport JSON", use_container_width=True):
-            with st.spinner("Génération du rapport..."):
-                rapport = super_admin_ctrl.generer_rapport_complet(salon_id_rapport)
-                
-                # Convertir en JSON
-                json_str = json.dumps(rapport, indent=2, default=str, ensure_ascii=False)
-                
-                st.download_button(
-                    label="💾 Télécharger le rapport JSON",
-                    data=json_str,
-                    file_name=f"rapport_{'global' if not salon_id_rapport else salon_id_rapport}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                    mime="application/json",
-                    width='stretch'
-                )
-                
-                st.success("✅ Rapport JSON généré avec succès !")
-                
-                # Aperçu du rapport
-                with st.expander("👁️ Aperçu du rapport (premiers éléments)"):
-                    st.json({
-                        'date_generation': rapport.get('date_generation'),
-                        'type': rapport.get('type'),
-                        'salon_id': rapport.get('salon_id'),
-                        'nombre_salons': len(rapport.get('salons', [])),
-                        'nombre_utilisateurs': len(rapport.get('utilisateurs', [])),
-                        'nombre_commandes': len(rapport.get('commandes', []))
-                    })
+    if st.button("📥 Générer le rapport", use_container_width=True):
+        suffixe, mime = FORMATS_EXPORT[format_choisi]
+        descripteur, chemin = tempfile.mkstemp(suffix=suffixe)
+        os.close(descripteur)
+        barre = st.progress(0.0, text="Préparation du rapport...")
+        try:
+            lignes = super_admin_ctrl.exporter_rapport_complet(
+                chemin, format_choisi, salon_id_rapport,
+                progression=lambda message, fraction: barre.progress(fraction, text=message),
+            )
+        except Exception as e:
+            logger.exception("Échec de l'export du rapport (%s)", format_choisi)
+            if os.path.exists(chemin):
+                os.remove(chemin)
+            st.error(f"❌ Erreur lors de la génération du rapport : {e}")
+        else:
+            precedent = st.session_state.get('rapport_export')
+            if precedent and os.path.exists(precedent['chemin']):
+                os.remove(precedent['chemin'])
+            st.session_state.rapport_export = {
+                'chemin': chemin,
+                'nom': f"rapport_{salon_id_rapport or 'global'}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{suffixe}",
+                'mime': mime,
+                'lignes': lignes,
+            }
     
-    with col2:
-        st.markdown("#### 📊 Format CSV")
-        st.markdown("""
-        Le format CSV est idéal pour :
-        - Ouverture dans Excel ou Google Sheets
-        - Analyse avec des tableurs
-        - Import dans des bases de données
-        """)
-        
-        if st.button("📥 Générer rapport CSV", use_container_width=True):
-            with st.spinner("Génération du rapport..."):
-                rapport = super_admin_ctrl.generer_rapport_complet(salon_id_rapport)
-                
-                # Convertir les salons en CSV
-                if rapport.get('salons'):
-                    df_salons = pd.DataFrame(rapport['salons'])
-                    csv = df_salons.to_csv(index=False)
-                    
-                    st.download_button(
-                        label="💾 Télécharger le rapport CSV",
-                        data=csv,
-                        file_name=f"rapport_salons_{'global' if not salon_id_rapport else salon_id_rapport}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                        mime="text/csv",
-                        width='stretch'
-                    )
-                    
-                    st.success("✅ Rapport CSV généré avec succès !")
-                    
-                    # Aperçu du tableau
-                    with st.expander("👁️ Aperçu du tableau (premiers salons)"):
-                        st.dataframe(df_salons.head(10), width='stretch', hide_index=True)
-                else:
-                    st.warning("⚠️ Aucun salon à exporter")
-
+    rapport = st.session_state.get('rapport_export')
+    if rapport and os.path.exists(rapport['chemin']):
+        st.success("✅ Rapport généré : " + ", ".join(f"{table} ({nb})" for table, nb in rapport['lignes'].items()))
+        with open(rapport['chemin'], 'rb') as fichier:
+            st.download_button(
+                label="💾 Télécharger le rapport",
+                data=fichier,
+                file_name=rapport['nom'],
+                mime=rapport['mime'],
+                width='stretch'
+            )